@@ -2,12 +2,14 @@ import argparse
 import os
 import os.path as osp
 import re
+import sys
 from collections import OrderedDict
 from datetime import datetime
 from pathlib import Path
 
 import mmcv
 from mmcv import Config
+from perf_utils import measure_inference, summarize_perf
 from rich.console import Console
 from rich.syntax import Syntax
 from rich.table import Table
@@ -62,6 +64,37 @@ def parse_args():
         action='store_true',
         help='Summarize benchmark test results.')
     parser.add_argument('--save', action='store_true', help='Save the summary')
+    parser.add_argument(
+        '--perf',
+        action='store_true',
+        help='Run the performance regression locally instead of the test '
+        'jobs, and record the inference throughput, latency and peak memory.')
+    parser.add_argument(
+        '--device', default='cpu', help='Device of the performance mode.')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=1,
+        help='Batch size of the performance mode.')
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=5,
+        help='Warm-up iterations of the performance mode.')
+    parser.add_argument(
+        '--iters',
+        type=int,
+        default=20,
+        help='Timed iterations of the performance mode.')
+    parser.add_argument(
+        '--baseline', help='The baseline file to compare the performance.')
+    parser.add_argument(
+        '--save-baseline', help='Save the performance as a baseline file.')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.1,
+        help='The relative tolerance of the performance regression.')
 
     args = parser.parse_args()
     return args
@@ -305,10 +338,75 @@ def summary(args):
         save_summary(summary_data, models, work_dir)
 
 
+def perf(args):
+    model_index_file = MMCLS_ROOT / 'model-index.yml'
+    model_index = Config.fromfile(model_index_file)
+    models = OrderedDict()
+    for file in model_index.Import:
+        metafile = Config.fromfile(MMCLS_ROOT / file)
+        models.update({model.Name: model for model in metafile.Models})
+
+    if args.models:
+        patterns = [re.compile(pattern) for pattern in args.models]
+        filter_models = {}
+        for k, v in models.items():
+            if any([re.match(pattern, k) for pattern in patterns]):
+                filter_models[k] = v
+        if len(filter_models) == 0:
+            print('No model found, please specify models in:')
+            print('\n'.join(models.keys()))
+            return
+        models = filter_models
+
+    http_prefix = 'https://download.openmmlab.com/mmclassification/'
+    results = {}
+    failures = {}
+    for model_name, model_info in models.items():
+        config = MMCLS_ROOT / model_info.Config
+        checkpoint = Path(args.checkpoint_root) / \
+            model_info.Weights[len(http_prefix):]
+        # The speed doesn't depend on the weights.
+        checkpoint = str(checkpoint) if checkpoint.exists() else None
+        console.print(f'Measuring {model_name}')
+        try:
+            results[model_name] = measure_inference(
+                str(config),
+                checkpoint,
+                device=args.device,
+                batch_size=args.batch_size,
+                warmup=args.warmup,
+                iters=args.iters)
+        except RuntimeError as e:
+            console.print(f'[red]{model_name} failed: {e}[/red]')
+            failures[model_name] = str(e)
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    mmcv.dump(results, work_dir / 'perf_results.json', indent=2)
+    settings = dict(
+        device=args.device,
+        batch_size=args.batch_size,
+        warmup=args.warmup,
+        iters=args.iters)
+    regressions = summarize_perf(
+        results,
+        'test',
+        settings,
+        args.baseline,
+        args.save_baseline,
+        args.tolerance,
+        failures=failures,
+        models=list(models) if args.models else None)
+    if regressions:
+        sys.exit(1)
+
+
 def main():
     args = parse_args()
 
-    if args.summary:
+    if args.perf:
+        perf(args)
+    elif args.summary:
         summary(args)
     else:
         test(args)
@@ -3,11 +3,13 @@ import json
 import os
 import os.path as osp
 import re
+import sys
 from datetime import datetime
 from pathlib import Path
 from zipfile import ZipFile
 
 from mmcv import Config
+from perf_utils import measure_train, summarize_perf
 from rich.console import Console
 from rich.syntax import Syntax
 from rich.table import Table
@@ -63,6 +65,49 @@ def parse_args():
         '--save',
         action='store_true',
         help='Save the summary and archive log files.')
+    parser.add_argument(
+        '--perf',
+        action='store_true',
+        help='Run the performance regression locally instead of the train '
+        'jobs, and record the training speed, data loading time ratio and '
+        'peak memory.')
+    parser.add_argument(
+        '--device', default='cpu', help='Device of the performance mode.')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=8,
+        help='Batch size of the performance mode.')
+    parser.add_argument(
+        '--warmup',
+        type=int,
+        default=2,
+        help='Warm-up iterations of the performance mode.')
+    parser.add_argument(
+        '--iters',
+        type=int,
+        default=10,
+        help='Timed iterations of the performance mode.')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=2,
+        help='Data loading workers of the performance mode.')
+    parser.add_argument(
+        '--img-shape',
+        type=int,
+        nargs=2,
+        default=[256, 256],
+        help='The shape of the synthetic images of the performance mode.')
+    parser.add_argument(
+        '--baseline', help='The baseline file to compare the performance.')
+    parser.add_argument(
+        '--save-baseline', help='Save the performance as a baseline file.')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.1,
+        help='The relative tolerance of the performance regression.')
 
     args = parser.parse_args()
     return args
@@ -326,10 +371,69 @@ def summary(args):
         save_summary(summary_data, models, work_dir)
 
 
+def perf(args):
+    models_cfg = Config.fromfile(Path(__file__).parent / 'bench_train.yml')
+    models = {model.Name: model for model in models_cfg.Models}
+
+    if args.models:
+        patterns = [re.compile(pattern) for pattern in args.models]
+        filter_models = {}
+        for k, v in models.items():
+            if any([re.match(pattern, k) for pattern in patterns]):
+                filter_models[k] = v
+        if len(filter_models) == 0:
+            print('No model found, please specify models in:')
+            print('\n'.join(models.keys()))
+            return
+        models = filter_models
+
+    results = {}
+    failures = {}
+    for model_name, model_info in models.items():
+        console.print(f'Measuring {model_name}')
+        try:
+            results[model_name] = measure_train(
+                model_info.Config,
+                device=args.device,
+                batch_size=args.batch_size,
+                workers=args.workers,
+                img_shape=tuple(args.img_shape),
+                warmup=args.warmup,
+                iters=args.iters)
+        except RuntimeError as e:
+            console.print(f'[red]{model_name} failed: {e}[/red]')
+            failures[model_name] = str(e)
+
+    work_dir = Path(args.work_dir)
+    work_dir.mkdir(parents=True, exist_ok=True)
+    with open(work_dir / 'perf_results.json', 'w') as f:
+        json.dump(results, f, indent=2)
+    settings = dict(
+        device=args.device,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        img_shape=args.img_shape,
+        warmup=args.warmup,
+        iters=args.iters)
+    regressions = summarize_perf(
+        results,
+        'train',
+        settings,
+        args.baseline,
+        args.save_baseline,
+        args.tolerance,
+        failures=failures,
+        models=list(models) if args.models else None)
+    if regressions:
+        sys.exit(1)
+
+
 def main():
     args = parse_args()
 
-    if args.summary:
+    if args.perf:
+        perf(args)
+    elif args.summary:
         summary(args)
     else:
         train(args)
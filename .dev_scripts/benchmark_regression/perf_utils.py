@@ -0,0 +1,382 @@
+"""Utilities of the performance regression mode of the benchmark scripts.
+
+Every model is measured in a new process, so that the peak memory isn't
+affected by the other models, and the results are compared with a baseline
+file recorded by a previous run.
+"""
+import multiprocessing
+import platform
+import resource
+import subprocess
+import time
+from datetime import datetime
+from pathlib import Path
+from queue import Empty
+
+import mmcv
+import numpy as np
+import torch
+
+# The version of the baseline file format.
+BASELINE_VERSION = 1
+MMCLS_ROOT = Path(__file__).absolute().parents[2]
+
+# Whether a larger value of the metric is better.
+PERF_METRICS = {
+    'throughput': True,
+    'latency_p50': False,
+    'latency_p95': False,
+    'iters_per_sec': True,
+    'data_time_ratio': False,
+    'peak_memory': False,
+}
+
+
+def get_input_shape(cfg, default=224):
+    """Get the input size from the crop or resize of the test pipeline."""
+    size = default
+    for transform in cfg.data.test.pipeline:
+        if transform['type'] == 'CenterCrop':
+            size = transform['crop_size']
+        elif transform['type'] == 'Resize' and size == default:
+            size = transform['size']
+    if isinstance(size, int):
+        size = (size, size)
+    if min(size) <= 0:
+        size = (default, default)
+    return (3, *size)
+
+
+def _peak_memory(device):
+    """The peak memory of the process in MB."""
+    if device.startswith('cuda'):
+        return torch.cuda.max_memory_allocated() / 2**20
+    # The maxrss is in KB on Linux.
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class SyntheticDataset(torch.utils.data.Dataset):
+    """Apply the training pipeline on random images, to measure the data
+    loading time without the dataset files."""
+
+    def __init__(self, pipeline, num_samples, img_shape, num_classes):
+        from mmcls.datasets.pipelines import Compose
+        pipeline = [t for t in pipeline if t['type'] != 'LoadImageFromFile']
+        self.pipeline = Compose(pipeline)
+        self.num_samples = num_samples
+        self.img_shape = img_shape
+        self.num_classes = num_classes
+
+    def __len__(self):
+        return self.num_samples
+
+    def __getitem__(self, idx):
+        rng = np.random.RandomState(idx)
+        img = rng.randint(0, 256, (*self.img_shape, 3), dtype=np.uint8)
+        results = dict(
+            img=img,
+            img_shape=img.shape,
+            ori_shape=img.shape,
+            gt_label=np.array(idx % self.num_classes, dtype=np.int64))
+        return self.pipeline(results)
+
+
+def _measure_inference(config, checkpoint, device, batch_size, warmup, iters):
+    from mmcls.apis import init_model
+
+    cfg = mmcv.Config.fromfile(config)
+    model = init_model(cfg, checkpoint, device=device)
+    imgs = torch.randn(batch_size, *get_input_shape(cfg), device=device)
+
+    latencies = []
+    with torch.no_grad():
+        for i in range(warmup + iters):
+            start = time.perf_counter()
+            model(imgs, return_loss=False, img_metas=None)
+            if device.startswith('cuda'):
+                torch.cuda.synchronize()
+            if i >= warmup:
+                latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies)
+    return dict(
+        throughput=float(batch_size * iters / latencies.sum()),
+        latency_p50=float(np.percentile(latencies, 50) * 1000),
+        latency_p95=float(np.percentile(latencies, 95) * 1000),
+        peak_memory=_peak_memory(device))
+
+
+def _measure_train(config, device, batch_size, workers, img_shape, warmup,
+                   iters):
+    from mmcv.runner import build_optimizer
+
+    from mmcls.datasets import build_dataloader
+    from mmcls.models import build_classifier
+
+    cfg = mmcv.Config.fromfile(config)
+    cfg.model.pretrained = None
+    model = build_classifier(cfg.model).to(device)
+    model.train()
+    optimizer = build_optimizer(model, cfg.optimizer)
+    num_classes = cfg.model.head.get('num_classes', 1000)
+    dataset = SyntheticDataset(cfg.data.train.pipeline,
+                               batch_size * (warmup + iters), img_shape,
+                               num_classes)
+    data_loader = build_dataloader(
+        dataset,
+        batch_size,
+        workers,
+        num_gpus=1,
+        dist=False,
+        shuffle=False,
+        persistent_workers=False)
+
+    data_time, total_time = 0., 0.
+    data_iter = iter(data_loader)
+    for i in range(warmup + iters):
+        start = time.perf_counter()
+        data = next(data_iter)
+        loaded = time.perf_counter()
+        data = {k: v.to(device) for k, v in data.items() if k != 'img_metas'}
+        outputs = model.train_step(data, optimizer)
+        optimizer.zero_grad()
+        outputs['loss'].backward()
+        optimizer.step()
+        if device.startswith('cuda'):
+            torch.cuda.synchronize()
+        if i >= warmup:
+            data_time += loaded - start
+            total_time += time.perf_counter() - start
+    return dict(
+        iters_per_sec=iters / total_time,
+        data_time_ratio=data_time / total_time,
+        peak_memory=_peak_memory(device))
+
+
+def _run(queue, func, args):
+    try:
+        queue.put((True, func(*args)))
+    except Exception as e:
+        queue.put((False, f'{type(e).__name__}: {e}'))
+
+
+def run_isolated(func, *args, poll_interval=1.):
+    """Run the function in a new process, and return its result.
+
+    A non-daemonic process is used, so that the data loader can start its
+    workers. If the process exits without a result, e.g. killed by the OOM
+    killer or crashed, a RuntimeError with the exit code is raised.
+    """
+    ctx = multiprocessing.get_context('spawn')
+    queue = ctx.Queue()
+    process = ctx.Process(target=_run, args=(queue, func, args))
+    process.start()
+    while True:
+        try:
+            success, result = queue.get(timeout=poll_interval)
+            break
+        except Empty:
+            if process.is_alive():
+                continue
+        # the result may be put right before the exit
+        try:
+            success, result = queue.get(timeout=poll_interval)
+            break
+        except Empty:
+            process.join()
+            raise RuntimeError('The process exited without a result, '
+                               f'exit code {process.exitcode}.')
+    process.join()
+    if not success:
+        raise RuntimeError(result)
+    return result
+
+
+def measure_inference(config,
+                      checkpoint=None,
+                      device='cpu',
+                      batch_size=1,
+                      warmup=5,
+                      iters=20):
+    """Measure the inference throughput, latency and peak memory."""
+    return run_isolated(_measure_inference, config, checkpoint, device,
+                        batch_size, warmup, iters)
+
+
+def measure_train(config,
+                  device='cpu',
+                  batch_size=8,
+                  workers=2,
+                  img_shape=(256, 256),
+                  warmup=2,
+                  iters=10):
+    """Measure the training iterations per second, the time ratio of data
+    loading and the peak memory."""
+    return run_isolated(_measure_train, config, device, batch_size, workers,
+                        img_shape, warmup, iters)
+
+
+def _git_hash():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'],
+                                       cwd=MMCLS_ROOT).decode().strip()
+    except Exception:
+        return None
+
+
+def dump_baseline(results, filename, kind, settings):
+    """Save the results as a baseline file with the environment."""
+    import mmcls
+    baseline = dict(
+        version=BASELINE_VERSION,
+        kind=kind,
+        date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        mmcls_version=mmcls.__version__,
+        git_hash=_git_hash(),
+        torch_version=torch.__version__,
+        platform=platform.platform(),
+        settings=settings,
+        models=results)
+    mmcv.dump(baseline, filename, indent=2)
+
+
+def load_baseline(filename, kind):
+    """Load a baseline file and check the version and kind."""
+    baseline = mmcv.load(filename)
+    assert baseline.get('version') == BASELINE_VERSION, \
+        f'The baseline file version {baseline.get("version")} is not ' \
+        f'supported, please record a new baseline.'
+    assert baseline['kind'] == kind, \
+        f'The baseline file is for the {baseline["kind"]} benchmark.'
+    return baseline
+
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Compare the results with the baseline.
+
+    Args:
+        results (dict): The metrics of every model.
+        baseline (dict): The loaded baseline.
+        tolerance (float): The relative tolerance, e.g. 0.1 means the
+            regression within 10% is accepted.
+
+    Returns:
+        dict: The comparison of every metric of every model, with
+        ``baseline``, ``result``, ``change`` (the relative change, positive
+        means better) and ``regression``.
+    """
+    comparison = {}
+    for model_name, metrics in results.items():
+        base_metrics = baseline['models'].get(model_name, {})
+        comparison[model_name] = {}
+        for key, value in metrics.items():
+            if key not in PERF_METRICS or key not in base_metrics:
+                continue
+            base = base_metrics[key]
+            if base == 0:
+                change = 0.
+            elif PERF_METRICS[key]:
+                change = (value - base) / base
+            else:
+                change = (base - value) / base
+            comparison[model_name][key] = dict(
+                baseline=base,
+                result=value,
+                change=change,
+                regression=change < -tolerance)
+    return comparison
+
+
+def show_perf_summary(results, comparison, title):
+    """Show the metrics of every model, colored by the comparison."""
+    from rich.console import Console
+    from rich.table import Table
+
+    keys = [
+        key for key in PERF_METRICS
+        if any(key in metrics for metrics in results.values())
+    ]
+    table = Table(title=title)
+    table.add_column('Model')
+    for key in keys:
+        table.add_column(key)
+
+    for model_name, metrics in results.items():
+        row = [model_name]
+        for key in keys:
+            if key not in metrics:
+                row.append('')
+                continue
+            text = f'{metrics[key]:.3f}'
+            compare = comparison.get(model_name, {}).get(key)
+            if compare is not None:
+                color = 'red' if compare['regression'] else \
+                    'green' if compare['change'] > 0 else 'white'
+                text = (f'[{color}]{text} ({compare["change"]:+.1%})'
+                        f'[/{color}]')
+            row.append(text)
+        table.add_row(*row)
+    Console().print(table)
+
+
+def summarize_perf(results,
+                   kind,
+                   settings,
+                   baseline_file=None,
+                   save_baseline=None,
+                   tolerance=0.1,
+                   failures=None,
+                   models=None):
+    """Show the results, compare them with the baseline, and save them as a
+    new baseline if specified.
+
+    Args:
+        failures (dict, optional): The errors of the failed models.
+        models (list[str], optional): The names of the measured models, to
+            find the models of the baseline without results. Defaults to
+            all models of the baseline.
+
+    Returns:
+        list[str]: The regressed metrics, the failed models and the models
+        of the baseline without results.
+    """
+    failures = failures or {}
+    comparison = {}
+    missing = []
+    if baseline_file is not None:
+        baseline = load_baseline(baseline_file, kind)
+        if baseline['settings'] != settings:
+            print('Warning: the settings are different from the baseline '
+                  f'{baseline["settings"]}.')
+        comparison = compare_with_baseline(results, baseline, tolerance)
+        missing = [
+            model_name for model_name in (models or baseline['models'])
+            if model_name in baseline['models'] and model_name not in results
+            and model_name not in failures
+        ]
+    show_perf_summary(results, comparison,
+                      f'{kind.capitalize()} Performance Regression Summary')
+
+    regressions = [
+        f'{model_name}: {key} {compare["baseline"]:.3f} -> '
+        f'{compare["result"]:.3f} ({compare["change"]:+.1%})'
+        for model_name, metrics in comparison.items()
+        for key, compare in metrics.items() if compare['regression']
+    ]
+    regressions += [
+        f'{model_name}: failed, {error}'
+        for model_name, error in failures.items()
+    ]
+    regressions += [
+        f'{model_name}: no result of the baseline model'
+        for model_name in missing
+    ]
+    if regressions:
+        print(f'{len(regressions)} regressions beyond the tolerance '
+              f'{tolerance:.1%} or failures:')
+        print('\n'.join(regressions))
+    elif baseline_file is not None:
+        print(f'No regression beyond the tolerance {tolerance:.1%}.')
+    if save_baseline is not None:
+        dump_baseline(results, save_baseline, kind, settings)
+        print(f'Baseline saved at {save_baseline}')
+    return regressions
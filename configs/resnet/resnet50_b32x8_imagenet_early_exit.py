@@ -0,0 +1,21 @@
+_base_ = ['./resnet50_b32x8_imagenet.py']
+
+# Attach exits to the stage 2 and stage 3 of ResNet-50. Samples whose
+# softmax confidence reaches `exit_threshold` stop at the first such exit.
+model = dict(
+    type='EarlyExitClassifier',
+    backbone=dict(out_indices=(1, 2, 3)),
+    exit_heads=[
+        dict(
+            type='LinearClsHead',
+            num_classes=5,
+            in_channels=512,
+            loss=dict(type='CrossEntropyLoss', loss_weight=1.0)),
+        dict(
+            type='LinearClsHead',
+            num_classes=5,
+            in_channels=1024,
+            loss=dict(type='CrossEntropyLoss', loss_weight=1.0)),
+    ],
+    exit_threshold=0.9,
+    exit_loss_weights=0.5)
@@ -0,0 +1,20 @@
+_base_ = ['./resnet50_b32x8_imagenet.py']
+
+# Retrain the head only. The pooled features of the frozen backbone are
+# extracted once with the test pipeline, and the following epochs iterate
+# over the memory-mapped feature cache.
+# The backbone must be pretrained, or the cached features are meaningless.
+model = dict(
+    backbone=dict(
+        frozen_stages=4,
+        norm_eval=True,
+        init_cfg=dict(
+            type='Pretrained',
+            checkpoint='https://download.openmmlab.com/mmclassification/v0/resnet/resnet50_8xb32_in1k_20210831-ea4938fc.pth',  # noqa: E501
+            prefix='backbone')))
+feature_cache = dict(samples_per_gpu=32, overwrite=False)
+data = dict(samples_per_gpu=256, workers_per_gpu=2)
+
+optimizer = dict(type='SGD', lr=0.1, momentum=0.9, weight_decay=0.)
+lr_config = dict(policy='CosineAnnealing', min_lr=0)
+runner = dict(type='EpochBasedRunner', max_epochs=30)
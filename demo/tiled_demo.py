@@ -0,0 +1,79 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from argparse import ArgumentParser
+
+import cv2
+import mmcv
+import numpy as np
+
+from mmcls.apis import inference_tiled_model, init_model
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('img', help='Image file')
+    parser.add_argument('config', help='Config file')
+    parser.add_argument('checkpoint', help='Checkpoint file')
+    parser.add_argument(
+        '--tile-size', type=int, default=224, help='The size of tiles')
+    parser.add_argument(
+        '--stride',
+        type=int,
+        default=None,
+        help='The stride of tiles, defaults to half of the tile size')
+    parser.add_argument(
+        '--scales',
+        type=float,
+        nargs='+',
+        default=[1.],
+        help='The scales of the image pyramid')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=32,
+        help='The number of tiles in a forward pass')
+    parser.add_argument(
+        '--empty-thr',
+        type=float,
+        default=None,
+        help='Skip the tiles whose intensity std is lower than the threshold')
+    parser.add_argument(
+        '--class-idx',
+        type=int,
+        default=-1,
+        help='The class of the heatmap to visualize, defaults to the last')
+    parser.add_argument(
+        '--out-file', default=None, help='The file to save the heatmap')
+    parser.add_argument(
+        '--device', default='cuda:0', help='Device used for inference')
+    args = parser.parse_args()
+
+    # build the model from a config file and a checkpoint file
+    model = init_model(args.config, args.checkpoint, device=args.device)
+    # test a single image by tiles
+    result = inference_tiled_model(
+        model,
+        args.img,
+        tile_size=args.tile_size,
+        stride=args.stride,
+        scales=args.scales,
+        batch_size=args.batch_size,
+        empty_thr=args.empty_thr)
+
+    print(f'{result["num_tiles"]} tiles ({result["num_skipped"]} skipped) '
+          f'in {result["time"]:.3f} s, {result["mp_per_s"]:.2f} MP/s')
+    labels, counts = np.unique(
+        [tile['pred_class'] for tile in result['tiles']], return_counts=True)
+    for label, count in zip(labels, counts):
+        print(f'{label}: {count} tiles')
+
+    if args.out_file is not None:
+        img = mmcv.imread(args.img)
+        heatmap = result['heatmap'][args.class_idx]
+        heatmap = mmcv.imresize(heatmap, (img.shape[1], img.shape[0]))
+        heatmap = cv2.applyColorMap(
+            np.uint8(np.clip(heatmap, 0, 1) * 255), cv2.COLORMAP_JET)
+        mmcv.imwrite(cv2.addWeighted(img, 0.5, heatmap, 0.5, 0), args.out_file)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,17 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .feature_cache import build_feature_cache, extract_feature_cache
 from .inference import inference_model, init_model, show_result_pyplot
+from .prune import (bn_gamma_importance, get_prunable_groups, prune_classifier,
+                    taylor_importance)
 from .test import multi_gpu_test, single_gpu_test
+from .tiled import inference_tiled_model
 from .train import set_random_seed, train_model
+from .tta import learn_tta_weights
 
 __all__ = [
     'set_random_seed', 'train_model', 'init_model', 'inference_model',
-    'multi_gpu_test', 'single_gpu_test', 'show_result_pyplot'
+    'multi_gpu_test', 'single_gpu_test', 'show_result_pyplot',
+    'build_feature_cache', 'extract_feature_cache', 'get_prunable_groups',
+    'bn_gamma_importance', 'taylor_importance', 'prune_classifier',
+    'learn_tta_weights', 'inference_tiled_model'
 ]
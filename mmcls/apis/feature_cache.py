@@ -0,0 +1,213 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import hashlib
+import json
+import os
+import os.path as osp
+
+import mmcv
+import numpy as np
+import torch
+import torch.distributed as dist
+from mmcv.runner import get_dist_info
+
+from mmcls.datasets import build_dataloader, build_dataset
+from mmcls.datasets.feature_cache import feature_cache_files
+from mmcls.models import build_classifier
+from mmcls.utils import get_root_logger, load_checkpoint
+
+
+def extract_feature_cache(model, data_loader, prefix):
+    """Extract the features of a dataset and save them as a feature cache.
+
+    The features are the outputs of ``model.extract_feat``, i.e. the pooled
+    neck features if the model has a `GlobalAveragePooling` neck. They are
+    written into a memory-mapped ``.npy`` file, so the dataset does not need
+    to fit into memory.
+
+    Args:
+        model (nn.Module): The classifier to extract features with.
+        data_loader (DataLoader): A non-shuffled dataloader without padding,
+            usually built with the test pipeline.
+        prefix (str): The prefix of the cache files.
+
+    Returns:
+        tuple[str]: The path of the feature array and the label array.
+    """
+    model.eval()
+    module = model.module if hasattr(model, 'module') else model
+    device = next(module.parameters()).device
+    dataset = data_loader.dataset
+    feat_file, label_file = feature_cache_files(prefix)
+    mmcv.mkdir_or_exist(osp.dirname(osp.abspath(feat_file)))
+
+    tmp_file = feat_file + '.tmp'
+    feats = None
+    start = 0
+    prog_bar = mmcv.ProgressBar(len(dataset))
+    for data in data_loader:
+        with torch.no_grad():
+            x = module.extract_feat(data['img'].to(device))
+        if isinstance(x, tuple):
+            x = x[-1]
+        x = x.flatten(1).float().cpu().numpy()
+        if feats is None:
+            feats = np.lib.format.open_memmap(
+                tmp_file,
+                mode='w+',
+                dtype=np.float32,
+                shape=(len(dataset), x.shape[1]))
+        feats[start:start + len(x)] = x
+        start += len(x)
+        for _ in range(len(x)):
+            prog_bar.update()
+    assert start == len(dataset), \
+        'The dataloader of feature extraction should not drop or pad samples.'
+    feats.flush()
+    del feats
+    # Only expose the cache after it's completely written.
+    os.replace(tmp_file, feat_file)
+    np.save(label_file, np.asarray(dataset.get_gt_labels(), dtype=np.int64))
+    return feat_file, label_file
+
+
+def _feature_cache_key(model, dataset_cfg):
+    """The hash of the weights extracting the features, i.e. all weights
+    except the head, and the dataset config with the pipeline."""
+    hasher = hashlib.sha256()
+    hasher.update(
+        json.dumps(dataset_cfg, sort_keys=True, default=str).encode())
+    for name, tensor in sorted(model.state_dict().items()):
+        if name.startswith('head.'):
+            continue
+        hasher.update(name.encode())
+        data = tensor.detach().cpu().reshape(-1).view(torch.uint8)
+        hasher.update(data.numpy().tobytes())
+    return hasher.hexdigest()
+
+
+def _is_pretrained(init_cfg):
+    init_cfgs = init_cfg if isinstance(init_cfg, list) else [init_cfg]
+    return any(
+        isinstance(init_cfg, dict) and init_cfg.get('type') == 'Pretrained'
+        for init_cfg in init_cfgs)
+
+
+def build_feature_cache(model, cfg, device='cuda'):
+    """Switch a config to head-only training on cached features.
+
+    Both the train and the val datasets are processed with the deterministic
+    ``cfg.data.test.pipeline`` and the features of ``model`` are saved into
+    ``cfg.feature_cache.cache_dir``. Then ``cfg.data.train`` and
+    ``cfg.data.val`` are replaced by :class:`FeatureCacheDataset` and
+    ``cfg.model`` by :class:`CachedFeatureClassifier` with the same
+    ``train_cfg``, so the following epochs don't decode images or run the
+    backbone anymore.
+
+    The backbone should be pretrained, either by a ``Pretrained`` init_cfg
+    or by ``cfg.load_from``. The checkpoint of ``cfg.load_from`` is loaded
+    into ``model`` before the extraction, and ``cfg.load_from`` is cleared,
+    since the head-only classifier can't load the backbone weights.
+
+    The available keys of ``cfg.feature_cache`` are:
+
+    - cache_dir (str): The directory of the cache files. Defaults to
+      ``{cfg.work_dir}/feature_cache``.
+    - samples_per_gpu (int): Batch size of extraction. Defaults to
+      ``cfg.data.samples_per_gpu``.
+    - workers_per_gpu (int): Workers of extraction. Defaults to
+      ``cfg.data.workers_per_gpu``.
+    - overwrite (bool): Whether to re-extract an existing cache.
+      Defaults to False.
+
+    An existing cache is reused only if its key, the hash of the weights
+    except the head and the dataset config with the pipeline, is the same,
+    which is saved as ``{split}_key.txt`` next to the cache files.
+
+    Args:
+        model (nn.Module): The full classifier with initialized weights.
+            It's loaded with ``cfg.load_from`` if specified.
+        cfg (mmcv.Config): The config, will be modified in place.
+        device (str): The device to extract features on. Defaults to 'cuda'.
+
+    Returns:
+        nn.Module: The head-only classifier, whose head is initialized from
+        the head of ``model``.
+    """
+    logger = get_root_logger()
+    cache_cfg = copy.deepcopy(cfg.feature_cache)
+    cache_dir = cache_cfg.get('cache_dir',
+                              osp.join(cfg.work_dir, 'feature_cache'))
+    samples_per_gpu = cache_cfg.get('samples_per_gpu',
+                                    cfg.data.samples_per_gpu)
+    workers_per_gpu = cache_cfg.get('workers_per_gpu',
+                                    cfg.data.workers_per_gpu)
+    overwrite = cache_cfg.get('overwrite', False)
+
+    if cfg.get('load_from'):
+        load_checkpoint(
+            model, cfg.load_from, map_location='cpu', logger=logger)
+        cfg.load_from = None
+    elif not (cfg.model.get('pretrained')
+              or _is_pretrained(cfg.model.get('init_cfg'))
+              or _is_pretrained(cfg.model.backbone.get('init_cfg'))):
+        raise ValueError(
+            'The features of a randomly initialized backbone are useless, '
+            'please specify a pretrained `init_cfg` of the backbone or '
+            '`load_from` to train the head on cached features.')
+
+    # built before the extraction to check the training settings early
+    head_cfg = dict(
+        type='CachedFeatureClassifier',
+        head=cfg.model.head,
+        train_cfg=cfg.model.get('train_cfg'))
+    head_model = build_classifier(copy.deepcopy(head_cfg))
+
+    rank, world_size = get_dist_info()
+    classes = None
+    for split in ('train', 'val'):
+        if split not in cfg.data:
+            continue
+        dataset_cfg = copy.deepcopy(cfg.data[split])
+        dataset_cfg.pipeline = copy.deepcopy(cfg.data.test.pipeline)
+        dataset = build_dataset(dataset_cfg)
+        classes = classes or dataset.CLASSES
+        prefix = osp.join(cache_dir, split)
+
+        if rank == 0:
+            key = _feature_cache_key(model, dataset_cfg)
+            key_file = f'{prefix}_key.txt'
+            files = feature_cache_files(prefix) + (key_file, )
+            reuse = not overwrite and all(osp.exists(f) for f in files) \
+                and mmcv.list_from_file(key_file) == [key] \
+                and len(np.load(files[1])) == len(dataset)
+            if reuse:
+                logger.info(f'Use the existing feature cache {prefix}.')
+            else:
+                logger.info(f'Extract features of {split} dataset into '
+                            f'{prefix}.')
+                data_loader = build_dataloader(
+                    dataset,
+                    samples_per_gpu=samples_per_gpu,
+                    workers_per_gpu=workers_per_gpu,
+                    dist=False,
+                    shuffle=False,
+                    round_up=False,
+                    persistent_workers=False)
+                extract_feature_cache(
+                    model.to(device), data_loader, prefix=prefix)
+                with open(key_file, 'w') as f:
+                    f.write(key)
+        if world_size > 1:
+            dist.barrier()
+
+        cfg.data[split] = dict(
+            type='FeatureCacheDataset',
+            data_prefix=prefix,
+            classes=classes,
+            test_mode=split != 'train')
+
+    cfg.model = head_cfg
+    head_model.head.load_state_dict(model.head.state_dict())
+    head_model.CLASSES = classes
+    return head_model
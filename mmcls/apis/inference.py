@@ -5,10 +5,11 @@ import mmcv
 import numpy as np
 import torch
 from mmcv.parallel import collate, scatter
-from mmcv.runner import load_checkpoint
 
+from mmcls.core import wrap_execution_mode
 from mmcls.datasets.pipelines import Compose
 from mmcls.models import build_classifier
+from mmcls.utils import load_checkpoint
 
 
 def init_model(config, checkpoint=None, device='cuda:0', options=None):
@@ -36,6 +37,7 @@ def init_model(config, checkpoint=None, device='cuda:0', options=None):
     if checkpoint is not None:
         # Mapping the weights to GPU may cause unexpected video memory leak
         # which refers to https://github.com/open-mmlab/mmdetection/pull/6405
+        # The local checkpoint is memory-mapped to load without copying.
         checkpoint = load_checkpoint(model, checkpoint, map_location='cpu')
         if 'CLASSES' in checkpoint.get('meta', {}):
             model.CLASSES = checkpoint['meta']['CLASSES']
@@ -47,6 +49,9 @@ def init_model(config, checkpoint=None, device='cuda:0', options=None):
             model.CLASSES = ImageNet.CLASSES
     model.cfg = config  # save the config in the model for convenience
     model.to(device)
+    runtime_cfg = config.get('runtime', None)
+    if runtime_cfg is not None:
+        wrap_execution_mode(model, **runtime_cfg)
     model.eval()
     return model
 
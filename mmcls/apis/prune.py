@@ -0,0 +1,241 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+
+import torch
+
+from mmcls.models import build_classifier
+from mmcls.models.backbones import MobileNetV2, ResNet
+from mmcls.models.backbones.mobilenet_v2 import InvertedResidual
+from mmcls.models.backbones.resnet import BasicBlock, Bottleneck
+from mmcls.models.utils import make_divisible
+
+
+def get_prunable_groups(model):
+    """Get the groups of channels that can be pruned in the backbone.
+
+    Only the middle channels of the residual blocks are pruned, so the input
+    and output channels of every block, and hence the shapes of the residual
+    connections, are kept.
+
+    - ``BasicBlock``: the outputs of conv1.
+    - ``Bottleneck``: the outputs of conv1 and conv2.
+    - ``InvertedResidual``: the expanded hidden channels, i.e. the outputs of
+      the expand conv and the depth-wise conv.
+
+    Args:
+        model (nn.Module): The classifier with a ``ResNet``, ``ResNetV1d`` or
+            ``MobileNetV2`` backbone.
+
+    Returns:
+        list[dict]: Every group contains the following keys:
+
+        - stage (int), block (int): The position of the block.
+        - channels (int): The number of channels.
+        - out_modules (list[str]): The modules whose outputs are pruned.
+        - in_modules (list[str]): The convs whose inputs are pruned.
+        - norms (list[nn.Module]): The norm layers of the channels.
+    """
+    backbone = model.backbone
+    names = {module: name for name, module in model.named_modules()}
+    groups = []
+    if isinstance(backbone, ResNet):
+        for i, layer_name in enumerate(backbone.res_layers):
+            for j, block in enumerate(getattr(backbone, layer_name)):
+                if type(block) is BasicBlock:
+                    pairs = [(block.conv1, block.norm1, block.conv2)]
+                elif type(block) is Bottleneck:
+                    pairs = [(block.conv1, block.norm1, block.conv2),
+                             (block.conv2, block.norm2, block.conv3)]
+                else:
+                    raise TypeError('Channel pruning only supports '
+                                    '`BasicBlock` and `Bottleneck`, but got '
+                                    f'{type(block).__name__}.')
+                for conv, norm, next_conv in pairs:
+                    groups.append(
+                        dict(
+                            stage=i,
+                            block=j,
+                            channels=conv.out_channels,
+                            out_modules=[names[conv], names[norm]],
+                            in_modules=[names[next_conv]],
+                            norms=[norm]))
+    elif isinstance(backbone, MobileNetV2):
+        for i, layer_name in enumerate(backbone.layers[:-1]):
+            for j, block in enumerate(getattr(backbone, layer_name)):
+                assert isinstance(block, InvertedResidual)
+                if len(block.conv) != 3:
+                    # The hidden channels are the inputs if expand_ratio=1.
+                    continue
+                expand, depthwise, linear = block.conv
+                groups.append(
+                    dict(
+                        stage=i,
+                        block=j,
+                        channels=expand.conv.out_channels,
+                        out_modules=[names[expand], names[depthwise]],
+                        in_modules=[names[linear]],
+                        norms=[expand.bn, depthwise.bn]))
+    else:
+        raise TypeError('Channel pruning only supports ResNet, ResNetV1d and '
+                        f'MobileNetV2, but got {type(backbone).__name__}.')
+    return groups
+
+
+def bn_gamma_importance(model, groups=None):
+    """Rank the channels by the magnitude of the scale of norm layers.
+
+    Args:
+        model (nn.Module): The classifier.
+        groups (list[dict], optional): The channel groups. Defaults to
+            :func:`get_prunable_groups` of the model.
+
+    Returns:
+        list[Tensor]: The importance of the channels in every group.
+    """
+    if groups is None:
+        groups = get_prunable_groups(model)
+    importance = []
+    for group in groups:
+        assert all(norm.weight is not None for norm in group['norms']), \
+            'BN gamma importance needs affine norm layers.'
+        importance.append(
+            sum(norm.weight.detach().abs().float().cpu()
+                for norm in group['norms']))
+    return importance
+
+
+def taylor_importance(model, data_loader, num_batches=10, groups=None):
+    """Rank the channels by the first-order Taylor expansion of the loss.
+
+    The importance of a channel is the absolute value of the spatially
+    averaged ``activation * gradient`` of the norm layer outputs, summed over
+    the samples. See `Importance Estimation for Neural Network Pruning
+    <https://arxiv.org/abs/1906.10771>`_ for details.
+
+    Args:
+        model (nn.Module): The classifier.
+        data_loader (DataLoader): The dataloader of the training data.
+        num_batches (int): The number of batches to estimate the importance.
+            Defaults to 10.
+        groups (list[dict], optional): The channel groups. Defaults to
+            :func:`get_prunable_groups` of the model.
+
+    Returns:
+        list[Tensor]: The importance of the channels in every group.
+    """
+    if groups is None:
+        groups = get_prunable_groups(model)
+    device = next(model.parameters()).device
+    norms = {norm for group in groups for norm in group['norms']}
+    scores = {norm: 0. for norm in norms}
+
+    def forward_hook(module, inputs, output):
+
+        def backward_hook(grad):
+            score = (output.detach() * grad).mean(dim=(2, 3)).abs().sum(0)
+            scores[module] = scores[module] + score.float().cpu()
+
+        output.register_hook(backward_hook)
+
+    handles = [norm.register_forward_hook(forward_hook) for norm in norms]
+    # Use eval mode to keep the running stats of norm layers.
+    model.eval()
+    for i, data in enumerate(data_loader):
+        if i >= num_batches:
+            break
+        model.zero_grad()
+        losses = model(
+            img=data['img'].to(device),
+            gt_label=data['gt_label'].to(device),
+            return_loss=True)
+        loss, _ = model._parse_losses(losses)
+        loss.backward()
+    model.zero_grad()
+    for handle in handles:
+        handle.remove()
+
+    return [sum(scores[norm] for norm in group['norms']) for group in groups]
+
+
+def _get_mid_channels(backbone):
+    """Get the middle channels of every block in the backbone."""
+    mid_channels = []
+    if isinstance(backbone, ResNet):
+        for layer_name in backbone.res_layers:
+            mid_channels.append([
+                block.mid_channels for block in getattr(backbone, layer_name)
+            ])
+    else:
+        for layer_name in backbone.layers[:-1]:
+            mid_channels.append([
+                block.conv[0].conv.out_channels
+                if len(block.conv) == 3 else None
+                for block in getattr(backbone, layer_name)
+            ])
+    return mid_channels
+
+
+def prune_classifier(model,
+                     model_cfg,
+                     ratio,
+                     importance=None,
+                     divisor=8,
+                     min_channels=8):
+    """Physically remove the least important channels of a classifier.
+
+    Every group from :func:`get_prunable_groups` is pruned by ``ratio``. The
+    remaining widths are written into the ``mid_channels`` of the backbone
+    config, and a new classifier is built from it and loaded with the sliced
+    weights.
+
+    Args:
+        model (nn.Module): The classifier to prune.
+        model_cfg (dict): The config of the classifier.
+        ratio (float): The ratio of channels to remove in every group.
+        importance (list[Tensor], optional): The importance of the channels
+            in every group. Defaults to :func:`bn_gamma_importance`.
+        divisor (int): The number of remaining channels is rounded to a
+            multiple of it. Defaults to 8.
+        min_channels (int): The minimum number of remaining channels.
+            Defaults to 8.
+
+    Returns:
+        tuple[nn.Module, dict]: The pruned classifier and its config.
+    """
+    assert 0 <= ratio < 1, 'The pruning ratio should be in [0, 1).'
+    groups = get_prunable_groups(model)
+    if importance is None:
+        importance = bn_gamma_importance(model, groups)
+    assert len(importance) == len(groups)
+
+    state_dict = model.state_dict()
+    mid_channels = _get_mid_channels(model.backbone)
+    for group, score in zip(groups, importance):
+        channels = group['channels']
+        num_keep = make_divisible(
+            channels * (1 - ratio), divisor, min_value=min_channels)
+        num_keep = min(num_keep, channels)
+        keep = torch.topk(score, num_keep)[1].sort()[0]
+
+        for name in group['out_modules']:
+            for key, value in state_dict.items():
+                if key.startswith(name + '.') and value.dim() > 0 and \
+                        value.size(0) == channels:
+                    state_dict[key] = value[keep.to(value.device)]
+        for name in group['in_modules']:
+            for key, value in state_dict.items():
+                if key.startswith(name + '.') and value.dim() == 4:
+                    state_dict[key] = value[:, keep.to(value.device)]
+        mid_channels[group['stage']][group['block']] = num_keep
+
+    new_cfg = copy.deepcopy(model_cfg)
+    new_cfg['pretrained'] = None
+    new_cfg['backbone']['mid_channels'] = mid_channels
+    # The pruned weights can't be initialized from the original checkpoint.
+    new_cfg['backbone']['init_cfg'] = None
+    new_model = build_classifier(new_cfg)
+    new_model.load_state_dict(state_dict, strict=True)
+    new_model.to(next(model.parameters()).device)
+    if hasattr(model, 'CLASSES'):
+        new_model.CLASSES = model.CLASSES
+    return new_model, new_cfg
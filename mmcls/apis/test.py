@@ -12,12 +12,33 @@ import torch.distributed as dist
 from mmcv.image import tensor2imgs
 from mmcv.runner import get_dist_info
 
+from mmcls.core import wrap_execution_mode
+
 
 def single_gpu_test(model,
                     data_loader,
                     show=False,
                     out_dir=None,
+                    runtime_cfg=None,
                     **show_kwargs):
+    """Test model with a single gpu.
+
+    Args:
+        model (nn.Module): Model to be tested.
+        data_loader (nn.Dataloader): Pytorch data loader.
+        show (bool): Whether to show the results. Defaults to False.
+        out_dir (str, optional): The directory to save the visualized
+            results. Defaults to None.
+        runtime_cfg (dict, optional): The execution mode of the model, e.g.,
+            ``dict(memory_format='channels_last', autocast='bf16')``, see
+            :func:`mmcls.core.wrap_execution_mode`. Defaults to None.
+        **show_kwargs: Other arguments to visualize the results.
+
+    Returns:
+        list: The prediction results.
+    """
+    if runtime_cfg is not None:
+        model = wrap_execution_mode(model, **runtime_cfg)
     model.eval()
     results = []
     dataset = data_loader.dataset
@@ -36,7 +57,11 @@ def single_gpu_test(model,
             pred_class = [model.CLASSES[lb] for lb in pred_label]
 
             img_metas = data['img_metas'].data[0]
-            imgs = tensor2imgs(data['img'], **img_metas[0]['img_norm_cfg'])
+            img_tensor = data['img']
+            if img_tensor.dim() == 5:
+                # Show the first view of the test-time augmentation.
+                img_tensor = img_tensor[:, 0]
+            imgs = tensor2imgs(img_tensor, **img_metas[0]['img_norm_cfg'])
             assert len(imgs) == len(img_metas)
 
             for i, (img, img_meta) in enumerate(zip(imgs, img_metas)):
@@ -69,7 +94,11 @@ def single_gpu_test(model,
     return results
 
 
-def multi_gpu_test(model, data_loader, tmpdir=None, gpu_collect=False):
+def multi_gpu_test(model,
+                   data_loader,
+                   tmpdir=None,
+                   gpu_collect=False,
+                   runtime_cfg=None):
     """Test model with multiple gpus.
 
     This method tests model with multiple gpus and collects the results
@@ -84,10 +113,14 @@ def multi_gpu_test(model, data_loader, tmpdir=None, gpu_collect=False):
         tmpdir (str): Path of directory to save the temporary results from
             different gpus under cpu mode.
         gpu_collect (bool): Option to use either gpu or cpu to collect results.
+        runtime_cfg (dict, optional): The execution mode of the model, see
+            :func:`single_gpu_test`. Defaults to None.
 
     Returns:
         list: The prediction results.
     """
+    if runtime_cfg is not None:
+        model = wrap_execution_mode(model, **runtime_cfg)
     model.eval()
     results = []
     dataset = data_loader.dataset
@@ -0,0 +1,214 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+import time
+
+import mmcv
+import numpy as np
+import torch
+import torch.nn.functional as F
+
+
+def _get_norm_cfg(cfg):
+    """Get the ``Normalize`` transform of the test pipeline."""
+    for transform in cfg.data.test.pipeline:
+        if transform['type'] == 'Normalize':
+            return transform
+    return None
+
+
+def _pad_size(size, tile_size, stride):
+    """The padded size to cover the whole image by the sliding windows."""
+    num_steps = math.ceil(max(size - tile_size, 0) / stride)
+    return tile_size + num_steps * stride
+
+
+def _tile_std(gray, tile_size, stride):
+    """The standard deviation of the intensity of every tile."""
+    mean = F.avg_pool2d(gray, tile_size, stride)
+    sq_mean = F.avg_pool2d(gray * gray, tile_size, stride)
+    return (sq_mean - mean * mean).clamp(min=0).sqrt().flatten()
+
+
+def inference_tiled_model(model,
+                          img,
+                          tile_size=224,
+                          stride=None,
+                          scales=(1., ),
+                          batch_size=32,
+                          empty_thr=None):
+    """Inference a high resolution image by sliding-window tiles.
+
+    The image is normalized once and split into overlapping tiles of
+    ``tile_size`` by the sliding windows with ``stride``, and the tiles are
+    predicted in batches of ``batch_size``. The scores of the tiles are
+    stitched into a class heatmap, where every cell is the mean score of the
+    tiles covering it. The cell size of the heatmap is the greatest common
+    divisor of ``tile_size`` and ``stride``.
+
+    With multiple ``scales``, the tiles are extracted from every level of the
+    image pyramid, so that a tile at scale 0.5 covers a region of twice the
+    tile size in the original image, and the heatmaps of all levels are
+    averaged.
+
+    Args:
+        model (nn.Module): The loaded classifier, see :func:`init_model`.
+        img (str | ndarray): The image filename or loaded image.
+        tile_size (int): The size of the square tiles, which should be the
+            input size of the model. Defaults to 224.
+        stride (int, optional): The stride of the sliding windows. Defaults
+            to None, which means half of ``tile_size``.
+        scales (Sequence[float]): The scales of the image pyramid.
+            Defaults to (1., ).
+        batch_size (int): The number of tiles in a forward pass.
+            Defaults to 32.
+        empty_thr (float, optional): The tiles whose standard deviation of
+            the gray-scale intensity (in 0-255) is lower than the threshold
+            are regarded as empty, and they are skipped without being
+            predicted. Defaults to None, which means no tile is skipped.
+
+    Returns:
+        dict: The inference results with the following keys.
+
+        - heatmap (np.ndarray): The class heatmap with shape
+          (num_classes, H / cell, W / cell), and the cells not covered by any
+          predicted tile are 0.
+        - heatmap_stride (int): The cell size of the heatmap in the image.
+        - label_map (np.ndarray): The predicted label of every cell, and the
+          cells not covered by any predicted tile are -1.
+        - tiles (list[dict]): The decisions of the predicted tiles, with
+          the ``bbox`` (x1, y1, x2, y2) in the image, ``scale``,
+          ``pred_label``, ``pred_score`` and ``pred_class``.
+        - num_tiles (int): The number of tiles of all scales.
+        - num_skipped (int): The number of the skipped empty tiles.
+        - time (float): The inference time in seconds.
+        - megapixels (float): The number of megapixels of the image.
+        - mp_per_s (float): The throughput in megapixels per second.
+    """
+    if stride is None:
+        stride = tile_size // 2
+    assert 0 < stride <= tile_size, \
+        'stride should be in (0, tile_size] to cover the whole image.'
+    if hasattr(model, 'module'):
+        model = model.module
+    device = next(model.parameters()).device
+    img = mmcv.imread(img)
+    start = time.perf_counter()
+
+    height, width = img.shape[:2]
+    cell = math.gcd(tile_size, stride)
+    kernel, step = tile_size // cell, stride // cell
+    out_size = (math.ceil(height / cell), math.ceil(width / cell))
+
+    norm_cfg = _get_norm_cfg(model.cfg)
+    raw = torch.from_numpy(img).to(device).permute(2, 0, 1)[None].float()
+    if norm_cfg is not None and norm_cfg.get('to_rgb', True):
+        raw = raw.flip(1)
+
+    heat_sum, heat_count = 0, 0
+    tiles_info = []
+    num_tiles, num_skipped = 0, 0
+    for scale in scales:
+        if scale == 1:
+            scaled = raw
+        else:
+            scaled = F.interpolate(
+                raw, scale_factor=scale, mode='bilinear', align_corners=False)
+        h, w = scaled.shape[-2:]
+        pad_h = _pad_size(h, tile_size, stride) - h
+        pad_w = _pad_size(w, tile_size, stride) - w
+
+        keep = None
+        if empty_thr is not None:
+            gray = F.pad(
+                scaled.mean(dim=1, keepdim=True), (0, pad_w, 0, pad_h),
+                mode='replicate')
+            keep = _tile_std(gray, tile_size, stride) >= empty_thr
+
+        inputs = scaled
+        if norm_cfg is not None:
+            mean = inputs.new_tensor(norm_cfg['mean']).view(1, -1, 1, 1)
+            std = inputs.new_tensor(norm_cfg['std']).view(1, -1, 1, 1)
+            inputs = (inputs - mean) / std
+        # Pad with zeros, i.e. the mean color after normalization.
+        inputs = F.pad(inputs, (0, pad_w, 0, pad_h))
+        # (1, C, nh, nw, t, t) -> (nh * nw, C, t, t), without copying.
+        tiles = inputs.unfold(2, tile_size,
+                              stride).unfold(3, tile_size, stride)
+        grid_h, grid_w = tiles.shape[2:4]
+        tiles = tiles[0].permute(1, 2, 0, 3, 4).flatten(0, 1)
+        if keep is None:
+            keep = torch.ones(len(tiles), dtype=torch.bool, device=device)
+        keep_inds = keep.nonzero().flatten()
+        num_tiles += len(tiles)
+        num_skipped += len(tiles) - len(keep_inds)
+
+        scores = []
+        with torch.no_grad():
+            for i in range(0, len(keep_inds), batch_size):
+                batch = tiles[keep_inds[i:i + batch_size]].contiguous()
+                x = model.extract_feat(batch)
+                scores.append(model.head.simple_test(x, post_process=False))
+        if len(scores) == 0:
+            continue
+        scores = torch.cat(scores).float()
+        num_classes = scores.size(1)
+
+        # Stitch the scores of tiles into the heatmap of the cells by fold.
+        tile_scores = scores.new_zeros(len(tiles), num_classes)
+        tile_scores[keep_inds] = scores
+        grid_size = ((grid_h - 1) * step + kernel,
+                     (grid_w - 1) * step + kernel)
+        cols = torch.cat([tile_scores, keep.float()[:, None]], dim=1)
+        cols = cols.t()[:, None, :].expand(-1, kernel * kernel, -1)
+        stitched = F.fold(
+            cols.reshape(1, -1, len(tiles)),
+            grid_size,
+            kernel_size=kernel,
+            stride=step)
+        valid_h, valid_w = math.ceil(h / cell), math.ceil(w / cell)
+        stitched = stitched[..., :valid_h, :valid_w]
+        if stitched.shape[-2:] != out_size:
+            stitched = F.interpolate(stitched, size=out_size, mode='bilinear')
+        heat_sum = heat_sum + stitched[0, :-1]
+        heat_count = heat_count + stitched[0, -1:]
+
+        scores, labels = scores.max(dim=1)
+        for ind, score, label in zip(keep_inds.tolist(), scores.tolist(),
+                                     labels.tolist()):
+            y1 = ind // grid_w * stride
+            x1 = ind % grid_w * stride
+            bbox = np.array([x1, y1, x1 + tile_size, y1 + tile_size],
+                            dtype=np.float32) / scale
+            bbox[2:] = np.minimum(bbox[2:], [width, height])
+            tiles_info.append(
+                dict(
+                    bbox=bbox,
+                    scale=scale,
+                    pred_label=label,
+                    pred_score=score,
+                    pred_class=model.CLASSES[label]))
+
+    if isinstance(heat_sum, torch.Tensor):
+        heatmap = heat_sum / heat_count.clamp(min=1e-6)
+        label_map = heatmap.argmax(dim=0)
+        label_map[heat_count[0] < 1e-6] = -1
+        heatmap = heatmap.cpu().numpy()
+        label_map = label_map.cpu().numpy()
+    else:
+        # All tiles are skipped.
+        num_classes = len(model.CLASSES)
+        heatmap = np.zeros((num_classes, *out_size), dtype=np.float32)
+        label_map = np.full(out_size, -1, dtype=np.int64)
+
+    elapsed = time.perf_counter() - start
+    megapixels = height * width / 1e6
+    return dict(
+        heatmap=heatmap,
+        heatmap_stride=cell,
+        label_map=label_map,
+        tiles=tiles_info,
+        num_tiles=num_tiles,
+        num_skipped=num_skipped,
+        time=elapsed,
+        megapixels=megapixels,
+        mp_per_s=megapixels / elapsed)
@@ -7,8 +7,12 @@ import torch
 from mmcv.parallel import MMDataParallel, MMDistributedDataParallel
 from mmcv.runner import DistSamplerSeedHook, build_optimizer, build_runner
 
-from mmcls.core import DistOptimizerHook
-from mmcls.datasets import build_dataloader, build_dataset
+from mmcls.core import (ConsolidateOptimizerStateHook, DistOptimizerHook,
+                        GradientAccumulationFp16OptimizerHook,
+                        GradientAccumulationOptimizerHook,
+                        MidEpochCheckpointHook, ZeroRedundancyOptimizer,
+                        wrap_execution_mode)
+from mmcls.datasets import apply_auto_tune, build_dataloader, build_dataset
 from mmcls.utils import get_root_logger
 
 # TODO import eval hooks from mmcv and delete them from mmcls
@@ -61,6 +65,22 @@ def train_model(model,
     # prepare data loaders
     dataset = dataset if isinstance(dataset, (list, tuple)) else [dataset]
 
+    # tune the data loader settings by timed trials if `data.auto_tune`
+    apply_auto_tune(cfg.data, dataset[0], distributed, logger=logger)
+
+    sampler_cfg = cfg.data.get('sampler', None)
+    mid_epoch_cfg = cfg.get('mid_epoch_checkpoint', None)
+    if mid_epoch_cfg is not None and sampler_cfg is None:
+        # the position of the default sampler of PyTorch cannot be resumed
+        sampler_cfg = dict(type='DistributedSampler')
+    if sampler_cfg is not None and sampler_cfg['type'] == 'LossAwareSampler':
+        # the losses are mapped to the sampled indices by the iterations,
+        # which don't match the echoed or the split batches
+        assert cfg.data.get('echo') is None \
+            and cfg.data.get('multi_crop') is None, \
+            'LossAwareSampler is not compatible with `data.echo` and ' \
+            '`data.multi_crop`.'
+
     data_loaders = [
         build_dataloader(
             ds,
@@ -70,9 +90,19 @@ def train_model(model,
             num_gpus=len(cfg.gpu_ids),
             dist=distributed,
             round_up=True,
-            seed=cfg.seed) for ds in dataset
+            seed=cfg.seed,
+            pin_memory=cfg.data.get('pin_memory', True),
+            prefetch_factor=cfg.data.get('prefetch_factor'),
+            sampler_cfg=sampler_cfg,
+            echo_cfg=cfg.data.get('echo'),
+            multi_crop_cfg=cfg.data.get('multi_crop')) for ds in dataset
     ]
 
+    # set the memory format and the autocast
+    runtime_cfg = cfg.get('runtime', None)
+    if runtime_cfg is not None:
+        model = wrap_execution_mode(model, **runtime_cfg)
+
     # put model on gpus
     if distributed:
         find_unused_parameters = cfg.get('find_unused_parameters', False)
@@ -93,6 +123,9 @@ def train_model(model,
             raise ValueError(F'unsupported device name {device}.')
 
     # build runner
+    if cfg.optimizer.get('type') == 'ZeroRedundancyOptimizer':
+        assert distributed, \
+            'ZeroRedundancyOptimizer only supports distributed training.'
     optimizer = build_optimizer(model, cfg.optimizer)
 
     if cfg.get('runner') is None:
@@ -119,9 +152,20 @@ def train_model(model,
 
     # fp16 setting
     fp16_cfg = cfg.get('fp16', None)
+    # accumulate the gradients of `cumulative_iters` iterations
+    accumulate = 'cumulative_iters' in cfg.optimizer_config
+    if 'compression' in cfg.optimizer_config:
+        assert distributed and fp16_cfg is None and not accumulate, \
+            'The gradient compression is only supported by ' \
+            '`DistOptimizerHook` in distributed training.'
     if fp16_cfg is not None:
-        optimizer_config = Fp16OptimizerHook(
+        fp16_hook = GradientAccumulationFp16OptimizerHook if accumulate \
+            else Fp16OptimizerHook
+        optimizer_config = fp16_hook(
             **cfg.optimizer_config, **fp16_cfg, distributed=distributed)
+    elif accumulate and 'type' not in cfg.optimizer_config:
+        optimizer_config = GradientAccumulationOptimizerHook(
+            **cfg.optimizer_config)
     elif distributed and 'type' not in cfg.optimizer_config:
         optimizer_config = DistOptimizerHook(**cfg.optimizer_config)
     else:
@@ -135,8 +179,17 @@ def train_model(model,
         cfg.log_config,
         cfg.get('momentum_config', None),
         custom_hooks_config=cfg.get('custom_hooks', None))
-    if distributed and cfg.runner['type'] == 'EpochBasedRunner':
+    # the sampler of the config draws different samples by the epoch
+    if (distributed or sampler_cfg is not None) \
+            and cfg.runner['type'] == 'EpochBasedRunner':
         runner.register_hook(DistSamplerSeedHook())
+    # save the checkpoints with the sampler position and the random states
+    if mid_epoch_cfg is not None:
+        runner.register_hook(MidEpochCheckpointHook(**mid_epoch_cfg))
+    # gather the sharded optimizer states before the checkpoint hooks
+    if isinstance(optimizer, ZeroRedundancyOptimizer):
+        runner.register_hook(
+            ConsolidateOptimizerStateHook(), priority='ABOVE_NORMAL')
 
     # register eval hooks
     if validate:
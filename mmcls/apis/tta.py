@@ -0,0 +1,66 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmcv
+import torch
+import torch.nn.functional as F
+
+
+def learn_tta_weights(model, data_loader, num_iters=200, lr=0.1):
+    """Learn the weights of views for the "weighted" test-time augmentation.
+
+    The scores of all views are predicted once, and then the weights are
+    optimized to minimize the negative log-likelihood of the merged scores.
+    The learned weights are saved in ``model.tta_logits``, which will be
+    saved in the checkpoint.
+
+    Args:
+        model (nn.Module): The classifier with ``tta_merge='weighted'`` in
+            its ``test_cfg``.
+        data_loader (DataLoader): A non-shuffled dataloader of a single-label
+            validation dataset, whose pipeline generates the views by
+            ``MultiView``.
+        num_iters (int): The number of optimization iterations.
+            Defaults to 200.
+        lr (float): The learning rate. Defaults to 0.1.
+
+    Returns:
+        Tensor: The learned weights of views.
+    """
+    module = model.module if hasattr(model, 'module') else model
+    assert getattr(module, 'tta_merge', None) == 'weighted', \
+        'The model should be configured with `tta_merge="weighted"`.'
+    model.eval()
+    device = next(module.parameters()).device
+    dataset = data_loader.dataset
+
+    scores = []
+    prog_bar = mmcv.ProgressBar(len(dataset))
+    for data in data_loader:
+        imgs = data['img'].to(device)
+        assert imgs.dim() == 5, \
+            'The images should be (N, K, C, H, W), please use `MultiView` ' \
+            'in the pipeline.'
+        num_imgs, num_views = imgs.shape[:2]
+        with torch.no_grad():
+            x = module.extract_feat(imgs.flatten(0, 1))
+            score = module.head.simple_test(x, post_process=False)
+        scores.append(score.view(num_imgs, num_views, -1).float().cpu())
+        for _ in range(num_imgs):
+            prog_bar.update()
+    scores = torch.cat(scores)
+    labels = torch.as_tensor(dataset.get_gt_labels(), dtype=torch.long)
+    assert labels.dim() == 1 and len(labels) == len(scores), \
+        'The dataset should be single-label and the dataloader should not ' \
+        'drop or pad samples.'
+
+    logits = module.tta_logits.detach().float().cpu().clone()
+    logits.requires_grad_(True)
+    optimizer = torch.optim.Adam([logits], lr=lr)
+    for _ in range(num_iters):
+        merged = torch.einsum('nkc,k->nc', scores, F.softmax(logits, dim=0))
+        loss = F.nll_loss(merged.clamp(min=1e-12).log(), labels)
+        optimizer.zero_grad()
+        loss.backward()
+        optimizer.step()
+
+    module.tta_logits.copy_(logits.detach())
+    return F.softmax(logits.detach(), dim=0)
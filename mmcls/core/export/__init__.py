@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .ort_engine import ONNXRuntimeEngine
 from .test import ONNXRuntimeClassifier, TensorRTClassifier
 
-__all__ = ['ONNXRuntimeClassifier', 'TensorRTClassifier']
+__all__ = ['ONNXRuntimeClassifier', 'TensorRTClassifier', 'ONNXRuntimeEngine']
@@ -0,0 +1,209 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import queue
+from contextlib import contextmanager
+
+import numpy as np
+import onnxruntime as ort
+import torch
+
+GRAPH_OPTIMIZATION_LEVELS = {
+    'disable': ort.GraphOptimizationLevel.ORT_DISABLE_ALL,
+    'basic': ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    'extended': ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    'all': ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+
+
+class _SessionContext:
+    """A session with its IO binding and the reused buffers."""
+
+    def __init__(self, sess):
+        self.sess = sess
+        self.io_binding = sess.io_binding()
+        self.input_name = sess.get_inputs()[0].name
+        self.output_names = [_.name for _ in sess.get_outputs()]
+        self._buffers = {}
+
+    def get_buffer(self, name, shape, dtype):
+        """Get a contiguous buffer of the shape, which is only re-allocated
+        if the cached buffer is too small."""
+        numel = int(np.prod(shape))
+        buffer = self._buffers.get((name, dtype))
+        if buffer is None or buffer.size < numel:
+            buffer = np.empty(numel, dtype=dtype)
+            self._buffers[(name, dtype)] = buffer
+        return buffer[:numel].reshape(shape)
+
+
+class ONNXRuntimeEngine:
+    """A batched ONNX Runtime inference engine for CPU serving.
+
+    Compared with :class:`ONNXRuntimeClassifier`, the engine keeps a pool of
+    sessions tuned by the session options, so that it can be called from
+    multiple threads, and every session binds the input and output to
+    pre-allocated buffers, which are reused across calls. The model should be
+    exported with a dynamic batch axis, see ``--dynamic-batch`` of
+    ``tools/deployment/pytorch2onnx.py``, and a batch larger than
+    ``max_batch_size`` is split into chunks.
+
+    The engine also accepts ``uint8`` images if ``mean`` and ``std`` are
+    specified, and the normalization is done in place in the input buffer,
+    so that the ``Normalize`` transform can be removed from the data pipeline.
+
+    Args:
+        onnx_file (str): The ONNX model file.
+        num_sessions (int): The number of sessions in the pool, i.e. the
+            number of batches that can run concurrently. Defaults to 1.
+        intra_op_num_threads (int, optional): The number of threads to run an
+            operator. Defaults to the number of CPUs divided by
+            ``num_sessions``.
+        inter_op_num_threads (int): The number of threads to run operators
+            in parallel, only used in the parallel execution mode.
+            Defaults to 1.
+        graph_optimization_level (str): The graph optimization level, one of
+            "disable", "basic", "extended" and "all". Defaults to "all".
+        parallel_execution (bool): Whether to run independent operators in
+            parallel. Defaults to False.
+        enable_cpu_mem_arena (bool): Whether to enable the memory arena on
+            CPU. Defaults to True.
+        enable_mem_pattern (bool): Whether to pre-allocate memory by the
+            memory pattern of the first run. Defaults to True.
+        max_batch_size (int): The maximum batch size of a single run.
+            Defaults to 32.
+        mean (Sequence[float], optional): The mean values to normalize the
+            ``uint8`` images. Defaults to None.
+        std (Sequence[float], optional): The std values to normalize the
+            ``uint8`` images. Defaults to None.
+        to_rgb (bool): Whether to convert the ``uint8`` images from BGR to
+            RGB. Defaults to True.
+    """
+
+    def __init__(self,
+                 onnx_file,
+                 num_sessions=1,
+                 intra_op_num_threads=None,
+                 inter_op_num_threads=1,
+                 graph_optimization_level='all',
+                 parallel_execution=False,
+                 enable_cpu_mem_arena=True,
+                 enable_mem_pattern=True,
+                 max_batch_size=32,
+                 mean=None,
+                 std=None,
+                 to_rgb=True):
+        assert num_sessions >= 1 and max_batch_size >= 1
+        assert graph_optimization_level in GRAPH_OPTIMIZATION_LEVELS, \
+            'graph_optimization_level should be one of ' \
+            f'{list(GRAPH_OPTIMIZATION_LEVELS)}, ' \
+            f'but got "{graph_optimization_level}".'
+        if intra_op_num_threads is None:
+            num_cpus = os.cpu_count() or 1
+            intra_op_num_threads = max(1, num_cpus // num_sessions)
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = intra_op_num_threads
+        options.inter_op_num_threads = inter_op_num_threads
+        options.graph_optimization_level = \
+            GRAPH_OPTIMIZATION_LEVELS[graph_optimization_level]
+        options.execution_mode = ort.ExecutionMode.ORT_PARALLEL \
+            if parallel_execution else ort.ExecutionMode.ORT_SEQUENTIAL
+        options.enable_cpu_mem_arena = enable_cpu_mem_arena
+        options.enable_mem_pattern = enable_mem_pattern
+
+        self._pool = queue.Queue()
+        for _ in range(num_sessions):
+            sess = ort.InferenceSession(
+                onnx_file, options, providers=['CPUExecutionProvider'])
+            self._pool.put(_SessionContext(sess))
+        self.num_sessions = num_sessions
+        self.max_batch_size = max_batch_size
+
+        if mean is not None:
+            assert std is not None, '`std` should be specified with `mean`.'
+            self.mean = np.array(mean, dtype=np.float32).reshape(-1, 1, 1)
+            self.std_inv = 1. / np.array(
+                std, dtype=np.float32).reshape(-1, 1, 1)
+        else:
+            self.mean = None
+            self.std_inv = None
+        self.to_rgb = to_rgb
+
+    @contextmanager
+    def _acquire(self):
+        ctx = self._pool.get()
+        try:
+            yield ctx
+        finally:
+            self._pool.put(ctx)
+
+    def _fill_input(self, ctx, imgs):
+        """Copy a batch of images into the input buffer."""
+        buffer = ctx.get_buffer('input', imgs.shape, np.float32)
+        if imgs.dtype != np.uint8:
+            np.copyto(buffer, imgs, casting='same_kind')
+            return buffer
+
+        assert self.mean is not None, \
+            '`mean` and `std` should be specified to accept uint8 images.'
+        if self.to_rgb:
+            imgs = imgs[:, ::-1]
+        np.copyto(buffer, imgs, casting='unsafe')
+        buffer -= self.mean
+        buffer *= self.std_inv
+        return buffer
+
+    def _run_batch(self, ctx, imgs):
+        inputs = self._fill_input(ctx, imgs)
+        io_binding = ctx.io_binding
+        io_binding.bind_input(
+            name=ctx.input_name,
+            device_type='cpu',
+            device_id=0,
+            element_type=np.float32,
+            shape=inputs.shape,
+            buffer_ptr=inputs.ctypes.data)
+
+        output_shape = ctx.sess.get_outputs()[0].shape
+        if isinstance(output_shape[-1], int):
+            outputs = ctx.get_buffer('output', (len(imgs), output_shape[-1]),
+                                     np.float32)
+            io_binding.bind_output(
+                name=ctx.output_names[0],
+                device_type='cpu',
+                device_id=0,
+                element_type=np.float32,
+                shape=outputs.shape,
+                buffer_ptr=outputs.ctypes.data)
+        else:
+            # The number of classes is unknown until the first run.
+            io_binding.bind_output(ctx.output_names[0])
+            outputs = None
+
+        ctx.sess.run_with_iobinding(io_binding)
+        if outputs is None:
+            outputs = io_binding.copy_outputs_to_cpu()[0]
+        # The buffer will be overwritten by the next run.
+        return outputs.copy()
+
+    def __call__(self, imgs):
+        """Run a batch of images.
+
+        Args:
+            imgs (np.ndarray | torch.Tensor): The images with shape
+                (N, C, H, W), in ``float32`` if normalized, or in ``uint8``.
+
+        Returns:
+            np.ndarray: The scores with shape (N, num_classes).
+        """
+        if isinstance(imgs, torch.Tensor):
+            imgs = imgs.detach().cpu().numpy()
+        assert imgs.ndim == 4, \
+            f'The images should be (N, C, H, W), but got {imgs.shape}.'
+
+        results = []
+        with self._acquire() as ctx:
+            for i in range(0, len(imgs), self.max_batch_size):
+                results.append(
+                    self._run_batch(ctx, imgs[i:i + self.max_batch_size]))
+        return np.concatenate(results)
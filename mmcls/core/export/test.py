@@ -6,13 +6,32 @@ import onnxruntime as ort
 import torch
 
 from mmcls.models.classifiers import BaseClassifier
+from .ort_engine import ONNXRuntimeEngine
 
 
 class ONNXRuntimeClassifier(BaseClassifier):
-    """Wrapper for classifier's inference with ONNXRuntime."""
-
-    def __init__(self, onnx_file, class_names, device_id):
+    """Wrapper for classifier's inference with ONNXRuntime.
+
+    Args:
+        onnx_file (str): The ONNX model file.
+        class_names (list[str]): The class names.
+        device_id (int): The GPU id if ONNXRuntime is built with CUDA.
+        engine_cfg (dict, optional): If specified and running on CPU, use
+            :class:`ONNXRuntimeEngine` with these arguments to run the model
+            with a pool of tuned sessions and reused buffers.
+            Defaults to None.
+    """
+
+    def __init__(self, onnx_file, class_names, device_id, engine_cfg=None):
         super(ONNXRuntimeClassifier, self).__init__()
+        self.CLASSES = class_names
+        self.device_id = device_id
+        self.engine = None
+        if engine_cfg is not None and ort.get_device() != 'GPU':
+            self.engine = ONNXRuntimeEngine(onnx_file, **engine_cfg)
+            self.is_cuda_available = False
+            return
+
         sess = ort.InferenceSession(onnx_file)
 
         providers = ['CPUExecutionProvider']
@@ -24,8 +43,6 @@ class ONNXRuntimeClassifier(BaseClassifier):
         sess.set_providers(providers, options)
 
         self.sess = sess
-        self.CLASSES = class_names
-        self.device_id = device_id
         self.io_binding = sess.io_binding()
         self.output_names = [_.name for _ in sess.get_outputs()]
         self.is_cuda_available = is_cuda_available
@@ -40,6 +57,9 @@ class ONNXRuntimeClassifier(BaseClassifier):
         raise NotImplementedError('This method is not implemented.')
 
     def forward_test(self, imgs, img_metas, **kwargs):
+        if self.engine is not None:
+            return list(self.engine(imgs))
+
         input_data = imgs
         # set io binding for inputs/outputs
         device_type = 'cuda' if self.is_cuda_available else 'cpu'
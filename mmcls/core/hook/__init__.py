@@ -0,0 +1,16 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from .consolidate_optimizer_hook import ConsolidateOptimizerStateHook
+from .gradient_accumulation_hook import (GradientAccumulationFp16OptimizerHook,
+                                         GradientAccumulationOptimizerHook)
+from .hot_path_timing_hook import HotPathTimingHook, hot_path_phase
+from .loss_aware_sampling_hook import LossAwareSamplingHook
+from .progressive_resolution_hook import ProgressiveResolutionHook
+from .resumable_checkpoint_hook import (MidEpochCheckpointHook, get_rng_state,
+                                        set_rng_state)
+
+__all__ = [
+    'HotPathTimingHook', 'hot_path_phase', 'MidEpochCheckpointHook',
+    'get_rng_state', 'set_rng_state', 'GradientAccumulationOptimizerHook',
+    'GradientAccumulationFp16OptimizerHook', 'ProgressiveResolutionHook',
+    'LossAwareSamplingHook', 'ConsolidateOptimizerStateHook'
+]
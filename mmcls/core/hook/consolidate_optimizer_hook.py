@@ -0,0 +1,53 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from mmcv.runner import HOOKS, CheckpointHook, EvalHook, Hook
+
+from .resumable_checkpoint_hook import MidEpochCheckpointHook
+
+
+@HOOKS.register_module()
+class ConsolidateOptimizerStateHook(Hook):
+    """Gather the sharded optimizer states to rank 0 before saving the
+    checkpoints.
+
+    The checkpoints are saved by rank 0 only, but gathering the states of
+    ``ZeroRedundancyOptimizer`` needs all ranks, so it's done by this hook
+    on all ranks before the checkpoint hooks, only at the epochs and the
+    iterations some checkpoint is saved. It should be registered with a
+    higher priority than the checkpoint and evaluation hooks, e.g.
+    'ABOVE_NORMAL'.
+
+    Note:
+        Since the best checkpoints of ``EvalHook`` are saved only if the
+        score is improved, which is unknown in advance, the states are
+        gathered at every evaluation with ``save_best``.
+    """
+
+    def _consolidate(self, runner):
+        runner.optimizer.consolidate_state_dict(to=0)
+
+    def _save_best(self, runner, hook, by_epoch):
+        return isinstance(hook, EvalHook) and bool(hook.save_best) and \
+            hook.by_epoch == by_epoch and hook._should_evaluate(runner)
+
+    def _save_by_iter(self, runner, hook):
+        if isinstance(hook, MidEpochCheckpointHook):
+            return hook.interval > 0 and \
+                hook.every_n_iters(runner, hook.interval)
+        if isinstance(hook, CheckpointHook) and not hook.by_epoch:
+            save_last = hook.save_last and hook.is_last_iter(runner)
+            return hook.every_n_iters(runner, hook.interval) or save_last
+        return self._save_best(runner, hook, by_epoch=False)
+
+    def _save_by_epoch(self, runner, hook):
+        if isinstance(hook, CheckpointHook) and hook.by_epoch:
+            save_last = hook.save_last and hook.is_last_epoch(runner)
+            return hook.every_n_epochs(runner, hook.interval) or save_last
+        return self._save_best(runner, hook, by_epoch=True)
+
+    def after_train_iter(self, runner):
+        if any(self._save_by_iter(runner, hook) for hook in runner.hooks):
+            self._consolidate(runner)
+
+    def after_train_epoch(self, runner):
+        if any(self._save_by_epoch(runner, hook) for hook in runner.hooks):
+            self._consolidate(runner)
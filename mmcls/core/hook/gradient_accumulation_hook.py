@@ -0,0 +1,152 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from mmcv.runner import (HOOKS, EpochBasedRunner, Fp16OptimizerHook,
+                         LrUpdaterHook, OptimizerHook, StepLrUpdaterHook)
+
+
+@HOOKS.register_module()
+class GradientAccumulationOptimizerHook(OptimizerHook):
+    """Optimizer hook to accumulate the gradients of several iterations.
+
+    The optimizer steps once every ``cumulative_iters`` iterations, which
+    simulates a batch of ``cumulative_iters`` times ``samples_per_gpu``
+    without more memory. The losses are divided by the number of iterations
+    of the accumulation, so the gradients are the same as the ones of the
+    large batch, and the last accumulation of an epoch, which may have fewer
+    iterations, is averaged by its own number of iterations.
+
+    In distributed training, the gradients are only synchronized in the last
+    iteration of an accumulation, by disabling the gradient synchronization
+    of ``MMDistributedDataParallel`` in the other iterations.
+
+    The batch augments, e.g. mixup and cutmix, are applied to every small
+    batch, and the BatchNorm layers see the small batches, which may differ
+    slightly from the large batch.
+
+    Args:
+        cumulative_iters (int): The number of iterations to accumulate the
+            gradients. Defaults to 1.
+        scale_lr_schedule (bool): Whether to multiply the iterations in the
+            learning rate config by ``cumulative_iters``, i.e.
+            ``warmup_iters`` and the ``step`` of the step policy with
+            ``by_epoch=False``, so that the config of the large batch is used
+            as is. The schedules by epochs or by the ratio of the progress
+            need no change. Defaults to True.
+        **kwargs: Other arguments of :class:`OptimizerHook`.
+
+    Examples:
+        >>> # 8 GPUs x 32 samples in the schedule, 1 GPU x 64 samples here
+        >>> optimizer_config = dict(
+        ...     type='GradientAccumulationOptimizerHook',
+        ...     cumulative_iters=4,
+        ...     grad_clip=None)
+    """
+
+    def __init__(self, cumulative_iters=1, scale_lr_schedule=True, **kwargs):
+        super().__init__(**kwargs)
+        assert isinstance(cumulative_iters, int) and cumulative_iters > 0, \
+            'cumulative_iters should be a positive integer, ' \
+            f'got {cumulative_iters}.'
+        self.cumulative_iters = cumulative_iters
+        self.scale_lr_schedule = scale_lr_schedule
+
+    def before_run(self, runner):
+        if self.scale_lr_schedule and self.cumulative_iters > 1:
+            for hook in runner.hooks:
+                if isinstance(hook, LrUpdaterHook):
+                    self._scale_lr_hook(hook)
+        runner.optimizer.zero_grad()
+
+    def _scale_lr_hook(self, hook):
+        # `warmup_iters` is computed from `warmup_epochs` at the first epoch
+        # if warmup by epoch, which counts the small batches already
+        if hook.warmup is not None and not hook.warmup_by_epoch:
+            hook.warmup_iters *= self.cumulative_iters
+        if isinstance(hook, StepLrUpdaterHook) and not hook.by_epoch:
+            if isinstance(hook.step, int):
+                hook.step *= self.cumulative_iters
+            else:
+                hook.step = [s * self.cumulative_iters for s in hook.step]
+
+    def _accumulation(self, runner):
+        """The number of iterations of the current accumulation, and whether
+        the current iteration is the last one of it."""
+        if isinstance(runner, EpochBasedRunner):
+            cur_iter, num_iters = runner.inner_iter, len(runner.data_loader)
+        else:
+            cur_iter, num_iters = runner.iter, runner.max_iters
+        start = cur_iter // self.cumulative_iters * self.cumulative_iters
+        size = min(self.cumulative_iters, num_iters - start)
+        return size, cur_iter + 1 == start + size
+
+    def before_train_iter(self, runner):
+        # the synchronization is decided in the forward of DDP
+        if hasattr(runner.model, 'require_backward_grad_sync'):
+            _, is_last = self._accumulation(runner)
+            runner.model.require_backward_grad_sync = is_last
+
+    def backward(self, runner, loss):
+        loss.backward()
+
+    def step(self, runner):
+        if self.grad_clip is not None:
+            grad_norm = self.clip_grads(runner.model.parameters())
+            if grad_norm is not None:
+                # Add grad norm to the logger
+                runner.log_buffer.update({'grad_norm': float(grad_norm)},
+                                         runner.outputs['num_samples'])
+        runner.optimizer.step()
+
+    def after_train_iter(self, runner):
+        size, is_last = self._accumulation(runner)
+        self.backward(runner, runner.outputs['loss'] / size)
+        if is_last:
+            self.step(runner)
+            runner.model.zero_grad()
+            runner.optimizer.zero_grad()
+
+
+@HOOKS.register_module()
+class GradientAccumulationFp16OptimizerHook(GradientAccumulationOptimizerHook,
+                                            Fp16OptimizerHook):
+    """Fp16 optimizer hook to accumulate the gradients of several iterations.
+
+    The losses are scaled by the ``GradScaler`` of :class:`Fp16OptimizerHook`
+    in every iteration, and the gradients are unscaled before the optimizer
+    steps.
+
+    Args:
+        cumulative_iters (int): The number of iterations to accumulate the
+            gradients. Defaults to 1.
+        scale_lr_schedule (bool): Whether to multiply the iterations in the
+            learning rate config by ``cumulative_iters``. Defaults to True.
+        **kwargs: Other arguments of :class:`Fp16OptimizerHook`.
+    """
+
+    def __init__(self, cumulative_iters=1, scale_lr_schedule=True, **kwargs):
+        Fp16OptimizerHook.__init__(self, **kwargs)
+        assert isinstance(cumulative_iters, int) and cumulative_iters > 0, \
+            'cumulative_iters should be a positive integer, ' \
+            f'got {cumulative_iters}.'
+        self.cumulative_iters = cumulative_iters
+        self.scale_lr_schedule = scale_lr_schedule
+
+    def before_run(self, runner):
+        Fp16OptimizerHook.before_run(self, runner)
+        GradientAccumulationOptimizerHook.before_run(self, runner)
+
+    def backward(self, runner, loss):
+        self.loss_scaler.scale(loss).backward()
+
+    def step(self, runner):
+        self.loss_scaler.unscale_(runner.optimizer)
+        if self.grad_clip is not None:
+            grad_norm = self.clip_grads(runner.model.parameters())
+            if grad_norm is not None:
+                # Add grad norm to the logger
+                runner.log_buffer.update({'grad_norm': float(grad_norm)},
+                                         runner.outputs['num_samples'])
+        self.loss_scaler.step(runner.optimizer)
+        self.loss_scaler.update(self._scale_update_param)
+        # save state_dict of loss_scaler
+        runner.meta.setdefault(
+            'fp16', {})['loss_scaler'] = self.loss_scaler.state_dict()
@@ -0,0 +1,346 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+import torch
+from mmcv.parallel import is_module_wrapper
+from mmcv.runner import HOOKS, Hook, LoggerHook, OptimizerHook, get_dist_info
+from torch.utils.data import get_worker_info
+
+# The running timing hooks, the latest one records the phases.
+_TIMING_HOOKS = []
+
+
+@contextmanager
+def hot_path_phase(name):
+    """Record the time of a phase in the running :class:`HotPathTimingHook`.
+
+    It does nothing if no timing hook is running, so it can be put in the hot
+    path of training, e.g. ``allreduce_grads``.
+
+    Args:
+        name (str): The name of the phase.
+    """
+    if not _TIMING_HOOKS:
+        yield
+        return
+    with _TIMING_HOOKS[-1].timed(name):
+        yield
+
+
+class _WorkerTiming:
+    """The ``worker_init_fn`` to record the latency of every sample in the
+    data loader workers.
+
+    The ``__getitem__`` of the dataset copy in the worker is timed, and the
+    latency is written in a ring buffer of the worker in the shared memory.
+    """
+
+    def __init__(self, worker_init_fn, latency, counts):
+        self.worker_init_fn = worker_init_fn
+        self.latency = latency
+        self.counts = counts
+
+    def __call__(self, worker_id):
+        if self.worker_init_fn is not None:
+            self.worker_init_fn(worker_id)
+        dataset = get_worker_info().dataset
+        dataset_cls = type(dataset)
+        latency, counts = self.latency[worker_id], self.counts
+        window = latency.numel()
+
+        def __getitem__(obj, idx):
+            start = time.perf_counter()
+            data = dataset_cls.__getitem__(obj, idx)
+            latency[counts[worker_id] % window] = time.perf_counter() - start
+            counts[worker_id] += 1
+            return data
+
+        try:
+            dataset.__class__ = type(dataset_cls.__name__, (dataset_cls, ),
+                                     {'__getitem__': __getitem__})
+        except TypeError:
+            # The class of some datasets cannot be changed.
+            pass
+
+
+def _loader_iterator(data_loader):
+    """Get the running iterator of a ``DataLoader`` or an ``IterLoader``."""
+    if hasattr(data_loader, 'iter_loader'):
+        return data_loader.iter_loader
+    return getattr(data_loader, '_iterator', None)
+
+
+def _ready_batches(iterator):
+    """The number of batches fetched by the workers but not consumed yet."""
+    ready = sum(
+        len(info) == 2 for idx, info in iterator._task_info.items()
+        if idx >= iterator._rcvd_idx)
+    try:
+        ready += iterator._data_queue.qsize()
+    except NotImplementedError:
+        # ``qsize`` is not implemented on macOS.
+        pass
+    return ready
+
+
+@HOOKS.register_module()
+class HotPathTimingHook(Hook):
+    """Record the time breakdown of every training iteration.
+
+    The runner only logs the total ``time`` and ``data_time`` of iterations.
+    This hook records the time of the following phases of every iteration,
+    and logs their percentiles, e.g. ``forward_time_p95``, in seconds:
+
+    - ``data``: Waiting for the data loader, including the hooks after this
+      hook in the last iteration.
+    - ``h2d``: The ``scatter`` of the model wrapper, which copies the inputs
+      to the device.
+    - ``forward``: The ``train_step`` of the model, i.e. the forward pass and
+      the losses.
+    - ``backward``: The optimizer hook except the optimizer step and the
+      all-reduce, i.e. zeroing, backward and gradient clipping.
+    - ``allreduce``: ``allreduce_grads``, used by the fp16 optimizer hook in
+      distributed training. The gradients of ``MMDistributedDataParallel``
+      are reduced during backward.
+    - ``optimizer``: The ``step`` of the optimizer.
+    - ``iter``: The whole iteration.
+
+    It also logs the mean ratio of ready batches in the data loader queue
+    (``queue_occupancy``), the ratio of iterations starting with an empty
+    queue (``queue_empty_ratio``) and the latency percentiles of a sample in
+    every worker (``worker_latency_p50`` etc., a list of workers).
+
+    The queue occupancy needs a running iterator of the data loader, which
+    is kept by ``persistent_workers=True``, the default of
+    :func:`build_dataloader`, or by the ``IterBasedRunner``. The worker
+    latency needs the workers to be started after the hook is set up, which
+    is the case of the ``EpochBasedRunner``.
+
+    Args:
+        interval (int, optional): Logging interval. Defaults to None, which
+            means the interval of the logger hooks.
+        percentiles (Sequence[int]): The percentiles to log.
+            Defaults to (50, 95, 99).
+        sync_cuda (bool): Whether to synchronize CUDA around the phases so
+            that the time of kernels is counted in the right phase. It slows
+            down the training a little. Defaults to True.
+        worker_window (int): The number of the latest samples of every worker
+            to compute the latency percentiles. Defaults to 1000.
+        trace_iters (tuple[int], optional): The iterations ``(start, end)`` to
+            profile by ``torch.profiler``, and the Chrome trace is saved as
+            ``trace_rank{rank}_iter{start}-{end}.json``. Defaults to None.
+        trace_dir (str, optional): The directory to save the trace. Defaults
+            to None, which means ``runner.work_dir``.
+    """
+
+    PHASES = ('data', 'h2d', 'forward', 'backward', 'allreduce', 'optimizer',
+              'iter')
+
+    def __init__(self,
+                 interval=None,
+                 percentiles=(50, 95, 99),
+                 sync_cuda=True,
+                 worker_window=1000,
+                 trace_iters=None,
+                 trace_dir=None):
+        if trace_iters is not None:
+            assert len(trace_iters) == 2 and \
+                0 <= trace_iters[0] < trace_iters[1], \
+                '`trace_iters` should be (start, end) with 0 <= start < end.'
+        self.interval = interval
+        self.percentiles = percentiles
+        self.sync_cuda = sync_cuda and torch.cuda.is_available()
+        self.worker_window = worker_window
+        self.trace_iters = trace_iters
+        self.trace_dir = trace_dir
+
+        self.by_epoch = True
+        self._patched = []
+        self._current = defaultdict(float)
+        self._records = defaultdict(list)
+        self._queue_records = []
+        self._iter_end = None
+        self._worker_latency = None
+        self._worker_counts = None
+        self._profiler = None
+
+    def _sync(self):
+        if self.sync_cuda:
+            torch.cuda.synchronize()
+
+    @contextmanager
+    def timed(self, name):
+        """Record the time of a phase in the current iteration."""
+        self._sync()
+        start = time.perf_counter()
+        if self._profiler is not None:
+            with torch.profiler.record_function(f'hot_path/{name}'):
+                yield
+        else:
+            yield
+        self._sync()
+        self._current[name] += time.perf_counter() - start
+
+    def _patch(self, obj, attr, name):
+        """Time a method of an object by replacing it on the instance."""
+        origin = getattr(obj, attr)
+        self._patched.append((obj, attr, attr in vars(obj), origin))
+
+        def timed_method(*args, **kwargs):
+            with self.timed(name):
+                return origin(*args, **kwargs)
+
+        setattr(obj, attr, timed_method)
+
+    def _restore(self):
+        for obj, attr, in_instance, origin in reversed(self._patched):
+            if in_instance:
+                setattr(obj, attr, origin)
+            else:
+                delattr(obj, attr)
+        self._patched = []
+
+    def before_run(self, runner):
+        loggers = [
+            hook for hook in runner.hooks if isinstance(hook, LoggerHook)
+        ]
+        if loggers:
+            self.by_epoch = loggers[0].by_epoch
+            if self.interval is None:
+                self.interval = loggers[0].interval
+        if self.interval is None:
+            self.interval = 50
+
+        model = runner.model
+        module = model.module if is_module_wrapper(model) else model
+        if is_module_wrapper(model) and hasattr(model, 'scatter'):
+            self._patch(model, 'scatter', 'h2d')
+        self._patch(module, 'train_step', 'forward')
+        for hook in runner.hooks:
+            if isinstance(hook, OptimizerHook):
+                self._patch(hook, 'after_train_iter', 'optimizer_hook')
+        if isinstance(runner.optimizer, torch.optim.Optimizer):
+            self._patch(runner.optimizer, 'step', 'optimizer')
+
+        _TIMING_HOOKS.append(self)
+        self._iter_end = time.perf_counter()
+        self._maybe_start_trace(runner, runner.iter)
+
+    def after_run(self, runner):
+        self._stop_trace(runner)
+        self._restore()
+        if self in _TIMING_HOOKS:
+            _TIMING_HOOKS.remove(self)
+
+    def before_train_epoch(self, runner):
+        self._setup_workers(runner.data_loader)
+        self._iter_end = time.perf_counter()
+
+    def _setup_workers(self, data_loader):
+        """Record the sample latency in the workers, which must be set before
+        the workers are started."""
+        if self._worker_latency is not None \
+                or getattr(data_loader, 'num_workers', 0) == 0 \
+                or _loader_iterator(data_loader) is not None:
+            return
+        num_workers = data_loader.num_workers
+        self._worker_latency = torch.zeros(
+            num_workers, self.worker_window,
+            dtype=torch.float64).share_memory_()
+        self._worker_counts = torch.zeros(
+            num_workers, dtype=torch.long).share_memory_()
+        self._patched.append(
+            (data_loader, 'worker_init_fn', True, data_loader.worker_init_fn))
+        data_loader.worker_init_fn = _WorkerTiming(data_loader.worker_init_fn,
+                                                   self._worker_latency,
+                                                   self._worker_counts)
+
+    def before_train_iter(self, runner):
+        self._current = defaultdict(float)
+        self._current['data'] = time.perf_counter() - self._iter_end
+
+        iterator = _loader_iterator(runner.data_loader)
+        if iterator is not None and hasattr(iterator, '_task_info'):
+            capacity = iterator._prefetch_factor * iterator._num_workers
+            self._queue_records.append(_ready_batches(iterator) / capacity)
+
+    def after_train_iter(self, runner):
+        self._sync()
+        now = time.perf_counter()
+        current = self._current
+        if 'optimizer_hook' in current:
+            current['backward'] = max(
+                current.pop('optimizer_hook') - current['optimizer'] -
+                current['allreduce'], 0.)
+        current['iter'] = now - self._iter_end
+        for name in self.PHASES:
+            if name in current:
+                self._records[name].append(current[name])
+
+        if self._should_log(runner):
+            self._log(runner)
+
+        if self._profiler is not None and \
+                runner.iter + 1 >= self.trace_iters[1]:
+            self._stop_trace(runner)
+        self._maybe_start_trace(runner, runner.iter + 1)
+        self._iter_end = time.perf_counter()
+
+    def _should_log(self, runner):
+        if self.by_epoch:
+            return self.every_n_inner_iters(runner, self.interval) \
+                or self.end_of_epoch(runner)
+        return self.every_n_iters(runner, self.interval)
+
+    def _log(self, runner):
+        output = runner.log_buffer.output
+        for name in self.PHASES:
+            if not self._records[name]:
+                continue
+            values = np.percentile(self._records[name], self.percentiles)
+            for q, value in zip(self.percentiles, values):
+                output[f'{name}_time_p{q}'] = float(value)
+        if self._queue_records:
+            occupancy = np.array(self._queue_records)
+            output['queue_occupancy'] = float(occupancy.mean())
+            output['queue_empty_ratio'] = float((occupancy == 0).mean())
+        if self._worker_latency is not None:
+            counts = self._worker_counts.tolist()
+            latency = [
+                self._worker_latency[i, :min(n, self.worker_window)].numpy()
+                for i, n in enumerate(counts)
+            ]
+            for q in self.percentiles:
+                output[f'worker_latency_p{q}'] = [
+                    round(float(np.percentile(x, q)), 5) if len(x) else None
+                    for x in latency
+                ]
+        self._records = defaultdict(list)
+        self._queue_records = []
+
+    def _maybe_start_trace(self, runner, next_iter):
+        if self.trace_iters is None or self._profiler is not None \
+                or next_iter != self.trace_iters[0]:
+            return
+        activities = [torch.profiler.ProfilerActivity.CPU]
+        if torch.cuda.is_available():
+            activities.append(torch.profiler.ProfilerActivity.CUDA)
+        self._profiler = torch.profiler.profile(activities=activities)
+        self._profiler.__enter__()
+
+    def _stop_trace(self, runner):
+        if self._profiler is None:
+            return
+        profiler, self._profiler = self._profiler, None
+        profiler.__exit__(None, None, None)
+        rank, _ = get_dist_info()
+        start, end = self.trace_iters
+        trace_dir = self.trace_dir or runner.work_dir
+        filename = osp.join(trace_dir,
+                            f'trace_rank{rank}_iter{start}-{end}.json')
+        profiler.export_chrome_trace(filename)
+        runner.logger.info(f'The Chrome trace is saved at {filename}')
@@ -0,0 +1,133 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import time
+import warnings
+
+import numpy as np
+import torch
+import torch.distributed as dist
+from mmcv.runner import HOOKS, Hook, get_dist_info
+
+
+@HOOKS.register_module()
+class LossAwareSamplingHook(Hook):
+    """Record the per-sample losses for ``LossAwareSampler``, and optionally
+    backward only the samples of high losses.
+
+    The losses of every batch are recorded by the classification head, and
+    keyed by the dataset indices of the batch, which are given by the
+    sampler in order. At the end of every epoch, the losses are gathered
+    from all ranks and updated into the sampler, which draws the samples of
+    the next epoch by them. The importance weights of the sampler are applied
+    to the losses of the samples.
+
+    With ``selective_backprop``, the losses of a batch are computed without
+    gradients first, and only the selected samples, mostly the ones of high
+    losses, are forwarded and backwarded again. The ratio of the selected
+    samples is logged as ``backprop_ratio``.
+
+    The training time without the evaluation is logged as ``train_time`` in
+    seconds with the evaluation results of every epoch, so the time to an
+    accuracy can be compared with the uniform sampling by
+    ``tools/analysis_tools/analyze_logs.py time_to_accuracy``.
+
+    Note:
+        Only the heads based on :class:`ClsHead` record the losses, and
+        the batches of the data loader should be the ones of the sampler,
+        so ``data.echo`` and ``data.multi_crop`` are not supported.
+
+    Args:
+        selective_backprop (bool): Whether to backward only the selected
+            samples. Defaults to False.
+        beta (float): The power of the loss percentiles to select the
+            samples. Defaults to 1.
+        history_size (int): The number of the recent losses to compute the
+            percentiles. Defaults to 1024.
+    """
+
+    def __init__(self, selective_backprop=False, beta=1., history_size=1024):
+        self.selective_backprop = selective_backprop
+        self.beta = beta
+        self.history_size = history_size
+        self.recorder = None
+        self.train_time = 0.
+        self._epoch_losses = None
+
+    def before_run(self, runner):
+        # avoid importing the models with the hooks
+        from mmcls.models.utils import SampleLossRecorder
+        self.recorder = SampleLossRecorder(self.selective_backprop, self.beta,
+                                           self.history_size)
+        self.recorder.start()
+        self._generator = torch.Generator()
+        self._generator.manual_seed(get_dist_info()[0])
+        # continue the training time of the resumed checkpoint
+        hook_msgs = (runner.meta or {}).get('hook_msgs', {})
+        self.train_time = hook_msgs.get('train_time', 0.)
+
+    def after_run(self, runner):
+        self.recorder.stop()
+
+    def _sampler(self, runner):
+        sampler = runner.data_loader.sampler
+        return sampler if hasattr(sampler, 'update_losses') else None
+
+    def before_train_epoch(self, runner):
+        sampler = self._sampler(runner)
+        if sampler is None:
+            warnings.warn('The sampler of the data loader is not '
+                          'LossAwareSampler, the losses are not used.')
+        else:
+            # the sums and the counts of the losses in the epoch
+            self._epoch_losses = np.zeros((2, len(sampler.losses)))
+        self._epoch_start = time.perf_counter()
+
+    def _batch_indices(self, runner):
+        sampler = self._sampler(runner)
+        if sampler is None or sampler.epoch_indices is None:
+            return None, None
+        batch_size = runner.data_loader.batch_sampler.batch_size
+        batch = slice(runner.inner_iter * batch_size,
+                      (runner.inner_iter + 1) * batch_size)
+        indices = sampler.epoch_indices[batch]
+        weights = None
+        if sampler.epoch_weights is not None:
+            weights = torch.from_numpy(sampler.epoch_weights[batch])
+        return indices, weights
+
+    def before_train_iter(self, runner):
+        _, weights = self._batch_indices(runner)
+        self.recorder.reset(weights, self._generator)
+
+    def after_train_iter(self, runner):
+        losses = self.recorder.losses
+        if self.recorder.keep is not None:
+            runner.log_buffer.update(
+                {'backprop_ratio': self.recorder.keep.float().mean().item()})
+        indices, _ = self._batch_indices(runner)
+        if indices is None or losses is None:
+            return
+        assert len(indices) == len(losses), \
+            'The batch does not match the indices of the sampler.'
+        np.add.at(self._epoch_losses[0], indices, losses.numpy())
+        np.add.at(self._epoch_losses[1], indices, 1)
+
+    def after_train_epoch(self, runner):
+        self.train_time += time.perf_counter() - self._epoch_start
+        runner.log_buffer.output['train_time'] = round(self.train_time, 2)
+        if runner.meta is not None:
+            runner.meta.setdefault('hook_msgs', {})
+            runner.meta['hook_msgs']['train_time'] = self.train_time
+
+        sampler = self._sampler(runner)
+        if sampler is None:
+            return
+        epoch_losses = self._epoch_losses
+        if dist.is_available() and dist.is_initialized():
+            epoch_losses = torch.from_numpy(epoch_losses)
+            if dist.get_backend() == 'nccl':
+                epoch_losses = epoch_losses.cuda()
+            dist.all_reduce(epoch_losses)
+            epoch_losses = epoch_losses.cpu().numpy()
+        seen = np.flatnonzero(epoch_losses[1])
+        sampler.update_losses(seen,
+                              epoch_losses[0, seen] / epoch_losses[1, seen])
@@ -0,0 +1,97 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+
+from mmcv.runner import HOOKS, Hook
+
+
+@HOOKS.register_module()
+class ProgressiveResolutionHook(Hook):
+    """Change the training resolution and batch size by epochs.
+
+    Every stage of the ``schedule`` sets the size of the progressive
+    transforms, e.g. ``ProgressiveRandomResizedCrop``, from its ``epoch``,
+    which counts the finished epochs like the ``step`` of the learning rate
+    config. The size is kept in the shared memory, so it is also changed in
+    the persistent data loader workers. The early epochs at low resolutions
+    are much faster, and the model is fine-tuned at the full resolution in
+    the last stage.
+
+    The ``batch_size`` of a stage changes the batch size of the training data
+    loader, and the total iterations are updated for the iteration-based
+    learning rate schedules. Note that the learning rate is not scaled.
+
+    The backbones need to accept the inputs of different sizes, e.g. ResNet,
+    and VisionTransformer, whose position embedding is resized to the input.
+
+    Args:
+        schedule (list[dict]): The stages of ``epoch``, ``size`` and
+            optionally ``batch_size``, sorted by ``epoch``.
+        name (str): The name of the progressive transforms.
+            Defaults to 'default'.
+
+    Examples:
+        >>> custom_hooks = [
+        ...     dict(
+        ...         type='ProgressiveResolutionHook',
+        ...         schedule=[
+        ...             dict(epoch=0, size=128, batch_size=128),
+        ...             dict(epoch=40, size=176, batch_size=64),
+        ...             dict(epoch=85, size=224, batch_size=32),
+        ...         ])
+        ... ]
+    """
+
+    def __init__(self, schedule, name='default'):
+        assert len(schedule) > 0 and schedule[0]['epoch'] == 0, \
+            'The schedule should start from epoch 0.'
+        epochs = [stage['epoch'] for stage in schedule]
+        assert epochs == sorted(epochs), \
+            'The stages of the schedule should be sorted by epoch.'
+        self.schedule = schedule
+        self.name = name
+        self._stage = None
+
+    def get_stage(self, epoch):
+        """Get the stage of the schedule at the epoch."""
+        stage = self.schedule[0]
+        for s in self.schedule:
+            if s['epoch'] <= epoch:
+                stage = s
+        return stage
+
+    def _num_iters(self, data_loader, batch_size):
+        num_samples = len(data_loader.sampler)
+        if data_loader.drop_last:
+            return num_samples // batch_size
+        return math.ceil(num_samples / batch_size)
+
+    def before_train_epoch(self, runner):
+        # avoid the circular import of the datasets
+        from mmcls.datasets.pipelines import set_progressive_size
+
+        stage = self.get_stage(runner.epoch)
+        data_loader = runner.data_loader
+        batch_sampler = data_loader.batch_sampler
+        if stage is not self._stage:
+            self._stage = stage
+            set_progressive_size(stage['size'], self.name)
+            if 'batch_size' in stage:
+                batch_sampler.batch_size = stage['batch_size']
+            runner.logger.info(
+                f'Train at the resolution {stage["size"]} with the batch '
+                f'size {batch_sampler.batch_size} from epoch '
+                f'{runner.epoch + 1}')
+
+        if any('batch_size' in s for s in self.schedule):
+            # the total iterations by the batch sizes of the stages
+            max_iters = runner.iter
+            batch_size = batch_sampler.batch_size
+            for epoch in range(runner.epoch, runner.max_epochs):
+                batch_size = self.get_stage(epoch).get('batch_size',
+                                                       batch_size)
+                max_iters += self._num_iters(data_loader, batch_size)
+            runner._max_iters = max_iters
+
+    def after_run(self, runner):
+        from mmcls.datasets.pipelines import set_progressive_size
+        set_progressive_size(None, self.name)
@@ -0,0 +1,177 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+import random
+import warnings
+from functools import partial
+
+import numpy as np
+import torch
+from mmcv.runner import HOOKS, EpochBasedRunner, Hook, master_only
+
+
+def get_rng_state():
+    """Get the states of the random generators of Python, NumPy and torch."""
+    state = dict(
+        python=random.getstate(),
+        numpy=np.random.get_state(),
+        torch=torch.get_rng_state())
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def set_rng_state(state):
+    """Set the states of the random generators got by
+    :func:`get_rng_state`."""
+    random.setstate(state['python'])
+    np.random.set_state(state['numpy'])
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+@HOOKS.register_module()
+class MidEpochCheckpointHook(Hook):
+    """Save checkpoints in the middle of epochs and resume from them.
+
+    Every ``interval`` iterations, a checkpoint ``iter_{}.pth`` is saved with
+    the position of the sampler in the epoch and the states of the random
+    generators of Python, NumPy and torch in ``meta['resume_state']``. When
+    training is resumed from it by ``resume_from``, the epoch and the
+    iteration are restored, and the sampler skips the indices consumed
+    before the checkpoint without loading them, by
+    :meth:`DistributedSampler.set_start_index`.
+
+    The data augmentation in the main process follows the restored random
+    states. The data loader workers are seeded by their seed plus the
+    iteration, so the augmentation of the rest of the epoch is deterministic,
+    but not the same as the one without interruption.
+
+    Note:
+        Only ``EpochBasedRunner`` is supported, and the sampler of the data
+        loader should have ``set_start_index``, e.g. ``DistributedSampler``
+        and ``ClassBalancedSampler``. The number of GPUs should be the
+        same after resuming.
+
+    Args:
+        interval (int): The saving period in iterations. Defaults to 1000.
+        max_keep_ckpts (int): The maximum number of the mid-epoch checkpoints
+            to keep, the older ones are removed. -1 means all of them.
+            Defaults to 1.
+        out_dir (str, optional): The directory to save the checkpoints.
+            Defaults to None, which means ``runner.work_dir``.
+        filename_tmpl (str): The filename template of the checkpoints.
+            Defaults to 'iter_{}.pth'.
+    """
+
+    def __init__(self,
+                 interval=1000,
+                 max_keep_ckpts=1,
+                 out_dir=None,
+                 filename_tmpl='iter_{}.pth'):
+        self.interval = interval
+        self.max_keep_ckpts = max_keep_ckpts
+        self.out_dir = out_dir
+        self.filename_tmpl = filename_tmpl
+        self._resume_state = None
+        self._saved = []
+        # the generator of the data loader replaced in the resumed epoch
+        self._loader_generator = False
+
+    def before_run(self, runner):
+        if self.out_dir is None:
+            self.out_dir = runner.work_dir
+        if not isinstance(runner, EpochBasedRunner):
+            warnings.warn(f'{self.__class__.__name__} only supports '
+                          f'EpochBasedRunner, got {type(runner).__name__}.')
+            self.interval = -1
+        # drop the state of the loaded checkpoint from the meta of the
+        # runner, which is saved into the later checkpoints
+        state = (runner.meta or {}).pop('resume_state', None)
+        if state is None:
+            return
+        runner._epoch = state['epoch']
+        runner._iter = state['iter']
+        set_rng_state(state['rng'])
+        self._resume_state = state
+        runner.logger.info(f'Resume from epoch {state["epoch"] + 1}, after '
+                           f'{state["sample_index"]} samples of every rank')
+
+    def before_train_epoch(self, runner):
+        if self._resume_state is None:
+            return
+        state, self._resume_state = self._resume_state, None
+        data_loader = runner.data_loader
+        if state['world_size'] != runner.world_size:
+            warnings.warn(
+                'The number of GPUs is changed after resuming, the consumed '
+                'samples are not skipped exactly.')
+
+        sampler = data_loader.sampler
+        if not hasattr(sampler, 'set_start_index'):
+            warnings.warn(
+                f'{type(sampler).__name__} cannot skip the consumed samples, '
+                'the epoch is restarted from the beginning.')
+        else:
+            # set the epoch first, which resets the start index when changed
+            sampler.set_epoch(runner.epoch)
+            sampler.set_start_index(state['sample_index'])
+
+        # the iterator of the data loader draws its base seed by the global
+        # torch generator, which would shift the restored random states
+        self._loader_generator = data_loader.generator
+        data_loader.generator = torch.Generator()
+        data_loader.generator.manual_seed(runner.iter)
+
+        # different seeds of the workers from the ones at the beginning of
+        # the epoch, otherwise the augmentation of the first samples repeats
+        init_fn = data_loader.worker_init_fn
+        if isinstance(init_fn, partial) and 'seed' in init_fn.keywords:
+            keywords = dict(init_fn.keywords)
+            keywords['seed'] += runner.iter
+            data_loader.worker_init_fn = partial(init_fn.func, *init_fn.args,
+                                                 **keywords)
+
+    def after_train_epoch(self, runner):
+        if self._loader_generator is not False:
+            runner.data_loader.generator = self._loader_generator
+            self._loader_generator = False
+
+    def after_train_iter(self, runner):
+        if self.interval <= 0 or not self.every_n_iters(runner, self.interval):
+            return
+        self._save_checkpoint(runner)
+
+    @master_only
+    def _save_checkpoint(self, runner):
+        data_loader = runner.data_loader
+        sampler = data_loader.sampler
+        epoch = runner.epoch
+        sample_index = getattr(sampler, 'start_index', 0) + \
+            (runner.inner_iter + 1) * data_loader.batch_sampler.batch_size
+        if self.end_of_epoch(runner):
+            epoch, sample_index = epoch + 1, 0
+        state = dict(
+            epoch=epoch,
+            iter=runner.iter + 1,
+            sample_index=sample_index,
+            batch_size=data_loader.batch_sampler.batch_size,
+            world_size=runner.world_size,
+            rng=get_rng_state())
+
+        filename = self.filename_tmpl.format(runner.iter + 1)
+        runner.save_checkpoint(
+            self.out_dir,
+            filename_tmpl=filename,
+            save_optimizer=True,
+            meta=dict(resume_state=state))
+        runner.logger.info(
+            f'Saving mid-epoch checkpoint at {runner.iter + 1} iterations')
+
+        self._saved.append(osp.join(self.out_dir, filename))
+        if self.max_keep_ckpts > 0:
+            while len(self._saved) > self.max_keep_ckpts:
+                ckpt_path = self._saved.pop(0)
+                if osp.isfile(ckpt_path):
+                    os.remove(ckpt_path)
@@ -0,0 +1,4 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from .zero_optimizer import ZeroRedundancyOptimizer
+
+__all__ = ['ZeroRedundancyOptimizer']
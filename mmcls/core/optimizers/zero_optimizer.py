@@ -0,0 +1,56 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+from mmcv.runner import OPTIMIZERS
+from mmcv.utils import digit_version
+
+try:
+    from torch.distributed.optim import \
+        ZeroRedundancyOptimizer as _ZeroRedundancyOptimizer
+except ImportError:
+    _ZeroRedundancyOptimizer = object
+
+
+@OPTIMIZERS.register_module()
+class ZeroRedundancyOptimizer(_ZeroRedundancyOptimizer):
+    """Optimizer that shards its states across the ranks, i.e. ZeRO stage 1.
+
+    The parameters are partitioned across the ranks by their sizes, and
+    every rank only keeps the states of its partition, e.g. the two moments
+    of ``AdamW``, and updates the parameters of it. The updated parameters
+    are broadcast to the other ranks after the step. It's a wrapper of
+    :class:`torch.distributed.optim.ZeroRedundancyOptimizer` to be built by
+    ``build_optimizer`` with the parameter-wise configs, in distributed
+    training only.
+
+    The states are gathered to rank 0 before saving the checkpoints by
+    ``ConsolidateOptimizerStateHook``, which is registered by
+    :func:`mmcls.apis.train_model`, so the checkpoints are the same as the
+    ones of the plain optimizer. The full states are sharded again when
+    loaded, with any number of ranks.
+
+    Args:
+        params (list[torch.Tensor] | list[dict]): The parameters or the
+            parameter groups.
+        optimizer_type (str): The type of the optimizer in ``OPTIMIZERS``,
+            e.g. 'AdamW'.
+        **kwargs: The arguments of the optimizer, e.g. ``lr``, and of
+            :class:`torch.distributed.optim.ZeroRedundancyOptimizer`.
+
+    Example:
+        >>> optimizer = dict(
+        ...     type='ZeroRedundancyOptimizer',
+        ...     optimizer_type='AdamW',
+        ...     lr=5e-4 * 1024 / 512,
+        ...     weight_decay=0.05,
+        ...     paramwise_cfg=dict(norm_decay_mult=0.0))
+    """
+
+    def __init__(self, params, optimizer_type, **kwargs):
+        assert _ZeroRedundancyOptimizer is not object and \
+            digit_version(torch.__version__) >= digit_version('1.12.0'), \
+            'ZeroRedundancyOptimizer with parameter groups needs ' \
+            'PyTorch >= 1.12.0.'
+        optimizer_class = OPTIMIZERS.get(optimizer_type)
+        assert optimizer_class is not None, \
+            f'{optimizer_type} is not in the OPTIMIZERS registry.'
+        super().__init__(params, optimizer_class, **kwargs)
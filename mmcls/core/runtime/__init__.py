@@ -0,0 +1,4 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from .execution_mode import wrap_execution_mode
+
+__all__ = ['wrap_execution_mode']
@@ -0,0 +1,95 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+import torch.nn as nn
+from mmcv.parallel import is_module_wrapper
+from torch.nn.modules.batchnorm import _BatchNorm
+
+MEMORY_FORMATS = {
+    'contiguous': torch.contiguous_format,
+    'channels_last': torch.channels_last,
+}
+AUTOCAST_DTYPES = {
+    'bf16': torch.bfloat16,
+    'fp16': torch.float16,
+}
+
+
+def _norm_fp32_pre_hook(module, inputs):
+    """Convert the inputs of the normalization layer to fp32, so that it
+    runs in fp32 even under autocast."""
+    x = inputs[0]
+    if x.dtype not in (torch.float16, torch.bfloat16):
+        module._fp32_input_dtype = None
+        return None
+    module._fp32_input_dtype = x.dtype
+    return (x.float(), ) + tuple(inputs[1:])
+
+
+def _norm_fp32_hook(module, inputs, output):
+    """Convert the outputs of the normalization layer back to the dtype of
+    its inputs."""
+    if module._fp32_input_dtype is not None:
+        return output.to(module._fp32_input_dtype)
+    return None
+
+
+def wrap_execution_mode(model, memory_format=None, autocast=None):
+    """Set the memory format and the autocast of a classifier.
+
+    The parameters of the model and the input images are converted to the
+    ``memory_format``, and the backbone and neck, i.e. ``extract_feat`` of
+    :class:`ImageClassifier`, run under the autocast of ``torch.autocast`` on
+    the device of the inputs in training and testing. The
+    parameters are kept in fp32, the normalization layers run in fp32, and
+    the features are converted to fp32 before the head and the losses.
+
+    On CPUs with AVX512-BF16 or AMX, the ``channels_last`` memory format with
+    the ``bf16`` autocast is several times faster than the default fp32
+    NCHW execution. Unlike :func:`wrap_fp16_model`, the ``bf16`` autocast
+    doesn't need loss scaling in training. The ``fp16`` autocast is only for
+    inference on GPUs.
+
+    It's usually configured in the ``runtime`` field of the config, e.g.,
+    ``runtime=dict(memory_format='channels_last', autocast='bf16')``, which
+    is applied by :func:`train_model`, :func:`single_gpu_test` and
+    :func:`init_model`. Calling it again replaces the previous mode.
+
+    Args:
+        model (nn.Module): The classifier, or the classifier wrapped by
+            ``MMDataParallel`` or ``MMDistributedDataParallel``.
+        memory_format (str, optional): The memory format of the model and
+            the inputs, "contiguous" or "channels_last". Defaults to None,
+            which means not to change the memory format.
+        autocast (str, optional): The dtype of the autocast, "bf16" or
+            "fp16". Defaults to None, which means no autocast.
+
+    Returns:
+        nn.Module: The model.
+    """
+    assert memory_format is None or memory_format in MEMORY_FORMATS, \
+        f'memory_format should be one of {list(MEMORY_FORMATS)}, ' \
+        f'but got "{memory_format}".'
+    assert autocast is None or autocast in AUTOCAST_DTYPES, \
+        f'autocast should be one of {list(AUTOCAST_DTYPES)}, ' \
+        f'but got "{autocast}".'
+    module = model.module if is_module_wrapper(model) else model
+
+    memory_format = MEMORY_FORMATS.get(memory_format)
+    if memory_format is not None:
+        module.to(memory_format=memory_format)
+    autocast = AUTOCAST_DTYPES.get(autocast)
+    if autocast is not None:
+        for m in module.modules():
+            if isinstance(m, (_BatchNorm, nn.GroupNorm, nn.LayerNorm)) \
+                    and _norm_fp32_pre_hook not in \
+                    m._forward_pre_hooks.values():
+                m._fp32_input_dtype = None
+                m.register_forward_pre_hook(_norm_fp32_pre_hook)
+                m.register_forward_hook(_norm_fp32_hook)
+
+    # The mode is kept as plain attributes and applied by the classifier, so
+    # the copies of the model, e.g., by ``copy.deepcopy``, run on their own
+    # weights.
+    module.memory_format = memory_format
+    module.autocast_dtype = autocast
+    return model
@@ -1,5 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from .dist_utils import DistOptimizerHook, allreduce_grads
+from .grad_compression import (GRAD_COMPRESSORS, BaseGradCompressor,
+                               BF16Compressor, FP16Compressor,
+                               PowerSGDCompressor, TopKCompressor,
+                               build_grad_compressor,
+                               register_grad_compression)
 from .misc import multi_apply
 
-__all__ = ['allreduce_grads', 'DistOptimizerHook', 'multi_apply']
+__all__ = [
+    'allreduce_grads', 'DistOptimizerHook', 'multi_apply', 'GRAD_COMPRESSORS',
+    'BaseGradCompressor', 'FP16Compressor', 'BF16Compressor',
+    'PowerSGDCompressor', 'TopKCompressor', 'build_grad_compressor',
+    'register_grad_compression'
+]
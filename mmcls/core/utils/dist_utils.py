@@ -1,4 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import warnings
 from collections import OrderedDict
 
 import torch.distributed as dist
@@ -6,8 +7,14 @@ from mmcv.runner import OptimizerHook
 from torch._utils import (_flatten_dense_tensors, _take_tensors,
                           _unflatten_dense_tensors)
 
+from ..hook import hot_path_phase
+from .grad_compression import build_grad_compressor, register_grad_compression
 
-def _allreduce_coalesced(tensors, world_size, bucket_size_mb=-1):
+
+def _allreduce_coalesced(tensors,
+                         world_size,
+                         bucket_size_mb=-1,
+                         compressor=None):
     if bucket_size_mb > 0:
         bucket_size_bytes = bucket_size_mb * 1024 * 1024
         buckets = _take_tensors(tensors, bucket_size_bytes)
@@ -20,7 +27,10 @@ def _allreduce_coalesced(tensors, world_size, bucket_size_mb=-1):
             buckets[tp].append(tensor)
         buckets = buckets.values()
 
-    for bucket in buckets:
+    for i, bucket in enumerate(buckets):
+        if compressor is not None:
+            compressor.allreduce(bucket, world_size, key=i)
+            continue
         flat_tensors = _flatten_dense_tensors(bucket)
         dist.all_reduce(flat_tensors)
         flat_tensors.div_(world_size)
@@ -29,25 +39,66 @@ def _allreduce_coalesced(tensors, world_size, bucket_size_mb=-1):
             tensor.copy_(synced)
 
 
-def allreduce_grads(params, coalesce=True, bucket_size_mb=-1):
+def allreduce_grads(params, coalesce=True, bucket_size_mb=-1, compressor=None):
     grads = [
         param.grad.data for param in params
         if param.requires_grad and param.grad is not None
     ]
     world_size = dist.get_world_size()
-    if coalesce:
-        _allreduce_coalesced(grads, world_size, bucket_size_mb)
-    else:
-        for tensor in grads:
-            dist.all_reduce(tensor.div_(world_size))
+    with hot_path_phase('allreduce'):
+        if compressor is not None and not coalesce:
+            for i, tensor in enumerate(grads):
+                compressor.allreduce([tensor], world_size, key=i)
+        elif coalesce:
+            _allreduce_coalesced(grads, world_size, bucket_size_mb, compressor)
+        else:
+            for tensor in grads:
+                dist.all_reduce(tensor.div_(world_size))
 
 
 class DistOptimizerHook(OptimizerHook):
+    """Optimizer hook for distributed training.
+
+    The gradients are all-reduced by the DDP model in the backward. With
+    ``compression``, the all-reduce of the gradient buckets is compressed by
+    the gradient compressor, e.g., ``dict(type='PowerSGDCompressor',
+    rank=4)``, ``FP16Compressor``, ``BF16Compressor`` or ``TopKCompressor``,
+    and the payload sent by the rank (``comm_mb``), the ratio of the
+    gradients to the payload (``compress_ratio``) and the time of the
+    communication (``comm_time``) of every iteration are logged.
 
-    def __init__(self, grad_clip=None, coalesce=True, bucket_size_mb=-1):
+    Args:
+        grad_clip (dict, optional): The config of the gradient clipping.
+            Defaults to None.
+        coalesce (bool): Whether to all-reduce the gradients in buckets, only
+            used by :func:`allreduce_grads`. Defaults to True.
+        bucket_size_mb (int): The size of the buckets, only used by
+            :func:`allreduce_grads`. Defaults to -1.
+        compression (dict, optional): The config of the gradient compressor.
+            Defaults to None.
+    """
+
+    def __init__(self,
+                 grad_clip=None,
+                 coalesce=True,
+                 bucket_size_mb=-1,
+                 compression=None):
         self.grad_clip = grad_clip
         self.coalesce = coalesce
         self.bucket_size_mb = bucket_size_mb
+        self.compressor = None
+        if compression is not None:
+            self.compressor = build_grad_compressor(compression)
+
+    def before_run(self, runner):
+        if self.compressor is None:
+            return
+        if hasattr(runner.model, 'register_comm_hook'):
+            register_grad_compression(runner.model, self.compressor)
+        else:
+            warnings.warn('The gradient compression needs the model wrapped '
+                          'by DistributedDataParallel.')
+            self.compressor = None
 
     def after_train_iter(self, runner):
         runner.optimizer.zero_grad()
@@ -55,3 +106,15 @@ class DistOptimizerHook(OptimizerHook):
         if self.grad_clip is not None:
             self.clip_grads(runner.model.parameters())
         runner.optimizer.step()
+        if self.compressor is not None:
+            self._log_stats(runner)
+
+    def _log_stats(self, runner):
+        stats = self.compressor.stats
+        sent_bytes = max(stats['sent_bytes'], 1)
+        runner.log_buffer.update({
+            'comm_mb': stats['sent_bytes'] / 2**20,
+            'compress_ratio': stats['raw_bytes'] / sent_bytes,
+            'comm_time': stats['comm_time']
+        })
+        self.compressor.reset_stats()
@@ -0,0 +1,271 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import time
+
+import torch
+import torch.distributed as dist
+from mmcv.utils import Registry, build_from_cfg
+from torch._utils import _flatten_dense_tensors, _unflatten_dense_tensors
+
+GRAD_COMPRESSORS = Registry('gradient compressor', scope='mmcls')
+
+
+def build_grad_compressor(cfg, default_args=None):
+    """Build a gradient compressor, e.g., ``dict(type='PowerSGDCompressor',
+    rank=4)``."""
+    return build_from_cfg(cfg, GRAD_COMPRESSORS, default_args)
+
+
+class BaseGradCompressor:
+    """Base class of the compressors of the gradient all-reduce.
+
+    :meth:`allreduce` averages a bucket of gradients of all ranks in place.
+    The payload of the communication and the time are counted in
+    :attr:`stats`, to be logged and reset every iteration, e.g. by
+    ``DistOptimizerHook``.
+    """
+
+    def __init__(self):
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the statistics of the communication, i.e. the bytes of the
+        gradients, the bytes sent by the rank and the time in seconds."""
+        self.stats = dict(raw_bytes=0, sent_bytes=0, comm_time=0.)
+
+    def _communicate(self, op, tensor, *args):
+        if tensor.is_cuda:
+            torch.cuda.synchronize()
+        start = time.perf_counter()
+        op(*args)
+        if tensor.is_cuda:
+            torch.cuda.synchronize()
+        self.stats['comm_time'] += time.perf_counter() - start
+        self.stats['sent_bytes'] += tensor.numel() * tensor.element_size()
+
+    def _all_reduce(self, tensor):
+        self._communicate(dist.all_reduce, tensor, tensor)
+
+    def _all_gather(self, tensor, world_size):
+        gathered = [torch.empty_like(tensor) for _ in range(world_size)]
+        self._communicate(dist.all_gather, tensor, gathered, tensor)
+        return gathered
+
+    def _allreduce_dense(self, tensors, world_size):
+        """All-reduce the tensors without compression."""
+        flat_tensors = _flatten_dense_tensors(tensors)
+        self._all_reduce(flat_tensors)
+        flat_tensors.div_(world_size)
+        for tensor, synced in zip(
+                tensors, _unflatten_dense_tensors(flat_tensors, tensors)):
+            tensor.copy_(synced)
+
+    def allreduce(self, tensors, world_size, key=0):
+        """Average the tensors of all ranks in place.
+
+        Args:
+            tensors (list[torch.Tensor]): The gradients of a bucket, in the
+                same order on all ranks.
+            world_size (int): The number of ranks.
+            key (int): The key of the bucket, to keep the states of the
+                compressor between iterations. Defaults to 0.
+        """
+        self.stats['raw_bytes'] += sum(t.numel() * t.element_size()
+                                       for t in tensors)
+        self._allreduce(tensors, world_size, key)
+
+    def _allreduce(self, tensors, world_size, key):
+        raise NotImplementedError
+
+
+@GRAD_COMPRESSORS.register_module()
+class FP16Compressor(BaseGradCompressor):
+    """All-reduce the gradients in float16.
+
+    The gradients are divided by the world size before the cast, to avoid the
+    overflow of the sum.
+    """
+
+    dtype = torch.float16
+
+    def _reduce(self, compressed, world_size):
+        self._all_reduce(compressed)
+        return compressed
+
+    def _allreduce(self, tensors, world_size, key):
+        flat_tensors = _flatten_dense_tensors(tensors)
+        compressed = flat_tensors.div(world_size).to(self.dtype)
+        flat_tensors.copy_(self._reduce(compressed, world_size))
+        for tensor, synced in zip(
+                tensors, _unflatten_dense_tensors(flat_tensors, tensors)):
+            tensor.copy_(synced)
+
+
+@GRAD_COMPRESSORS.register_module()
+class BF16Compressor(FP16Compressor):
+    """All-reduce the gradients in bfloat16, which has the range of float32
+    but fewer bits of precision than float16.
+
+    The gloo backend doesn't reduce bfloat16, so the bytes of the gradients
+    are all-gathered as uint8 and summed in float32 by every rank instead,
+    which sends the same bytes from a rank.
+    """
+
+    dtype = torch.bfloat16
+
+    def _reduce(self, compressed, world_size):
+        if dist.get_backend() != 'gloo':
+            return super()._reduce(compressed, world_size)
+        gathered = self._all_gather(compressed.view(torch.uint8), world_size)
+        return sum(data.view(self.dtype).float() for data in gathered)
+
+
+@GRAD_COMPRESSORS.register_module()
+class PowerSGDCompressor(BaseGradCompressor):
+    """Low-rank compression of the gradients by PowerSGD, with error
+    feedback.
+
+    Every gradient of more than one dimension is viewed as a matrix M of
+    shape (n, m), and approximated by P @ Q.T of rank ``rank``, where
+    ``P = M @ Q`` and ``Q = M.T @ P`` are all-reduced, and Q is kept for the
+    next iteration as the warm start. The error of the approximation is
+    added to the gradient of the next iteration. The vectors, e.g. biases,
+    and the small matrices are all-reduced without compression.
+
+    Refer to https://arxiv.org/abs/1905.13727 for more details.
+
+    Args:
+        rank (int): The rank of the approximation. Defaults to 2.
+        min_compression_rate (float): The minimum ratio of the size of a
+            matrix to the size of P and Q to compress it. Defaults to 2.
+        seed (int): The random seed of the initial Q, which should be the
+            same on all ranks. Defaults to 0.
+    """
+
+    def __init__(self, rank=2, min_compression_rate=2., seed=0):
+        super().__init__()
+        self.rank = rank
+        self.min_compression_rate = min_compression_rate
+        self.generator = torch.Generator()
+        self.generator.manual_seed(seed)
+        # the errors and the Q of the matrices by the keys of the bucket
+        self.errors = {}
+        self.qs = {}
+
+    def _compressible(self, tensor):
+        if tensor.dim() < 2:
+            return False
+        n, m = tensor.size(0), tensor.numel() // tensor.size(0)
+        rank = min(self.rank, n, m)
+        return n * m >= self.min_compression_rate * rank * (n + m)
+
+    def _allreduce(self, tensors, world_size, key):
+        dense = [t for t in tensors if not self._compressible(t)]
+        if dense:
+            self._allreduce_dense(dense, world_size)
+
+        matrices, qs, state_keys = [], [], []
+        for i, tensor in enumerate(tensors):
+            if not self._compressible(tensor):
+                continue
+            matrix = tensor.view(tensor.size(0), -1)
+            rank = min(self.rank, *matrix.shape)
+            state_key = (key, i)
+            q = self.qs.get(state_key)
+            error = self.errors.get(state_key)
+            # the bucket of a key may hold other tensors after rebuilding
+            if q is None or q.shape != (matrix.size(1), rank) \
+                    or error is None or error.shape != matrix.shape:
+                q = torch.randn(
+                    matrix.size(1), rank, generator=self.generator).to(matrix)
+                self.errors[state_key] = torch.zeros_like(matrix)
+            # the error feedback of the last iteration
+            matrix.add_(self.errors[state_key])
+            matrices.append(matrix)
+            qs.append(q)
+            state_keys.append(state_key)
+        if not matrices:
+            return
+
+        # all-reduce P = M @ Q of all matrices at once
+        ps = [matrix @ q for matrix, q in zip(matrices, qs)]
+        flat_ps = _flatten_dense_tensors(ps)
+        self._all_reduce(flat_ps)
+        ps = [
+            torch.linalg.qr(p)[0]
+            for p in _unflatten_dense_tensors(flat_ps, ps)
+        ]
+
+        # all-reduce Q = M.T @ P
+        qs = [matrix.t() @ p for matrix, p in zip(matrices, ps)]
+        flat_qs = _flatten_dense_tensors(qs)
+        self._all_reduce(flat_qs)
+        flat_qs.div_(world_size)
+        qs = _unflatten_dense_tensors(flat_qs, qs)
+
+        for matrix, p, q, state_key in zip(matrices, ps, qs, state_keys):
+            approx = p @ q.t()
+            self.errors[state_key] = matrix - approx
+            self.qs[state_key] = q
+            matrix.copy_(approx)
+
+
+@GRAD_COMPRESSORS.register_module()
+class TopKCompressor(BaseGradCompressor):
+    """Top-k sparsification of the gradients, with error feedback.
+
+    Every rank sends the ``ratio`` of the gradients of the bucket with the
+    largest magnitudes and their indices, and the others are added to the
+    gradients of the next iteration.
+
+    Args:
+        ratio (float): The ratio of the gradients to send. Defaults to 0.01.
+    """
+
+    def __init__(self, ratio=0.01):
+        super().__init__()
+        assert 0 < ratio <= 1, 'ratio should be in (0, 1].'
+        self.ratio = ratio
+        self.errors = {}
+
+    def _allreduce(self, tensors, world_size, key):
+        flat_tensors = _flatten_dense_tensors(tensors)
+        error = self.errors.get(key)
+        if error is not None and error.shape == flat_tensors.shape:
+            flat_tensors.add_(error)
+
+        k = max(int(flat_tensors.numel() * self.ratio), 1)
+        indices = flat_tensors.abs().topk(k, sorted=False)[1]
+        values = flat_tensors[indices]
+        sparse = torch.zeros_like(flat_tensors).index_put_((indices, ), values)
+        self.errors[key] = flat_tensors - sparse
+
+        all_indices = self._all_gather(indices.int(), world_size)
+        all_values = self._all_gather(values, world_size)
+        synced = torch.zeros_like(flat_tensors)
+        for rank_indices, rank_values in zip(all_indices, all_values):
+            synced.index_add_(0, rank_indices.long(), rank_values)
+        synced.div_(world_size)
+        for tensor, synced_tensor in zip(
+                tensors, _unflatten_dense_tensors(synced, tensors)):
+            tensor.copy_(synced_tensor)
+
+
+def _ddp_comm_hook(compressor, bucket):
+    """The communication hook of DDP to all-reduce the gradient buckets by
+    the compressor."""
+    tensors = bucket.gradients()
+    compressor.allreduce(tensors, dist.get_world_size(), key=bucket.index())
+    bucket.buffer().copy_(_flatten_dense_tensors(tensors))
+    future = torch.futures.Future()
+    future.set_result(bucket.buffer())
+    return future
+
+
+def register_grad_compression(model, compressor):
+    """Compress the gradient all-reduce of a DDP model by the compressor.
+
+    Args:
+        model (DistributedDataParallel): The model.
+        compressor (BaseGradCompressor): The compressor.
+    """
+    model.register_comm_hook(compressor, _ddp_comm_hook)
@@ -1,21 +1,38 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from mmcls.utils import lazy_import
+from .auto_tune import (apply_auto_tune, auto_tune_dataloader,
+                        profile_dataloader)
 from .base_dataset import BaseDataset
-from .builder import DATASETS, PIPELINES, build_dataloader, build_dataset
-from .cifar import CIFAR10, CIFAR100
+from .builder import (DATASETS, PIPELINES, SAMPLERS, build_dataloader,
+                      build_dataset, build_sampler)
+from .data_echoing import EchoDataLoader
 from .dataset_wrappers import (ClassBalancedDataset, ConcatDataset,
                                RepeatDataset)
-from .imagenet import ImageNet
-from .imagenet21k import ImageNet21k
-from .laser_dataset import LaserDataset, LaserDayDataset
-from .mnist import MNIST, FashionMNIST
-from .multi_label import MultiLabelDataset
-from .samplers import DistributedSampler
-from .voc import VOC
+from .multi_crop_loader import MultiCropDataLoader
+from .samplers import (ClassBalancedSampler, DistributedSampler,
+                       LossAwareSampler)
+
+# The datasets are imported when they are first accessed or built, to save
+# the startup time of importing all of them.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.cifar': ['CIFAR10', 'CIFAR100'],
+        '.feature_cache': ['FeatureCacheDataset'],
+        '.imagenet': ['ImageNet'],
+        '.imagenet21k': ['ImageNet21k'],
+        '.laser_dataset': ['LaserDataset', 'LaserDayDataset'],
+        '.mnist': ['MNIST', 'FashionMNIST'],
+        '.multi_label': ['MultiLabelDataset'],
+        '.voc': ['VOC'],
+    }, DATASETS)
 
 __all__ = [
     'BaseDataset', 'ImageNet', 'CIFAR10', 'CIFAR100', 'MNIST', 'FashionMNIST',
     'VOC', 'MultiLabelDataset', 'build_dataloader', 'build_dataset',
     'DistributedSampler', 'ConcatDataset', 'RepeatDataset',
     'ClassBalancedDataset', 'DATASETS', 'PIPELINES', 'ImageNet21k',
-    'LaserDataset', 'LaserDayDataset', 'DCTLaserDayDataset'
+    'LaserDataset', 'LaserDayDataset', 'FeatureCacheDataset',
+    'auto_tune_dataloader', 'profile_dataloader', 'apply_auto_tune',
+    'SAMPLERS', 'build_sampler', 'ClassBalancedSampler', 'LossAwareSampler',
+    'EchoDataLoader', 'MultiCropDataLoader'
 ]
@@ -0,0 +1,309 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import hashlib
+import itertools
+import json
+import os
+import os.path as osp
+import socket
+import time
+from datetime import datetime
+
+import mmcv
+import torch
+import torch.distributed as dist
+from mmcv.runner import get_dist_info
+from mmcv.utils import print_log
+
+from .builder import build_dataloader
+
+DEFAULT_CACHE_FILE = osp.join('~', '.cache', 'mmcls',
+                              'dataloader_profiles.json')
+# The settings of ``cfg.data`` written by the auto-tuning.
+TUNED_KEYS = ('samples_per_gpu', 'workers_per_gpu', 'prefetch_factor',
+              'pin_memory')
+
+
+def _rss_mb(pids):
+    """The total resident memory of the processes in MB, read from
+    ``/proc``."""
+    if not osp.isdir('/proc'):
+        return None
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    total = 0
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/statm') as f:
+                total += int(f.read().split()[1]) * page_size
+        except (OSError, IndexError, ValueError):
+            # The process has exited.
+            pass
+    return total / 2**20
+
+
+def _num_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def profile_dataloader(dataset,
+                       samples_per_gpu,
+                       workers_per_gpu,
+                       prefetch_factor=2,
+                       pin_memory=False,
+                       num_batches=20,
+                       warmup=3):
+    """Measure the speed and the memory of a data loader setting.
+
+    The first ``warmup`` batches, which include the start of the workers, are
+    not timed. The memory is the total RSS of the main process and the
+    workers after the trial, and the shared pages are counted repeatedly.
+
+    Args:
+        dataset (Dataset): The dataset to load.
+        samples_per_gpu (int): The batch size.
+        workers_per_gpu (int): The number of workers.
+        prefetch_factor (int): The number of batches loaded in advance by
+            every worker. Defaults to 2.
+        pin_memory (bool): Whether to pin the memory of batches.
+            Defaults to False.
+        num_batches (int): The number of timed batches. Defaults to 20.
+        warmup (int): The number of batches before timing. Defaults to 3.
+
+    Returns:
+        dict: ``samples_per_sec`` and ``rss_mb``.
+    """
+    data_loader = build_dataloader(
+        dataset,
+        samples_per_gpu,
+        workers_per_gpu,
+        dist=False,
+        shuffle=True,
+        pin_memory=pin_memory,
+        persistent_workers=False,
+        prefetch_factor=prefetch_factor)
+    assert len(data_loader) > warmup, \
+        f'The dataset is too small to profile {warmup} warm-up batches.'
+    num_batches = min(num_batches, len(data_loader) - warmup)
+
+    data_iter = iter(data_loader)
+    for _ in range(warmup):
+        next(data_iter)
+    start = time.perf_counter()
+    for _ in range(num_batches):
+        next(data_iter)
+    elapsed = time.perf_counter() - start
+
+    pids = [os.getpid()] + [w.pid for w in getattr(data_iter, '_workers', [])]
+    rss_mb = _rss_mb(pids)
+    if hasattr(data_iter, '_shutdown_workers'):
+        data_iter._shutdown_workers()
+    return dict(
+        samples_per_sec=num_batches * samples_per_gpu / elapsed, rss_mb=rss_mb)
+
+
+def _profile_key(data_cfg, search_space):
+    """The key of a profile, the host name and the hash of the training
+    dataset config and the search space."""
+    content = json.dumps(
+        dict(dataset=data_cfg.get('train'), search_space=search_space),
+        sort_keys=True,
+        default=str)
+    digest = hashlib.md5(content.encode()).hexdigest()[:16]
+    return f'{socket.gethostname()}-{digest}'
+
+
+def _select(trials, tolerance, max_rss_mb):
+    """Select the setting with the least memory among the ones whose speed is
+    within the tolerance of the fastest one."""
+    feasible = [
+        t for t in trials
+        if 'error' not in t and (max_rss_mb is None or t['rss_mb'] is None
+                                 or t['rss_mb'] <= max_rss_mb)
+    ]
+    assert feasible, 'All data loader settings failed or exceeded the ' \
+        'memory limit.'
+    best_speed = max(t['samples_per_sec'] for t in feasible)
+    candidates = [
+        t for t in feasible
+        if t['samples_per_sec'] >= (1 - tolerance) * best_speed
+    ]
+    best = min(
+        candidates,
+        key=lambda t: (t['rss_mb'] or 0, t['workers_per_gpu'], t[
+            'prefetch_factor'] or 0, -t['samples_per_sec']))
+    return {key: best[key] for key in TUNED_KEYS}
+
+
+def auto_tune_dataloader(dataset,
+                         data_cfg,
+                         workers=None,
+                         prefetch_factors=(2, 4),
+                         batch_sizes=None,
+                         pin_memory=None,
+                         num_batches=20,
+                         warmup=3,
+                         tolerance=0.05,
+                         max_rss_mb=None,
+                         cache_file=DEFAULT_CACHE_FILE,
+                         use_cache=True,
+                         logger=None):
+    """Find the data loader settings by short timed trials.
+
+    Every combination of the number of workers, the prefetch factor, the
+    batch size and the memory pinning is profiled by
+    :func:`profile_dataloader` on the real dataset and pipeline. Among the
+    settings whose speed is within ``tolerance`` of the fastest one, the one
+    with the least memory is selected, so that extra workers are not used
+    for a negligible speedup.
+
+    The profile is cached in ``cache_file`` with the key of the host name and
+    the hash of the dataset config and the search space, and the trials are
+    skipped if the key is found.
+
+    Args:
+        dataset (Dataset): The training dataset.
+        data_cfg (dict): The ``data`` field of the config, which gives the
+            default ``samples_per_gpu`` and ``workers_per_gpu``.
+        workers (Sequence[int], optional): The numbers of workers to try.
+            Defaults to None, which means 0 and the powers of 2 up to the
+            number of CPUs, and the ``workers_per_gpu`` of the config.
+        prefetch_factors (Sequence[int]): The prefetch factors to try.
+            Defaults to (2, 4).
+        batch_sizes (Sequence[int], optional): The batch sizes to try. Note
+            that the learning rate is not scaled with the batch size.
+            Defaults to None, which means the ``samples_per_gpu`` of the
+            config.
+        pin_memory (Sequence[bool], optional): The memory pinning to try.
+            Defaults to None, which means both if CUDA is available, otherwise
+            False.
+        num_batches (int): The number of timed batches of every trial.
+            Defaults to 20.
+        warmup (int): The number of batches before timing. Defaults to 3.
+        tolerance (float): The relative speed tolerance to prefer the setting
+            with less memory. Defaults to 0.05.
+        max_rss_mb (float, optional): The memory limit in MB. Defaults to
+            None.
+        cache_file (str, optional): The file of cached profiles. Defaults to
+            "~/.cache/mmcls/dataloader_profiles.json".
+        use_cache (bool): Whether to use the cached profile. Defaults to True.
+        logger (logging.Logger | str, optional): The logger to print the
+            trials. Defaults to None.
+
+    Returns:
+        dict: The profile with the ``key``, ``host``, ``date``, the selected
+        ``settings`` and the ``trials``.
+    """
+    if workers is None:
+        num_cpus = _num_cpus()
+        workers = {0, data_cfg.get('workers_per_gpu', 2)}
+        workers.update(2**i for i in range(1, num_cpus.bit_length())
+                       if 2**i <= num_cpus)
+    if batch_sizes is None:
+        batch_sizes = [data_cfg['samples_per_gpu']]
+    if pin_memory is None:
+        pin_memory = (True, False) if torch.cuda.is_available() else (False, )
+    search_space = dict(
+        workers=sorted(workers),
+        prefetch_factors=sorted(prefetch_factors),
+        batch_sizes=sorted(batch_sizes),
+        pin_memory=sorted(pin_memory),
+        num_batches=num_batches)
+    key = _profile_key(data_cfg, search_space)
+
+    cache_file = osp.expanduser(cache_file) if cache_file else None
+    profiles = {}
+    if cache_file is not None and osp.exists(cache_file):
+        profiles = mmcv.load(cache_file)
+    if use_cache and key in profiles:
+        print_log(
+            f'Use the cached data loader profile {key}: '
+            f'{profiles[key]["settings"]}',
+            logger=logger)
+        return profiles[key]
+
+    trials = []
+    for num_workers, prefetch_factor, batch_size, pin in itertools.product(
+            search_space['workers'], search_space['prefetch_factors'],
+            search_space['batch_sizes'], search_space['pin_memory']):
+        if num_workers == 0:
+            # The prefetch factor is meaningless without workers.
+            if prefetch_factor != search_space['prefetch_factors'][0]:
+                continue
+            prefetch_factor = None
+        trial = dict(
+            samples_per_gpu=batch_size,
+            workers_per_gpu=num_workers,
+            prefetch_factor=prefetch_factor,
+            pin_memory=pin)
+        try:
+            trial.update(
+                profile_dataloader(dataset, batch_size, num_workers,
+                                   prefetch_factor, pin, num_batches, warmup))
+            rss = 'N/A' if trial['rss_mb'] is None \
+                else f'{trial["rss_mb"]:.0f} MB'
+            print_log(
+                f'workers={num_workers}, prefetch={prefetch_factor}, '
+                f'batch={batch_size}, pin_memory={pin}: '
+                f'{trial["samples_per_sec"]:.1f} samples/s, RSS {rss}',
+                logger=logger)
+        except Exception as e:
+            trial['error'] = f'{type(e).__name__}: {e}'
+            print_log(
+                f'workers={num_workers}, prefetch={prefetch_factor}, '
+                f'batch={batch_size}, pin_memory={pin}: '
+                f'{trial["error"].splitlines()[0]}',
+                logger=logger)
+        trials.append(trial)
+
+    profile = dict(
+        key=key,
+        host=socket.gethostname(),
+        num_cpus=_num_cpus(),
+        date=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        settings=_select(trials, tolerance, max_rss_mb),
+        trials=trials)
+    print_log(
+        f'The selected data loader settings: {profile["settings"]}',
+        logger=logger)
+    if cache_file is not None:
+        profiles[key] = profile
+        mmcv.mkdir_or_exist(osp.dirname(cache_file))
+        mmcv.dump(profiles, cache_file, indent=2)
+    return profile
+
+
+def apply_auto_tune(data_cfg, dataset, distributed=False, logger=None):
+    """Tune the data loader settings if ``data_cfg.auto_tune`` is set, and
+    write them into ``data_cfg``.
+
+    ``auto_tune`` is True, or a dict of the arguments of
+    :func:`auto_tune_dataloader`. In distributed training, the settings are
+    tuned by rank 0 and broadcast to the other ranks, and the trials don't
+    count the CPU contention of the other ranks on the same machine.
+
+    Args:
+        data_cfg (dict): The ``data`` field of the config.
+        dataset (Dataset): The training dataset.
+        distributed (bool): Whether in distributed training.
+            Defaults to False.
+        logger (logging.Logger | str, optional): The logger to print the
+            trials. Defaults to None.
+
+    Returns:
+        dict: ``data_cfg`` with the tuned settings.
+    """
+    auto_tune = data_cfg.get('auto_tune', False)
+    if not auto_tune:
+        return data_cfg
+    tune_kwargs = auto_tune if isinstance(auto_tune, dict) else {}
+
+    rank, _ = get_dist_info()
+    settings = [None]
+    if rank == 0:
+        settings[0] = auto_tune_dataloader(
+            dataset, data_cfg, logger=logger, **tune_kwargs)['settings']
+    if distributed:
+        dist.broadcast_object_list(settings, src=0)
+    data_cfg.update(settings[0])
+    return data_cfg
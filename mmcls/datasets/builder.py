@@ -7,10 +7,12 @@ import numpy as np
 import torch
 from mmcv.parallel import collate
 from mmcv.runner import get_dist_info
-from mmcv.utils import Registry, build_from_cfg, digit_version
+from mmcv.utils import build_from_cfg, digit_version
 from torch.utils.data import DataLoader
 
-from .samplers import DistributedSampler
+from mmcls.utils import LazyRegistry
+from .data_echoing import EchoDataLoader
+from .multi_crop_loader import MultiCropDataLoader
 
 if platform.system() != 'Windows':
     # https://github.com/pytorch/pytorch/issues/973
@@ -20,8 +22,9 @@ if platform.system() != 'Windows':
     soft_limit = min(4096, hard_limit)
     resource.setrlimit(resource.RLIMIT_NOFILE, (soft_limit, hard_limit))
 
-DATASETS = Registry('dataset')
-PIPELINES = Registry('pipeline')
+DATASETS = LazyRegistry('dataset', scope='mmcls')
+PIPELINES = LazyRegistry('pipeline', scope='mmcls')
+SAMPLERS = LazyRegistry('sampler', scope='mmcls')
 
 
 def build_dataset(cfg, default_args=None):
@@ -41,6 +44,12 @@ def build_dataset(cfg, default_args=None):
     return dataset
 
 
+def build_sampler(cfg, default_args=None):
+    if cfg is None:
+        return None
+    return build_from_cfg(cfg, SAMPLERS, default_args=default_args)
+
+
 def build_dataloader(dataset,
                      samples_per_gpu,
                      workers_per_gpu,
@@ -51,6 +60,10 @@ def build_dataloader(dataset,
                      seed=None,
                      pin_memory=True,
                      persistent_workers=True,
+                     prefetch_factor=None,
+                     sampler_cfg=None,
+                     echo_cfg=None,
+                     multi_crop_cfg=None,
                      **kwargs):
     """Build PyTorch DataLoader.
 
@@ -74,22 +87,70 @@ def build_dataloader(dataset,
         persistent_workers (bool): If True, the data loader will not shutdown
             the worker processes after a dataset has been consumed once.
             This allows to maintain the workers Dataset instances alive.
-            The argument also has effect in PyTorch>=1.7.0.
+            The argument also has effect in PyTorch>=1.7.0, and it's ignored
+            if there is no worker.
             Default: True
+        prefetch_factor (int, optional): Number of batches loaded in advance
+            by each worker. It's ignored if there is no worker. The argument
+            also has effect in PyTorch>=1.7.0. Default: None, which means the
+            default of PyTorch.
+        sampler_cfg (dict, optional): Config of the sampler, e.g.,
+            ``dict(type='ClassBalancedSampler', oversample_thr=0.01)``. The
+            dataset, the number of replicas, the rank, ``shuffle``,
+            ``round_up`` and ``seed`` are given by this function.
+            Default: None, which means ``DistributedSampler`` in distributed
+            training, otherwise the default sampler of DataLoader.
+        echo_cfg (dict, optional): The arguments of :class:`EchoDataLoader`
+            to reuse the loaded batches, e.g., ``dict(echo_factor='auto')``.
+            Default: None, which means no data echoing.
+        multi_crop_cfg (dict, optional): The arguments of
+            :class:`MultiCropDataLoader` to split the crops of ``MultiCrop``
+            into samples, e.g., ``dict(num_crops=4, mix_batches=4)``.
+            ``samples_per_gpu`` counts the crops, and should be divisible by
+            ``num_crops``. Default: None.
         kwargs: any keyword argument to be used to initialize DataLoader
 
     Returns:
         DataLoader: A PyTorch dataloader.
     """
     rank, world_size = get_dist_info()
-    if dist:
-        sampler = DistributedSampler(
-            dataset, world_size, rank, shuffle=shuffle, round_up=round_up)
+    if sampler_cfg is not None:
+        sampler = build_sampler(
+            sampler_cfg,
+            default_args=dict(
+                dataset=dataset,
+                num_replicas=world_size,
+                rank=rank,
+                shuffle=shuffle,
+                round_up=round_up,
+                seed=seed))
+    elif dist:
+        sampler = build_sampler(
+            dict(
+                type='DistributedSampler',
+                dataset=dataset,
+                num_replicas=world_size,
+                rank=rank,
+                shuffle=shuffle,
+                round_up=round_up))
+    else:
+        sampler = None
+    if sampler is not None:
         shuffle = False
+
+    if multi_crop_cfg is not None:
+        assert echo_cfg is None, \
+            'The data echoing does not support multiple crops.'
+        num_crops = multi_crop_cfg['num_crops']
+        assert samples_per_gpu % num_crops == 0, \
+            f'samples_per_gpu should be divisible by num_crops {num_crops}.'
+        # the loaded batches count the images
+        samples_per_gpu //= num_crops
+
+    if dist:
         batch_size = samples_per_gpu
         num_workers = workers_per_gpu
     else:
-        sampler = None
         batch_size = num_gpus * samples_per_gpu
         num_workers = num_gpus * workers_per_gpu
 
@@ -98,9 +159,18 @@ def build_dataloader(dataset,
         seed=seed) if seed is not None else None
 
     if digit_version(torch.__version__) >= digit_version('1.8.0'):
-        kwargs['persistent_workers'] = persistent_workers
-
-    data_loader = DataLoader(
+        kwargs['persistent_workers'] = persistent_workers and num_workers > 0
+    if digit_version(torch.__version__) >= digit_version('1.7.0') \
+            and prefetch_factor is not None and num_workers > 0:
+        kwargs['prefetch_factor'] = prefetch_factor
+
+    if echo_cfg is not None:
+        loader_type = partial(EchoDataLoader, **echo_cfg)
+    elif multi_crop_cfg is not None:
+        loader_type = partial(MultiCropDataLoader, **multi_crop_cfg)
+    else:
+        loader_type = DataLoader
+    data_loader = loader_type(
         dataset,
         batch_size=batch_size,
         sampler=sampler,
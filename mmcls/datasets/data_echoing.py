@@ -0,0 +1,114 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import time
+
+from torch.utils.data import DataLoader
+
+from mmcls.utils import get_root_logger
+
+
+class EchoDataLoader(DataLoader):
+    """DataLoader that reuses every loaded batch several times, i.e. data
+    echoing, when the training is bound by the data loading.
+
+    An epoch has as many iterations as the plain data loader, but only about
+    ``1 / echo_factor`` of them load new batches from the dataset, and the
+    others repeat the last loaded batch. The repeated batches should be
+    augmented differently by the cheap batch augmentations of the model,
+    e.g. ``BatchMixup`` and ``BatchCutMix`` in ``train_cfg.augments``,
+    otherwise the model sees the same batch several times in a row.
+
+    With ``echo_factor='auto'``, the factor is adapted to the time waiting
+    for the loaded batches versus the time of the iterations that use them.
+    The factor grows while the training waits for the data, and shrinks
+    slowly while it doesn't, so that about ``data_time_ratio`` of the time is
+    spent waiting. The factor is a float, and the numbers of repeats of the
+    batches average to it.
+
+    Note:
+        The mid-epoch checkpoints assume that every iteration loads a new
+        batch, so they don't resume exactly with the echoing.
+        ``LossAwareSampler`` maps the losses to the samples by the
+        iterations, so it's not supported with the echoing.
+
+    Args:
+        *args: The arguments of :class:`DataLoader`.
+        echo_factor (float | str): The number of times to use every loaded
+            batch, or 'auto' to adapt it to the time. Defaults to 'auto'.
+        max_echo_factor (float): The maximum of the adaptive factor.
+            Defaults to 4.
+        data_time_ratio (float): The target ratio of the time waiting for the
+            data of the adaptive factor. Defaults to 0.05.
+        momentum (float): The momentum of the moving average of the adaptive
+            factor. Defaults to 0.9.
+        **kwargs: The keyword arguments of :class:`DataLoader`.
+    """
+
+    def __init__(self,
+                 *args,
+                 echo_factor='auto',
+                 max_echo_factor=4.,
+                 data_time_ratio=0.05,
+                 momentum=0.9,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.adaptive = echo_factor == 'auto'
+        if self.adaptive:
+            echo_factor = 1.
+        assert echo_factor >= 1, 'echo_factor should be at least 1.'
+        assert max_echo_factor >= 1, 'max_echo_factor should be at least 1.'
+        self.echo_factor = float(echo_factor)
+        self.max_echo_factor = float(max_echo_factor)
+        self.data_time_ratio = data_time_ratio
+        self.momentum = momentum
+        # the fractional repeats carried to the next batch
+        self._echo_credit = 0.
+
+    def _num_repeats(self):
+        self._echo_credit += self.echo_factor
+        repeats = max(int(self._echo_credit), 1)
+        self._echo_credit -= repeats
+        return repeats
+
+    def _update_echo_factor(self, wait_time, compute_time, repeats):
+        """Update the adaptive factor by the time waiting for a batch and the
+        time of the iterations of the last batch."""
+        if compute_time <= 0:
+            return
+        # the factor to hide the loading time of a batch in the iterations,
+        # which shrinks when the training doesn't wait
+        step_time = compute_time / repeats
+        load_time = compute_time + wait_time
+        factor = load_time / step_time * (1 - self.data_time_ratio)
+        factor = self.momentum * self.echo_factor + \
+            (1 - self.momentum) * factor
+        self.echo_factor = min(max(factor, 1.), self.max_echo_factor)
+
+    def __iter__(self):
+        iterator = super().__iter__()
+        num_iters = len(self)
+        num_loaded = 0
+        repeats = 0
+        compute_time = 0.
+        i = 0
+        while i < num_iters:
+            start = time.perf_counter()
+            try:
+                batch = next(iterator)
+            except StopIteration:
+                break
+            wait_time = time.perf_counter() - start
+            # the first batch of the epoch waits for the start of the workers
+            if self.adaptive and num_loaded > 0:
+                self._update_echo_factor(wait_time, compute_time, repeats)
+            num_loaded += 1
+            repeats = min(self._num_repeats(), num_iters - i)
+            compute_time = 0.
+            for _ in range(repeats):
+                start = time.perf_counter()
+                yield batch
+                compute_time += time.perf_counter() - start
+            i += repeats
+
+        get_root_logger().info(
+            f'Data echoing: loaded {num_loaded} batches for {i} iterations, '
+            f'the echo factor is {self.echo_factor:.2f}')
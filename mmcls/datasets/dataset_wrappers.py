@@ -1,7 +1,5 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import bisect
-import math
-from collections import defaultdict
 
 import numpy as np
 from torch.utils.data.dataset import ConcatDataset as _ConcatDataset
@@ -69,6 +67,108 @@ class RepeatDataset(object):
         return self.times * self._ori_len
 
 
+def _get_all_cat_ids(dataset):
+    """Get the category ids of all samples as flat arrays.
+
+    The labels of the datasets whose ``get_cat_ids`` is known are read from
+    ``get_gt_labels`` at once, and ``get_cat_ids`` of other datasets is called
+    once per sample.
+
+    Returns:
+        tuple[np.ndarray]: The sample indices and the category ids, one
+        element for every category of every sample.
+    """
+    from .base_dataset import BaseDataset
+    from .imagenet21k import ImageNet21k
+    from .multi_label import MultiLabelDataset
+
+    if isinstance(dataset, ConcatDataset):
+        sample_inds, cat_ids = [], []
+        for offset, sub_dataset in zip([0] + dataset.cumulative_sizes[:-1],
+                                       dataset.datasets):
+            inds, ids = _get_all_cat_ids(sub_dataset)
+            sample_inds.append(inds + offset)
+            cat_ids.append(ids)
+        return np.concatenate(sample_inds), np.concatenate(cat_ids)
+    if isinstance(dataset, RepeatDataset):
+        inds, ids = _get_all_cat_ids(dataset.dataset)
+        offsets = np.arange(dataset.times) * dataset._ori_len
+        return (inds[None] + offsets[:, None]).ravel(), np.tile(
+            ids, dataset.times)
+
+    get_cat_ids = getattr(type(dataset), 'get_cat_ids', None)
+    if 'get_cat_ids' not in vars(dataset):
+        if get_cat_ids in (BaseDataset.get_cat_ids, ImageNet21k.get_cat_ids):
+            cat_ids = np.asarray(dataset.get_gt_labels(), dtype=np.int64)
+            return np.arange(len(cat_ids)), cat_ids
+        if get_cat_ids is MultiLabelDataset.get_cat_ids:
+            return np.nonzero(np.stack(dataset.get_gt_labels()) == 1)
+
+    sample_inds, cat_ids = [], []
+    for idx in range(len(dataset)):
+        ids = dataset.get_cat_ids(idx)
+        sample_inds.extend([idx] * len(ids))
+        cat_ids.extend(ids)
+    return np.asarray(sample_inds, np.int64), np.asarray(cat_ids, np.int64)
+
+
+def get_repeat_factors(dataset, repeat_thr):
+    r"""Get the repeat factor of every sample for class balancing.
+
+    The repeat factor is computed by the labels of all samples at once.
+
+    1. For each category c, compute the fraction :math:`f(c)` of images that
+       contain it.
+    2. For each category c, compute the category-level repeat factor
+
+        .. math::
+            r(c) = \max(1, \sqrt{\frac{t}{f(c)}})
+
+    3. For each image I and its labels :math:`L(I)`, compute the image-level
+       repeat factor
+
+        .. math::
+            r(I) = \max_{c \in L(I)} r(c)
+
+    Args:
+        dataset (:obj:`Dataset`): The dataset with ``get_cat_ids``.
+        repeat_thr (float): frequency threshold below which data is repeated.
+
+    Returns:
+        np.ndarray: The repeat factors of all samples, and it's 1 for the
+        samples without any category.
+    """
+    num_images = len(dataset)
+    sample_inds, cat_ids = _get_all_cat_ids(dataset)
+    if len(cat_ids) == 0:
+        return np.ones(num_images)
+    # count a category once in an image
+    _, cat_ids = np.unique(cat_ids, return_inverse=True)
+    num_cats = int(cat_ids.max()) + 1
+    pair_keys = np.unique(sample_inds * num_cats + cat_ids)
+    sample_inds, cat_ids = pair_keys // num_cats, pair_keys % num_cats
+
+    # 1. For each category c, compute the fraction # of images
+    #   that contain it: f(c)
+    category_freq = np.bincount(cat_ids, minlength=num_cats) / num_images
+
+    # 2. For each category c, compute the category-level repeat factor:
+    #    r(c) = max(1, sqrt(t/f(c)))
+    category_repeat = np.maximum(1.0, np.sqrt(repeat_thr / category_freq))
+
+    # 3. For each image I and its labels L(I), compute the image-level
+    # repeat factor:
+    #    r(I) = max_{c in L(I)} r(c)
+    repeat_factors = np.ones(num_images)
+    if len(sample_inds) == num_images and \
+            np.array_equal(sample_inds, np.arange(num_images)):
+        # single-label datasets
+        repeat_factors = category_repeat[cat_ids]
+    else:
+        np.maximum.at(repeat_factors, sample_inds, category_repeat[cat_ids])
+    return repeat_factors
+
+
 # Modified from https://github.com/facebookresearch/detectron2/blob/41d475b75a230221e21d9cac5d69655e3415e3a4/detectron2/data/samplers/distributed_sampler.py#L57 # noqa
 @DATASETS.register_module()
 class ClassBalancedDataset(object):
@@ -101,6 +201,11 @@ class ClassBalancedDataset(object):
         .. math::
             r(I) = \max_{c \in L(I)} r(c)
 
+    An image is repeated ``ceil(r(I))`` times, and the repeated indices are
+    located by the cumulative repeat times instead of being materialized. To
+    draw the repeated images on the fly with the stochastic rounding of the
+    repeat factors, use :class:`ClassBalancedSampler` instead.
+
     References:
         .. [#1]  https://arxiv.org/pdf/1908.03195.pdf
 
@@ -118,55 +223,36 @@ class ClassBalancedDataset(object):
         self.oversample_thr = oversample_thr
         self.CLASSES = dataset.CLASSES
 
-        repeat_factors = self._get_repeat_factors(dataset, oversample_thr)
-        repeat_indices = []
-        for dataset_index, repeat_factor in enumerate(repeat_factors):
-            repeat_indices.extend([dataset_index] * math.ceil(repeat_factor))
-        self.repeat_indices = repeat_indices
+        self.repeat_factors = get_repeat_factors(dataset, oversample_thr)
+        repeat_times = np.ceil(self.repeat_factors).astype(np.int64)
+        self._cum_repeat_times = np.cumsum(repeat_times)
 
         flags = []
         if hasattr(self.dataset, 'flag'):
-            for flag, repeat_factor in zip(self.dataset.flag, repeat_factors):
-                flags.extend([flag] * int(math.ceil(repeat_factor)))
-            assert len(flags) == len(repeat_indices)
+            flags = np.repeat(np.asarray(self.dataset.flag), repeat_times)
         self.flag = np.asarray(flags, dtype=np.uint8)
 
-    def _get_repeat_factors(self, dataset, repeat_thr):
-        # 1. For each category c, compute the fraction # of images
-        #   that contain it: f(c)
-        category_freq = defaultdict(int)
-        num_images = len(dataset)
-        for idx in range(num_images):
-            cat_ids = set(self.dataset.get_cat_ids(idx))
-            for cat_id in cat_ids:
-                category_freq[cat_id] += 1
-        for k, v in category_freq.items():
-            assert v > 0, f'caterogy {k} does not contain any images'
-            category_freq[k] = v / num_images
-
-        # 2. For each category c, compute the category-level repeat factor:
-        #    r(c) = max(1, sqrt(t/f(c)))
-        category_repeat = {
-            cat_id: max(1.0, math.sqrt(repeat_thr / cat_freq))
-            for cat_id, cat_freq in category_freq.items()
-        }
-
-        # 3. For each image I and its labels L(I), compute the image-level
-        # repeat factor:
-        #    r(I) = max_{c in L(I)} r(c)
-        repeat_factors = []
-        for idx in range(num_images):
-            cat_ids = set(self.dataset.get_cat_ids(idx))
-            repeat_factor = max(
-                {category_repeat[cat_id]
-                 for cat_id in cat_ids})
-            repeat_factors.append(repeat_factor)
-
-        return repeat_factors
+    @property
+    def repeat_indices(self):
+        """np.ndarray: The materialized indices of the original dataset."""
+        return np.repeat(
+            np.arange(len(self.dataset)),
+            np.diff(self._cum_repeat_times, prepend=0))
+
+    def _get_ori_index(self, idx):
+        if idx < 0:
+            if -idx > len(self):
+                raise ValueError(
+                    'absolute value of index should not exceed dataset length')
+            idx = len(self) + idx
+        return int(np.searchsorted(self._cum_repeat_times, idx, side='right'))
 
     def __getitem__(self, idx):
-        ori_index = self.repeat_indices[idx]
-        return self.dataset[ori_index]
+        return self.dataset[self._get_ori_index(idx)]
+
+    def get_cat_ids(self, idx):
+        return self.dataset.get_cat_ids(self._get_ori_index(idx))
 
     def __len__(self):
-        return len(self.repeat_indices)
+        return int(self._cum_repeat_times[-1]) if len(
+            self._cum_repeat_times) else 0
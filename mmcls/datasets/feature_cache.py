@@ -0,0 +1,82 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+
+import numpy as np
+
+from .base_dataset import BaseDataset
+from .builder import DATASETS
+
+
+def feature_cache_files(prefix):
+    """Get the file names used by a feature cache.
+
+    Args:
+        prefix (str): The prefix of the cache files, e.g.
+            ``work_dirs/feat_cache/train``.
+
+    Returns:
+        tuple[str]: The path of the feature array and the label array.
+    """
+    return f'{prefix}_feats.npy', f'{prefix}_labels.npy'
+
+
+@DATASETS.register_module()
+class FeatureCacheDataset(BaseDataset):
+    """Dataset of pre-extracted features stored in a memory-mapped array.
+
+    The features are produced by :func:`mmcls.apis.extract_feature_cache`
+    and stored as ``{data_prefix}_feats.npy`` of shape (N, C) along with
+    ``{data_prefix}_labels.npy`` of shape (N, ). The feature array is opened
+    with ``mmap_mode='r'``, so only the accessed rows are paged in and the
+    workers of the dataloader share the page cache.
+
+    Args:
+        data_prefix (str): The prefix of the cache files.
+        pipeline (list, optional): Processing pipeline. Defaults to convert
+            ``img`` and ``gt_label`` to tensors and collect them.
+        classes (Sequence[str] | str | None): Classes of the dataset.
+        test_mode (bool): In train mode or test mode.
+    """
+
+    def __init__(self,
+                 data_prefix,
+                 pipeline=None,
+                 classes=None,
+                 ann_file=None,
+                 test_mode=False):
+        if pipeline is None:
+            pipeline = [
+                dict(type='ToTensor', keys=['img', 'gt_label']),
+                dict(type='Collect', keys=['img', 'gt_label'], meta_keys=())
+            ]
+        super(FeatureCacheDataset, self).__init__(
+            data_prefix=data_prefix,
+            pipeline=pipeline,
+            classes=classes,
+            ann_file=ann_file,
+            test_mode=test_mode)
+
+    def load_annotations(self):
+        feat_file, label_file = feature_cache_files(self.data_prefix)
+        assert osp.exists(feat_file) and osp.exists(label_file), \
+            f'Feature cache {self.data_prefix} not found, please extract ' \
+            'it by `mmcls.apis.extract_feature_cache` first.'
+        self.features = np.load(feat_file, mmap_mode='r')
+        self.gt_labels = np.load(label_file).astype(np.int64)
+        assert len(self.features) == len(self.gt_labels), \
+            'The feature cache is broken, the numbers of features and ' \
+            'labels are different.'
+        # Keep the per-sample info minimal, the features stay on disk.
+        return [dict(idx=i) for i in range(len(self.gt_labels))]
+
+    def get_gt_labels(self):
+        return self.gt_labels
+
+    def get_cat_ids(self, idx):
+        return [int(self.gt_labels[idx])]
+
+    def prepare_data(self, idx):
+        results = dict(
+            img=np.array(self.features[idx], dtype=np.float32),
+            gt_label=np.array(self.gt_labels[idx], dtype=np.int64))
+        return self.pipeline(results)
@@ -68,6 +68,15 @@ class ImageNet21k(BaseDataset):
         super(ImageNet21k, self).__init__(data_prefix, pipeline, classes,
                                           ann_file, test_mode)
 
+    def get_gt_labels(self):
+        """Get all ground-truth labels (categories).
+
+        Returns:
+            np.ndarray: categories for all images.
+        """
+
+        return np.array([info.gt_label for info in self.data_infos])
+
     def get_cat_ids(self, idx: int) -> List[int]:
         """Get category id by index.
 
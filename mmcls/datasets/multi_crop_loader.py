@@ -0,0 +1,91 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+from mmcv.parallel import DataContainer
+from torch.utils.data import DataLoader
+
+
+class MultiCropDataLoader(DataLoader):
+    """DataLoader that splits the crops generated by ``MultiCrop`` into the
+    samples of the batches.
+
+    A loaded batch of ``batch_size`` images of shape (N, K, C, H, W) gives
+    ``batch_size * num_crops`` samples. The crops of ``mix_batches``
+    consecutive loaded batches are distributed into the same number of
+    batches, the k-th crop of the i-th image into the ``(i + k) %
+    mix_batches``-th batch, so that a batch has at most ``ceil(num_crops /
+    mix_batches)`` crops of an image, which limits the correlation of the
+    samples in a batch. An epoch has as many iterations as the loaded
+    batches.
+
+    Args:
+        *args: The arguments of :class:`DataLoader`, whose ``batch_size`` is
+            the number of the images of a loaded batch.
+        num_crops (int): The number of crops of an image, the same as the one
+            of ``MultiCrop``.
+        mix_batches (int): The number of loaded batches to distribute the
+            crops. Defaults to 1, which means the crops of an image are in
+            the same batch.
+        **kwargs: The keyword arguments of :class:`DataLoader`.
+    """
+
+    def __init__(self, *args, num_crops, mix_batches=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        assert num_crops >= 1, 'num_crops should be at least 1.'
+        assert mix_batches >= 1, 'mix_batches should be at least 1.'
+        self.num_crops = num_crops
+        self.mix_batches = mix_batches
+
+    def _split_crops(self, batches):
+        """Split the crops of the loaded batches into the same number of
+        batches."""
+        crops = torch.cat([batch['img'] for batch in batches])
+        assert crops.dim() > 2 and crops.size(1) == self.num_crops, \
+            f'The images should be (N, {self.num_crops}, ...), please use ' \
+            '`MultiCrop` in the pipeline with the same `num_crops`.'
+        image_ids = torch.arange(len(crops)).repeat_interleave(self.num_crops)
+        crop_ids = torch.arange(self.num_crops).repeat(len(crops))
+        batch_ids = (image_ids + crop_ids) % len(batches)
+
+        outputs = []
+        for i in range(len(batches)):
+            mask = batch_ids == i
+            ids = image_ids[mask]
+            output = dict()
+            for key, value in batches[0].items():
+                if key == 'img':
+                    output[key] = crops[ids, crop_ids[mask]]
+                elif isinstance(value, torch.Tensor):
+                    output[key] = torch.cat([b[key] for b in batches])[ids]
+                elif isinstance(value, DataContainer):
+                    assert value.cpu_only, \
+                        f'The data container "{key}" should be cpu_only.'
+                    samples = [
+                        sample for b in batches for chunk in b[key].data
+                        for sample in chunk
+                    ]
+                    samples = [samples[j] for j in ids.tolist()]
+                    # the samples of every GPU
+                    size = len(value.data[0]) * self.num_crops
+                    chunks = [
+                        samples[j:j + size]
+                        for j in range(0, len(samples), size)
+                    ]
+                    output[key] = DataContainer(
+                        chunks,
+                        value.stack,
+                        value.padding_value,
+                        cpu_only=True)
+                else:
+                    output[key] = value
+            outputs.append(output)
+        return outputs
+
+    def __iter__(self):
+        batches = []
+        for batch in super().__iter__():
+            batches.append(batch)
+            if len(batches) == self.mix_batches:
+                yield from self._split_crops(batches)
+                batches = []
+        if len(batches) > 0:
+            yield from self._split_crops(batches)
@@ -1,23 +1,44 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .auto_augment import (AutoAugment, AutoContrast, Brightness,
-                           ColorTransform, Contrast, Cutout, Equalize, Invert,
-                           Posterize, RandAugment, Rotate, Sharpness, Shear,
-                           Solarize, SolarizeAdd, Translate)
+from mmcls.utils import lazy_import
+from ..builder import PIPELINES
 from .compose import Compose
-from .formatting import (Collect, ImageToTensor, ToNumpy, ToPIL, ToTensor,
-                         Transpose, to_tensor)
-from .loading import (LoadImageFromFile)
-from .transforms import (CenterCrop, ColorJitter, Lighting, Normalize, Pad,
-                         RandomCrop, RandomErasing, RandomFlip,
-                         RandomGrayscale, RandomResizedCrop, Resize)
+
+# The transforms are imported when they are first accessed or built, to save
+# the startup time of importing all of them.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.auto_augment': [
+            'AutoAugment', 'AutoContrast', 'Brightness', 'ColorTransform',
+            'Contrast', 'Cutout', 'Equalize', 'Invert', 'Posterize',
+            'RandAugment', 'Rotate', 'Sharpness', 'Shear', 'Solarize',
+            'SolarizeAdd', 'Translate'
+        ],
+        '.formatting': [
+            'Collect', 'ImageToTensor', 'ToNumpy', 'ToPIL', 'ToTensor',
+            'Transpose', 'to_tensor'
+        ],
+        '.loading': ['LoadImageFromFile'],
+        '.multi_crop': ['MultiCrop'],
+        '.progressive': [
+            'ProgressiveCenterCrop', 'ProgressiveRandomResizedCrop',
+            'get_progressive_size', 'set_progressive_size'
+        ],
+        '.test_time_aug': ['MultiView'],
+        '.transforms': [
+            'CenterCrop', 'ColorJitter', 'Lighting', 'Normalize', 'Pad',
+            'RandomCrop', 'RandomErasing', 'RandomFlip', 'RandomGrayscale',
+            'RandomResizedCrop', 'Resize'
+        ],
+    }, PIPELINES)
 
 __all__ = [
     'Compose', 'to_tensor', 'ToTensor', 'ImageToTensor', 'ToPIL', 'ToNumpy',
-    'Transpose', 'Collect', 'Resize', 'CenterCrop',
-    'LoadImageFromFile',
+    'Transpose', 'Collect', 'Resize', 'CenterCrop', 'LoadImageFromFile',
     'RandomFlip', 'Normalize', 'RandomCrop', 'RandomResizedCrop',
     'RandomGrayscale', 'Shear', 'Translate', 'Rotate', 'Invert',
     'ColorTransform', 'Solarize', 'Posterize', 'AutoContrast', 'Equalize',
     'Contrast', 'Brightness', 'Sharpness', 'AutoAugment', 'SolarizeAdd',
-    'Cutout', 'RandAugment', 'Lighting', 'ColorJitter', 'RandomErasing', 'Pad'
+    'Cutout', 'RandAugment', 'Lighting', 'ColorJitter', 'RandomErasing', 'Pad',
+    'MultiView', 'ProgressiveRandomResizedCrop', 'ProgressiveCenterCrop',
+    'get_progressive_size', 'set_progressive_size', 'MultiCrop'
 ]
@@ -0,0 +1,63 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import torch
+
+from ..builder import PIPELINES
+from .compose import Compose
+
+
+@PIPELINES.register_module()
+class MultiCrop(object):
+    """Generate multiple independently augmented crops of an image for
+    training, so that a decoded image gives several samples.
+
+    The ``transforms`` are applied to every crop, and the images of all crops
+    are stacked into an array or tensor of shape (K, ...), like
+    ``MultiView`` in testing. The data loader should be built with
+    ``data.multi_crop`` (see :class:`MultiCropDataLoader`), which splits the
+    crops into the samples of the batches.
+
+    Args:
+        transforms (list[dict | callable]): The transforms applied to every
+            crop, e.g., ``RandomResizedCrop``, ``RandomFlip``, ``Normalize``
+            and ``ImageToTensor``. The images of all crops should be in the
+            same shape after them.
+        num_crops (int): The number of crops of an image. Defaults to 2.
+
+    Example:
+        >>> train_pipeline = [
+        ...     dict(type='LoadImageFromFile'),
+        ...     dict(type='MultiCrop',
+        ...          num_crops=4,
+        ...          transforms=[
+        ...              dict(type='RandomResizedCrop', size=224),
+        ...              dict(type='RandomFlip', flip_prob=0.5),
+        ...              dict(type='Normalize', **img_norm_cfg),
+        ...              dict(type='ImageToTensor', keys=['img']),
+        ...          ]),
+        ...     dict(type='ToTensor', keys=['gt_label']),
+        ...     dict(type='Collect', keys=['img', 'gt_label'])
+        ... ]
+    """
+
+    def __init__(self, transforms, num_crops=2):
+        assert num_crops >= 1, 'num_crops should be at least 1.'
+        self.transforms = Compose(transforms)
+        self.num_crops = num_crops
+
+    def __call__(self, results):
+        crop_results = [
+            self.transforms(results.copy()) for _ in range(self.num_crops)
+        ]
+        imgs = [crop_result['img'] for crop_result in crop_results]
+        results = crop_results[0]
+        if isinstance(imgs[0], torch.Tensor):
+            results['img'] = torch.stack(imgs)
+        else:
+            results['img'] = np.stack(imgs)
+        results['num_crops'] = self.num_crops
+        return results
+
+    def __repr__(self):
+        return self.__class__.__name__ + \
+            f'(num_crops={self.num_crops}, transforms={self.transforms})'
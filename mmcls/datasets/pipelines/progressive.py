@@ -0,0 +1,97 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+
+from ..builder import PIPELINES
+from .transforms import CenterCrop, RandomResizedCrop
+
+# The current sizes of the progressive transforms by name, in shared memory.
+_PROGRESSIVE_SIZES = {}
+
+
+def get_progressive_size(name='default'):
+    """Get the shared tensor of the current size (h, w) of the progressive
+    transforms with the name.
+
+    The tensor is in the shared memory, so the size set in the main process
+    is visible to the persistent data loader workers. (0, 0) means the size
+    in the config of the transforms.
+
+    Args:
+        name (str): The name of the progressive transforms.
+            Defaults to 'default'.
+
+    Returns:
+        torch.Tensor: The size tensor of shape (2, ).
+    """
+    if name not in _PROGRESSIVE_SIZES:
+        _PROGRESSIVE_SIZES[name] = torch.zeros(
+            2, dtype=torch.int32).share_memory_()
+    return _PROGRESSIVE_SIZES[name]
+
+
+def set_progressive_size(size, name='default'):
+    """Set the current size of the progressive transforms with the name.
+
+    Args:
+        size (int | tuple[int], optional): The size (h, w). None means the
+            size in the config of the transforms.
+        name (str): The name of the progressive transforms.
+            Defaults to 'default'.
+    """
+    if size is None:
+        size = (0, 0)
+    elif isinstance(size, int):
+        size = (size, size)
+    get_progressive_size(name).copy_(torch.tensor(size, dtype=torch.int32))
+
+
+@PIPELINES.register_module()
+class ProgressiveRandomResizedCrop(RandomResizedCrop):
+    """RandomResizedCrop whose output size is changed during training.
+
+    The output size is the one set by :func:`set_progressive_size`, e.g. by
+    ``ProgressiveResolutionHook``, or ``size`` if not set.
+
+    Args:
+        size (sequence | int): The output size if the progressive size is not
+            set.
+        name (str): The name of the progressive size. Defaults to 'default'.
+        **kwargs: Other arguments of :class:`RandomResizedCrop`.
+    """
+
+    def __init__(self, size, name='default', **kwargs):
+        super().__init__(size, **kwargs)
+        self.name = name
+        self.default_size = self.size
+        self.progressive_size = get_progressive_size(name)
+
+    def __call__(self, results):
+        h, w = self.progressive_size.tolist()
+        self.size = (h, w) if h > 0 else self.default_size
+        return super().__call__(results)
+
+
+@PIPELINES.register_module()
+class ProgressiveCenterCrop(CenterCrop):
+    """CenterCrop whose crop size is changed during training.
+
+    The crop size is the one set by :func:`set_progressive_size`, e.g. by
+    ``ProgressiveResolutionHook``, or ``crop_size`` if not set.
+
+    Args:
+        crop_size (int | tuple): The crop size if the progressive size is not
+            set.
+        name (str): The name of the progressive size. Defaults to 'default'.
+        **kwargs: Other arguments of :class:`CenterCrop`.
+    """
+
+    def __init__(self, crop_size, name='default', **kwargs):
+        super().__init__(crop_size, **kwargs)
+        self.name = name
+        self.default_size = self.crop_size
+        self.progressive_size = get_progressive_size(name)
+
+    def __call__(self, results):
+        h, w = self.progressive_size.tolist()
+        self.crop_size = (h, w) if h > 0 else self.default_size
+        return super().__call__(results)
@@ -0,0 +1,129 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmcv
+import numpy as np
+import torch
+
+from ..builder import PIPELINES
+from .compose import Compose
+
+
+class _FixedCrop(object):
+    """Crop the image at a fixed position, used by the preset views."""
+
+    def __init__(self, crop_size, position):
+        assert position in ('center', 'top_left', 'top_right', 'bottom_left',
+                            'bottom_right')
+        self.crop_size = crop_size
+        self.position = position
+
+    def __call__(self, results):
+        crop_h, crop_w = self.crop_size
+        for key in results.get('img_fields', ['img']):
+            img = results[key]
+            img_h, img_w = img.shape[:2]
+            crop_h, crop_w = min(crop_h, img_h), min(crop_w, img_w)
+            if self.position == 'center':
+                y1 = (img_h - crop_h) // 2
+                x1 = (img_w - crop_w) // 2
+            else:
+                y1 = 0 if self.position.startswith('top') else img_h - crop_h
+                x1 = 0 if self.position.endswith('left') else img_w - crop_w
+            bbox = np.array([x1, y1, x1 + crop_w - 1, y1 + crop_h - 1])
+            results[key] = mmcv.imcrop(img, bboxes=bbox)
+        results['img_shape'] = results['img'].shape
+        return results
+
+    def __repr__(self):
+        return self.__class__.__name__ + \
+            f'(crop_size={self.crop_size}, position={self.position})'
+
+
+@PIPELINES.register_module()
+class MultiView(object):
+    """Generate multiple views of an image for test-time augmentation.
+
+    Every view is generated by its view transforms followed by the common
+    ``transforms``, and the images of all views are stacked into an array or
+    tensor of shape (K, ...). After collation, the batch of shape
+    (N, K, C, H, W) is reshaped to (N*K, C, H, W) by
+    :meth:`ImageClassifier.aug_test`, so that all views are predicted in one
+    forward pass.
+
+    Args:
+        transforms (list[dict | callable]): The transforms applied to every
+            view after the view transforms, e.g., ``Normalize`` and
+            ``ImageToTensor``. The images of all views should be in the same
+            shape after them.
+        views (str | list[list[dict | callable]]): The view transforms of
+            every view, or a preset of:
+
+            - "flip": The original image and the horizontally flipped one.
+            - "five_crop": The four corner crops and the center crop.
+            - "ten_crop": The "five_crop" views and their flipped ones.
+
+            Defaults to "flip".
+        crop_size (int | tuple[int], optional): The (h, w) crop size of the
+            "five_crop" and "ten_crop" presets. Defaults to None.
+
+    Example:
+        >>> test_pipeline = [
+        ...     dict(type='LoadImageFromFile'),
+        ...     dict(type='Resize', size=(256, -1)),
+        ...     dict(type='MultiView',
+        ...          views='ten_crop',
+        ...          crop_size=224,
+        ...          transforms=[
+        ...              dict(type='Normalize', **img_norm_cfg),
+        ...              dict(type='ImageToTensor', keys=['img']),
+        ...          ]),
+        ...     dict(type='Collect', keys=['img'])
+        ... ]
+    """
+
+    PRESETS = ('flip', 'five_crop', 'ten_crop')
+
+    def __init__(self, transforms, views='flip', crop_size=None):
+        if isinstance(views, str):
+            views = self._preset_views(views, crop_size)
+        assert isinstance(views, (list, tuple)) and len(views) > 0
+        self.views = [Compose(list(view) + list(transforms)) for view in views]
+
+    @classmethod
+    def _preset_views(cls, preset, crop_size):
+        assert preset in cls.PRESETS, \
+            f'views should be one of {cls.PRESETS}, but got "{preset}".'
+        flip = dict(type='RandomFlip', flip_prob=1., direction='horizontal')
+        if preset == 'flip':
+            return [[], [flip]]
+
+        assert crop_size is not None, \
+            f'crop_size should be specified for the "{preset}" views.'
+        if isinstance(crop_size, int):
+            crop_size = (crop_size, crop_size)
+        crops = [
+            _FixedCrop(crop_size, position)
+            for position in ('center', 'top_left', 'top_right', 'bottom_left',
+                             'bottom_right')
+        ]
+        views = [[crop] for crop in crops]
+        if preset == 'ten_crop':
+            views += [[crop, flip] for crop in crops]
+        return views
+
+    def __call__(self, results):
+        view_results = [view(results.copy()) for view in self.views]
+        imgs = [view_result['img'] for view_result in view_results]
+        results = view_results[0]
+        if isinstance(imgs[0], torch.Tensor):
+            results['img'] = torch.stack(imgs)
+        else:
+            results['img'] = np.stack(imgs)
+        results['num_views'] = len(imgs)
+        return results
+
+    def __repr__(self):
+        repr_str = self.__class__.__name__ + '(views=['
+        for view in self.views:
+            repr_str += f'\n    {view}'
+        repr_str += '\n])'
+        return repr_str
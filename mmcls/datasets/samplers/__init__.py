@@ -1,4 +1,6 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .class_balanced_sampler import ClassBalancedSampler
 from .distributed_sampler import DistributedSampler
+from .loss_aware_sampler import LossAwareSampler
 
-__all__ = ['DistributedSampler']
+__all__ = ['DistributedSampler', 'ClassBalancedSampler', 'LossAwareSampler']
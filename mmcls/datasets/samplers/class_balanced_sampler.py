@@ -0,0 +1,105 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+
+import numpy as np
+import torch
+
+from ..builder import SAMPLERS
+from .distributed_sampler import DistributedSampler, index_dtype
+
+
+@SAMPLERS.register_module()
+class ClassBalancedSampler(DistributedSampler):
+    """Sampler that repeats the samples of rare categories in every epoch.
+
+    The repeat factor of every sample is the same as
+    :class:`ClassBalancedDataset`, but the repeated indices are drawn on the
+    fly in every epoch without wrapping the dataset. With the stochastic
+    rounding, a sample with the repeat factor ``r`` is repeated
+    ``floor(r) + 1`` times with the probability ``r - floor(r)``, otherwise
+    ``floor(r)`` times, so the expected repeat times is exactly ``r``.
+    Without it, a sample is repeated ``ceil(r)`` times.
+
+    The number of samples in an epoch is fixed to the expected one, by
+    truncating or cycling the drawn indices. It supports both distributed and
+    non-distributed training, and ``set_epoch`` is called by
+    ``DistSamplerSeedHook`` to draw different indices in every epoch.
+
+    Args:
+        dataset (:obj:`Dataset`): The dataset with ``get_cat_ids``.
+        num_replicas (int, optional): Number of processes in distributed
+            training. Defaults to None, which means the world size.
+        rank (int, optional): Rank of the current process. Defaults to None.
+        oversample_thr (float): frequency threshold below which data is
+            repeated. Defaults to 1e-3.
+        stochastic_round (bool): Whether to round the repeat factors
+            stochastically. Defaults to True.
+        shuffle (bool): Whether to shuffle the indices. Defaults to True.
+        round_up (bool): Whether to add extra samples to make the number of
+            samples evenly divisible by the number of replicas.
+            Defaults to True.
+        seed (int, optional): The random seed. Defaults to 0.
+    """
+
+    def __init__(self,
+                 dataset,
+                 num_replicas=None,
+                 rank=None,
+                 oversample_thr=1e-3,
+                 stochastic_round=True,
+                 shuffle=True,
+                 round_up=True,
+                 seed=0):
+        super().__init__(
+            dataset,
+            num_replicas=num_replicas,
+            rank=rank,
+            shuffle=shuffle,
+            round_up=round_up,
+            seed=seed)
+        # avoid the circular import of the dataset wrappers
+        from ..dataset_wrappers import get_repeat_factors
+        self.oversample_thr = oversample_thr
+        self.stochastic_round = stochastic_round
+        self.repeat_factors = get_repeat_factors(dataset, oversample_thr)
+
+        if stochastic_round:
+            num_repeated = int(round(self.repeat_factors.sum()))
+        else:
+            num_repeated = int(np.ceil(self.repeat_factors).sum())
+        if self.round_up:
+            self.num_samples = math.ceil(num_repeated / self.num_replicas)
+            self.total_size = self.num_samples * self.num_replicas
+        else:
+            self.num_samples = len(
+                range(self.rank, num_repeated, self.num_replicas))
+            self.total_size = num_repeated
+
+    def __iter__(self):
+        # deterministically draw and shuffle based on epoch
+        g = torch.Generator()
+        g.manual_seed(self.seed + self.epoch)
+        if self.stochastic_round:
+            floor = np.floor(self.repeat_factors)
+            rand = torch.rand(
+                len(self.repeat_factors), generator=g,
+                dtype=torch.float64).numpy()
+            repeat_times = floor + (rand < self.repeat_factors - floor)
+        else:
+            repeat_times = np.ceil(self.repeat_factors)
+        num_indices = len(self.repeat_factors)
+        indices = np.repeat(
+            np.arange(num_indices, dtype=index_dtype(num_indices)),
+            repeat_times.astype(np.int64))
+        if self.shuffle:
+            indices = indices[torch.randperm(len(indices),
+                                             generator=g).numpy()]
+
+        # fix the number of samples in an epoch
+        indices = np.resize(indices, self.total_size)
+
+        # subsample
+        indices = self._subsample(indices)
+        assert len(indices) == self.num_samples
+
+        return map(int, indices[self.start_index:])
@@ -0,0 +1,140 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+
+import numpy as np
+import torch
+
+from ..builder import SAMPLERS
+from .distributed_sampler import DistributedSampler, index_dtype
+
+
+@SAMPLERS.register_module()
+class LossAwareSampler(DistributedSampler):
+    """Sampler that draws the samples of high losses more often.
+
+    After ``warmup_epochs`` epochs, the samples are drawn with replacement by
+    the probabilities proportional to their recent losses, which are updated
+    by ``LossAwareSamplingHook``, mixed with the uniform probabilities by
+    ``uniform_ratio``, so every sample is drawn with a probability of at
+    least ``uniform_ratio / len(dataset)``. With ``sample_ratio`` less than
+    1, an epoch only has a part of the samples, most of which are the hard
+    ones, so that the easy samples are mostly skipped.
+
+    The gradients are biased to the hard samples. With ``reweight``, the
+    losses of the samples are weighted by ``1 / (len(dataset) * prob)`` to
+    get the unbiased gradients of the dataset.
+
+    The samples of the warm-up epochs are drawn uniformly without
+    replacement, and the samples without recorded losses have the mean loss.
+
+    Args:
+        dataset (:obj:`Dataset`): The dataset.
+        num_replicas (int, optional): Number of processes in distributed
+            training. Defaults to None, which means the world size.
+        rank (int, optional): Rank of the current process. Defaults to None.
+        shuffle (bool): Whether to shuffle the indices in the warm-up epochs.
+            Defaults to True.
+        round_up (bool): Whether to add extra samples to make the number of
+            samples evenly divisible by the number of replicas.
+            Defaults to True.
+        seed (int, optional): The random seed. Defaults to 0.
+        sample_ratio (float): The ratio of the number of samples in an epoch
+            to the size of the dataset. Defaults to 1.
+        uniform_ratio (float): The ratio of the uniform probabilities, which
+            is the floor of the probabilities. Defaults to 0.1.
+        warmup_epochs (int): The number of epochs of uniform sampling to
+            record the losses. Defaults to 1.
+        reweight (bool): Whether to weight the losses by the inverse of the
+            probabilities. Defaults to True.
+    """
+
+    def __init__(self,
+                 dataset,
+                 num_replicas=None,
+                 rank=None,
+                 shuffle=True,
+                 round_up=True,
+                 seed=0,
+                 sample_ratio=1.,
+                 uniform_ratio=0.1,
+                 warmup_epochs=1,
+                 reweight=True):
+        super().__init__(
+            dataset,
+            num_replicas=num_replicas,
+            rank=rank,
+            shuffle=shuffle,
+            round_up=round_up,
+            seed=seed)
+        assert 0 < sample_ratio <= 1, 'sample_ratio should be in (0, 1].'
+        assert 0 < uniform_ratio <= 1, 'uniform_ratio should be in (0, 1].'
+        self.sample_ratio = sample_ratio
+        self.uniform_ratio = uniform_ratio
+        self.warmup_epochs = warmup_epochs
+        self.reweight = reweight
+        self.losses = np.full(len(dataset), np.nan, dtype=np.float32)
+
+        num_drawn = math.ceil(len(dataset) * sample_ratio)
+        if self.round_up:
+            self.num_samples = math.ceil(num_drawn / self.num_replicas)
+            self.total_size = self.num_samples * self.num_replicas
+        else:
+            self.num_samples = len(
+                range(self.rank, num_drawn, self.num_replicas))
+            self.total_size = num_drawn
+        # the indices and the loss weights of the current rank in the epoch
+        self.epoch_indices = None
+        self.epoch_weights = None
+
+    def update_losses(self, indices, losses):
+        """Update the recent losses of the samples.
+
+        Args:
+            indices (np.ndarray): The indices of the samples.
+            losses (np.ndarray): The losses of the samples.
+        """
+        self.losses[indices] = losses
+
+    def get_probs(self):
+        """Get the probabilities of the samples, or None in the warm-up
+        epochs."""
+        seen = ~np.isnan(self.losses)
+        if self.epoch < self.warmup_epochs or not seen.any():
+            return None
+        losses = np.where(seen, self.losses, self.losses[seen].mean())
+        losses = np.maximum(losses, 0).astype(np.float64)
+        uniform = np.full(len(losses), 1. / len(losses))
+        if losses.sum() <= 0:
+            return uniform
+        return (1 - self.uniform_ratio) * losses / losses.sum() + \
+            self.uniform_ratio * uniform
+
+    def __iter__(self):
+        probs = self.get_probs()
+        if probs is None:
+            indices = self._get_indices()
+            indices = np.resize(indices, self.total_size)
+        else:
+            # draw with replacement by the inverse of the cumulative
+            # probabilities
+            g = torch.Generator()
+            g.manual_seed(self.seed + self.epoch)
+            rand = torch.rand(
+                self.total_size, generator=g, dtype=torch.float64).numpy()
+            cum_probs = np.cumsum(probs)
+            indices = np.searchsorted(cum_probs, rand * cum_probs[-1])
+            indices = np.minimum(indices, len(probs) - 1)
+            indices = indices.astype(index_dtype(len(probs)))
+
+        # subsample
+        indices = self._subsample(indices)
+        assert len(indices) == self.num_samples
+        indices = indices[self.start_index:]
+
+        self.epoch_indices = indices
+        if probs is not None and self.reweight:
+            self.epoch_weights = (1. / (len(probs) * probs[indices])).astype(
+                np.float32)
+        else:
+            self.epoch_weights = None
+        return map(int, indices)
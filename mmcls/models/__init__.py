@@ -1,12 +1,20 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .backbones import *  # noqa: F401,F403
+from mmcls.utils import lazy_import
+from . import backbones, classifiers, heads, necks
 from .builder import (BACKBONES, CLASSIFIERS, HEADS, LOSSES, NECKS,
                       build_backbone, build_classifier, build_head, build_loss,
                       build_neck)
-from .classifiers import *  # noqa: F401,F403
-from .heads import *  # noqa: F401,F403
 from .losses import *  # noqa: F401,F403
-from .necks import *  # noqa: F401,F403
+
+# The backbones, classifiers, heads and necks are imported lazily from the
+# sub-packages, see `mmcls.utils.lazy_import`.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.backbones': backbones.__all__,
+        '.classifiers': classifiers.__all__,
+        '.heads': heads.__all__,
+        '.necks': necks.__all__,
+    })
 
 __all__ = [
     'BACKBONES', 'HEADS', 'NECKS', 'LOSSES', 'CLASSIFIERS', 'build_backbone',
@@ -1,26 +1,34 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .alexnet import AlexNet
-from .lenet import LeNet5
-from .mlp_mixer import MlpMixer
-from .mobilenet_v2 import MobileNetV2
-from .mobilenet_v3 import MobileNetV3
-from .regnet import RegNet
-from .repvgg import RepVGG
-from .res2net import Res2Net
-from .resnest import ResNeSt
-from .resnet import ResNet, ResNetV1d
-from .resnet_cifar import ResNet_CIFAR
-from .resnext import ResNeXt
-from .seresnet import SEResNet
-from .seresnext import SEResNeXt
-from .shufflenet_v1 import ShuffleNetV1
-from .shufflenet_v2 import ShuffleNetV2
-from .swin_transformer import SwinTransformer
-from .t2t_vit import T2T_ViT
-from .timm_backbone import TIMMBackbone
-from .tnt import TNT
-from .vgg import VGG
-from .vision_transformer import VisionTransformer
+from mmcls.utils import lazy_import
+from ..builder import BACKBONES
+
+# The backbones are imported when they are first accessed or built, to save
+# the startup time of importing all of them.
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.alexnet': ['AlexNet'],
+        '.lenet': ['LeNet5'],
+        '.mlp_mixer': ['MlpMixer'],
+        '.mobilenet_v2': ['MobileNetV2'],
+        '.mobilenet_v3': ['MobileNetV3'],
+        '.regnet': ['RegNet'],
+        '.repvgg': ['RepVGG'],
+        '.res2net': ['Res2Net'],
+        '.resnest': ['ResNeSt'],
+        '.resnet': ['ResNet', 'ResNetV1d'],
+        '.resnet_cifar': ['ResNet_CIFAR'],
+        '.resnext': ['ResNeXt'],
+        '.seresnet': ['SEResNet'],
+        '.seresnext': ['SEResNeXt'],
+        '.shufflenet_v1': ['ShuffleNetV1'],
+        '.shufflenet_v2': ['ShuffleNetV2'],
+        '.swin_transformer': ['SwinTransformer'],
+        '.t2t_vit': ['T2T_ViT'],
+        '.timm_backbone': ['TIMMBackbone'],
+        '.tnt': ['TNT'],
+        '.vgg': ['VGG'],
+        '.vision_transformer': ['VisionTransformer'],
+    }, BACKBONES)
 
 __all__ = [
     'LeNet5', 'AlexNet', 'VGG', 'RegNet', 'ResNet', 'ResNeXt', 'ResNetV1d',
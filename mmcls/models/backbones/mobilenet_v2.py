@@ -19,6 +19,9 @@ class InvertedResidual(BaseModule):
         stride (int): Stride of the middle (first) 3x3 convolution.
         expand_ratio (int): adjusts number of channels of the hidden layer
             in InvertedResidual by this amount.
+        mid_channels (int, optional): The channels of the hidden layer. If
+            specified, it overrides ``in_channels * expand_ratio``, which is
+            used by pruned models. Default: None.
         conv_cfg (dict, optional): Config dict for convolution layer.
             Default: None, which means using conv2d.
         norm_cfg (dict): Config dict for normalization layer.
@@ -37,6 +40,7 @@ class InvertedResidual(BaseModule):
                  out_channels,
                  stride,
                  expand_ratio,
+                 mid_channels=None,
                  conv_cfg=None,
                  norm_cfg=dict(type='BN'),
                  act_cfg=dict(type='ReLU6'),
@@ -48,7 +52,12 @@ class InvertedResidual(BaseModule):
             f'But received {stride}.'
         self.with_cp = with_cp
         self.use_res_connect = self.stride == 1 and in_channels == out_channels
-        hidden_dim = int(round(in_channels * expand_ratio))
+        if mid_channels is None:
+            hidden_dim = int(round(in_channels * expand_ratio))
+        else:
+            assert expand_ratio != 1, \
+                'The hidden channels are the input channels if expand_ratio=1.'
+            hidden_dim = mid_channels
 
         layers = []
         if expand_ratio != 1:
@@ -119,6 +128,10 @@ class MobileNetV2(BaseBackbone):
             and its variants only. Default: False.
         with_cp (bool): Use checkpoint or not. Using checkpoint will save some
             memory while slowing down the training speed. Default: False.
+        mid_channels (Sequence[Sequence[int | None]], optional): The hidden
+            channels of every block in every layer, usually generated by
+            channel pruning. None means the default hidden channels.
+            Default: None.
     """
 
     # Parameters to build layers. 4 parameters are needed to construct a
@@ -136,6 +149,7 @@ class MobileNetV2(BaseBackbone):
                  act_cfg=dict(type='ReLU6'),
                  norm_eval=False,
                  with_cp=False,
+                 mid_channels=None,
                  init_cfg=[
                      dict(type='Kaiming', layer=['Conv2d']),
                      dict(
@@ -161,6 +175,9 @@ class MobileNetV2(BaseBackbone):
         self.act_cfg = act_cfg
         self.norm_eval = norm_eval
         self.with_cp = with_cp
+        if mid_channels is not None:
+            assert len(mid_channels) == len(self.arch_settings)
+        self.mid_channels = mid_channels
 
         self.in_channels = make_divisible(32 * widen_factor, 8)
 
@@ -179,11 +196,15 @@ class MobileNetV2(BaseBackbone):
         for i, layer_cfg in enumerate(self.arch_settings):
             expand_ratio, channel, num_blocks, stride = layer_cfg
             out_channels = make_divisible(channel * widen_factor, 8)
+            layer_mid_channels = None
+            if mid_channels is not None:
+                layer_mid_channels = mid_channels[i]
             inverted_res_layer = self.make_layer(
                 out_channels=out_channels,
                 num_blocks=num_blocks,
                 stride=stride,
-                expand_ratio=expand_ratio)
+                expand_ratio=expand_ratio,
+                mid_channels=layer_mid_channels)
             layer_name = f'layer{i + 1}'
             self.add_module(layer_name, inverted_res_layer)
             self.layers.append(layer_name)
@@ -205,7 +226,12 @@ class MobileNetV2(BaseBackbone):
         self.add_module('conv2', layer)
         self.layers.append('conv2')
 
-    def make_layer(self, out_channels, num_blocks, stride, expand_ratio):
+    def make_layer(self,
+                   out_channels,
+                   num_blocks,
+                   stride,
+                   expand_ratio,
+                   mid_channels=None):
         """Stack InvertedResidual blocks to build a layer for MobileNetV2.
 
         Args:
@@ -214,7 +240,12 @@ class MobileNetV2(BaseBackbone):
             stride (int): stride of the first block. Default: 1
             expand_ratio (int): Expand the number of channels of the
                 hidden layer in InvertedResidual by this ratio. Default: 6.
+            mid_channels (Sequence[int | None], optional): The hidden
+                channels of every block. Default: None.
         """
+        if mid_channels is None:
+            mid_channels = [None] * num_blocks
+        assert len(mid_channels) == num_blocks
         layers = []
         for i in range(num_blocks):
             if i >= 1:
@@ -225,6 +256,7 @@ class MobileNetV2(BaseBackbone):
                     out_channels,
                     stride,
                     expand_ratio=expand_ratio,
+                    mid_channels=mid_channels[i],
                     conv_cfg=self.conv_cfg,
                     norm_cfg=self.norm_cfg,
                     act_cfg=self.act_cfg,
@@ -18,6 +18,9 @@ class BasicBlock(nn.Module):
         expansion (int): The ratio of ``out_channels/mid_channels`` where
             ``mid_channels`` is the output channels of conv1. This is a
             reserved argument in BasicBlock and should always be 1. Default: 1.
+        mid_channels (int, optional): The output channels of conv1. If
+            specified, it overrides ``out_channels // expansion``, which is
+            used by pruned models. Default: None.
         stride (int): stride of the block. Default: 1
         dilation (int): dilation of convolution. Default: 1
         downsample (nn.Module, optional): downsample operation on identity
@@ -36,6 +39,7 @@ class BasicBlock(nn.Module):
                  in_channels,
                  out_channels,
                  expansion=1,
+                 mid_channels=None,
                  stride=1,
                  dilation=1,
                  downsample=None,
@@ -49,7 +53,9 @@ class BasicBlock(nn.Module):
         self.expansion = expansion
         assert self.expansion == 1
         assert out_channels % expansion == 0
-        self.mid_channels = out_channels // expansion
+        if mid_channels is None:
+            mid_channels = out_channels // expansion
+        self.mid_channels = mid_channels
         self.stride = stride
         self.dilation = dilation
         self.style = style
@@ -129,6 +135,9 @@ class Bottleneck(nn.Module):
         out_channels (int): Output channels of this block.
         expansion (int): The ratio of ``out_channels/mid_channels`` where
             ``mid_channels`` is the input/output channels of conv2. Default: 4.
+        mid_channels (int, optional): The input/output channels of conv2. If
+            specified, it overrides ``out_channels // expansion``, which is
+            used by pruned models. Default: None.
         stride (int): stride of the block. Default: 1
         dilation (int): dilation of convolution. Default: 1
         downsample (nn.Module, optional): downsample operation on identity
@@ -148,6 +157,7 @@ class Bottleneck(nn.Module):
                  in_channels,
                  out_channels,
                  expansion=4,
+                 mid_channels=None,
                  stride=1,
                  dilation=1,
                  downsample=None,
@@ -162,7 +172,9 @@ class Bottleneck(nn.Module):
         self.out_channels = out_channels
         self.expansion = expansion
         assert out_channels % expansion == 0
-        self.mid_channels = out_channels // expansion
+        if mid_channels is None:
+            mid_channels = out_channels // expansion
+        self.mid_channels = mid_channels
         self.stride = stride
         self.dilation = dilation
         self.style = style
@@ -307,6 +319,9 @@ class ResLayer(nn.Sequential):
             ``block.expansion``. If the block has no attribute "expansion",
             the following default values will be used: 1 for BasicBlock and
             4 for Bottleneck. Default: None.
+        mid_channels (Sequence[int], optional): The middle channels of every
+            block. Defaults to use ``out_channels // expansion``.
+            Default: None.
         stride (int): stride of the first block. Default: 1.
         avg_down (bool): Use AvgPool instead of stride conv when
             downsampling in the bottleneck. Default: False
@@ -322,6 +337,7 @@ class ResLayer(nn.Sequential):
                  in_channels,
                  out_channels,
                  expansion=None,
+                 mid_channels=None,
                  stride=1,
                  avg_down=False,
                  conv_cfg=None,
@@ -354,6 +370,15 @@ class ResLayer(nn.Sequential):
             ])
             downsample = nn.Sequential(*downsample)
 
+        if mid_channels is not None:
+            assert len(mid_channels) == num_blocks
+        block_kwargs = [dict() for _ in range(num_blocks)]
+        if mid_channels is not None:
+            # Only pass the argument if specified, since the blocks of some
+            # variants don't support it.
+            for block_kwarg, mid in zip(block_kwargs, mid_channels):
+                block_kwarg['mid_channels'] = mid
+
         layers = []
         layers.append(
             block(
@@ -364,6 +389,7 @@ class ResLayer(nn.Sequential):
                 downsample=downsample,
                 conv_cfg=conv_cfg,
                 norm_cfg=norm_cfg,
+                **block_kwargs[0],
                 **kwargs))
         in_channels = out_channels
         for i in range(1, num_blocks):
@@ -375,6 +401,7 @@ class ResLayer(nn.Sequential):
                     stride=1,
                     conv_cfg=conv_cfg,
                     norm_cfg=norm_cfg,
+                    **block_kwargs[i],
                     **kwargs))
         super(ResLayer, self).__init__(*layers)
 
@@ -416,6 +443,10 @@ class ResNet(BaseBackbone):
             memory while slowing down the training speed. Default: False.
         zero_init_residual (bool): Whether to use zero init for last norm layer
             in resblocks to let them behave as identity. Default: True.
+        mid_channels (Sequence[Sequence[int]], optional): The middle channels
+            of every block in every stage, usually generated by channel
+            pruning. Defaults to use ``out_channels // expansion``.
+            Default: None.
 
     Example:
         >>> from mmcls.models import ResNet
@@ -459,6 +490,7 @@ class ResNet(BaseBackbone):
                  norm_eval=False,
                  with_cp=False,
                  zero_init_residual=True,
+                 mid_channels=None,
                  init_cfg=[
                      dict(type='Kaiming', layer=['Conv2d']),
                      dict(
@@ -491,6 +523,9 @@ class ResNet(BaseBackbone):
         self.block, stage_blocks = self.arch_settings[depth]
         self.stage_blocks = stage_blocks[:num_stages]
         self.expansion = get_expansion(self.block, expansion)
+        if mid_channels is not None:
+            assert len(mid_channels) == num_stages
+        self.mid_channels = mid_channels
 
         self._make_stem_layer(in_channels, stem_channels)
 
@@ -500,6 +535,9 @@ class ResNet(BaseBackbone):
         for i, num_blocks in enumerate(self.stage_blocks):
             stride = strides[i]
             dilation = dilations[i]
+            layer_kwargs = dict()
+            if mid_channels is not None:
+                layer_kwargs['mid_channels'] = mid_channels[i]
             res_layer = self.make_res_layer(
                 block=self.block,
                 num_blocks=num_blocks,
@@ -512,7 +550,8 @@ class ResNet(BaseBackbone):
                 avg_down=self.avg_down,
                 with_cp=with_cp,
                 conv_cfg=conv_cfg,
-                norm_cfg=norm_cfg)
+                norm_cfg=norm_cfg,
+                **layer_kwargs)
             _in_channels = _out_channels
             _out_channels *= 2
             layer_name = f'layer{i + 1}'
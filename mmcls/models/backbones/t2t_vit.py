@@ -11,7 +11,7 @@ from mmcv.cnn.utils.weight_init import trunc_normal_
 from mmcv.runner.base_module import BaseModule, ModuleList
 
 from ..builder import BACKBONES
-from ..utils import MultiheadAttention
+from ..utils import MultiheadAttention, TokenPruner
 from .base_backbone import BaseBackbone
 
 
@@ -105,12 +105,19 @@ class T2TTransformerLayer(BaseModule):
     def norm2(self):
         return getattr(self, self.norm2_name)
 
-    def forward(self, x):
+    def forward(self, x, return_cls_attn=False):
+        if return_cls_attn:
+            attn_out, cls_attn = self.attn(self.norm1(x), return_cls_attn=True)
+        else:
+            attn_out = self.attn(self.norm1(x))
+
         if self.v_shortcut:
-            x = self.attn(self.norm1(x))
+            x = attn_out
         else:
-            x = x + self.attn(self.norm1(x))
+            x = x + attn_out
         x = self.ffn(self.norm2(x), identity=x)
+        if return_cls_attn:
+            return x, cls_attn
         return x
 
 
@@ -251,6 +258,10 @@ class T2T_ViT(BaseBackbone):
             final feature map. Defaults to True.
         output_cls_token (bool): Whether output the cls_token.
             Defaults to True.
+        token_pruning_cfg (dict, optional): Configs of
+            :class:`TokenPruner` to drop the less important patch tokens
+            after some layers. The dropped positions of the output patch
+            tokens are filled with zeros. Defaults to None.
         init_cfg (dict, optional): The Config for initialization.
             Defaults to None.
     """
@@ -268,6 +279,7 @@ class T2T_ViT(BaseBackbone):
                  norm_cfg=dict(type='LN'),
                  final_norm=True,
                  output_cls_token=True,
+                 token_pruning_cfg=None,
                  init_cfg=None):
         super(T2T_ViT, self).__init__(init_cfg)
 
@@ -319,6 +331,12 @@ class T2T_ViT(BaseBackbone):
             layer = T2TTransformerLayer(**layer_cfg)
             self.encoder.append(layer)
 
+        if token_pruning_cfg is not None:
+            self.token_pruner = TokenPruner(
+                embed_dims=embed_dims, **token_pruning_cfg)
+        else:
+            self.token_pruner = None
+
         self.final_norm = final_norm
         if final_norm:
             self.norm = build_norm_layer(norm_cfg, embed_dims)[1]
@@ -347,15 +365,28 @@ class T2T_ViT(BaseBackbone):
         x = self.drop_after_pos(x)
 
         outs = []
+        # The original positions of the patch tokens after pruning.
+        token_index = None
+        pruner = self.token_pruner
         for i, layer in enumerate(self.encoder):
-            x = layer(x)
+            if pruner is not None and i in pruner.prune_layers:
+                cls_attn = None
+                if pruner.with_cls_attn:
+                    x, cls_attn = layer(x, return_cls_attn=True)
+                else:
+                    x = layer(x)
+                x, token_index = pruner(x, token_index, i, cls_attn)
+            else:
+                x = layer(x)
 
             if i == len(self.encoder) - 1 and self.final_norm:
                 x = self.norm(x)
 
             if i in self.out_indices:
                 B, _, C = x.shape
-                patch_token = x[:, 1:].reshape(B, *patch_resolution, C)
+                patch_token = TokenPruner.restore(x[:, 1:], token_index,
+                                                  num_patches)
+                patch_token = patch_token.reshape(B, *patch_resolution, C)
                 patch_token = patch_token.permute(0, 3, 1, 2)
                 cls_token = x[:, 0]
                 if self.output_cls_token:
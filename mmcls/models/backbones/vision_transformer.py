@@ -12,7 +12,7 @@ from mmcv.runner.base_module import BaseModule, ModuleList
 
 from mmcls.utils import get_root_logger
 from ..builder import BACKBONES
-from ..utils import MultiheadAttention, PatchEmbed, to_2tuple
+from ..utils import MultiheadAttention, PatchEmbed, TokenPruner, to_2tuple
 from .base_backbone import BaseBackbone
 
 
@@ -94,7 +94,12 @@ class TransformerEncoderLayer(BaseModule):
                 nn.init.xavier_uniform_(m.weight)
                 nn.init.normal_(m.bias, std=1e-6)
 
-    def forward(self, x):
+    def forward(self, x, return_cls_attn=False):
+        if return_cls_attn:
+            attn_out, cls_attn = self.attn(self.norm1(x), return_cls_attn=True)
+            x = x + attn_out
+            x = self.ffn(self.norm2(x), identity=x)
+            return x, cls_attn
         x = x + self.attn(self.norm1(x))
         x = self.ffn(self.norm2(x), identity=x)
         return x
@@ -111,7 +116,8 @@ class VisionTransformer(BaseBackbone):
     Args:
         arch (str | dict): Vision Transformer architecture
             Default: 'b'
-        img_size (int | tuple): Input image size
+        img_size (int | tuple): Input image size. The inputs of other sizes
+            are also accepted by resizing the position embedding.
         patch_size (int | tuple): The patch size
         out_indices (Sequence | int): Output from which stages.
             Defaults to -1, means the last stage.
@@ -129,6 +135,10 @@ class VisionTransformer(BaseBackbone):
         patch_cfg (dict): Configs of patch embeding. Defaults to an empty dict.
         layer_cfgs (Sequence | dict): Configs of each transformer layer in
             encoder. Defaults to an empty dict.
+        token_pruning_cfg (dict, optional): Configs of
+            :class:`TokenPruner` to drop the less important patch tokens
+            after some layers. The dropped positions of the output patch
+            tokens are filled with zeros. Defaults to None.
         init_cfg (dict, optional): Initialization config dict.
             Defaults to None.
     """
@@ -170,6 +180,7 @@ class VisionTransformer(BaseBackbone):
                  interpolate_mode='bicubic',
                  patch_cfg=dict(),
                  layer_cfgs=dict(),
+                 token_pruning_cfg=None,
                  init_cfg=None):
         super(VisionTransformer, self).__init__(init_cfg)
 
@@ -241,6 +252,12 @@ class VisionTransformer(BaseBackbone):
             _layer_cfg.update(layer_cfgs[i])
             self.layers.append(TransformerEncoderLayer(**_layer_cfg))
 
+        if token_pruning_cfg is not None:
+            self.token_pruner = TokenPruner(
+                embed_dims=self.embed_dims, **token_pruning_cfg)
+        else:
+            self.token_pruner = None
+
         self.final_norm = final_norm
         if final_norm:
             self.norm1_name, norm1 = build_norm_layer(
@@ -336,27 +353,58 @@ class VisionTransformer(BaseBackbone):
 
         return torch.cat((cls_token, dst_weight), dim=1)
 
+    def _embed_patches(self, x):
+        """Embed the patches, and resize the position embedding to the
+        patches if the input size is not ``img_size``, e.g., in progressive
+        resizing."""
+        if tuple(x.shape[2:]) == self.img_size:
+            return (self.patch_embed(x), self.patch_embed.patches_resolution,
+                    self.pos_embed)
+        x = self.patch_embed.projection(x)
+        patch_resolution = tuple(x.shape[2:])
+        x = x.flatten(2).transpose(1, 2)
+        if self.patch_embed.norm is not None:
+            x = self.patch_embed.norm(x)
+        pos_embed = self.resize_pos_embed(self.pos_embed,
+                                          self.patch_embed.patches_resolution,
+                                          patch_resolution,
+                                          self.interpolate_mode)
+        return x, patch_resolution, pos_embed
+
     def forward(self, x):
         B = x.shape[0]
-        x = self.patch_embed(x)
-        patch_resolution = self.patch_embed.patches_resolution
+        x, patch_resolution, pos_embed = self._embed_patches(x)
 
         # stole cls_tokens impl from Phil Wang, thanks
         cls_tokens = self.cls_token.expand(B, -1, -1)
         x = torch.cat((cls_tokens, x), dim=1)
-        x = x + self.pos_embed
+        x = x + pos_embed
         x = self.drop_after_pos(x)
 
         outs = []
+        # The original positions of the patch tokens after pruning.
+        token_index = None
+        pruner = self.token_pruner
         for i, layer in enumerate(self.layers):
-            x = layer(x)
+            if pruner is not None and i in pruner.prune_layers:
+                cls_attn = None
+                if pruner.with_cls_attn:
+                    x, cls_attn = layer(x, return_cls_attn=True)
+                else:
+                    x = layer(x)
+                x, token_index = pruner(x, token_index, i, cls_attn)
+            else:
+                x = layer(x)
 
             if i == len(self.layers) - 1 and self.final_norm:
                 x = self.norm1(x)
 
             if i in self.out_indices:
                 B, _, C = x.shape
-                patch_token = x[:, 1:].reshape(B, *patch_resolution, C)
+                patch_token = TokenPruner.restore(
+                    x[:, 1:], token_index,
+                    patch_resolution[0] * patch_resolution[1])
+                patch_token = patch_token.reshape(B, *patch_resolution, C)
                 patch_token = patch_token.permute(0, 3, 1, 2)
                 cls_token = x[:, 0]
                 if self.output_cls_token:
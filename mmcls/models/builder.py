@@ -3,7 +3,9 @@ from mmcv.cnn import MODELS as MMCV_MODELS
 from mmcv.cnn.bricks.registry import ATTENTION as MMCV_ATTENTION
 from mmcv.utils import Registry
 
-MODELS = Registry('models', parent=MMCV_MODELS)
+from mmcls.utils import LazyRegistry
+
+MODELS = LazyRegistry('models', parent=MMCV_MODELS, scope='mmcls')
 
 BACKBONES = MODELS
 NECKS = MODELS
@@ -11,7 +13,7 @@ HEADS = MODELS
 LOSSES = MODELS
 CLASSIFIERS = MODELS
 
-ATTENTION = Registry('attention', parent=MMCV_ATTENTION)
+ATTENTION = Registry('attention', parent=MMCV_ATTENTION, scope='mmcls')
 
 
 def build_backbone(cfg):
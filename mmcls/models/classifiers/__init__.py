@@ -1,5 +1,16 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .base import BaseClassifier
-from .image import ImageClassifier
+from mmcls.utils import lazy_import
+from ..builder import CLASSIFIERS
 
-__all__ = ['BaseClassifier', 'ImageClassifier']
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.base': ['BaseClassifier'],
+        '.early_exit': ['EarlyExitClassifier'],
+        '.feature': ['CachedFeatureClassifier'],
+        '.image': ['ImageClassifier'],
+    }, CLASSIFIERS)
+
+__all__ = [
+    'BaseClassifier', 'ImageClassifier', 'CachedFeatureClassifier',
+    'EarlyExitClassifier'
+]
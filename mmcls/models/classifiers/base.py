@@ -8,8 +8,6 @@ import torch
 import torch.distributed as dist
 from mmcv.runner import BaseModule
 
-from mmcls.core.visualization import imshow_infos
-
 # TODO import `auto_fp16` from mmcv and delete them from mmcls
 try:
     from mmcv.runner import auto_fp16
@@ -57,14 +55,27 @@ class BaseClassifier(BaseModule, metaclass=ABCMeta):
     def simple_test(self, img, **kwargs):
         pass
 
+    def aug_test(self, imgs, **kwargs):
+        """Test with augmentations.
+
+        Args:
+            imgs (Tensor): The views of every image with shape
+                (N, K, C, H, W), where K is the number of views.
+        """
+        raise NotImplementedError('aug_test has not been implemented')
+
     def forward_test(self, imgs, **kwargs):
         """
         Args:
-            imgs (List[Tensor]): the outer list indicates test-time
+            imgs (List[Tensor] | Tensor): the outer list indicates test-time
                 augmentations and inner Tensor should have a shape NxCxHxW,
-                which contains all images in the batch.
+                which contains all images in the batch. The views can also
+                be stacked into a Tensor of shape NxKxCxHxW, e.g., by the
+                ``MultiView`` transform.
         """
         if isinstance(imgs, torch.Tensor):
+            if imgs.dim() == 5:
+                return self.aug_test(imgs, **kwargs)
             imgs = [imgs]
         for var, name in [(imgs, 'imgs')]:
             if not isinstance(var, list):
@@ -73,7 +84,7 @@ class BaseClassifier(BaseModule, metaclass=ABCMeta):
         if len(imgs) == 1:
             return self.simple_test(imgs[0], **kwargs)
         else:
-            raise NotImplementedError('aug_test has not been implemented')
+            return self.aug_test(torch.stack(imgs, dim=1), **kwargs)
 
     @auto_fp16(apply_to=('img', ))
     def forward(self, img, return_loss=True, **kwargs):
@@ -213,6 +224,9 @@ class BaseClassifier(BaseModule, metaclass=ABCMeta):
         Returns:
             img (ndarray): Image with overlaid results.
         """
+        # Import matplotlib only when it's used, which is slow to import.
+        from mmcls.core.visualization import imshow_infos
+
         img = mmcv.imread(img)
         img = img.copy()
 
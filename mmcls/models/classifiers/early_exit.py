@@ -0,0 +1,227 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import torch
+import torch.nn as nn
+from mmcv.runner import ModuleList
+
+from ..backbones import MobileNetV2, RegNet, ResNet, ResNet_CIFAR
+from ..builder import CLASSIFIERS, build_head
+from ..utils import is_tracing
+from .image import ImageClassifier
+
+
+@CLASSIFIERS.register_module()
+class EarlyExitClassifier(ImageClassifier):
+    """Image classifier with confidence-gated intermediate exits.
+
+    Lightweight heads are attached to the intermediate stages listed in
+    ``backbone.out_indices``, and the last index is used by the final head.
+    All heads are trained jointly. During inference, the backbone runs stage
+    by stage, and a sample leaves the network at the first exit whose softmax
+    confidence reaches ``exit_threshold``. The exited samples are removed
+    from the batch, so the following stages only run on the remaining ones.
+
+    Only the ResNet family, RegNet and MobileNetV2 backbones are supported,
+    since the backbone has to be executed stage by stage.
+
+    Args:
+        backbone (dict): Config of the backbone, whose ``out_indices`` should
+            contain the stages of the exits and the final stage, e.g.
+            ``(1, 2, 3)``.
+        exit_heads (list[dict]): Configs of the exit heads, attached to the
+            ``out_indices[:-1]`` stages in order.
+        exit_threshold (float): The softmax confidence to stop at an exit.
+            Defaults to 0.9.
+        exit_loss_weights (float | Sequence[float]): The loss weights of the
+            exit heads. Defaults to 1.0.
+        **kwargs: Other arguments of :class:`ImageClassifier`.
+
+    Example:
+        >>> model = dict(
+        ...     type='EarlyExitClassifier',
+        ...     backbone=dict(type='ResNet', depth=50, out_indices=(1, 2, 3)),
+        ...     neck=dict(type='GlobalAveragePooling'),
+        ...     head=dict(type='LinearClsHead', num_classes=2,
+        ...               in_channels=2048),
+        ...     exit_heads=[
+        ...         dict(type='LinearClsHead', num_classes=2, in_channels=512),
+        ...         dict(type='LinearClsHead', num_classes=2,
+        ...              in_channels=1024),
+        ...     ],
+        ...     exit_threshold=0.9)
+    """
+
+    def __init__(self,
+                 backbone,
+                 exit_heads,
+                 exit_threshold=0.9,
+                 exit_loss_weights=1.0,
+                 **kwargs):
+        super(EarlyExitClassifier, self).__init__(backbone, **kwargs)
+        if not isinstance(self.backbone, (ResNet, MobileNetV2)):
+            raise TypeError('EarlyExitClassifier only supports ResNet, '
+                            'RegNet and MobileNetV2 backbones, but got '
+                            f'{type(self.backbone).__name__}.')
+        assert self.return_tuple, \
+            'EarlyExitClassifier needs the outputs of all stages.'
+
+        out_indices = sorted(self.backbone.out_indices)
+        assert len(exit_heads) == len(out_indices) - 1, \
+            f'The number of exit heads ({len(exit_heads)}) should be the ' \
+            f'number of `out_indices` ({len(out_indices)}) minus one.'
+        self.exit_indices = out_indices[:-1]
+        self.final_index = out_indices[-1]
+        self.exit_heads = ModuleList([build_head(cfg) for cfg in exit_heads])
+
+        if isinstance(exit_loss_weights, (int, float)):
+            exit_loss_weights = [exit_loss_weights] * len(exit_heads)
+        assert len(exit_loss_weights) == len(exit_heads)
+        self.exit_loss_weights = exit_loss_weights
+
+        assert 0 < exit_threshold <= 1
+        self.exit_threshold = exit_threshold
+
+        # The relative compute cost up to each exit, profiled at the first
+        # inference, and the number of samples left from each exit.
+        self._exit_costs = None
+        self.reset_exit_stats()
+
+    def reset_exit_stats(self):
+        """Reset the statistics of the exits."""
+        self._exit_counts = np.zeros(len(self.exit_heads) + 1, dtype=np.int64)
+
+    def get_exit_stats(self):
+        """Get the statistics of the exits since the last reset.
+
+        Returns:
+            dict: The statistics, including:
+
+            - exit_ratio (list[float]): The ratio of samples left from each
+              exit, and the last one is the final head.
+            - compute_saved (float): The average ratio of backbone compute
+              saved compared with running all stages.
+        """
+        total = self._exit_counts.sum()
+        if total == 0 or self._exit_costs is None:
+            return dict(
+                exit_ratio=[0.] * len(self._exit_counts), compute_saved=0.)
+        ratio = self._exit_counts / total
+        compute_saved = 1. - float((ratio * self._exit_costs).sum())
+        return dict(exit_ratio=ratio.tolist(), compute_saved=compute_saved)
+
+    def _forward_stem(self, img):
+        backbone = self.backbone
+        if isinstance(backbone, MobileNetV2):
+            return backbone.conv1(img)
+        if getattr(backbone, 'deep_stem', False):
+            x = backbone.stem(img)
+        else:
+            x = backbone.relu(backbone.norm1(backbone.conv1(img)))
+        if not isinstance(backbone, (ResNet_CIFAR, RegNet)):
+            x = backbone.maxpool(x)
+        return x
+
+    def _stages(self):
+        backbone = self.backbone
+        if isinstance(backbone, MobileNetV2):
+            names = backbone.layers
+        else:
+            names = backbone.res_layers
+        return [getattr(backbone, name) for name in names]
+
+    @torch.no_grad()
+    def _profile_exit_costs(self, img):
+        """Count the multiply-adds of the convolutions up to every exit."""
+        macs = [0]
+
+        def count_macs(module, inputs, output):
+            kernel = np.prod(module.kernel_size) * module.in_channels // \
+                module.groups
+            macs[0] += int(output[0].numel() * kernel)
+
+        handles = [
+            m.register_forward_hook(count_macs)
+            for m in self.backbone.modules() if isinstance(m, nn.Conv2d)
+        ]
+        costs = []
+        x = self._forward_stem(img[:1])
+        for i, stage in enumerate(self._stages()[:self.final_index + 1]):
+            x = stage(x)
+            if i in self.exit_indices or i == self.final_index:
+                costs.append(macs[0])
+        for handle in handles:
+            handle.remove()
+        self._exit_costs = np.array(costs, dtype=np.float64) / costs[-1]
+
+    def forward_train(self, img, gt_label, **kwargs):
+        """Forward computation during training.
+
+        The losses of exit heads are weighted by ``exit_loss_weights`` and
+        added to the loss of the final head.
+        """
+        if self.augments is not None:
+            img, gt_label = self.augments(img, gt_label)
+
+        x = self.extract_feat(img)
+        out_indices = sorted(self.backbone.out_indices)
+        losses = dict()
+        for i, (head, weight) in enumerate(
+                zip(self.exit_heads, self.exit_loss_weights)):
+            feat = x[out_indices.index(self.exit_indices[i])]
+            exit_losses = head.forward_train(feat, gt_label)
+            losses[f'exit{i}.loss'] = exit_losses['loss'] * weight
+            if 'accuracy' in exit_losses:
+                losses[f'exit{i}.accuracy'] = {
+                    f'exit{i}.{k}': v
+                    for k, v in exit_losses['accuracy'].items()
+                }
+        losses.update(self.head.forward_train(x, gt_label))
+        return losses
+
+    def simple_test(self, img, img_metas=None):
+        """Test with early exits.
+
+        When exporting or tracing the model, the data-dependent exits are
+        skipped and the final head is used for all samples.
+        """
+        if torch.onnx.is_in_onnx_export() or is_tracing():
+            return super(EarlyExitClassifier, self).simple_test(img)
+
+        if self._exit_costs is None:
+            self._profile_exit_costs(img)
+
+        preds = None
+        # The indices of the samples that haven't exited yet.
+        remain = torch.arange(img.size(0), device=img.device)
+        x = self._forward_stem(img)
+        for i, stage in enumerate(self._stages()):
+            x = stage(x)
+            if i == self.final_index:
+                feat = self.neck(x) if self.with_neck else x
+                prob = self.head.simple_test((feat, ), post_process=False)
+                if preds is None:
+                    preds = prob
+                else:
+                    preds[remain] = prob
+                self._exit_counts[-1] += len(remain)
+                break
+            if i not in self.exit_indices:
+                continue
+
+            exit_id = self.exit_indices.index(i)
+            feat = self.neck(x) if self.with_neck else x
+            prob = self.exit_heads[exit_id].simple_test(
+                feat, post_process=False)
+            if preds is None:
+                preds = prob.new_zeros(img.size(0), prob.size(1))
+            exited = prob.max(dim=1)[0] >= self.exit_threshold
+            preds[remain[exited]] = prob[exited]
+            self._exit_counts[exit_id] += int(exited.sum())
+
+            # compact the batch to the samples that need deeper stages.
+            remain = remain[~exited]
+            x = x[~exited]
+            if len(remain) == 0:
+                break
+
+        return self.head.post_process(preds)
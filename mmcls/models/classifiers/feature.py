@@ -0,0 +1,65 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from ..builder import CLASSIFIERS, build_head
+from ..utils.augment import Augments
+from .base import BaseClassifier
+
+
+@CLASSIFIERS.register_module()
+class CachedFeatureClassifier(BaseClassifier):
+    """Classifier that trains a head on pre-extracted features.
+
+    It is used with :class:`mmcls.datasets.FeatureCacheDataset`, whose
+    ``img`` field is the pooled neck feature of a frozen backbone instead of
+    an image. Since the head is saved with the same ``head.`` prefix as in
+    :class:`ImageClassifier`, the checkpoints can be loaded into the full
+    classifier directly.
+
+    Args:
+        head (dict): Config of the classification head.
+        train_cfg (dict, optional): The training settings. The batch augments
+            of ``augments`` are applied to the features, so only the ones
+            without spatial operations, i.e. "BatchMixup" and "Identity",
+            are supported. Defaults to None.
+        init_cfg (dict, optional): The config to control the initialization.
+    """
+
+    FEATURE_AUGMENTS = ('BatchMixup', 'Identity')
+
+    def __init__(self, head, train_cfg=None, init_cfg=None):
+        super(CachedFeatureClassifier, self).__init__(init_cfg)
+        self.head = build_head(head)
+
+        self.augments = None
+        if train_cfg is not None:
+            assert 'mixup' not in train_cfg and 'cutmix' not in train_cfg, \
+                'The deprecated mixup and cutmix of train_cfg are not ' \
+                'supported, please use augments instead.'
+            augments_cfg = train_cfg.get('augments', None)
+            if augments_cfg is not None:
+                if isinstance(augments_cfg, dict):
+                    augments_cfg = [augments_cfg]
+                for cfg in augments_cfg:
+                    assert cfg['type'] in self.FEATURE_AUGMENTS, \
+                        f'The augment "{cfg["type"]}" can\'t be applied to ' \
+                        f'the cached features, only ' \
+                        f'{self.FEATURE_AUGMENTS} are supported.'
+                self.augments = Augments(augments_cfg)
+
+    def extract_feat(self, img):
+        """The features are already extracted, wrap them as a tuple like the
+        outputs of the neck."""
+        return (img, )
+
+    def forward_train(self, img, gt_label, **kwargs):
+        if self.augments is not None:
+            img, gt_label = self.augments(img, gt_label)
+        x = self.extract_feat(img)
+        losses = dict()
+        loss = self.head.forward_train(x, gt_label)
+        losses.update(loss)
+        return losses
+
+    def simple_test(self, img, img_metas=None, **kwargs):
+        """Test without augmentation."""
+        x = self.extract_feat(img)
+        return self.head.simple_test(x)
@@ -2,7 +2,11 @@
 import copy
 import warnings
 
+import torch
+import torch.nn.functional as F
+
 from ..builder import CLASSIFIERS, build_backbone, build_head, build_neck
+from ..utils import get_sample_loss_recorder
 from ..utils.augment import Augments
 from .base import BaseClassifier
 
@@ -11,6 +15,31 @@ warnings.simplefilter('once')
 
 @CLASSIFIERS.register_module()
 class ImageClassifier(BaseClassifier):
+    """Image classifier with a backbone, an optional neck and a head.
+
+    Args:
+        backbone (dict): Config of the backbone.
+        neck (dict, optional): Config of the neck. Defaults to None.
+        head (dict, optional): Config of the head. Defaults to None.
+        pretrained (str, optional): Deprecated, use ``init_cfg`` instead.
+        train_cfg (dict, optional): The training settings, e.g. the batch
+            augments. Defaults to None.
+        test_cfg (dict, optional): The testing settings. The test-time
+            augmentation (see ``MultiView``) is configured by:
+
+            - tta_merge (str): How to merge the scores of views, "mean",
+              "max" or "weighted". Defaults to "mean".
+            - num_views (int): The number of views, required by "weighted".
+            - tta_weights (list[float], optional): The initial weights of
+              views for "weighted", which can be learned by
+              :func:`mmcls.apis.learn_tta_weights`. Defaults to equal weights.
+
+            Defaults to None.
+        init_cfg (dict, optional): The initialization config.
+            Defaults to None.
+    """
+
+    TTA_MERGE_MODES = ('mean', 'max', 'weighted')
 
     def __init__(self,
                  backbone,
@@ -18,6 +47,7 @@ class ImageClassifier(BaseClassifier):
                  head=None,
                  pretrained=None,
                  train_cfg=None,
+                 test_cfg=None,
                  init_cfg=None):
         super(ImageClassifier, self).__init__(init_cfg)
 
@@ -41,6 +71,27 @@ class ImageClassifier(BaseClassifier):
         if head is not None:
             self.head = build_head(head)
 
+        test_cfg = test_cfg or dict()
+        self.tta_merge = test_cfg.get('tta_merge', 'mean')
+        assert self.tta_merge in self.TTA_MERGE_MODES, \
+            f'tta_merge should be one of {self.TTA_MERGE_MODES}, ' \
+            f'but got "{self.tta_merge}".'
+        if self.tta_merge == 'weighted':
+            assert 'num_views' in test_cfg, \
+                '`num_views` is required by the "weighted" tta_merge.'
+            num_views = test_cfg['num_views']
+            tta_weights = test_cfg.get('tta_weights', [1.] * num_views)
+            assert len(tta_weights) == num_views
+            # Save the logits of the weights as a buffer, so that the learned
+            # weights are saved in the checkpoint.
+            self.register_buffer(
+                'tta_logits',
+                torch.tensor(tta_weights, dtype=torch.float).log())
+
+        # the execution mode set by `mmcls.core.wrap_execution_mode`
+        self.memory_format = None
+        self.autocast_dtype = None
+
         self.augments = None
         if train_cfg is not None:
             augments_cfg = train_cfg.get('augments', None)
@@ -71,7 +122,21 @@ class ImageClassifier(BaseClassifier):
                     self.augments = Augments(cfg)
 
     def extract_feat(self, img):
-        """Directly extract features from the backbone + neck."""
+        """Directly extract features from the backbone + neck, in the memory
+        format and under the autocast of the execution mode."""
+        if self.memory_format is not None and img.dim() == 4:
+            img = img.contiguous(memory_format=self.memory_format)
+        if self.autocast_dtype is None:
+            return self._extract_feat(img)
+        with torch.autocast(
+                device_type=img.device.type, dtype=self.autocast_dtype):
+            x = self._extract_feat(img)
+        # The heads and losses run in fp32.
+        if isinstance(x, tuple):
+            return tuple(feat.float() for feat in x)
+        return x.float()
+
+    def _extract_feat(self, img):
         x = self.backbone(img)
         if self.return_tuple:
             if not isinstance(x, tuple):
@@ -100,6 +165,10 @@ class ImageClassifier(BaseClassifier):
         Returns:
             dict[str, Tensor]: a dictionary of loss components
         """
+        recorder = get_sample_loss_recorder()
+        if recorder is not None and recorder.selective_backprop:
+            img, gt_label = self._select_samples(img, gt_label, recorder)
+
         if self.augments is not None:
             img, gt_label = self.augments(img, gt_label)
 
@@ -122,6 +191,17 @@ class ImageClassifier(BaseClassifier):
 
         return losses
 
+    def _select_samples(self, img, gt_label, recorder):
+        """Select the samples to backward by their losses without
+        gradients, i.e. selective backprop."""
+        # in the eval mode, not to update the statistics of BatchNorm twice
+        self.eval()
+        with torch.no_grad():
+            self.head.forward_train(self.extract_feat(img), gt_label)
+        self.train()
+        keep = recorder.select().to(img.device)
+        return img[keep], gt_label[keep]
+
     def simple_test(self, img, img_metas=None):
         """Test without augmentation."""
         x = self.extract_feat(img)
@@ -139,3 +219,38 @@ class ImageClassifier(BaseClassifier):
             raise e
 
         return res
+
+    def merge_aug_scores(self, scores):
+        """Merge the scores of views.
+
+        Args:
+            scores (Tensor): The scores of views with shape
+                (N, K, num_classes).
+
+        Returns:
+            Tensor: The merged scores with shape (N, num_classes).
+        """
+        if self.tta_merge == 'mean':
+            return scores.mean(dim=1)
+        elif self.tta_merge == 'max':
+            return scores.max(dim=1)[0]
+        else:
+            assert scores.size(1) == self.tta_logits.numel(), \
+                f'Got {scores.size(1)} views, but the "weighted" tta_merge ' \
+                f'is configured with {self.tta_logits.numel()} views.'
+            weights = F.softmax(self.tta_logits, dim=0).to(scores.dtype)
+            return torch.einsum('nkc,k->nc', scores, weights)
+
+    def aug_test(self, imgs, img_metas=None, **kwargs):
+        """Test with augmentations in a single batched forward pass.
+
+        Args:
+            imgs (Tensor): The views of every image with shape
+                (N, K, C, H, W), where K is the number of views.
+            img_metas (list[dict], optional): The meta information of images.
+        """
+        num_imgs, num_views = imgs.shape[:2]
+        x = self.extract_feat(imgs.flatten(0, 1))
+        scores = self.head.simple_test(x, post_process=False)
+        scores = scores.view(num_imgs, num_views, -1)
+        return self.head.post_process(self.merge_aug_scores(scores))
@@ -1,10 +1,16 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .cls_head import ClsHead
-from .linear_head import LinearClsHead
-from .multi_label_head import MultiLabelClsHead
-from .multi_label_linear_head import MultiLabelLinearClsHead
-from .stacked_head import StackedLinearClsHead
-from .vision_transformer_head import VisionTransformerClsHead
+from mmcls.utils import lazy_import
+from ..builder import HEADS
+
+__getattr__, __dir__ = lazy_import(
+    __name__, {
+        '.cls_head': ['ClsHead'],
+        '.linear_head': ['LinearClsHead'],
+        '.multi_label_head': ['MultiLabelClsHead'],
+        '.multi_label_linear_head': ['MultiLabelLinearClsHead'],
+        '.stacked_head': ['StackedLinearClsHead'],
+        '.vision_transformer_head': ['VisionTransformerClsHead'],
+    }, HEADS)
 
 __all__ = [
     'ClsHead', 'LinearClsHead', 'StackedLinearClsHead', 'MultiLabelClsHead',
@@ -4,7 +4,7 @@ import torch.nn.functional as F
 
 from mmcls.models.losses import Accuracy
 from ..builder import HEADS, build_loss
-from ..utils import is_tracing
+from ..utils import get_sample_loss_recorder, is_tracing
 from .base_head import BaseHead
 
 
@@ -42,6 +42,16 @@ class ClsHead(BaseHead):
     def loss(self, cls_score, gt_label, **kwargs):
         num_samples = len(cls_score)
         losses = dict()
+        recorder = get_sample_loss_recorder()
+        if recorder is not None:
+            # record the per-sample losses for the loss-aware sampling
+            with torch.no_grad():
+                recorder.record(
+                    self.compute_loss(
+                        cls_score, gt_label, reduction_override='none'))
+            weights = recorder.batch_weights(cls_score.device)
+            if weights is not None and torch.is_grad_enabled():
+                kwargs.setdefault('weight', weights)
         # compute loss
         loss = self.compute_loss(
             cls_score, gt_label, avg_factor=num_samples, **kwargs)
@@ -62,14 +72,33 @@ class ClsHead(BaseHead):
         losses = self.loss(cls_score, gt_label, **kwargs)
         return losses
 
-    def simple_test(self, cls_score):
-        """Test without augmentation."""
+    def simple_test(self, cls_score, softmax=True, post_process=True):
+        """Inference without augmentation.
+
+        Args:
+            cls_score (tuple[Tensor]): The input classification score logits.
+            softmax (bool): Whether to softmax the classification score.
+                Defaults to True.
+            post_process (bool): Whether to do post processing the
+                inference results. It will convert the output to a list.
+                Defaults to True.
+
+        Returns:
+            Tensor | list: The inference results.
+        """
         if isinstance(cls_score, tuple):
             cls_score = cls_score[-1]
         if isinstance(cls_score, list):
             cls_score = sum(cls_score) / float(len(cls_score))
-        pred = F.softmax(cls_score, dim=1) if cls_score is not None else None
-        return self.post_process(pred)
+        if softmax:
+            pred = (
+                F.softmax(cls_score, dim=1) if cls_score is not None else None)
+        else:
+            pred = cls_score
+        if post_process:
+            return self.post_process(pred)
+        else:
+            return pred
 
     def post_process(self, pred):
         on_trace = is_tracing()
@@ -35,16 +35,35 @@ class LinearClsHead(ClsHead):
 
         self.fc = nn.Linear(self.in_channels, self.num_classes)
 
-    def simple_test(self, x):
-        """Test without augmentation."""
+    def simple_test(self, x, softmax=True, post_process=True):
+        """Inference without augmentation.
+
+        Args:
+            x (tuple[Tensor]): The input features.
+            softmax (bool): Whether to softmax the classification score.
+                Defaults to True.
+            post_process (bool): Whether to do post processing the
+                inference results. It will convert the output to a list.
+                Defaults to True.
+
+        Returns:
+            Tensor | list: The inference results.
+        """
         if isinstance(x, tuple):
             x = x[-1]
         cls_score = self.fc(x)
         if isinstance(cls_score, list):
             cls_score = sum(cls_score) / float(len(cls_score))
-        pred = F.softmax(cls_score, dim=1) if cls_score is not None else None
+        if softmax:
+            pred = (
+                F.softmax(cls_score, dim=1) if cls_score is not None else None)
+        else:
+            pred = cls_score
 
-        return self.post_process(pred)
+        if post_process:
+            return self.post_process(pred)
+        else:
+            return pred
 
     def forward_train(self, x, gt_label, **kwargs):
         if isinstance(x, tuple):
@@ -47,8 +47,15 @@ class MultiLabelLinearClsHead(MultiLabelClsHead):
         losses = self.loss(cls_score, gt_label, **kwargs)
         return losses
 
-    def simple_test(self, x):
-        """Test without augmentation."""
+    def simple_test(self, x, post_process=True):
+        """Test without augmentation.
+
+        Args:
+            x (tuple[Tensor]): The input features.
+            post_process (bool): Whether to do post processing the
+                inference results. It will convert the output to a list.
+                Defaults to True.
+        """
         if isinstance(x, tuple):
             x = x[-1]
         cls_score = self.fc(x)
@@ -56,4 +63,7 @@ class MultiLabelLinearClsHead(MultiLabelClsHead):
             cls_score = sum(cls_score) / float(len(cls_score))
         pred = F.sigmoid(cls_score) if cls_score is not None else None
 
-        return self.post_process(pred)
+        if post_process:
+            return self.post_process(pred)
+        else:
+            return pred
@@ -68,16 +68,35 @@ class VisionTransformerClsHead(ClsHead):
                 std=math.sqrt(1 / self.layers.pre_logits.in_features))
             nn.init.zeros_(self.layers.pre_logits.bias)
 
-    def simple_test(self, x):
-        """Test without augmentation."""
+    def simple_test(self, x, softmax=True, post_process=True):
+        """Inference without augmentation.
+
+        Args:
+            x (tuple[tuple[Tensor, Tensor]]): The outputs of the backbone.
+            softmax (bool): Whether to softmax the classification score.
+                Defaults to True.
+            post_process (bool): Whether to do post processing the
+                inference results. It will convert the output to a list.
+                Defaults to True.
+
+        Returns:
+            Tensor | list: The inference results.
+        """
         x = x[-1]
         _, cls_token = x
         cls_score = self.layers(cls_token)
         if isinstance(cls_score, list):
             cls_score = sum(cls_score) / float(len(cls_score))
-        pred = F.softmax(cls_score, dim=1) if cls_score is not None else None
+        if softmax:
+            pred = (
+                F.softmax(cls_score, dim=1) if cls_score is not None else None)
+        else:
+            pred = cls_score
 
-        return self.post_process(pred)
+        if post_process:
+            return self.post_process(pred)
+        else:
+            return pred
 
     def forward_train(self, x, gt_label, **kwargs):
         x = x[-1]
@@ -1,4 +1,8 @@
 # Copyright (c) OpenMMLab. All rights reserved.
-from .gap import GlobalAveragePooling
+from mmcls.utils import lazy_import
+from ..builder import NECKS
+
+__getattr__, __dir__ = lazy_import(__name__,
+                                   {'.gap': ['GlobalAveragePooling']}, NECKS)
 
 __all__ = ['GlobalAveragePooling']
@@ -6,11 +6,14 @@ from .embed import HybridEmbed, PatchEmbed, PatchMerging
 from .helpers import is_tracing, to_2tuple, to_3tuple, to_4tuple, to_ntuple
 from .inverted_residual import InvertedResidual
 from .make_divisible import make_divisible
+from .sample_losses import SampleLossRecorder, get_sample_loss_recorder
 from .se_layer import SELayer
+from .token_pruning import TokenPruner
 
 __all__ = [
     'channel_shuffle', 'make_divisible', 'InvertedResidual', 'SELayer',
     'to_ntuple', 'to_2tuple', 'to_3tuple', 'to_4tuple', 'PatchEmbed',
     'PatchMerging', 'HybridEmbed', 'Augments', 'ShiftWindowMSA', 'is_tracing',
-    'MultiheadAttention'
+    'MultiheadAttention', 'TokenPruner', 'SampleLossRecorder',
+    'get_sample_loss_recorder'
 ]
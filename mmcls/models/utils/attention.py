@@ -6,9 +6,62 @@ from mmcv.cnn.bricks.registry import DROPOUT_LAYERS
 from mmcv.cnn.bricks.transformer import build_dropout
 from mmcv.cnn.utils.weight_init import trunc_normal_
 from mmcv.runner.base_module import BaseModule
+from mmcv.utils import TORCH_VERSION, digit_version
 
 from ..builder import ATTENTION
-from .helpers import to_2tuple
+from .helpers import is_tracing, to_2tuple
+
+# The ``scale`` argument of the fused kernel is available since PyTorch 2.1.
+HAS_FUSED_ATTN = (
+    TORCH_VERSION != 'parrots'
+    and digit_version(TORCH_VERSION) >= digit_version('2.1.0')
+    and hasattr(F, 'scaled_dot_product_attention'))
+
+
+def scaled_dot_product_attention(query,
+                                 key,
+                                 value,
+                                 attn_mask=None,
+                                 dropout_p=0.,
+                                 scale=None):
+    """Compute ``softmax(query @ key^T * scale + attn_mask) @ value``.
+
+    It dispatches to :func:`torch.nn.functional.scaled_dot_product_attention`
+    if available, which avoids materializing the attention matrix with the
+    fused kernels. Otherwise, or when exporting to ONNX, it falls back to the
+    equivalent implementation with plain operators.
+
+    Args:
+        query (Tensor): The query with shape (..., L, E).
+        key (Tensor): The key with shape (..., S, E).
+        value (Tensor): The value with shape (..., S, Ev).
+        attn_mask (Tensor, optional): The float mask added to the attention
+            weights, which should be broadcastable to (..., L, S).
+            Defaults to None.
+        dropout_p (float): Dropout ratio of attention weight. Defaults to 0.
+        scale (float, optional): The scale of ``query @ key^T``. Defaults to
+            ``E ** -0.5``.
+
+    Returns:
+        Tensor: The output with shape (..., L, Ev).
+    """
+    if HAS_FUSED_ATTN and not torch.onnx.is_in_onnx_export():
+        return F.scaled_dot_product_attention(
+            query,
+            key,
+            value,
+            attn_mask=attn_mask,
+            dropout_p=dropout_p,
+            scale=scale)
+
+    scale = scale or query.size(-1)**-0.5
+    attn = (query * scale) @ key.transpose(-2, -1)
+    if attn_mask is not None:
+        attn = attn + attn_mask
+    attn = attn.softmax(dim=-1)
+    if dropout_p > 0:
+        attn = F.dropout(attn, p=dropout_p)
+    return attn @ value
 
 
 class WindowMSA(BaseModule):
@@ -26,6 +79,8 @@ class WindowMSA(BaseModule):
         attn_drop (float, optional): Dropout ratio of attention weight.
             Defaults to 0.
         proj_drop (float, optional): Dropout ratio of output. Defaults to 0.
+        fused_attn (bool): Whether to use the fused attention kernel of
+            PyTorch if available. Defaults to True.
         init_cfg (dict, optional): The extra config for initialization.
             Defaults to None.
     """
@@ -38,6 +93,7 @@ class WindowMSA(BaseModule):
                  qk_scale=None,
                  attn_drop=0.,
                  proj_drop=0.,
+                 fused_attn=True,
                  init_cfg=None):
 
         super().__init__(init_cfg)
@@ -46,6 +102,10 @@ class WindowMSA(BaseModule):
         self.num_heads = num_heads
         head_embed_dims = embed_dims // num_heads
         self.scale = qk_scale or head_embed_dims**-0.5
+        self.fused_attn = fused_attn
+        # The gathered relative position bias, only cached in eval mode.
+        self._bias_cache = None
+        self._bias_cache_key = None
 
         # define a parameter table of relative position bias
         self.relative_position_bias_table = nn.Parameter(
@@ -71,6 +131,34 @@ class WindowMSA(BaseModule):
 
         trunc_normal_(self.relative_position_bias_table, std=0.02)
 
+    def _gather_relative_position_bias(self):
+        relative_position_bias = self.relative_position_bias_table[
+            self.relative_position_index.view(-1)].view(
+                self.window_size[0] * self.window_size[1],
+                self.window_size[0] * self.window_size[1],
+                -1)  # Wh*Ww,Wh*Ww,nH
+        return relative_position_bias.permute(
+            2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
+
+    def get_relative_position_bias(self):
+        """Get the relative position bias with shape (nH, Wh*Ww, Wh*Ww).
+
+        In eval mode without gradients, the gathered bias is cached until the
+        bias table is modified or moved.
+        """
+        table = self.relative_position_bias_table
+        if self.training or is_tracing() or (torch.is_grad_enabled()
+                                             and table.requires_grad):
+            self._bias_cache = None
+            return self._gather_relative_position_bias()
+
+        key = (table.data_ptr(), table._version, table.device, table.dtype)
+        if self._bias_cache is None or self._bias_cache_key != key:
+            with torch.no_grad():
+                self._bias_cache = self._gather_relative_position_bias()
+            self._bias_cache_key = key
+        return self._bias_cache
+
     def forward(self, x, mask=None):
         """
         Args:
@@ -85,16 +173,33 @@ class WindowMSA(BaseModule):
         q, k, v = qkv[0], qkv[1], qkv[
             2]  # make torchscript happy (cannot use tensor as tuple)
 
+        relative_position_bias = self.get_relative_position_bias()
+
+        if self.fused_attn:
+            attn_bias = relative_position_bias.unsqueeze(0)
+            if mask is not None:
+                # Split the windows of every image, so that the mask can be
+                # broadcast instead of being repeated along the batch.
+                nW = mask.shape[0]
+                attn_bias = attn_bias + mask.unsqueeze(1)  # nW, nH, N, N
+                q, k, v = (
+                    t.view(B_ // nW, nW, self.num_heads, N, -1)
+                    for t in (q, k, v))
+            x = scaled_dot_product_attention(
+                q,
+                k,
+                v,
+                attn_mask=attn_bias.to(q.dtype),
+                dropout_p=self.attn_drop.p if self.training else 0.,
+                scale=self.scale)
+            x = x.view(B_, self.num_heads, N, -1).transpose(1, 2)
+            x = x.reshape(B_, N, C)
+            x = self.proj(x)
+            x = self.proj_drop(x)
+            return x
+
         q = q * self.scale
         attn = (q @ k.transpose(-2, -1))
-
-        relative_position_bias = self.relative_position_bias_table[
-            self.relative_position_index.view(-1)].view(
-                self.window_size[0] * self.window_size[1],
-                self.window_size[0] * self.window_size[1],
-                -1)  # Wh*Ww,Wh*Ww,nH
-        relative_position_bias = relative_position_bias.permute(
-            2, 0, 1).contiguous()  # nH, Wh*Ww, Wh*Ww
         attn = attn + relative_position_bias.unsqueeze(0)
 
         if mask is not None:
@@ -143,6 +248,8 @@ class ShiftWindowMSA(BaseModule):
             Defaults to dict(type='DropPath', drop_prob=0.).
         auto_pad (bool, optional): Auto pad the feature map to be divisible by
             window_size, Defaults to False.
+        fused_attn (bool): Whether to use the fused attention kernel of
+            PyTorch if available. Defaults to True.
         init_cfg (dict, optional): The extra config for initialization.
             Default: None.
     """
@@ -159,6 +266,7 @@ class ShiftWindowMSA(BaseModule):
                  proj_drop=0,
                  dropout_layer=dict(type='DropPath', drop_prob=0.),
                  auto_pad=False,
+                 fused_attn=True,
                  init_cfg=None):
         super().__init__(init_cfg)
 
@@ -173,7 +281,7 @@ class ShiftWindowMSA(BaseModule):
 
         self.w_msa = WindowMSA(embed_dims, to_2tuple(self.window_size),
                                num_heads, qkv_bias, qk_scale, attn_drop,
-                               proj_drop)
+                               proj_drop, fused_attn)
 
         self.drop = build_dropout(dropout_layer)
 
@@ -318,6 +426,8 @@ class MultiheadAttention(BaseModule):
         v_shortcut (bool): Add a shortcut from value to output. It's usually
             used if ``input_dims`` is different from ``embed_dims``.
             Defaults to False.
+        fused_attn (bool): Whether to use the fused attention kernel of
+            PyTorch if available. Defaults to True.
         init_cfg (dict, optional): The Config for initialization.
             Defaults to None.
     """
@@ -333,6 +443,7 @@ class MultiheadAttention(BaseModule):
                  qk_scale=None,
                  proj_bias=True,
                  v_shortcut=False,
+                 fused_attn=True,
                  init_cfg=None):
         super(MultiheadAttention, self).__init__(init_cfg=init_cfg)
 
@@ -340,6 +451,7 @@ class MultiheadAttention(BaseModule):
         self.embed_dims = embed_dims
         self.num_heads = num_heads
         self.v_shortcut = v_shortcut
+        self.fused_attn = fused_attn
 
         self.head_dims = embed_dims // num_heads
         self.scale = qk_scale or self.head_dims**-0.5
@@ -351,20 +463,45 @@ class MultiheadAttention(BaseModule):
 
         self.out_drop = DROPOUT_LAYERS.build(dropout_layer)
 
-    def forward(self, x):
+    def forward(self, x, return_cls_attn=False):
+        """
+        Args:
+            x (Tensor): The input tokens with shape (B, N, C).
+            return_cls_attn (bool): Whether to also return the attention from
+                the first token to the others, averaged over heads, with
+                shape (B, N - 1). Defaults to False.
+        """
         B, N, _ = x.shape
         qkv = self.qkv(x).reshape(B, N, 3, self.num_heads,
                                   self.head_dims).permute(2, 0, 3, 1, 4)
         q, k, v = qkv[0], qkv[1], qkv[2]
 
-        attn = (q @ k.transpose(-2, -1)) * self.scale
-        attn = attn.softmax(dim=-1)
-        attn = self.attn_drop(attn)
+        cls_attn = None
+        if return_cls_attn:
+            # Only the query of the class token is needed, which is much
+            # cheaper than materializing the whole attention matrix.
+            cls_attn = (q[:, :, :1] @ k.transpose(-2, -1)) * self.scale
+            cls_attn = cls_attn.softmax(dim=-1)[:, :, 0, 1:].mean(dim=1)
+
+        if self.fused_attn:
+            x = scaled_dot_product_attention(
+                q,
+                k,
+                v,
+                dropout_p=self.attn_drop.p if self.training else 0.,
+                scale=self.scale)
+        else:
+            attn = (q @ k.transpose(-2, -1)) * self.scale
+            attn = attn.softmax(dim=-1)
+            attn = self.attn_drop(attn)
+            x = attn @ v
 
-        x = (attn @ v).transpose(1, 2).reshape(B, N, self.embed_dims)
+        x = x.transpose(1, 2).reshape(B, N, self.embed_dims)
         x = self.proj(x)
         x = self.out_drop(self.proj_drop(x))
 
         if self.v_shortcut:
             x = v.squeeze(1) + x
+        if return_cls_attn:
+            return x, cls_attn
         return x
@@ -1,7 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 from mmcv.utils import Registry, build_from_cfg
 
-AUGMENT = Registry('augment')
+AUGMENT = Registry('augment', scope='mmcls')
 
 
 def build_augment(cfg, default_args=None):
@@ -0,0 +1,108 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+
+# The running recorders, the latest one records the losses.
+_RECORDERS = []
+
+
+def get_sample_loss_recorder():
+    """Get the running :class:`SampleLossRecorder`, or None."""
+    return _RECORDERS[-1] if _RECORDERS else None
+
+
+class SampleLossRecorder:
+    """Record the per-sample losses of the classification heads in training,
+    and apply the per-sample loss weights of the current batch.
+
+    The losses are recorded by :meth:`ClsHead.loss` only if a recorder is
+    running, e.g. by ``LossAwareSamplingHook``, which sets the weights and
+    reads the losses of every batch.
+
+    With ``selective_backprop``, :class:`ImageClassifier` first computes the
+    losses of the batch without gradients, and only the samples selected by
+    :meth:`select` are forwarded and backwarded again. A sample is selected
+    with the probability of the percentile of its loss in the recent losses
+    to the power of ``beta``, so the samples of low losses are mostly
+    skipped.
+
+    Args:
+        selective_backprop (bool): Whether to backward only the selected
+            samples. Defaults to False.
+        beta (float): The power of the percentiles of the selection. The
+            larger, the fewer samples are selected. Defaults to 1.
+        history_size (int): The number of the recent losses to compute the
+            percentiles. Defaults to 1024.
+    """
+
+    def __init__(self, selective_backprop=False, beta=1., history_size=1024):
+        self.selective_backprop = selective_backprop
+        self.beta = beta
+        self.history = torch.zeros(history_size)
+        self.num_history = 0
+        self.reset()
+
+    def start(self):
+        _RECORDERS.append(self)
+
+    def stop(self):
+        if self in _RECORDERS:
+            _RECORDERS.remove(self)
+
+    def reset(self, weights=None, generator=None):
+        """Reset the recorder for a new batch.
+
+        Args:
+            weights (torch.Tensor, optional): The loss weights of the samples
+                of the batch. Defaults to None.
+            generator (torch.Generator, optional): The random generator of
+                the selection. Defaults to None.
+        """
+        self.weights = weights
+        self.generator = generator
+        self.losses = None
+        self.keep = None
+
+    def record(self, losses):
+        """Record the per-sample losses of the batch, only the first ones are
+        recorded, i.e. the ones of the whole batch with selective backprop.
+
+        Args:
+            losses (torch.Tensor): The unreduced losses of shape (N, \\*).
+        """
+        if self.losses is None:
+            self.losses = losses.detach().float().reshape(len(losses), -1)
+            self.losses = self.losses.mean(dim=1).cpu()
+
+    def batch_weights(self, device=None):
+        """The loss weights of the samples forwarded with gradients."""
+        if self.weights is None:
+            return None
+        weights = self.weights
+        if self.keep is not None:
+            weights = weights[self.keep]
+        return weights.to(device)
+
+    def select(self):
+        """Select the samples to backward by the recorded losses.
+
+        Returns:
+            torch.Tensor: The boolean mask of the selected samples.
+        """
+        losses = self.losses
+        if self.num_history == 0:
+            percentiles = torch.ones_like(losses)
+        else:
+            history = self.history[:min(self.num_history, len(self.history))]
+            percentiles = (history[None] <= losses[:, None]).float().mean(1)
+        probs = percentiles.pow(self.beta)
+        keep = torch.rand(len(losses), generator=self.generator) < probs
+        if not keep.any():
+            keep[losses.argmax()] = True
+
+        # update the recent losses as a ring buffer
+        losses = losses[-len(self.history):]
+        index = torch.arange(self.num_history, self.num_history + len(losses))
+        self.history[index % len(self.history)] = losses
+        self.num_history += len(losses)
+        self.keep = keep
+        return keep
@@ -0,0 +1,158 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import math
+from typing import Sequence
+
+import torch
+import torch.nn as nn
+from mmcv.runner.base_module import BaseModule, ModuleList
+
+
+class TokenPruner(BaseModule):
+    """Drop the less important patch tokens of a vision transformer.
+
+    After every layer in ``prune_layers``, only the ``keep_ratio`` most
+    important patch tokens are kept for the following layers, and the class
+    token is always kept. The importance of the tokens is scored by either
+    the attention from the class token to the patch tokens in that layer,
+    like `EViT <https://arxiv.org/abs/2202.07800>`_, or a light-weight
+    learned predictor, like `DynamicViT <https://arxiv.org/abs/2106.02034>`_.
+    The dropped tokens can be fused into one extra token weighted by their
+    scores, so their information isn't totally lost.
+
+    The original positions of the kept tokens are tracked, so that the patch
+    tokens can be scattered back to the full patch grid by :meth:`restore`.
+
+    Args:
+        embed_dims (int): The embedding dimension.
+        prune_layers (Sequence[int]): The indices of layers after which to
+            prune the tokens.
+        keep_ratio (float | Sequence[float]): The ratio of patch tokens to
+            keep at every pruning layer. Defaults to 0.7.
+        scorer (str): How to score the tokens, ``'cls_attn'`` or
+            ``'learned'``. Defaults to ``'cls_attn'``.
+        fuse_pruned (bool): Whether to fuse the dropped tokens into one
+            token. Defaults to True.
+        init_cfg (dict, optional): Initialization config dict.
+            Defaults to None.
+    """
+
+    def __init__(self,
+                 embed_dims,
+                 prune_layers,
+                 keep_ratio=0.7,
+                 scorer='cls_attn',
+                 fuse_pruned=True,
+                 init_cfg=None):
+        super(TokenPruner, self).__init__(init_cfg)
+        assert isinstance(prune_layers, Sequence)
+        self.prune_layers = list(prune_layers)
+        if isinstance(keep_ratio, (int, float)):
+            keep_ratio = [keep_ratio] * len(self.prune_layers)
+        assert len(keep_ratio) == len(self.prune_layers)
+        assert all(0 < ratio <= 1 for ratio in keep_ratio)
+        self.keep_ratio = list(keep_ratio)
+
+        assert scorer in ('cls_attn', 'learned'), \
+            f'Unsupported token scorer {scorer}.'
+        self.scorer = scorer
+        self.fuse_pruned = fuse_pruned
+
+        if scorer == 'learned':
+            self.predictors = ModuleList([
+                nn.Sequential(
+                    nn.LayerNorm(embed_dims),
+                    nn.Linear(embed_dims, embed_dims // 4), nn.GELU(),
+                    nn.Linear(embed_dims // 4, 1)) for _ in self.prune_layers
+            ])
+
+    @property
+    def with_cls_attn(self):
+        """bool: Whether the scorer needs the class token attention."""
+        return self.scorer == 'cls_attn'
+
+    def forward(self, x, token_index, layer_index, cls_attn=None):
+        """Prune the tokens after a layer.
+
+        Args:
+            x (Tensor): The tokens with shape (B, 1 + K, C), or (B, 2 + K, C)
+                if there is a fused token at the end.
+            token_index (Tensor, optional): The original positions of the K
+                patch tokens with shape (B, K). None means all patch tokens
+                are kept in order.
+            layer_index (int): The index of the layer, which should be in
+                ``prune_layers``.
+            cls_attn (Tensor, optional): The attention from the class token
+                to the other tokens with shape (B, K) or (B, K + 1). Required
+                if ``scorer='cls_attn'``.
+
+        Returns:
+            tuple[Tensor, Tensor]: The pruned tokens and the original
+            positions of the kept patch tokens.
+        """
+        stage = self.prune_layers.index(layer_index)
+        B, _, C = x.shape
+        if token_index is None:
+            token_index = torch.arange(
+                x.size(1) - 1, device=x.device).expand(B, -1)
+        num_tokens = token_index.size(1)
+        num_keep = max(1, math.ceil(num_tokens * self.keep_ratio[stage]))
+        if num_keep >= num_tokens:
+            return x, token_index
+
+        if self.with_cls_attn:
+            assert cls_attn is not None, \
+                'The class token attention is required to prune tokens.'
+            scores = cls_attn
+            weights = scores
+        else:
+            scores = self.predictors[stage](x[:, 1:]).squeeze(-1)
+            weights = scores.sigmoid()
+
+        cls_token = x[:, :1]
+        tokens = x[:, 1:num_tokens + 1]
+        keep = scores[:, :num_tokens].topk(num_keep, dim=1)[1]
+        kept = tokens.gather(1, keep.unsqueeze(-1).expand(-1, -1, C))
+        if not self.with_cls_attn and self.training:
+            # Straight-through estimator, the kept tokens are unchanged in
+            # the forward pass but the predictor gets the gradients.
+            prob = weights.gather(1, keep).unsqueeze(-1)
+            kept = kept * (1 + prob - prob.detach())
+        token_index = token_index.gather(1, keep)
+        outs = [cls_token, kept]
+
+        if self.fuse_pruned:
+            drop_weights = weights[:, :num_tokens].scatter(1, keep, 0)
+            fused = (drop_weights.unsqueeze(-1) * tokens).sum(1, keepdim=True)
+            total = drop_weights.sum(1)
+            if x.size(1) > num_tokens + 1:
+                # Merge into the existing fused token.
+                fused = fused + weights[:, num_tokens:, None] * x[:, -1:]
+                total = total + weights[:, num_tokens]
+            fused = fused / total.clamp(min=1e-6)[:, None, None]
+            outs.append(fused)
+
+        return torch.cat(outs, dim=1), token_index
+
+    @staticmethod
+    def restore(patch_token, token_index, num_patches):
+        """Scatter the kept patch tokens back to their original positions.
+
+        Args:
+            patch_token (Tensor): The tokens with shape (B, K', C), where K'
+                may be larger than K if there is a fused token at the end.
+            token_index (Tensor, optional): The original positions of the K
+                patch tokens with shape (B, K).
+            num_patches (int): The number of patches before pruning.
+
+        Returns:
+            Tensor: The patch tokens with shape (B, num_patches, C), and the
+            positions of the dropped tokens are filled with zeros.
+        """
+        if token_index is None:
+            return patch_token
+        B, K = token_index.shape
+        C = patch_token.size(-1)
+        out = patch_token.new_zeros(B, num_patches, C)
+        return out.scatter(1,
+                           token_index.unsqueeze(-1).expand(-1, -1, C),
+                           patch_token[:, :K])
@@ -0,0 +1,12 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from .backends import (ONNXRuntimeBackend, PyTorchBackend, TorchScriptBackend,
+                       build_backend)
+from .batcher import MicroBatcher
+from .metrics import Histogram, ServingMetrics
+from .server import InferenceServer
+
+__all__ = [
+    'PyTorchBackend', 'TorchScriptBackend', 'ONNXRuntimeBackend',
+    'build_backend', 'MicroBatcher', 'Histogram', 'ServingMetrics',
+    'InferenceServer'
+]
@@ -0,0 +1,98 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import torch
+
+
+class PyTorchBackend:
+    """Run a batch with a PyTorch classifier.
+
+    Args:
+        model (nn.Module): The classifier, usually from
+            :func:`mmcls.apis.init_model`.
+    """
+
+    def __init__(self, model):
+        self.model = model.eval()
+        self.device = next(model.parameters()).device
+
+    def __call__(self, imgs):
+        """Get the class scores of a batch of images.
+
+        Args:
+            imgs (Tensor): The preprocessed images with shape (N, C, H, W).
+
+        Returns:
+            np.ndarray: The scores with shape (N, num_classes).
+        """
+        with torch.no_grad():
+            scores = self.model(return_loss=False, img=imgs.to(self.device))
+        return np.stack(scores)
+
+
+class TorchScriptBackend:
+    """Run a batch with a TorchScript model exported by
+    ``tools/deployment/pytorch2torchscript.py``.
+
+    Args:
+        model_file (str): The TorchScript model file.
+        device (str): The device to run the model. Defaults to 'cpu'.
+    """
+
+    def __init__(self, model_file, device='cpu'):
+        self.model = torch.jit.load(model_file, map_location=device).eval()
+        self.device = device
+
+    def __call__(self, imgs):
+        with torch.no_grad():
+            scores = self.model(imgs.to(self.device))
+        return scores.cpu().numpy()
+
+
+class ONNXRuntimeBackend:
+    """Run a batch with an ONNX model exported by
+    ``tools/deployment/pytorch2onnx.py``.
+
+    The model should be exported with ``--dynamic-export`` to accept
+    batches of different sizes.
+
+    Args:
+        model_file (str): The ONNX model file.
+        class_names (list[str]): The class names.
+        device_id (int): The GPU id if the CUDA provider is available.
+            Defaults to 0.
+    """
+
+    def __init__(self, model_file, class_names, device_id=0):
+        from mmcls.core.export import ONNXRuntimeClassifier
+        self.model = ONNXRuntimeClassifier(model_file, class_names, device_id)
+
+    def __call__(self, imgs):
+        imgs = imgs.float().contiguous()
+        return np.stack(self.model.forward_test(imgs, img_metas=None))
+
+
+def build_backend(backend, model, class_names=None, device='cpu'):
+    """Build an inference backend.
+
+    Args:
+        backend (str): The type of backend, ``'pytorch'``, ``'torchscript'``
+            or ``'onnxruntime'``.
+        model (nn.Module | str): The classifier for the PyTorch backend, or
+            the model file for the others.
+        class_names (list[str], optional): The class names, required by the
+            ONNX Runtime backend. Defaults to None.
+        device (str): The device to run the model. Defaults to 'cpu'.
+
+    Returns:
+        callable: Take a batch of images and return the class scores.
+    """
+    if backend == 'pytorch':
+        return PyTorchBackend(model)
+    elif backend == 'torchscript':
+        return TorchScriptBackend(model, device=device)
+    elif backend == 'onnxruntime':
+        device_id = torch.device(device).index or 0
+        return ONNXRuntimeBackend(model, class_names, device_id=device_id)
+    else:
+        raise ValueError(f'Unsupported backend {backend}, please choose from '
+                         '"pytorch", "torchscript" and "onnxruntime".')
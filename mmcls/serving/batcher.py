@@ -0,0 +1,128 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class MicroBatcher:
+    """Group concurrent requests into micro-batches.
+
+    The requests submitted by :meth:`submit` are queued. A batch is closed
+    once it reaches ``max_batch_size`` or ``max_wait_ms`` has passed since
+    its first request, and then ``process_fn`` is called once for the whole
+    batch in a single worker thread, so the event loop is never blocked and
+    the model never runs concurrently with itself. The requests arriving
+    during the inference of a batch are queued for the next one.
+
+    Args:
+        process_fn (callable): Take a list of items and return a list of
+            results in the same order.
+        max_batch_size (int): The maximum number of items in a batch.
+            Defaults to 8.
+        max_wait_ms (float): The maximum time to wait for more items after
+            the first item of a batch arrives. Defaults to 5.
+        metrics (:obj:`ServingMetrics`, optional): If specified, the batch
+            sizes and the queueing latency are recorded. Defaults to None.
+    """
+
+    def __init__(self,
+                 process_fn,
+                 max_batch_size=8,
+                 max_wait_ms=5.,
+                 metrics=None):
+        assert max_batch_size >= 1
+        assert max_wait_ms >= 0
+        self.process_fn = process_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.
+        self.metrics = metrics
+
+        self._queue = None
+        self._task = None
+        self._executor = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def qsize(self):
+        return 0 if self._queue is None else self._queue.qsize()
+
+    async def start(self):
+        """Start the batching loop in the running event loop."""
+        assert not self.running, 'The batcher is already running.'
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='mmcls-batcher')
+        self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self):
+        """Stop the batching loop and fail the pending requests."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        while not self._queue.empty():
+            _, future, _ = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError('The batcher is stopped.'))
+        self._executor.shutdown(wait=True)
+        self._task = None
+
+    async def submit(self, item):
+        """Submit an item and wait for its result."""
+        assert self.running, 'Please start the batcher first.'
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future, time.perf_counter()))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            # Take the queued items without waiting.
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(),
+                                                    timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            # Skip the requests whose clients have gone.
+            batch = [b for b in batch if not b[1].done()]
+            if not batch:
+                continue
+            if self.metrics is not None:
+                now = time.perf_counter()
+                self.metrics.batch_size.observe(len(batch))
+                for _, _, enqueue_time in batch:
+                    self.metrics.queue_latency.observe(now - enqueue_time)
+
+            items = [item for item, _, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor,
+                                                     self.process_fn, items)
+                assert len(results) == len(items), \
+                    'The number of results should match the inputs.'
+            except Exception as e:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future, _), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
@@ -0,0 +1,94 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import bisect
+import threading
+
+# Latency buckets in seconds, from 1ms to 10s.
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    """A cumulative histogram in the Prometheus text exposition format.
+
+    Args:
+        name (str): The metric name.
+        description (str): The help text of the metric.
+        buckets (Sequence[float]): The upper bounds of the buckets in
+            increasing order. The ``+Inf`` bucket is always added.
+    """
+
+    def __init__(self, name, description, buckets):
+        assert list(buckets) == sorted(buckets), \
+            'The buckets should be in increasing order.'
+        self.name = name
+        self.description = description
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * (len(self.buckets) + 1)
+            self.sum = 0.
+            self.count = 0
+
+    def observe(self, value):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+    def to_text(self):
+        lines = [
+            f'# HELP {self.name} {self.description}',
+            f'# TYPE {self.name} histogram'
+        ]
+        with self._lock:
+            cumulative = 0
+            for bound, count in zip(self.buckets, self.counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{le="{bound}"}} '
+                             f'{cumulative}')
+            lines.append(f'{self.name}_bucket{{le="+Inf"}} {self.count}')
+            lines.append(f'{self.name}_sum {self.sum}')
+            lines.append(f'{self.name}_count {self.count}')
+        return '\n'.join(lines)
+
+
+class ServingMetrics:
+    """The metrics of an inference server.
+
+    Args:
+        max_batch_size (int): The maximum batch size, used to build the
+            buckets of the batch size histogram.
+    """
+
+    def __init__(self, max_batch_size):
+        self.latency = Histogram('mmcls_request_latency_seconds',
+                                 'End-to-end latency of prediction requests.',
+                                 LATENCY_BUCKETS)
+        self.queue_latency = Histogram(
+            'mmcls_queue_latency_seconds',
+            'Time from preprocessed to the start of the batch inference.',
+            LATENCY_BUCKETS)
+        self.batch_size = Histogram('mmcls_batch_size',
+                                    'Number of images in every batch.',
+                                    range(1, max_batch_size + 1))
+        self.num_requests = 0
+        self.num_errors = 0
+
+    def to_text(self):
+        """Dump all metrics in the Prometheus text exposition format."""
+        lines = [
+            self.latency.to_text(),
+            self.queue_latency.to_text(),
+            self.batch_size.to_text(),
+            '# HELP mmcls_requests_total Number of prediction requests.',
+            '# TYPE mmcls_requests_total counter',
+            f'mmcls_requests_total {self.num_requests}',
+            '# HELP mmcls_request_errors_total Number of failed requests.',
+            '# TYPE mmcls_request_errors_total counter',
+            f'mmcls_request_errors_total {self.num_errors}',
+        ]
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,257 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import asyncio
+import json
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import mmcv
+import numpy as np
+import torch
+
+from mmcls.datasets.pipelines import Compose
+from mmcls.utils import get_root_logger
+from .batcher import MicroBatcher
+from .metrics import ServingMetrics
+
+
+class HTTPError(Exception):
+    """An error with the HTTP status to respond."""
+
+    def __init__(self, status, message=None):
+        super(HTTPError, self).__init__(message or status.phrase)
+        self.status = status
+
+
+class InferenceServer:
+    """An HTTP inference server with dynamic micro-batching.
+
+    The server is built on the ``asyncio`` streams of the standard library.
+    Images are decoded and preprocessed in a thread pool, and the concurrent
+    requests are grouped into micro-batches by :class:`MicroBatcher`, so the
+    backend runs once for every batch.
+
+    The endpoints are:
+
+    - ``POST /predict`` or ``PUT /predict``: The request body is an encoded
+      image, and the response is a JSON of ``pred_label``, ``pred_score``
+      and ``pred_class``.
+    - ``GET /metrics``: The latency and batch size histograms in the
+      Prometheus text format.
+    - ``GET /health``: Check whether the server is alive.
+
+    Args:
+        backend (callable): Take a batch of images with shape (N, C, H, W)
+            and return the class scores with shape (N, num_classes), see
+            :func:`mmcls.serving.build_backend`.
+        pipeline (list[dict]): The test pipeline. The ``LoadImageFromFile``
+            is skipped since the images are decoded from the requests.
+        class_names (list[str]): The class names.
+        max_batch_size (int): The maximum batch size. Defaults to 8.
+        max_wait_ms (float): The maximum time to wait for a batch to be
+            filled. Defaults to 5.
+        num_workers (int): The number of preprocessing threads.
+            Defaults to 4.
+        max_body_size (int): The maximum size of request body in bytes.
+            Defaults to 32MB.
+    """
+
+    def __init__(self,
+                 backend,
+                 pipeline,
+                 class_names,
+                 max_batch_size=8,
+                 max_wait_ms=5.,
+                 num_workers=4,
+                 max_body_size=32 * 1024 * 1024):
+        self.backend = backend
+        pipeline = list(pipeline)
+        if pipeline and pipeline[0]['type'] == 'LoadImageFromFile':
+            pipeline.pop(0)
+        self.pipeline = Compose(pipeline)
+        self.class_names = class_names
+        self.num_workers = num_workers
+        self.max_body_size = max_body_size
+
+        self.metrics = ServingMetrics(max_batch_size)
+        self.batcher = MicroBatcher(
+            self.predict_batch,
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            metrics=self.metrics)
+        self._pool = None
+        self._server = None
+
+    def preprocess(self, content):
+        """Decode and preprocess an image from the bytes."""
+        try:
+            img = mmcv.imfrombytes(content)
+        except Exception:
+            img = None
+        if img is None:
+            raise HTTPError(HTTPStatus.BAD_REQUEST,
+                            'Failed to decode the image.')
+        return self.pipeline(dict(img=img))['img']
+
+    def predict_batch(self, imgs):
+        """Predict a batch of preprocessed images.
+
+        The images of different shapes are run in separate batches.
+        """
+        groups = defaultdict(list)
+        for i, img in enumerate(imgs):
+            groups[tuple(img.shape)].append(i)
+
+        results = [None] * len(imgs)
+        for indices in groups.values():
+            scores = self.backend(torch.stack([imgs[i] for i in indices]))
+            for i, score in zip(indices, scores):
+                label = int(np.argmax(score))
+                results[i] = dict(
+                    pred_label=label,
+                    pred_score=float(score[label]),
+                    pred_class=self.class_names[label])
+        return results
+
+    async def predict(self, content):
+        """Predict an encoded image."""
+        loop = asyncio.get_running_loop()
+        img = await loop.run_in_executor(self._pool, self.preprocess, content)
+        return await self.batcher.submit(img)
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Start the server.
+
+        Returns:
+            tuple[str, int]: The address and port the server listens on,
+            which is useful if ``port=0``.
+        """
+        self._pool = ThreadPoolExecutor(
+            max_workers=self.num_workers,
+            thread_name_prefix='mmcls-preprocess')
+        await self.batcher.start()
+        self._server = await asyncio.start_server(self._handle_connection,
+                                                  host, port)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def stop(self):
+        """Stop the server."""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        await self.batcher.stop()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    def run(self, host='127.0.0.1', port=8080):
+        """Run the server until interrupted."""
+
+        async def serve():
+            address = await self.start(host, port)
+            get_root_logger().info(
+                f'Serving on http://{address[0]}:{address[1]}')
+            try:
+                await self._server.serve_forever()
+            finally:
+                await self.stop()
+
+        try:
+            asyncio.run(serve())
+        except KeyboardInterrupt:
+            pass
+
+    async def _read_request(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        parts = line.decode('latin-1').split()
+        if len(parts) != 3:
+            raise HTTPError(HTTPStatus.BAD_REQUEST)
+        method, target, _ = parts
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, _, value = line.decode('latin-1').partition(':')
+            headers[key.strip().lower()] = value.strip()
+
+        if 'chunked' in headers.get('transfer-encoding', '').lower():
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED)
+        try:
+            length = int(headers.get('content-length', 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, 'Invalid Content-Length.')
+        if length > self.max_body_size:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length > 0 else b''
+        return method.upper(), target.split('?')[0], headers, body
+
+    async def _dispatch(self, method, path, body):
+        if path == '/predict' and method in ('POST', 'PUT'):
+            start = time.perf_counter()
+            self.metrics.num_requests += 1
+            try:
+                result = await self.predict(body)
+            except Exception:
+                self.metrics.num_errors += 1
+                raise
+            self.metrics.latency.observe(time.perf_counter() - start)
+            return HTTPStatus.OK, 'application/json', json.dumps(result)
+        elif path == '/metrics' and method == 'GET':
+            return (HTTPStatus.OK, 'text/plain; version=0.0.4',
+                    self.metrics.to_text())
+        elif path == '/health' and method == 'GET':
+            return HTTPStatus.OK, 'application/json', '{"status": "ok"}'
+        raise HTTPError(HTTPStatus.NOT_FOUND)
+
+    @staticmethod
+    def _write_response(writer, status, content_type, payload, keep_alive):
+        payload = payload.encode('utf-8')
+        headers = [
+            f'HTTP/1.1 {status.value} {status.phrase}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(payload)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1'))
+        writer.write(payload)
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = None
+                keep_alive = True
+                try:
+                    request = await self._read_request(reader)
+                    if request is None:
+                        break
+                    method, path, headers, body = request
+                    keep_alive = headers.get('connection',
+                                             '').lower() != 'close'
+                    response = await self._dispatch(method, path, body)
+                except HTTPError as e:
+                    # Close the connection if the request is malformed.
+                    keep_alive = keep_alive and request is not None
+                    response = (e.status, 'application/json',
+                                json.dumps(dict(error=str(e))))
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    break
+                except Exception as e:
+                    response = (HTTPStatus.INTERNAL_SERVER_ERROR,
+                                'application/json',
+                                json.dumps(dict(error=repr(e))))
+                self._write_response(writer, *response, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
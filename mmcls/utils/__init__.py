@@ -1,5 +1,12 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+from .checkpoint import (is_mmap_supported, load_checkpoint,
+                         load_state_dict_assign)
 from .collect_env import collect_env
+from .lazy import LazyRegistry, is_lazy_import_enabled, lazy_import
 from .logger import get_root_logger, load_json_logs
 
-__all__ = ['collect_env', 'get_root_logger', 'load_json_logs']
+__all__ = [
+    'collect_env', 'get_root_logger', 'load_json_logs', 'LazyRegistry',
+    'lazy_import', 'is_lazy_import_enabled', 'load_checkpoint',
+    'load_state_dict_assign', 'is_mmap_supported'
+]
@@ -0,0 +1,154 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import re
+import zipfile
+from collections import OrderedDict
+
+import torch
+from mmcv.parallel import is_module_wrapper
+from mmcv.runner import get_dist_info
+from mmcv.runner import load_checkpoint as mmcv_load_checkpoint
+from mmcv.utils import digit_version
+
+
+def is_mmap_supported(filename, map_location=None):
+    """Whether the checkpoint file can be memory-mapped.
+
+    It requires PyTorch>=2.1, and the checkpoint should be a local file saved
+    in the zipfile format, which is the default of ``torch.save`` since
+    PyTorch 1.6. Checkpoints saved with
+    ``_use_new_zipfile_serialization=False`` cannot be memory-mapped.
+    """
+    if digit_version(torch.__version__) < digit_version('2.1.0'):
+        return False
+    if map_location not in (None, 'cpu', torch.device('cpu')):
+        return False
+    return isinstance(filename, str) and osp.isfile(filename) \
+        and zipfile.is_zipfile(filename)
+
+
+def load_state_dict_assign(module, state_dict, strict=False, logger=None):
+    """Load the state dict by assigning the tensors to the module.
+
+    Unlike :func:`mmcv.runner.load_state_dict`, which copies the tensors into
+    the parameters of the module, the tensors are used as the parameters, so
+    that the memory-mapped tensors are loaded without copying. The tensors
+    with different dtypes from the parameters are converted, and the tensors
+    with mismatched shapes are skipped.
+
+    Args:
+        module (Module): Module that receives the state_dict.
+        state_dict (OrderedDict): Weights.
+        strict (bool): Whether to strictly enforce that the keys in the
+            state_dict match the keys of the module. Defaults to False.
+        logger (:obj:`logging.Logger`, optional): Logger to log the error
+            message. If not specified, print function will be used.
+    """
+    if is_module_wrapper(module):
+        module = module.module
+    err_msg = []
+    own_state = module.state_dict()
+    metadata = getattr(state_dict, '_metadata', None)
+    state_dict = OrderedDict(state_dict)
+    if metadata is not None:
+        state_dict._metadata = metadata
+    for name, param in list(state_dict.items()):
+        own_param = own_state.get(name)
+        if own_param is None:
+            continue
+        if own_param.shape != param.shape:
+            err_msg.append(f'size mismatch for {name}: copying a param with '
+                           f'shape {param.shape} from checkpoint, the shape '
+                           f'in current model is {own_param.shape}.')
+            state_dict.pop(name)
+        elif own_param.dtype != param.dtype:
+            state_dict[name] = param.to(own_param.dtype)
+
+    requires_grad = {
+        name: param.requires_grad
+        for name, param in module.named_parameters()
+    }
+    incompatible = module.load_state_dict(
+        state_dict, strict=False, assign=True)
+    # The assigned parameters don't keep the `requires_grad` of the module,
+    # e.g., the frozen stages of backbones.
+    for name, param in module.named_parameters():
+        param.requires_grad_(requires_grad.get(name, True))
+    missing_keys = [
+        key for key in incompatible.missing_keys
+        if 'num_batches_tracked' not in key
+    ]
+    if incompatible.unexpected_keys:
+        err_msg.append('unexpected key in source state_dict: '
+                       f'{", ".join(incompatible.unexpected_keys)}\n')
+    if missing_keys:
+        err_msg.append('missing keys in source state_dict: '
+                       f'{", ".join(missing_keys)}\n')
+
+    rank, _ = get_dist_info()
+    if len(err_msg) > 0 and rank == 0:
+        err_msg.insert(
+            0, 'The model and loaded state dict do not match exactly\n')
+        err_msg = '\n'.join(err_msg)
+        if strict:
+            raise RuntimeError(err_msg)
+        elif logger is not None:
+            logger.warning(err_msg)
+        else:
+            print(err_msg)
+
+
+def load_checkpoint(model,
+                    filename,
+                    map_location=None,
+                    strict=False,
+                    logger=None,
+                    revise_keys=[(r'^module\.', '')],
+                    mmap=True):
+    """Load checkpoint from a file or URI, with memory-mapping if possible.
+
+    If ``mmap=True`` and the checkpoint supports it (see
+    :func:`is_mmap_supported`), the tensors are memory-mapped from the file
+    instead of being read into memory, and assigned to the model without
+    copying, see :func:`load_state_dict_assign`. So only the pages of the
+    used tensors are read, for example, the optimizer states in the
+    checkpoint are never read. Otherwise, it falls back to
+    :func:`mmcv.runner.load_checkpoint`.
+
+    Args:
+        model (Module): Module to load checkpoint.
+        filename (str): Accept local filepath, URL, ``torchvision://xxx``,
+            ``open-mmlab://xxx``.
+        map_location (str): Same as :func:`torch.load`.
+        strict (bool): Whether to allow different params for the model and
+            checkpoint. Defaults to False.
+        logger (:mod:`logging.Logger` or None): The logger for error message.
+        revise_keys (list): A list of customized keywords to modify the
+            state_dict in checkpoint. Each item is a (pattern, replacement)
+            pair of the regular expression operations. Default: strip
+            the prefix 'module.' by [(r'^module\\.', '')].
+        mmap (bool): Whether to memory-map the checkpoint if possible.
+            Defaults to True.
+
+    Returns:
+        dict or OrderedDict: The loaded checkpoint.
+    """
+    if not (mmap and is_mmap_supported(filename, map_location)):
+        return mmcv_load_checkpoint(model, filename, map_location, strict,
+                                    logger, revise_keys)
+
+    checkpoint = torch.load(filename, map_location='cpu', mmap=True)
+    if not isinstance(checkpoint, dict):
+        raise RuntimeError(
+            f'No state_dict found in checkpoint file {filename}')
+    state_dict = checkpoint.get('state_dict', checkpoint)
+    # strip prefix of state_dict
+    metadata = getattr(state_dict, '_metadata', OrderedDict())
+    for p, r in revise_keys:
+        state_dict = OrderedDict(
+            {re.sub(p, r, k): v
+             for k, v in state_dict.items()})
+    # Keep metadata in state_dict
+    state_dict._metadata = metadata
+    load_state_dict_assign(model, state_dict, strict, logger)
+    return checkpoint
@@ -0,0 +1,116 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import importlib
+import importlib.util
+import os
+import sys
+
+from mmcv.utils import Registry
+
+
+def is_lazy_import_enabled():
+    """Whether the lazy import is enabled, which can be disabled by setting
+    the environment variable ``MMCLS_LAZY_IMPORT=0``."""
+    return os.environ.get('MMCLS_LAZY_IMPORT', '1') != '0'
+
+
+class LazyRegistry(Registry):
+    """A registry whose modules are imported when they are first used.
+
+    The modules to register are added by :meth:`add_lazy_modules`, and a
+    module is imported by :meth:`get` when a type in it is built. If a type is
+    not in the lazy modules, for example, a registered class which isn't
+    exported by the package, all lazy modules are imported before looking it
+    up again.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super(LazyRegistry, self).__init__(*args, **kwargs)
+        self._lazy_modules = {}
+
+    def add_lazy_modules(self, package, modules):
+        """Add the modules to import lazily.
+
+        Args:
+            package (str): The package of the modules.
+            modules (dict[str, list[str]]): The names defined in every module,
+                the keys are the module names relative to the ``package``.
+        """
+        for module, names in modules.items():
+            module = importlib.util.resolve_name(module, package)
+            for name in names:
+                self._lazy_modules[name] = module
+
+    def import_lazy_modules(self):
+        """Import all lazy modules."""
+        for module in set(self._lazy_modules.values()):
+            importlib.import_module(module)
+
+    @property
+    def module_dict(self):
+        self.import_lazy_modules()
+        return self._module_dict
+
+    def __len__(self):
+        self.import_lazy_modules()
+        return len(self._module_dict)
+
+    def get(self, key):
+        scope, real_key = self.split_scope_key(key)
+        if scope is None or scope == self._scope:
+            if real_key not in self._module_dict:
+                if real_key in self._lazy_modules:
+                    importlib.import_module(self._lazy_modules[real_key])
+                else:
+                    self.import_lazy_modules()
+        return super(LazyRegistry, self).get(key)
+
+
+def lazy_import(package, modules, registry=None):
+    """Import the names of a package from its modules on first access.
+
+    It returns the module-level ``__getattr__`` and ``__dir__`` (:pep:`562`)
+    of the package, for example, in ``mmcls/models/backbones/__init__.py``:
+
+    .. code-block:: python
+
+        __getattr__, __dir__ = lazy_import(
+            __name__, {'.resnet': ['ResNet', 'ResNetV1d']}, BACKBONES)
+
+    If the environment variable ``MMCLS_LAZY_IMPORT=0``, all modules are
+    imported immediately.
+
+    Args:
+        package (str): The name of the package, usually ``__name__``.
+        modules (dict[str, list[str]]): The names to export from every
+            module, the keys are the module names relative to the
+            ``package``.
+        registry (:obj:`LazyRegistry`, optional): If specified, the modules
+            are also imported when their types are built by the registry.
+
+    Returns:
+        tuple[callable]: The ``__getattr__`` and ``__dir__`` of the package.
+    """
+    names = {
+        name: module
+        for module, module_names in modules.items() for name in module_names
+    }
+    if registry is not None:
+        registry.add_lazy_modules(package, modules)
+
+    def __getattr__(name):
+        if name not in names:
+            raise AttributeError(
+                f'module {package!r} has no attribute {name!r}')
+        value = getattr(importlib.import_module(names[name], package), name)
+        # Cache it so that ``__getattr__`` isn't called again.
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(names))
+
+    if not is_lazy_import_enabled():
+        for module in modules:
+            importlib.import_module(module, package)
+
+    return __getattr__, __dir__
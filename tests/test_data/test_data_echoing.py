@@ -0,0 +1,94 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from unittest.mock import patch
+
+import pytest
+import torch
+
+from mmcls.datasets import EchoDataLoader, build_dataloader
+
+
+class ExampleDataset(torch.utils.data.Dataset):
+
+    def __getitem__(self, idx):
+        return dict(img=torch.tensor(idx))
+
+    def __len__(self):
+        return 16
+
+
+def _loaded_batches(batches):
+    return [
+        b for i, b in enumerate(batches) if i == 0 or b is not batches[i - 1]
+    ]
+
+
+def test_echo_data_loader():
+    dataset = ExampleDataset()
+    data_loader = build_dataloader(
+        dataset,
+        samples_per_gpu=2,
+        workers_per_gpu=0,
+        dist=False,
+        shuffle=False,
+        echo_cfg=dict(echo_factor=2))
+    assert isinstance(data_loader, EchoDataLoader)
+    # the iterations of an epoch are not changed
+    assert len(data_loader) == 8
+    batches = [batch['img'] for batch in data_loader]
+    assert len(batches) == 8
+    loaded = _loaded_batches(batches)
+    assert [b.tolist() for b in loaded] == [[0, 1], [2, 3], [4, 5], [6, 7]]
+    assert all(batches[i] is batches[i + 1] for i in range(0, 8, 2))
+
+    # the numbers of repeats average to the fractional factor
+    data_loader = EchoDataLoader(dataset, batch_size=2, echo_factor=1.5)
+    batches = list(data_loader)
+    assert len(batches) == 8
+    assert len(_loaded_batches(batches)) == 6
+
+    with pytest.raises(AssertionError):
+        EchoDataLoader(dataset, echo_factor=0.5)
+
+
+def test_echo_data_loader_adaptive():
+    dataset = ExampleDataset()
+    data_loader = EchoDataLoader(
+        dataset, echo_factor='auto', max_echo_factor=4, momentum=0.)
+    assert data_loader.echo_factor == 1
+    # the loading of a batch takes 3 iterations
+    data_loader._update_echo_factor(0.2, 0.1, 1)
+    assert data_loader.echo_factor == pytest.approx(3 * 0.95)
+    # limited by the maximum
+    data_loader._update_echo_factor(1., 0.2, 2)
+    assert data_loader.echo_factor == 4
+    # shrinks while the training doesn't wait
+    data_loader._update_echo_factor(0., 0.4, 4)
+    assert data_loader.echo_factor == pytest.approx(4 * 0.95)
+
+    # the factor converges with the momentum to hide the loading of 0.1s in
+    # the iterations of 0.02s
+    data_loader = EchoDataLoader(
+        dataset, echo_factor='auto', max_echo_factor=8, momentum=0.5)
+    for _ in range(20):
+        repeats = data_loader.echo_factor
+        compute_time = 0.02 * repeats
+        data_loader._update_echo_factor(
+            max(0.1 - compute_time, 0.), compute_time, repeats)
+    assert data_loader.echo_factor == pytest.approx(5 * 0.95)
+    # and stays 1 when the loading is fast
+    data_loader = EchoDataLoader(dataset, echo_factor='auto', momentum=0.5)
+    for _ in range(10):
+        data_loader._update_echo_factor(0., 0.02, 1)
+    assert data_loader.echo_factor == 1
+    # no update without the time of the iterations
+    data_loader._update_echo_factor(0.1, 0., 1)
+    assert data_loader.echo_factor == 1
+
+    # the factor is updated by every loaded batch but the first one
+    data_loader = EchoDataLoader(dataset, echo_factor='auto')
+    with patch.object(data_loader, '_update_echo_factor') as update:
+        batches = list(data_loader)
+    assert len(batches) == len(dataset)
+    assert update.call_count == len(_loaded_batches(batches)) - 1
+    for (wait_time, compute_time, repeats), _ in update.call_args_list:
+        assert wait_time >= 0 and compute_time >= 0 and repeats == 1
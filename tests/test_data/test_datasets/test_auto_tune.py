@@ -0,0 +1,109 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import tempfile
+from unittest.mock import patch
+
+import mmcv
+import torch
+from torch.utils.data import Dataset
+
+from mmcls.datasets import (apply_auto_tune, auto_tune_dataloader,
+                            profile_dataloader)
+
+
+class ExampleDataset(Dataset):
+
+    def __getitem__(self, idx):
+        return dict(img=torch.rand(3, 8, 8), gt_label=torch.tensor(idx % 2))
+
+    def __len__(self):
+        return 32
+
+
+def test_profile_dataloader():
+    result = profile_dataloader(
+        ExampleDataset(), 4, 1, prefetch_factor=2, num_batches=100, warmup=2)
+    assert result['samples_per_sec'] > 0
+    assert result['rss_mb'] is None or result['rss_mb'] > 0
+
+
+def test_auto_tune_dataloader():
+    dataset = ExampleDataset()
+    data_cfg = mmcv.ConfigDict(
+        samples_per_gpu=4, workers_per_gpu=1, train=dict(type='Example'))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cache_file = osp.join(tmpdir, 'profiles.json')
+        profile = auto_tune_dataloader(
+            dataset,
+            data_cfg,
+            workers=[0, 1],
+            prefetch_factors=[2],
+            batch_sizes=[4, 8],
+            pin_memory=[False],
+            num_batches=2,
+            warmup=1,
+            cache_file=cache_file)
+        # the prefetch factor is ignored without workers
+        assert len(profile['trials']) == 4
+        assert {t['prefetch_factor'] for t in profile['trials']} == {None, 2}
+        settings = profile['settings']
+        assert set(settings) == {
+            'samples_per_gpu', 'workers_per_gpu', 'prefetch_factor',
+            'pin_memory'
+        }
+        assert profile['key'] in mmcv.load(cache_file)
+
+        # the cached profile is used without trials
+        with patch('mmcls.datasets.auto_tune.profile_dataloader') as mock:
+            cached = auto_tune_dataloader(
+                dataset,
+                data_cfg,
+                workers=[1, 0],
+                prefetch_factors=[2],
+                batch_sizes=[8, 4],
+                pin_memory=[False],
+                num_batches=2,
+                warmup=1,
+                cache_file=cache_file)
+            mock.assert_not_called()
+        assert cached['settings'] == settings
+
+        # a different dataset config is tuned again
+        data_cfg.train.type = 'Another'
+        with patch(
+                'mmcls.datasets.auto_tune.profile_dataloader',
+                side_effect=[
+                    dict(samples_per_sec=100., rss_mb=100.),
+                    dict(samples_per_sec=98., rss_mb=50.),
+                    dict(samples_per_sec=200., rss_mb=300.),
+                    RuntimeError('out of memory'),
+                ]):
+            profile = auto_tune_dataloader(
+                dataset,
+                data_cfg,
+                workers=[0, 1],
+                prefetch_factors=[2],
+                batch_sizes=[4],
+                pin_memory=[True, False],
+                num_batches=2,
+                warmup=1,
+                max_rss_mb=200,
+                cache_file=cache_file)
+        assert 'error' in profile['trials'][-1]
+        # the setting with less memory is preferred within the tolerance
+        assert profile['settings'] == dict(
+            samples_per_gpu=4,
+            workers_per_gpu=0,
+            prefetch_factor=None,
+            pin_memory=True)
+        assert len(mmcv.load(cache_file)) == 2
+
+        # write the settings into the config
+        data_cfg.auto_tune = dict(cache_file=cache_file)
+        with patch(
+                'mmcls.datasets.auto_tune.auto_tune_dataloader',
+                return_value=dict(settings=profile['settings'])) as mock:
+            apply_auto_tune(data_cfg, dataset)
+            assert mock.call_args[1]['cache_file'] == cache_file
+        assert data_cfg.workers_per_gpu == 0
+        assert data_cfg.pin_memory is True
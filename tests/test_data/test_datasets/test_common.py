@@ -1,4 +1,7 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import os
+import os.path as osp
+import shutil
 import tempfile
 from unittest.mock import MagicMock, patch
 
@@ -310,3 +313,188 @@ def test_dataset_imagenet21k():
     dataset = ImageNet21k(**dataset_cfg)
     assert len(dataset) == 3
     assert isinstance(dataset[0], dict)
+
+
+def test_feature_cache_dataset():
+    from mmcls.apis import extract_feature_cache
+    from mmcls.datasets import FeatureCacheDataset, build_dataloader
+    from mmcls.models import build_classifier
+
+    class ToyDataset(BaseDataset):
+        CLASSES = ('a', 'b')
+
+        def load_annotations(self):
+            return [
+                dict(
+                    img=np.random.rand(3, 8, 8).astype(np.float32),
+                    gt_label=np.array(i % 2, dtype=np.int64)) for i in range(5)
+            ]
+
+    dataset = ToyDataset(
+        data_prefix='',
+        pipeline=[
+            dict(type='ToTensor', keys=['img']),
+            dict(type='Collect', keys=['img'])
+        ])
+    data_loader = build_dataloader(
+        dataset,
+        2,
+        0,
+        dist=False,
+        shuffle=False,
+        round_up=False,
+        persistent_workers=False)
+    model = build_classifier(
+        dict(
+            type='ImageClassifier',
+            backbone=dict(
+                type='ResNet_CIFAR',
+                depth=18,
+                num_stages=4,
+                out_indices=(3, ),
+                style='pytorch'),
+            neck=dict(type='GlobalAveragePooling'),
+            head=dict(type='LinearClsHead', num_classes=2, in_channels=512)))
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        prefix = f'{tmpdir}/train'
+        extract_feature_cache(model, data_loader, prefix)
+
+        cache = FeatureCacheDataset(data_prefix=prefix, classes=('a', 'b'))
+        assert len(cache) == 5
+        assert isinstance(cache.features, np.memmap)
+        np.testing.assert_equal(cache.get_gt_labels(), [0, 1, 0, 1, 0])
+        assert cache.get_cat_ids(1) == [1]
+
+        data = cache[3]
+        assert data['img'].shape == (512, )
+        assert data['gt_label'].item() == 1
+        with torch.no_grad():
+            feat = model.extract_feat(dataset[3]['img'][None])[-1]
+        torch.testing.assert_allclose(data['img'], feat[0])
+
+        with pytest.raises(AssertionError):
+            FeatureCacheDataset(data_prefix=f'{tmpdir}/val')
+
+
+def _feature_cache_cfg(tmpdir):
+    import mmcv
+    for i, folder in enumerate(['a', 'b', 'b']):
+        mmcv.mkdir_or_exist(f'{tmpdir}/imgs/{folder}')
+        shutil.copy('tests/data/color.jpg', f'{tmpdir}/imgs/{folder}/{i}.jpg')
+    return mmcv.Config(
+        dict(
+            model=dict(
+                type='ImageClassifier',
+                backbone=dict(
+                    type='ResNet_CIFAR',
+                    depth=18,
+                    num_stages=4,
+                    out_indices=(3, ),
+                    style='pytorch'),
+                neck=dict(type='GlobalAveragePooling'),
+                head=dict(
+                    type='LinearClsHead', num_classes=2, in_channels=512)),
+            data=dict(
+                samples_per_gpu=2,
+                workers_per_gpu=0,
+                train=dict(
+                    type='ImageNet',
+                    data_prefix=f'{tmpdir}/imgs',
+                    classes=['a', 'b'],
+                    pipeline=[]),
+                test=dict(pipeline=[
+                    dict(type='LoadImageFromFile'),
+                    dict(type='Resize', size=(8, 8)),
+                    dict(
+                        type='Normalize',
+                        mean=[0, 0, 0],
+                        std=[255, 255, 255],
+                        to_rgb=False),
+                    dict(type='ImageToTensor', keys=['img']),
+                    dict(type='Collect', keys=['img'])
+                ])),
+            feature_cache=dict(),
+            load_from=None,
+            work_dir=tmpdir))
+
+
+def test_build_feature_cache():
+    from mmcls.apis import build_feature_cache
+    from mmcls.datasets import FeatureCacheDataset, build_dataset
+    from mmcls.models import build_classifier
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        cfg = _feature_cache_cfg(tmpdir)
+        model = build_classifier(cfg.model)
+        # the backbone is neither pretrained nor loaded
+        with pytest.raises(ValueError):
+            build_feature_cache(model, cfg, device='cpu')
+
+        # the checkpoint is loaded into the full model before the extraction
+        trained = build_classifier(cfg.model)
+        for param in trained.parameters():
+            param.data.normal_()
+        torch.save({'state_dict': trained.state_dict()},
+                   f'{tmpdir}/trained.pth')
+        cfg.load_from = f'{tmpdir}/trained.pth'
+        test_pipeline = cfg.data.test.pipeline
+        head_model = build_feature_cache(model, cfg, device='cpu')
+        assert cfg.load_from is None
+        assert cfg.data.train['type'] == 'FeatureCacheDataset'
+        torch.testing.assert_close(head_model.head.fc.weight,
+                                   trained.head.fc.weight)
+
+        cache = build_dataset(cfg.data.train)
+        assert isinstance(cache, FeatureCacheDataset)
+        dataset = build_dataset(
+            dict(
+                type='ImageNet',
+                data_prefix=f'{tmpdir}/imgs',
+                classes=['a', 'b'],
+                pipeline=test_pipeline))
+        trained.eval()
+        with torch.no_grad():
+            feat = trained.extract_feat(dataset[2]['img'][None])[-1]
+        np.testing.assert_allclose(cache[2]['img'], feat[0], rtol=1e-4)
+        assert osp.exists(f'{tmpdir}/feature_cache/train_key.txt')
+
+        def rebuild(**kwargs):
+            cfg = _feature_cache_cfg(tmpdir)
+            cfg.merge_from_dict(kwargs)
+            mtime = os.stat(feat_file).st_mtime_ns
+            build_feature_cache(build_classifier(cfg.model), cfg, 'cpu')
+            return os.stat(feat_file).st_mtime_ns != mtime
+
+        # the cache is reused only with the same weights and pipeline
+        feat_file = f'{tmpdir}/feature_cache/train_feats.npy'
+        assert not rebuild(load_from=f'{tmpdir}/trained.pth')
+        assert rebuild(
+            load_from=f'{tmpdir}/trained.pth',
+            **{'data.test.pipeline.1.size': (16, 16)})
+        assert rebuild(load_from=f'{tmpdir}/trained.pth')
+        assert not rebuild(load_from=f'{tmpdir}/trained.pth')
+        for param in trained.parameters():
+            param.data.normal_()
+        torch.save({'state_dict': trained.state_dict()},
+                   f'{tmpdir}/trained.pth')
+        assert rebuild(load_from=f'{tmpdir}/trained.pth')
+
+        # the batch augments are kept for the head-only training
+        mixup = dict(type='BatchMixup', alpha=1., num_classes=2, prob=1.)
+        cfg = _feature_cache_cfg(tmpdir)
+        cfg.load_from = f'{tmpdir}/trained.pth'
+        cfg.model.train_cfg = dict(augments=mixup)
+        head_model = build_feature_cache(
+            build_classifier(cfg.model), cfg, device='cpu')
+        assert cfg.model['train_cfg'] == dict(augments=mixup)
+        assert head_model.augments is not None
+        # and the unsupported ones fail before the extraction
+        mtime = os.stat(feat_file).st_mtime_ns
+        with pytest.raises(AssertionError):
+            rebuild(
+                load_from=f'{tmpdir}/trained.pth',
+                feature_cache=dict(overwrite=True),
+                model=dict(
+                    train_cfg=dict(augments=dict(mixup, type='BatchCutMix'))))
+        assert os.stat(feat_file).st_mtime_ns == mtime
@@ -8,7 +8,17 @@ import numpy as np
 import pytest
 
 from mmcls.datasets import (BaseDataset, ClassBalancedDataset, ConcatDataset,
-                            RepeatDataset)
+                            MultiLabelDataset, RepeatDataset)
+from mmcls.datasets.dataset_wrappers import get_repeat_factors
+
+
+@pytest.fixture(autouse=True)
+def restore_base_dataset():
+    # the toy datasets replace the class attributes of BaseDataset, which
+    # would leak to the other tests building real datasets
+    with patch.object(BaseDataset, 'CLASSES', BaseDataset.CLASSES), \
+            patch.object(BaseDataset, '__getitem__', BaseDataset.__getitem__):
+        yield
 
 
 @patch.multiple(BaseDataset, __abstractmethods__=set())
@@ -107,3 +117,63 @@ def test_class_balanced_dataset(construct_dataset):
     for idx in np.random.randint(0, len(repeat_factor_dataset), 3):
         assert repeat_factor_dataset[idx] == bisect.bisect_right(
             repeat_factors_cumsum, idx)
+    assert repeat_factor_dataset[-1] == len(dataset) - 1
+    assert len(
+        repeat_factor_dataset.repeat_indices) == len(repeat_factor_dataset)
+
+
+@pytest.mark.parametrize('construct_dataset', [
+    'construct_toy_multi_label_dataset', 'construct_toy_single_label_dataset'
+])
+def test_get_repeat_factors(construct_dataset):
+    construct_toy_dataset = eval(construct_dataset)
+    dataset, cat_ids_list = construct_toy_dataset(20)
+    repeat_thr = 0.2
+
+    category_freq = defaultdict(int)
+    for cat_ids in cat_ids_list:
+        for cat_id in set(cat_ids):
+            category_freq[cat_id] += 1
+    expected = [
+        max(
+            max(
+                1.0,
+                math.sqrt(repeat_thr * len(cat_ids_list) /
+                          category_freq[cat_id])) for cat_id in set(cat_ids))
+        for cat_ids in cat_ids_list
+    ]
+    # get_cat_ids is called once per sample
+    repeat_factors = get_repeat_factors(dataset, repeat_thr)
+    assert dataset.get_cat_ids.call_count == len(dataset)
+    np.testing.assert_allclose(repeat_factors, expected)
+
+    # the same factors of the wrapped datasets
+    concat_dataset = ConcatDataset([dataset, RepeatDataset(dataset, 2)])
+    np.testing.assert_allclose(
+        get_repeat_factors(concat_dataset, repeat_thr), expected * 3)
+
+
+def test_get_repeat_factors_from_labels():
+    # the labels are read at once without get_cat_ids
+    dataset = MagicMock(spec=BaseDataset)
+    gt_labels = np.array([0, 0, 0, 1, 2, 2])
+    dataset.__len__.return_value = len(gt_labels)
+    dataset.get_gt_labels.return_value = gt_labels
+    with patch.object(BaseDataset, 'get_cat_ids') as get_cat_ids:
+        type(dataset).get_cat_ids = get_cat_ids
+        repeat_factors = get_repeat_factors(dataset, 0.5)
+        get_cat_ids.assert_not_called()
+    np.testing.assert_allclose(
+        repeat_factors,
+        [1, 1, 1, math.sqrt(3),
+         math.sqrt(1.5), math.sqrt(1.5)])
+
+    multi_label = MagicMock(spec=MultiLabelDataset)
+    multi_label.__len__.return_value = 3
+    multi_label.get_gt_labels.return_value = np.array([[1, 0, -1], [1, 1, 0],
+                                                       [1, 0, 0]])
+    with patch.object(MultiLabelDataset, 'get_cat_ids') as get_cat_ids:
+        type(multi_label).get_cat_ids = get_cat_ids
+        repeat_factors = get_repeat_factors(multi_label, 1)
+        get_cat_ids.assert_not_called()
+    np.testing.assert_allclose(repeat_factors, [1, math.sqrt(3), 1])
@@ -0,0 +1,103 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from functools import partial
+
+import numpy as np
+import pytest
+import torch
+from mmcv.parallel import collate
+
+from mmcls.datasets import MultiCropDataLoader, build_dataloader
+from mmcls.datasets.pipelines import Compose
+
+
+class ExampleDataset(torch.utils.data.Dataset):
+
+    def __init__(self, num_crops):
+        self.pipeline = Compose([
+            dict(
+                type='MultiCrop',
+                num_crops=num_crops,
+                transforms=[
+                    dict(type='RandomResizedCrop', size=4),
+                    dict(type='ImageToTensor', keys=['img']),
+                ]),
+            dict(type='ToTensor', keys=['gt_label']),
+            dict(type='Collect', keys=['img', 'gt_label'])
+        ])
+
+    def __getitem__(self, idx):
+        # the images are filled by the indices to find the crops
+        img = np.full((8, 8, 3), idx, dtype=np.uint8)
+        return self.pipeline(
+            dict(img=img, gt_label=np.array(idx), filename=str(idx)))
+
+    def __len__(self):
+        return 10
+
+
+def _check_batch(batch):
+    # the crops match the labels and the metas
+    images = batch['img'][:, 0, 0, 0].long()
+    assert images.tolist() == batch['gt_label'].tolist()
+    metas = [meta['filename'] for meta in batch['img_metas'].data[0]]
+    assert metas == [str(i) for i in images.tolist()]
+
+
+def test_multi_crop_data_loader():
+    data_loader = build_dataloader(
+        ExampleDataset(num_crops=2),
+        samples_per_gpu=4,
+        workers_per_gpu=0,
+        dist=False,
+        shuffle=False,
+        multi_crop_cfg=dict(num_crops=2))
+    assert isinstance(data_loader, MultiCropDataLoader)
+    # the loaded batches have 2 images of 2 crops
+    assert data_loader.batch_size == 2
+    assert len(data_loader) == 5
+    batches = list(data_loader)
+    assert len(batches) == 5
+    for i, batch in enumerate(batches):
+        assert batch['img'].shape == (4, 3, 4, 4)
+        assert batch['gt_label'].tolist() == [
+            2 * i, 2 * i, 2 * i + 1, 2 * i + 1
+        ]
+        _check_batch(batch)
+
+    with pytest.raises(AssertionError):
+        build_dataloader(
+            ExampleDataset(num_crops=2),
+            samples_per_gpu=3,
+            workers_per_gpu=0,
+            dist=False,
+            multi_crop_cfg=dict(num_crops=2))
+
+
+def test_multi_crop_data_loader_mix_batches():
+    data_loader = MultiCropDataLoader(
+        ExampleDataset(num_crops=4),
+        batch_size=2,
+        collate_fn=partial(collate, samples_per_gpu=2),
+        num_crops=4,
+        mix_batches=4)
+    batches = list(data_loader)
+    assert len(batches) == len(data_loader) == 5
+    # the 4 crops of an image are in 4 batches
+    labels = [batch['gt_label'].tolist() for batch in batches[:4]]
+    for batch_labels in labels:
+        assert len(batch_labels) == 8
+        assert len(set(batch_labels)) == 8
+    assert sorted(sum(labels, [])) == sorted(list(range(8)) * 4)
+    # the last loaded batch is not mixed
+    assert batches[4]['gt_label'].tolist() == [8] * 4 + [9] * 4
+    for batch in batches:
+        _check_batch(batch)
+
+    # the images without multiple crops
+    data_loader = MultiCropDataLoader(
+        ExampleDataset(num_crops=2),
+        batch_size=2,
+        collate_fn=partial(collate, samples_per_gpu=2),
+        num_crops=4)
+    with pytest.raises(AssertionError):
+        next(iter(data_loader))
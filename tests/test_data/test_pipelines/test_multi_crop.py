@@ -0,0 +1,38 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import torch
+from mmcv.utils import build_from_cfg
+
+from mmcls.datasets.builder import PIPELINES
+
+
+def test_multi_crop():
+    img = np.random.randint(0, 256, (16, 20, 3), dtype=np.uint8)
+    transform = dict(
+        type='MultiCrop',
+        num_crops=3,
+        transforms=[
+            dict(type='RandomResizedCrop', size=8),
+            dict(type='RandomFlip', flip_prob=0.5),
+        ])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(dict(img=img, gt_label=np.array(1)))
+    assert results['img'].shape == (3, 8, 8, 3)
+    assert results['num_crops'] == 3
+    assert results['gt_label'] == 1
+    # the crops are augmented independently
+    assert not all(
+        np.array_equal(results['img'][0], crop) for crop in results['img'])
+    assert 'MultiCrop' in repr(transform)
+
+    # the crops of tensors are stacked into a tensor
+    transform = dict(
+        type='MultiCrop',
+        transforms=[
+            dict(type='RandomResizedCrop', size=(4, 6)),
+            dict(type='ImageToTensor', keys=['img']),
+        ])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(dict(img=img))
+    assert isinstance(results['img'], torch.Tensor)
+    assert results['img'].shape == (2, 3, 4, 6)
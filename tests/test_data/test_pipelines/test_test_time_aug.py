@@ -0,0 +1,72 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import pytest
+import torch
+from mmcv.utils import build_from_cfg
+
+from mmcls.datasets.builder import PIPELINES
+
+
+def construct_toy_data():
+    img = np.arange(4 * 6 * 3, dtype=np.uint8).reshape(4, 6, 3)
+    results = dict(img=img, img_shape=img.shape, ori_shape=img.shape)
+    return results
+
+
+def test_multi_view():
+    # test flip views
+    transform = dict(type='MultiView', transforms=[])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(construct_toy_data())
+    img = construct_toy_data()['img']
+    assert results['img'].shape == (2, 4, 6, 3)
+    assert results['num_views'] == 2
+    np.testing.assert_array_equal(results['img'][0], img)
+    np.testing.assert_array_equal(results['img'][1], img[:, ::-1])
+    assert 'MultiView' in repr(transform)
+
+    # test five crop views
+    transform = dict(
+        type='MultiView', views='five_crop', crop_size=(2, 4), transforms=[])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(construct_toy_data())
+    assert results['img'].shape == (5, 2, 4, 3)
+    assert results['img_shape'] == (2, 4, 3)
+    np.testing.assert_array_equal(results['img'][0], img[1:3, 1:5])
+    np.testing.assert_array_equal(results['img'][1], img[:2, :4])
+    np.testing.assert_array_equal(results['img'][4], img[2:, 2:])
+
+    # test ten crop views with the common transforms
+    transform = dict(
+        type='MultiView',
+        views='ten_crop',
+        crop_size=2,
+        transforms=[
+            dict(type='Normalize', mean=[0] * 3, std=[1] * 3, to_rgb=False),
+            dict(type='ImageToTensor', keys=['img'])
+        ])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(construct_toy_data())
+    assert isinstance(results['img'], torch.Tensor)
+    assert results['img'].shape == (10, 3, 2, 2)
+    assert results['num_views'] == 10
+    torch.testing.assert_close(results['img'][5], results['img'][0].flip(-1))
+
+    # test custom views
+    transform = dict(
+        type='MultiView',
+        views=[[],
+               [dict(type='RandomFlip', flip_prob=1., direction='vertical')]],
+        transforms=[])
+    transform = build_from_cfg(transform, PIPELINES)
+    results = transform(construct_toy_data())
+    np.testing.assert_array_equal(results['img'][1], img[::-1])
+
+    # test assertions
+    with pytest.raises(AssertionError):
+        build_from_cfg(
+            dict(type='MultiView', views='six_crop', transforms=[]), PIPELINES)
+    with pytest.raises(AssertionError):
+        build_from_cfg(
+            dict(type='MultiView', views='five_crop', transforms=[]),
+            PIPELINES)
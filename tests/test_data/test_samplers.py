@@ -0,0 +1,219 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from collections import Counter
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+import torch
+
+from mmcls.datasets import (ClassBalancedSampler, DistributedSampler,
+                            LossAwareSampler, build_dataloader)
+from mmcls.datasets.samplers.distributed_sampler import block_shuffle
+
+
+def construct_toy_dataset(labels):
+    dataset = MagicMock()
+    dataset.__len__.return_value = len(labels)
+    dataset.__getitem__.side_effect = lambda idx: idx
+    dataset.get_cat_ids = MagicMock(side_effect=lambda idx: [labels[idx]])
+    return dataset
+
+
+@pytest.mark.parametrize('stochastic_round', [True, False])
+def test_class_balanced_sampler(stochastic_round):
+    # 90 samples of class 0 and 10 samples of class 1, whose repeat factor
+    # is sqrt(0.5 / 0.1) = 2.236
+    labels = [0] * 90 + [1] * 10
+    dataset = construct_toy_dataset(labels)
+    sampler = ClassBalancedSampler(
+        dataset,
+        num_replicas=1,
+        rank=0,
+        oversample_thr=0.5,
+        stochastic_round=stochastic_round)
+    repeat = np.sqrt(5)
+    if stochastic_round:
+        assert len(sampler) == round(90 + 10 * repeat)
+    else:
+        assert len(sampler) == 90 + 10 * 3
+
+    sampler.set_epoch(0)
+    indices = list(sampler)
+    assert len(indices) == len(sampler)
+    counts = Counter(indices)
+    assert all(counts[i] == 1 for i in range(90) if i in counts)
+    assert all(counts[i] in (2, 3) for i in range(90, 100) if i in counts)
+    # deterministic by the epoch
+    assert list(sampler) == indices
+    sampler.set_epoch(1)
+    assert list(sampler) != indices
+
+    # the expected repeat times of the stochastic rounding is the factor
+    if stochastic_round:
+        rare = 0
+        for epoch in range(200):
+            sampler.set_epoch(epoch)
+            rare += sum(i >= 90 for i in sampler)
+        np.testing.assert_allclose(rare / 200 / 10, repeat, rtol=0.05)
+
+
+def test_class_balanced_sampler_distributed():
+    labels = [0] * 90 + [1] * 10
+    dataset = construct_toy_dataset(labels)
+    samplers = [
+        ClassBalancedSampler(
+            dataset, num_replicas=3, rank=rank, oversample_thr=0.5, seed=1)
+        for rank in range(3)
+    ]
+    indices = [list(sampler) for sampler in samplers]
+    assert all(len(x) == len(samplers[0]) for x in indices)
+    assert samplers[0].total_size == 3 * len(samplers[0])
+    assert sum(i >= 90 for x in indices for i in x) > 10
+
+    samplers = [
+        ClassBalancedSampler(
+            dataset,
+            num_replicas=3,
+            rank=rank,
+            oversample_thr=0.5,
+            stochastic_round=False,
+            round_up=False) for rank in range(3)
+    ]
+    indices = [list(sampler) for sampler in samplers]
+    assert sum(len(x) for x in indices) == 120
+    assert [len(x) for x in indices] == [len(s) for s in samplers]
+
+    # build by the config of the data loader
+    data_loader = build_dataloader(
+        dataset,
+        4,
+        0,
+        dist=False,
+        seed=0,
+        sampler_cfg=dict(
+            type='ClassBalancedSampler',
+            oversample_thr=0.5,
+            stochastic_round=False))
+    assert isinstance(data_loader.sampler, ClassBalancedSampler)
+    assert sum(len(batch) for batch in data_loader) == 120
+
+
+def test_distributed_sampler():
+    dataset = list(range(103))
+
+    # interleaved subsets of a global shuffle
+    samplers = [
+        DistributedSampler(dataset, num_replicas=4, rank=rank, seed=1)
+        for rank in range(4)
+    ]
+    indices = [list(sampler) for sampler in samplers]
+    assert all(len(x) == 26 for x in indices)
+    assert all(isinstance(i, int) for i in indices[0])
+    merged = [i for group in zip(*indices) for i in group]
+    assert sorted(merged[:103]) == dataset
+    # padded by the beginning of the shuffled indices
+    assert merged[103:] == merged[:1]
+    samplers[0].set_epoch(1)
+    assert list(samplers[0]) != indices[0]
+
+    sampler = DistributedSampler(
+        dataset, num_replicas=4, rank=3, shuffle=False, round_up=False)
+    assert list(sampler) == list(range(3, 103, 4))
+
+    # contiguous subsets of a block shuffle
+    samplers = [
+        DistributedSampler(dataset, num_replicas=4, rank=rank, block_size=8)
+        for rank in range(4)
+    ]
+    indices = [list(sampler) for sampler in samplers]
+    assert all(len(x) == 26 for x in indices)
+    merged = sum(indices, [])
+    assert sorted(merged[:103]) == dataset
+    # every block of 8 samples is contiguous
+    blocks = [i // 8 for i in merged[:103]]
+    assert sum(a != b for a, b in zip(blocks[:-1], blocks[1:])) == 12
+    assert merged[:8] != sorted(merged[:8])
+
+    sampler = DistributedSampler(
+        dataset,
+        num_replicas=4,
+        rank=3,
+        round_up=False,
+        block_size=8,
+        shuffle_in_block=False)
+    indices = list(sampler)
+    assert len(indices) == 25
+    assert all(b - a == 1 for a, b in zip(indices[:-1], indices[1:])
+               if a // 8 == b // 8)
+
+
+def test_block_shuffle():
+    g = torch.Generator()
+    g.manual_seed(0)
+    indices = block_shuffle(50, 8, g)
+    assert indices.dtype == np.int32
+    assert sorted(indices.tolist()) == list(range(50))
+    # 7 blocks, the last one has 2 indices
+    blocks = indices // 8
+    assert np.count_nonzero(blocks[1:] != blocks[:-1]) == 6
+
+
+def test_sampler_start_index():
+    dataset = list(range(20))
+    sampler = DistributedSampler(dataset, num_replicas=2, rank=1)
+    sampler.set_epoch(1)
+    indices = list(sampler)
+    sampler.set_start_index(4)
+    assert len(sampler) == 6
+    assert list(sampler) == indices[4:]
+    # the start index is kept in the same epoch and reset by a new one
+    sampler.set_epoch(1)
+    assert len(sampler) == 6
+    sampler.set_epoch(2)
+    assert len(sampler) == 10
+
+
+def test_loss_aware_sampler():
+    dataset = list(range(100))
+    sampler = LossAwareSampler(
+        dataset, num_replicas=1, rank=0, sample_ratio=0.5, uniform_ratio=0.1)
+    assert len(sampler) == 50
+    # uniform sampling without replacement in the warm-up epoch
+    sampler.set_epoch(0)
+    assert sampler.get_probs() is None
+    indices = list(sampler)
+    assert len(indices) == 50 and len(set(indices)) == 50
+    assert sampler.epoch_weights is None
+
+    # the samples of high losses are drawn more often
+    losses = np.zeros(100, dtype=np.float32)
+    losses[:10] = 1.
+    sampler.update_losses(np.arange(100), losses)
+    sampler.set_epoch(1)
+    probs = sampler.get_probs()
+    np.testing.assert_allclose(probs.sum(), 1.)
+    np.testing.assert_allclose(probs[:10], 0.9 / 10 + 0.1 / 100)
+    np.testing.assert_allclose(probs[10:], 0.1 / 100)
+    indices = np.array(list(sampler))
+    assert np.mean(indices < 10) > 0.5
+    assert list(sampler) == indices.tolist()
+    np.testing.assert_allclose(sampler.epoch_weights,
+                               1. / (100 * probs[indices]))
+
+    # the samples without losses have the mean loss
+    sampler.losses[:] = np.nan
+    sampler.update_losses(np.array([0, 1]), np.array([1., 3.]))
+    np.testing.assert_allclose(sampler.get_probs()[:3],
+                               0.9 * np.array([1., 3., 2.]) / 200 + 0.1 / 100)
+
+    # every rank draws its part of the samples
+    samplers = [
+        LossAwareSampler(dataset, num_replicas=2, rank=rank, warmup_epochs=0)
+        for rank in range(2)
+    ]
+    for sampler in samplers:
+        sampler.update_losses(np.arange(100), losses)
+    indices = [list(sampler) for sampler in samplers]
+    assert all(len(i) == 50 for i in indices)
+    samplers[0].set_start_index(20)
+    assert list(samplers[0]) == indices[0][20:]
@@ -82,3 +82,17 @@ def test_vit_backbone():
     for out in model(imgs):
         assert out[0].shape == (3, 384, 14, 14)
         assert out[1].shape == (3, 384)
+
+    # Test T2T_ViT with token pruning
+    cfg = deepcopy(cfg_ori)
+    cfg['num_layers'] = 4
+    cfg['out_indices'] = [0, -1]
+    cfg['token_pruning_cfg'] = dict(prune_layers=[1, 2], keep_ratio=0.5)
+    model = T2T_ViT(**cfg)
+    outs = model(imgs)
+    assert outs[0][0].shape == (3, 384, 14, 14)
+    patch_token, cls_token = outs[1]
+    assert patch_token.shape == (3, 384, 14, 14)
+    assert cls_token.shape == (3, 384)
+    kept = (patch_token.flatten(2) != 0).any(dim=1).sum(dim=1)
+    assert (kept == 49).all()
@@ -86,6 +86,10 @@ def test_vit_backbone():
     patch_token = model(imgs)[-1]
     assert patch_token.shape == (3, 128, 14, 14)
 
+    # Test the inputs of other sizes, e.g. in progressive resizing
+    patch_token = model(torch.randn(3, 3, 128, 160))[-1]
+    assert patch_token.shape == (3, 128, 8, 10)
+
     # Test ViT with multi out indices
     cfg = deepcopy(cfg_ori)
     cfg['out_indices'] = [-3, -2, -1]
@@ -95,6 +99,68 @@ def test_vit_backbone():
         assert out[1].shape == (3, 768)
 
 
+def test_vit_token_pruning():
+    cfg_ori = dict(
+        arch={
+            'embed_dims': 64,
+            'num_layers': 4,
+            'num_heads': 4,
+            'feedforward_channels': 128
+        },
+        img_size=96,
+        patch_size=16,
+        out_indices=[0, -1])
+    imgs = torch.randn(2, 3, 96, 96)
+
+    with pytest.raises(AssertionError):
+        # test invalid scorer
+        cfg = deepcopy(cfg_ori)
+        cfg['token_pruning_cfg'] = dict(prune_layers=[1], scorer='unknown')
+        VisionTransformer(**cfg)
+
+    # Test keeping all tokens is the same as no pruning
+    model = VisionTransformer(**cfg_ori)
+    model.init_weights()
+    model.eval()
+    cfg = deepcopy(cfg_ori)
+    cfg['token_pruning_cfg'] = dict(prune_layers=[1, 2], keep_ratio=1.0)
+    pruned_model = VisionTransformer(**cfg)
+    pruned_model.load_state_dict(model.state_dict())
+    pruned_model.eval()
+    with torch.no_grad():
+        for out, pruned_out in zip(model(imgs), pruned_model(imgs)):
+            assert torch.allclose(out[0], pruned_out[0], atol=1e-5)
+            assert torch.allclose(out[1], pruned_out[1], atol=1e-5)
+
+    # Test pruning by class token attention
+    for fuse_pruned in [True, False]:
+        cfg = deepcopy(cfg_ori)
+        cfg['token_pruning_cfg'] = dict(
+            prune_layers=[1, 2], keep_ratio=0.5, fuse_pruned=fuse_pruned)
+        model = VisionTransformer(**cfg)
+        outs = model(imgs)
+        assert outs[0][0].shape == (2, 64, 6, 6)
+        assert outs[0][1].shape == (2, 64)
+        # The dropped tokens are filled with zeros.
+        patch_token, cls_token = outs[1]
+        assert patch_token.shape == (2, 64, 6, 6)
+        assert cls_token.shape == (2, 64)
+        kept = (patch_token.flatten(2) != 0).any(dim=1).sum(dim=1)
+        assert (kept == 9).all()
+
+    # Test pruning by learned scorer
+    cfg = deepcopy(cfg_ori)
+    cfg['token_pruning_cfg'] = dict(
+        prune_layers=[1], keep_ratio=0.5, scorer='learned')
+    model = VisionTransformer(**cfg)
+    model.train()
+    patch_token, cls_token = model(imgs)[-1]
+    assert patch_token.shape == (2, 64, 6, 6)
+    cls_token.sum().backward()
+    predictor = model.token_pruner.predictors[0]
+    assert predictor[-1].weight.grad is not None
+
+
 def timm_resize_pos_embed(posemb, posemb_new, num_tokens=1, gs_new=()):
     # Timm version pos embed resize function.
     # Refers to https://github.com/rwightman/pytorch-image-models/blob/master/timm/models/vision_transformer.py # noqa:E501
@@ -2,6 +2,7 @@
 import os.path as osp
 import tempfile
 from copy import deepcopy
+from unittest.mock import patch
 
 import numpy as np
 import pytest
@@ -304,3 +305,239 @@ def test_image_classifier_return_tuple():
 
     with pytest.warns(DeprecationWarning):
         model.extract_feat(imgs)
+
+
+def test_image_classifier_aug_test():
+    model_cfg = dict(
+        type='ImageClassifier',
+        backbone=dict(
+            type='ResNet_CIFAR',
+            depth=18,
+            num_stages=4,
+            out_indices=(3, ),
+            style='pytorch'),
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(
+            type='LinearClsHead',
+            num_classes=10,
+            in_channels=512,
+            loss=dict(type='CrossEntropyLoss')))
+    imgs = torch.randn(4, 3, 3, 32, 32)
+
+    # test the mean merge by default
+    model = CLASSIFIERS.build(deepcopy(model_cfg))
+    model.eval()
+    assert model.tta_merge == 'mean'
+    with torch.no_grad():
+        pred = model(imgs, return_loss=False, img_metas=None)
+        view_preds = [
+            model(imgs[:, i], return_loss=False, img_metas=None)
+            for i in range(3)
+        ]
+    assert len(pred) == 4
+    expect = np.mean(np.array(view_preds), axis=0)
+    np.testing.assert_allclose(np.array(pred), expect, rtol=1e-4, atol=1e-6)
+
+    # test the list of views is equivalent to the stacked views
+    with torch.no_grad():
+        list_pred = model([imgs[:, i] for i in range(3)],
+                          return_loss=False,
+                          img_metas=None)
+    np.testing.assert_allclose(np.array(list_pred), np.array(pred), atol=1e-6)
+
+    # test the max merge
+    model_cfg_ = deepcopy(model_cfg)
+    model_cfg_['test_cfg'] = dict(tta_merge='max')
+    model = CLASSIFIERS.build(model_cfg_)
+    model.eval()
+    with torch.no_grad():
+        pred = model(imgs, return_loss=False, img_metas=None)
+        view_preds = [
+            model(imgs[:, i], return_loss=False, img_metas=None)
+            for i in range(3)
+        ]
+    expect = np.max(np.array(view_preds), axis=0)
+    np.testing.assert_allclose(np.array(pred), expect, rtol=1e-4, atol=1e-6)
+
+    # test the weighted merge, and the weights are saved in the state dict
+    model_cfg_ = deepcopy(model_cfg)
+    model_cfg_['test_cfg'] = dict(
+        tta_merge='weighted', num_views=3, tta_weights=[1., 0., 0.])
+    model = CLASSIFIERS.build(model_cfg_)
+    model.eval()
+    assert 'tta_logits' in model.state_dict()
+    with torch.no_grad():
+        pred = model(imgs, return_loss=False, img_metas=None)
+        first_pred = model(imgs[:, 0], return_loss=False, img_metas=None)
+    np.testing.assert_allclose(
+        np.array(pred), np.array(first_pred), rtol=1e-4, atol=1e-6)
+    with pytest.raises(AssertionError):
+        model(imgs[:, :2], return_loss=False, img_metas=None)
+
+    # test assertions of the test_cfg
+    with pytest.raises(AssertionError):
+        model_cfg_ = deepcopy(model_cfg)
+        model_cfg_['test_cfg'] = dict(tta_merge='median')
+        CLASSIFIERS.build(model_cfg_)
+    with pytest.raises(AssertionError):
+        model_cfg_ = deepcopy(model_cfg)
+        model_cfg_['test_cfg'] = dict(tta_merge='weighted')
+        CLASSIFIERS.build(model_cfg_)
+
+
+def test_cached_feature_classifier():
+    model_cfg = dict(
+        type='CachedFeatureClassifier',
+        head=dict(
+            type='LinearClsHead',
+            num_classes=10,
+            in_channels=512,
+            loss=dict(type='CrossEntropyLoss')))
+    feats = torch.randn(16, 512)
+    label = torch.randint(0, 10, (16, ))
+
+    model = CLASSIFIERS.build(model_cfg)
+    assert model.with_head and not model.with_neck
+
+    # test train_step
+    outputs = model.train_step({'img': feats, 'gt_label': label}, None)
+    assert outputs['loss'].item() > 0
+    assert outputs['num_samples'] == 16
+
+    # test forward_test
+    pred = model(feats, return_loss=False, img_metas=None)
+    assert isinstance(pred, list) and len(pred) == 16
+
+    # test the head weights are compatible with ImageClassifier
+    image_model = CLASSIFIERS.build(
+        dict(
+            type='ImageClassifier',
+            backbone=dict(
+                type='ResNet_CIFAR',
+                depth=18,
+                num_stages=4,
+                out_indices=(3, ),
+                style='pytorch'),
+            neck=dict(type='GlobalAveragePooling'),
+            head=model_cfg['head']))
+    head_state = {
+        k: v
+        for k, v in model.state_dict().items() if k.startswith('head.')
+    }
+    image_model.load_state_dict(head_state, strict=False)
+    assert torch.equal(image_model.head.fc.weight, model.head.fc.weight)
+
+    # test the mixup of the features
+    model_cfg_ = deepcopy(model_cfg)
+    model_cfg_['head']['loss'] = dict(type='CrossEntropyLoss', use_soft=True)
+    model_cfg_['train_cfg'] = dict(
+        augments=dict(type='BatchMixup', alpha=1., num_classes=10, prob=1.))
+    model = CLASSIFIERS.build(model_cfg_)
+    assert model.augments is not None
+    with patch.object(model, 'augments', wraps=model.augments) as augments:
+        losses = model.forward_train(feats, label)
+    assert augments.call_count == 1
+    assert losses['loss'].item() > 0
+
+    # the spatial and the deprecated augments are not supported
+    with pytest.raises(AssertionError):
+        model_cfg_['train_cfg'] = dict(
+            augments=dict(
+                type='BatchCutMix', alpha=1., num_classes=10, prob=1.))
+        CLASSIFIERS.build(model_cfg_)
+    with pytest.raises(AssertionError):
+        model_cfg_['train_cfg'] = dict(mixup=dict(alpha=1., num_classes=10))
+        CLASSIFIERS.build(model_cfg_)
+
+
+def test_early_exit_classifier():
+    model_cfg = dict(
+        type='EarlyExitClassifier',
+        backbone=dict(
+            type='ResNet_CIFAR',
+            depth=18,
+            num_stages=4,
+            out_indices=(1, 2, 3),
+            style='pytorch'),
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(type='LinearClsHead', num_classes=2, in_channels=512),
+        exit_heads=[
+            dict(type='LinearClsHead', num_classes=2, in_channels=128),
+            dict(type='LinearClsHead', num_classes=2, in_channels=256),
+        ],
+        exit_threshold=0.9,
+        exit_loss_weights=0.5)
+
+    imgs = torch.randn(8, 3, 32, 32)
+    label = torch.randint(0, 2, (8, ))
+
+    # test the number of exit heads
+    with pytest.raises(AssertionError):
+        model_cfg_ = deepcopy(model_cfg)
+        model_cfg_['exit_heads'] = model_cfg_['exit_heads'][:1]
+        CLASSIFIERS.build(model_cfg_)
+
+    # test unsupported backbone
+    with pytest.raises(TypeError):
+        model_cfg_ = deepcopy(model_cfg)
+        model_cfg_['backbone'] = dict(type='VGG', depth=11, out_indices=(3, ))
+        CLASSIFIERS.build(model_cfg_)
+
+    model = CLASSIFIERS.build(deepcopy(model_cfg))
+    model.init_weights()
+
+    # test train_step with joint losses
+    outputs = model.train_step({'img': imgs, 'gt_label': label}, None)
+    assert 'exit0.loss' in outputs['log_vars']
+    assert 'exit1.loss' in outputs['log_vars']
+    assert outputs['loss'].item() > 0
+
+    # test all samples go through the final head
+    model.eval()
+    model.exit_threshold = 1.
+    pred = model(imgs, return_loss=False, img_metas=None)
+    assert isinstance(pred, list) and len(pred) == 8
+    stats = model.get_exit_stats()
+    assert stats['exit_ratio'] == [0., 0., 1.]
+    assert stats['compute_saved'] == 0.
+
+    # the results match ImageClassifier when nothing exits
+    with torch.no_grad():
+        feat = model.extract_feat(imgs)
+        expect = model.head.simple_test(feat)
+    np.testing.assert_allclose(np.stack(pred), np.stack(expect), rtol=1e-5)
+
+    # test all samples exit at the first exit
+    model.reset_exit_stats()
+    model.exit_threshold = 0.5
+    with torch.no_grad():
+        pred = model(imgs, return_loss=False, img_metas=None)
+        expect = model.exit_heads[0].simple_test(feat[0])
+    assert len(pred) == 8
+    np.testing.assert_allclose(np.stack(pred), np.stack(expect), rtol=1e-5)
+    stats = model.get_exit_stats()
+    assert stats['exit_ratio'] == [1., 0., 0.]
+    assert 0 < stats['compute_saved'] < 1
+
+    # test mixed exits with the batch compaction
+    model.reset_exit_stats()
+    model.exit_threshold = 0.50001
+    with torch.no_grad():
+        pred = model(imgs, return_loss=False, img_metas=None)
+    assert len(pred) == 8
+    assert sum(model.get_exit_stats()['exit_ratio']) == pytest.approx(1.)
+
+    # test MobileNetV2 backbone
+    model = CLASSIFIERS.build(
+        dict(
+            type='EarlyExitClassifier',
+            backbone=dict(
+                type='MobileNetV2', widen_factor=0.5, out_indices=(3, 7)),
+            neck=dict(type='GlobalAveragePooling'),
+            head=dict(type='LinearClsHead', num_classes=2, in_channels=1280),
+            exit_heads=[
+                dict(type='LinearClsHead', num_classes=2, in_channels=32)
+            ]))
+    model.eval()
+    pred = model(imgs, return_loss=False, img_metas=None)
+    assert len(pred) == 8
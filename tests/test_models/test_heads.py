@@ -60,6 +60,16 @@ def test_linear_head(feat):
         pred = head.simple_test(feat)
         assert pred.shape == (4, 10)
 
+    # test simple_test without post process
+    head = LinearClsHead(10, 3)
+    pred = head.simple_test(feat, post_process=False)
+    assert isinstance(pred, torch.Tensor) and pred.shape == (4, 10)
+    torch.testing.assert_allclose(pred.sum(dim=1), torch.ones(4))
+
+    # test simple_test without softmax
+    logits = head.simple_test(feat, softmax=False, post_process=False)
+    torch.testing.assert_allclose(logits.softmax(dim=1), pred)
+
 
 @pytest.mark.parametrize('feat', [torch.rand(4, 3), (torch.rand(4, 3), )])
 def test_multilabel_head(feat):
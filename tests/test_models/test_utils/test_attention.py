@@ -1,8 +1,13 @@
 # Copyright (c) OpenMMLab. All rights reserved.
+import copy
+from unittest.mock import patch
+
 import numpy as np
 import torch
 
-from mmcls.models.utils.attention import ShiftWindowMSA, WindowMSA
+from mmcls.models.utils.attention import (MultiheadAttention, ShiftWindowMSA,
+                                          WindowMSA,
+                                          scaled_dot_product_attention)
 
 
 def get_relative_position_index(window_size):
@@ -176,3 +181,78 @@ def test_shift_window_msa():
         auto_pad=True)
     assert attn.window_size == 5
     assert attn.shift_size == 0
+
+
+def test_fused_attention():
+    embed_dims = 96
+    num_heads = 4
+
+    # test WindowMSA with and without fused attention
+    window_size = (7, 7)
+    attn = WindowMSA(
+        embed_dims=embed_dims, window_size=window_size, num_heads=num_heads)
+    attn.init_weights()
+    plain_attn = copy.deepcopy(attn)
+    plain_attn.fused_attn = False
+    inputs = torch.rand((8, window_size[0] * window_size[1], embed_dims))
+    assert torch.allclose(attn(inputs), plain_attn(inputs), atol=1e-5)
+
+    # test the relative position bias is cached in eval mode
+    attn.eval()
+    with torch.no_grad():
+        outputs = attn(inputs)
+        bias = attn.get_relative_position_bias()
+        assert attn.get_relative_position_bias() is bias
+        assert torch.allclose(outputs, plain_attn(inputs), atol=1e-5)
+    # the cache is updated if the bias table is modified
+    with torch.no_grad():
+        attn.relative_position_bias_table.add_(1.)
+        assert attn.get_relative_position_bias() is not bias
+        assert torch.allclose(attn.get_relative_position_bias(), bias + 1.)
+    # the cache isn't used in training mode
+    attn.train()
+    attn.get_relative_position_bias().sum().backward()
+    assert attn.relative_position_bias_table.grad is not None
+
+    # test ShiftWindowMSA with and without fused attention
+    input_resolution = (14, 14)
+    attn = ShiftWindowMSA(
+        embed_dims=embed_dims,
+        input_resolution=input_resolution,
+        num_heads=num_heads,
+        window_size=7,
+        shift_size=3)
+    attn.init_weights()
+    plain_attn = ShiftWindowMSA(
+        embed_dims=embed_dims,
+        input_resolution=input_resolution,
+        num_heads=num_heads,
+        window_size=7,
+        shift_size=3,
+        fused_attn=False)
+    plain_attn.load_state_dict(attn.state_dict())
+    inputs = torch.rand(
+        (2, input_resolution[0] * input_resolution[1], embed_dims))
+    assert torch.allclose(attn(inputs), plain_attn(inputs), atol=1e-5)
+    attn.eval()
+    plain_attn.eval()
+    with torch.no_grad():
+        assert torch.allclose(attn(inputs), plain_attn(inputs), atol=1e-5)
+
+    # test MultiheadAttention with and without fused attention
+    attn = MultiheadAttention(
+        embed_dims=embed_dims, num_heads=num_heads, input_dims=48)
+    plain_attn = copy.deepcopy(attn)
+    plain_attn.fused_attn = False
+    inputs = torch.rand((2, 10, 48))
+    assert torch.allclose(attn(inputs), plain_attn(inputs), atol=1e-5)
+
+    # test the implementation without the fused kernel
+    q, k, v = torch.rand((3, 2, num_heads, 10, 24))
+    mask = torch.rand((num_heads, 10, 10))
+    outputs = scaled_dot_product_attention(q, k, v, mask, scale=0.1)
+    with patch('mmcls.models.utils.attention.HAS_FUSED_ATTN', False):
+        assert torch.allclose(
+            scaled_dot_product_attention(q, k, v, mask, scale=0.1),
+            outputs,
+            atol=1e-5)
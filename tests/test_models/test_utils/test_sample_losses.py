@@ -0,0 +1,75 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import torch
+
+from mmcls.models import build_classifier
+from mmcls.models.utils import SampleLossRecorder, get_sample_loss_recorder
+
+
+def test_sample_loss_recorder():
+    recorder = SampleLossRecorder(
+        selective_backprop=True, beta=2., history_size=4)
+    assert get_sample_loss_recorder() is None
+    recorder.start()
+    assert get_sample_loss_recorder() is recorder
+
+    # only the first losses of the batch are recorded
+    recorder.reset(weights=torch.tensor([1., 2., 3.]))
+    recorder.record(torch.tensor([[1., 3.], [0., 0.], [2., 2.]]))
+    recorder.record(torch.zeros(3))
+    assert recorder.losses.tolist() == [2., 0., 2.]
+    # all the samples are selected without the history
+    assert recorder.select().all()
+    assert recorder.batch_weights().tolist() == [1., 2., 3.]
+    assert recorder.history[:3].tolist() == [2., 0., 2.]
+
+    # the samples of low losses are skipped
+    recorder.reset(weights=torch.tensor([1., 2.]))
+    recorder.record(torch.tensor([-1., 5.]))
+    assert recorder.select().tolist() == [False, True]
+    assert recorder.batch_weights().tolist() == [2.]
+    # the history is a ring buffer
+    assert recorder.num_history == 5
+    assert recorder.history.tolist() == [5., 0., 2., -1.]
+
+    recorder.stop()
+    assert get_sample_loss_recorder() is None
+
+
+def test_selective_backprop():
+    model = build_classifier(
+        dict(
+            type='ImageClassifier',
+            backbone=dict(type='LeNet5'),
+            neck=dict(type='GlobalAveragePooling'),
+            head=dict(
+                type='LinearClsHead',
+                num_classes=3,
+                in_channels=120,
+                loss=dict(type='CrossEntropyLoss'))))
+    img = torch.rand(4, 1, 32, 32)
+    gt_label = torch.tensor([0, 1, 2, 0])
+    with torch.no_grad():
+        model.eval()
+        scores = model.head.fc(model.extract_feat(img)[-1])
+        model.train()
+    per_sample = torch.nn.functional.cross_entropy(
+        scores, gt_label, reduction='none')
+
+    recorder = SampleLossRecorder(selective_backprop=True)
+    recorder.start()
+    try:
+        # the recent losses are between the two low and the two high ones
+        sorted_losses = per_sample.sort().values
+        recorder.history[:] = sorted_losses[1:3].mean()
+        recorder.num_history = len(recorder.history)
+        weights = torch.tensor([1., 2., 3., 4.])
+        recorder.reset(weights, torch.Generator().manual_seed(0))
+        losses = model.forward_train(img, gt_label)
+    finally:
+        recorder.stop()
+
+    torch.testing.assert_close(recorder.losses, per_sample)
+    keep = recorder.keep
+    assert keep.tolist() == (per_sample > sorted_losses[1]).tolist()
+    expected = (per_sample * weights)[keep].sum() / keep.sum()
+    torch.testing.assert_close(losses['loss'], expected)
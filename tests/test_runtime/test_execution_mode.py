@@ -0,0 +1,120 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+
+import mmcv
+import numpy as np
+import pytest
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+
+from mmcls.apis import init_model, single_gpu_test
+from mmcls.core import wrap_execution_mode
+from mmcls.models import build_classifier
+
+MODEL_CFG = dict(
+    type='ImageClassifier',
+    backbone=dict(
+        type='ResNet_CIFAR',
+        depth=18,
+        num_stages=4,
+        out_indices=(3, ),
+        style='pytorch'),
+    neck=dict(type='GlobalAveragePooling'),
+    head=dict(
+        type='LinearClsHead',
+        num_classes=10,
+        in_channels=512,
+        loss=dict(type='CrossEntropyLoss')))
+
+
+def test_wrap_execution_mode():
+    model = build_classifier(MODEL_CFG)
+    model.eval()
+    imgs = torch.randn(4, 3, 32, 32)
+    with torch.no_grad():
+        expect = model(imgs, return_loss=False, img_metas=None)
+
+    # test channels last
+    wrap_execution_mode(model, memory_format='channels_last')
+    conv_weight = model.backbone.conv1.weight
+    assert conv_weight.is_contiguous(memory_format=torch.channels_last)
+    with torch.no_grad():
+        feats = model.extract_feat(imgs)
+        pred = model(imgs, return_loss=False, img_metas=None)
+    assert feats[0].dtype == torch.float
+    np.testing.assert_allclose(pred, expect, rtol=1e-4, atol=1e-5)
+
+    # test the bf16 autocast, which replaces the previous mode
+    wrap_execution_mode(model, 'channels_last', 'bf16')
+    norm_outputs = []
+    model.backbone.bn1.register_forward_hook(
+        lambda m, inputs, output: norm_outputs.append(output))
+    with torch.no_grad():
+        feats = model.extract_feat(imgs)
+        pred = model(imgs, return_loss=False, img_metas=None)
+    # the features are converted to fp32 for the head
+    assert feats[0].dtype == torch.float
+    # the norm layers run in fp32, and keep the dtype of the inputs
+    assert norm_outputs[0].dtype == torch.bfloat16
+    assert model.backbone.bn1.weight.dtype == torch.float
+    assert len(pred) == 4
+    np.testing.assert_allclose(np.array(pred), expect, atol=0.05)
+
+    # test training under the autocast
+    model.train()
+    label = torch.randint(0, 10, (4, ))
+    outputs = model.train_step({'img': imgs, 'gt_label': label}, None)
+    assert outputs['loss'].dtype == torch.float
+    outputs['loss'].backward()
+    assert model.backbone.conv1.weight.grad.dtype == torch.float
+
+    # test the module wrapper
+    model = build_classifier(MODEL_CFG)
+    wrapped = mmcv.parallel.MMDataParallel(model)
+    assert wrap_execution_mode(wrapped, autocast='bf16') is wrapped
+    assert model.autocast_dtype == torch.bfloat16
+    assert isinstance(model.backbone.bn1, nn.BatchNorm2d)
+
+    # the copies of the model run on their own weights
+    model.eval()
+    model_copy = copy.deepcopy(model)
+    for param in model_copy.parameters():
+        param.data.zero_()
+    with torch.no_grad():
+        feats = model.extract_feat(imgs)[0]
+        copy_feats = model_copy.extract_feat(imgs)[0]
+    assert feats.abs().sum() > 0
+    assert copy_feats.abs().sum() == 0
+    assert model_copy.autocast_dtype == torch.bfloat16
+
+    with pytest.raises(AssertionError):
+        wrap_execution_mode(model, memory_format='channels_first')
+    with pytest.raises(AssertionError):
+        wrap_execution_mode(model, autocast='int8')
+
+
+def test_init_model_execution_mode():
+    cfg = mmcv.Config(
+        dict(
+            model=MODEL_CFG,
+            runtime=dict(memory_format='channels_last', autocast='bf16')))
+    model = init_model(cfg, device='cpu')
+    conv_weight = model.backbone.conv1.weight
+    assert conv_weight.is_contiguous(memory_format=torch.channels_last)
+    with torch.no_grad():
+        pred = model(torch.randn(2, 3, 32, 32), return_loss=False)
+    assert len(pred) == 2
+
+
+def test_single_gpu_test_execution_mode():
+    model = build_classifier(MODEL_CFG)
+    data_loader = DataLoader(
+        [dict(img=torch.randn(3, 32, 32))] * 4, batch_size=2)
+    results = single_gpu_test(
+        model,
+        data_loader,
+        runtime_cfg=dict(memory_format='channels_last', autocast='bf16'))
+    assert len(results) == 4
+    conv_weight = model.backbone.conv1.weight
+    assert conv_weight.is_contiguous(memory_format=torch.channels_last)
@@ -0,0 +1,155 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import os.path as osp
+import tempfile
+from types import SimpleNamespace
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+from mmcv.runner import LogBuffer
+
+from mmcls.core import (BF16Compressor, DistOptimizerHook, FP16Compressor,
+                        PowerSGDCompressor, TopKCompressor, allreduce_grads,
+                        build_grad_compressor)
+
+WORLD_SIZE = 2
+
+
+def _grads(rank):
+    g = torch.Generator().manual_seed(rank)
+    return [torch.randn(4, 6, generator=g), torch.randn(6, generator=g)]
+
+
+def _mean_grads():
+    grads = [_grads(rank) for rank in range(WORLD_SIZE)]
+    return [sum(tensors) / WORLD_SIZE for tensors in zip(*grads)]
+
+
+def _params(rank):
+    params = [nn.Parameter(torch.zeros_like(grad)) for grad in _grads(rank)]
+    for param, grad in zip(params, _grads(rank)):
+        param.grad = grad
+    return params
+
+
+def _check_compressors(rank):
+    mean = _mean_grads()
+
+    for compressor, tol in [(FP16Compressor(), 1e-3),
+                            (BF16Compressor(), 3e-2)]:
+        params = _params(rank)
+        allreduce_grads(params, compressor=compressor)
+        for param, expected in zip(params, mean):
+            torch.testing.assert_close(
+                param.grad, expected, atol=tol, rtol=tol)
+        assert compressor.stats['sent_bytes'] * 2 == \
+            compressor.stats['raw_bytes']
+
+    # PowerSGD of the full rank is exact
+    compressor = PowerSGDCompressor(rank=4, min_compression_rate=0)
+    params = _params(rank)
+    allreduce_grads(params, compressor=compressor)
+    for param, expected in zip(params, mean):
+        torch.testing.assert_close(param.grad, expected)
+    # the error of the low-rank approximation is fed back
+    compressor = PowerSGDCompressor(rank=1, min_compression_rate=0)
+    params = _params(rank)
+    allreduce_grads(params, coalesce=False, compressor=compressor)
+    approx = params[0].grad.clone()
+    assert torch.linalg.matrix_rank(approx) == 1
+    torch.testing.assert_close(params[1].grad, mean[1])
+    error = compressor.errors[(0, 0)]
+    torch.testing.assert_close(error + approx, _grads(rank)[0])
+    assert compressor.stats['sent_bytes'] < compressor.stats['raw_bytes']
+    # the states are reset when the bucket of the key holds another shape
+    compressor = PowerSGDCompressor(rank=4)
+    compressor.allreduce([torch.randn(16, 32)], WORLD_SIZE, key=0)
+    compressor.allreduce([torch.randn(24, 32)], WORLD_SIZE, key=0)
+    assert compressor.qs[(0, 0)].shape == (32, 4)
+    assert compressor.errors[(0, 0)].shape == (24, 32)
+
+    # top-k of all the gradients is exact
+    compressor = TopKCompressor(ratio=1.)
+    params = _params(rank)
+    allreduce_grads(params, compressor=compressor)
+    for param, expected in zip(params, mean):
+        torch.testing.assert_close(param.grad, expected)
+    # the gradients of the largest magnitudes of every rank are sent
+    compressor = TopKCompressor(ratio=0.1)
+    params = _params(rank)
+    allreduce_grads(params, compressor=compressor)
+    expected = torch.zeros(30)
+    for r in range(WORLD_SIZE):
+        flat = torch.cat([grad.flatten() for grad in _grads(r)])
+        indices = flat.abs().topk(3)[1]
+        expected[indices] += flat[indices] / WORLD_SIZE
+    synced = torch.cat([param.grad.flatten() for param in params])
+    torch.testing.assert_close(synced, expected)
+    # the others are kept as the error
+    flat = torch.cat([grad.flatten() for grad in _grads(rank)])
+    indices = flat.abs().topk(3)[1]
+    flat[indices] = 0
+    torch.testing.assert_close(compressor.errors[0], flat)
+
+
+def _check_ddp_hook(rank):
+    torch.manual_seed(0)
+    model = nn.Linear(8, 4)
+    inputs = [torch.randn(2, 8) for _ in range(WORLD_SIZE)]
+    # the mean of the gradients of all ranks
+    expected = []
+    for r in range(WORLD_SIZE):
+        local = copy.deepcopy(model)
+        local(inputs[r]).sum().backward()
+        expected.append([p.grad for p in local.parameters()])
+    expected = [sum(grads) / WORLD_SIZE for grads in zip(*expected)]
+
+    ddp = nn.parallel.DistributedDataParallel(model)
+    hook = DistOptimizerHook(compression=dict(type='FP16Compressor'))
+    runner = SimpleNamespace(
+        model=ddp,
+        optimizer=torch.optim.SGD(ddp.parameters(), lr=0.),
+        log_buffer=LogBuffer())
+    hook.before_run(runner)
+    runner.outputs = dict(loss=ddp(inputs[rank]).sum())
+    hook.after_train_iter(runner)
+    for param, grad in zip(model.parameters(), expected):
+        torch.testing.assert_close(param.grad, grad, atol=1e-3, rtol=1e-3)
+    history = runner.log_buffer.val_history
+    assert history['compress_ratio'] == [2.]
+    assert history['comm_mb'][0] * 2**20 == (8 * 4 + 4) * 2
+    assert history['comm_time'][0] > 0
+    assert hook.compressor.stats['raw_bytes'] == 0
+
+
+def _worker(rank, init_file):
+    dist.init_process_group(
+        'gloo',
+        init_method=f'file://{init_file}',
+        rank=rank,
+        world_size=WORLD_SIZE)
+    try:
+        _check_compressors(rank)
+        _check_ddp_hook(rank)
+    finally:
+        dist.destroy_process_group()
+
+
+def test_grad_compression_gloo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mp.spawn(
+            _worker,
+            args=(osp.join(tmpdir, 'init'), ),
+            nprocs=WORLD_SIZE,
+            join=True)
+
+
+def test_build_grad_compressor():
+    compressor = build_grad_compressor(dict(type='PowerSGDCompressor', rank=4))
+    assert isinstance(compressor, PowerSGDCompressor)
+    assert compressor.rank == 4
+    with pytest.raises(AssertionError):
+        TopKCompressor(ratio=0)
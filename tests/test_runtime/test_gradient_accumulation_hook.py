@@ -0,0 +1,99 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import logging
+import tempfile
+
+import torch
+import torch.nn as nn
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import EpochBasedRunner, Hook, OptimizerHook
+from torch.utils.data import DataLoader, Dataset
+
+from mmcls.core import GradientAccumulationOptimizerHook
+
+
+class ExampleDataset(Dataset):
+
+    def __init__(self):
+        self.imgs = torch.rand(
+            10, 4, generator=torch.Generator().manual_seed(0))
+
+    def __getitem__(self, idx):
+        return dict(img=self.imgs[idx], gt_label=torch.tensor(idx % 2))
+
+    def __len__(self):
+        return 10
+
+
+class ExampleModel(nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Linear(4, 2)
+
+    def train_step(self, data_batch, optimizer):
+        loss = nn.functional.cross_entropy(
+            self.fc(data_batch['img']), data_batch['gt_label'])
+        return dict(
+            loss=loss,
+            log_vars=dict(loss=loss.item()),
+            num_samples=len(data_batch['img']))
+
+
+class GradSyncRecorder(Hook):
+
+    def __init__(self):
+        self.records = []
+
+    def before_train_iter(self, runner):
+        self.records.append(runner.model.require_backward_grad_sync)
+
+
+def _train(batch_size, optimizer_hook, lr_config=None, max_epochs=2):
+    torch.manual_seed(0)
+    model = ExampleModel()
+    data_loader = DataLoader(ExampleDataset(), batch_size=batch_size)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runner = EpochBasedRunner(
+            model=MMDataParallel(model),
+            optimizer=torch.optim.SGD(
+                model.parameters(), lr=0.1, momentum=0.9),
+            work_dir=tmpdir,
+            logger=logging.getLogger(),
+            max_epochs=max_epochs)
+        # simulate the gradient synchronization flag of DDP
+        runner.model.require_backward_grad_sync = True
+        recorder = GradSyncRecorder()
+        runner.register_training_hooks(
+            lr_config=lr_config, optimizer_config=optimizer_hook)
+        runner.register_hook(recorder, priority='LOW')
+        runner.run([data_loader], [('train', 1)])
+    return model, runner, recorder.records
+
+
+def test_gradient_accumulation_optimizer_hook():
+    # 8 + 2 samples per epoch
+    model, _, _ = _train(8, OptimizerHook())
+    # 4 + 1 iterations per epoch
+    acc_model, _, records = _train(
+        2, GradientAccumulationOptimizerHook(cumulative_iters=4))
+    torch.testing.assert_close(acc_model.fc.weight, model.fc.weight)
+    torch.testing.assert_close(acc_model.fc.bias, model.fc.bias)
+    # the gradients are only synchronized by the last iteration
+    assert records == [False, False, False, True, True] * 2
+
+    # the warmup iterations are counted by the large batches
+    _, runner, _ = _train(
+        2,
+        GradientAccumulationOptimizerHook(cumulative_iters=4),
+        lr_config=dict(
+            policy='step', step=[1], warmup='linear', warmup_iters=2),
+        max_epochs=1)
+    assert runner.hooks[0].warmup_iters == 8
+    _, runner, _ = _train(
+        2,
+        GradientAccumulationOptimizerHook(
+            cumulative_iters=4, scale_lr_schedule=False),
+        lr_config=dict(
+            policy='step', step=[1], warmup='linear', warmup_iters=2),
+        max_epochs=1)
+    assert runner.hooks[0].warmup_iters == 2
@@ -0,0 +1,87 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import glob
+import json
+import logging
+import os.path as osp
+import tempfile
+
+import mmcv
+import torch
+import torch.nn as nn
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import EpochBasedRunner
+from torch.utils.data import DataLoader, Dataset
+
+from mmcls.core import HotPathTimingHook, hot_path_phase
+
+
+class ExampleDataset(Dataset):
+
+    def __getitem__(self, idx):
+        return dict(img=torch.rand(4), gt_label=torch.tensor(idx % 2))
+
+    def __len__(self):
+        return 8
+
+
+class ExampleModel(nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Linear(4, 2)
+
+    def train_step(self, data_batch, optimizer):
+        loss = nn.functional.cross_entropy(
+            self.fc(data_batch['img']), data_batch['gt_label'])
+        with hot_path_phase('allreduce'):
+            pass
+        return dict(
+            loss=loss,
+            log_vars=dict(loss=loss.item()),
+            num_samples=len(data_batch['img']))
+
+
+def test_hot_path_timing_hook():
+    # hot_path_phase does nothing without a running hook
+    with hot_path_phase('allreduce'):
+        pass
+
+    model = ExampleModel()
+    data_loader = DataLoader(
+        ExampleDataset(), batch_size=2, num_workers=2, persistent_workers=True)
+    optimizer = torch.optim.SGD(model.parameters(), lr=0.01)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runner = EpochBasedRunner(
+            model=MMDataParallel(model),
+            optimizer=optimizer,
+            work_dir=tmpdir,
+            logger=logging.getLogger(),
+            max_epochs=2)
+        runner.register_training_hooks(
+            lr_config=None,
+            optimizer_config=dict(grad_clip=None),
+            log_config=dict(interval=2, hooks=[dict(type='TextLoggerHook')]))
+        hook = HotPathTimingHook(percentiles=(50, 99), trace_iters=(1, 3))
+        runner.register_hook(hook, priority='LOW')
+        runner.run([data_loader], [('train', 1)])
+
+        log = mmcv.list_from_file(glob.glob(osp.join(tmpdir, '*.log.json'))[0])
+        records = [json.loads(line) for line in log]
+        records = [r for r in records if r.get('mode') == 'train']
+        assert len(records) == 4
+        for record in records:
+            for phase in HotPathTimingHook.PHASES:
+                assert f'{phase}_time_p50' in record
+                assert f'{phase}_time_p99' in record
+                assert record[f'{phase}_time_p50'] >= 0
+            assert 0 <= record['queue_occupancy'] <= 1
+            assert 0 <= record['queue_empty_ratio'] <= 1
+            assert len(record['worker_latency_p50']) == 2
+        assert osp.exists(osp.join(tmpdir, 'trace_rank0_iter1-3.json'))
+
+    # the patched methods are restored after running
+    assert 'train_step' not in vars(model)
+    assert 'step' not in vars(optimizer)
+    assert data_loader.worker_init_fn is None
+    with hot_path_phase('allreduce'):
+        pass
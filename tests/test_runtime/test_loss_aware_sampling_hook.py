@@ -0,0 +1,116 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import logging
+import tempfile
+
+import mmcv
+import numpy as np
+import pytest
+import torch
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import DistSamplerSeedHook, EpochBasedRunner
+from torch.utils.data import DataLoader, Dataset
+
+from mmcls.core import LossAwareSamplingHook
+from mmcls.datasets import LossAwareSampler
+from mmcls.models import build_classifier
+from mmcls.models.utils import get_sample_loss_recorder
+
+
+class ExampleDataset(Dataset):
+
+    def __getitem__(self, idx):
+        g = torch.Generator().manual_seed(idx)
+        return dict(
+            img=torch.rand(1, 32, 32, generator=g),
+            gt_label=torch.tensor(idx % 3))
+
+    def __len__(self):
+        return 16
+
+
+def _run(selective_backprop):
+    model = build_classifier(
+        dict(
+            type='ImageClassifier',
+            backbone=dict(type='LeNet5'),
+            neck=dict(type='GlobalAveragePooling'),
+            head=dict(
+                type='LinearClsHead',
+                num_classes=3,
+                in_channels=120,
+                loss=dict(type='CrossEntropyLoss'))))
+    dataset = ExampleDataset()
+    sampler = LossAwareSampler(
+        dataset, num_replicas=1, rank=0, sample_ratio=0.5)
+    data_loader = DataLoader(dataset, batch_size=4, sampler=sampler)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runner = EpochBasedRunner(
+            model=MMDataParallel(model),
+            optimizer=torch.optim.SGD(model.parameters(), lr=0.01),
+            work_dir=tmpdir,
+            logger=logging.getLogger(),
+            max_epochs=3,
+            meta=dict())
+        runner.register_training_hooks(
+            lr_config=None, optimizer_config=dict(grad_clip=None))
+        runner.register_hook(DistSamplerSeedHook())
+        hook = LossAwareSamplingHook(selective_backprop=selective_backprop)
+        runner.register_hook(hook)
+
+        losses = []
+        train_step = model.train_step
+
+        def _train_step(data, optimizer):
+            # the weights of the batch from the sampler
+            weights = hook.recorder.weights
+            if sampler.epoch_weights is not None:
+                start = runner.inner_iter * 4
+                np.testing.assert_allclose(
+                    weights.numpy(), sampler.epoch_weights[start:start + 4])
+            else:
+                assert weights is None
+            outputs = train_step(data, optimizer)
+            losses.append(hook.recorder.losses)
+            return outputs
+
+        model.train_step = _train_step
+        runner.run([data_loader], [('train', 1)])
+    return runner, hook, sampler, losses
+
+
+def test_loss_aware_sampling_hook():
+    runner, hook, sampler, losses = _run(selective_backprop=False)
+    assert runner.iter == 6
+    # the losses of the whole batches are recorded
+    assert all(loss is not None and len(loss) == 4 for loss in losses)
+    # the losses of the warm-up epoch are updated into the sampler
+    assert np.count_nonzero(~np.isnan(sampler.losses)) >= 8
+    assert sampler.epoch_weights is not None
+    assert runner.meta['hook_msgs']['train_time'] == hook.train_time > 0
+    assert get_sample_loss_recorder() is None
+
+
+def test_loss_aware_sampling_hook_selective_backprop():
+    runner, hook, sampler, losses = _run(selective_backprop=True)
+    assert runner.iter == 6
+    assert hook.recorder.num_history == 24
+    assert 'backprop_ratio' in runner.log_buffer.val_history
+    ratios = runner.log_buffer.val_history['backprop_ratio']
+    assert all(0 < ratio <= 1 for ratio in ratios)
+    assert all(len(loss) == 4 for loss in losses)
+
+
+def test_loss_aware_sampler_incompatible_loaders():
+    from mmcls.apis import train_model
+
+    for key, value in [('echo', dict(echo_factor=2)),
+                       ('multi_crop', dict(num_crops=2))]:
+        cfg = mmcv.Config(
+            dict(
+                data=dict(
+                    samples_per_gpu=2,
+                    workers_per_gpu=0,
+                    sampler=dict(type='LossAwareSampler'),
+                    **{key: value})))
+        with pytest.raises(AssertionError):
+            train_model(None, None, cfg, device='cpu')
@@ -0,0 +1,92 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import logging
+import os.path as osp
+import tempfile
+
+import torch
+import torch.nn as nn
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import DistSamplerSeedHook, EpochBasedRunner
+
+from mmcls.core import MidEpochCheckpointHook
+from mmcls.datasets import build_dataloader
+
+
+class ExampleDataset:
+
+    def __init__(self):
+        self.loaded = []
+
+    def __getitem__(self, idx):
+        self.loaded.append(idx)
+        # the random augmentation
+        return dict(img=torch.rand(4), gt_label=torch.tensor(idx % 2))
+
+    def __len__(self):
+        return 10
+
+
+class ExampleModel(nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Linear(4, 2)
+
+    def train_step(self, data_batch, optimizer):
+        loss = nn.functional.cross_entropy(
+            self.fc(data_batch['img']), data_batch['gt_label'])
+        return dict(
+            loss=loss,
+            log_vars=dict(loss=loss.item()),
+            num_samples=len(data_batch['img']))
+
+
+def _train(work_dir, resume_from=None):
+    torch.manual_seed(0)
+    model = ExampleModel()
+    dataset = ExampleDataset()
+    data_loader = build_dataloader(
+        dataset,
+        2,
+        0,
+        dist=False,
+        seed=0,
+        sampler_cfg=dict(type='DistributedSampler'))
+    runner = EpochBasedRunner(
+        model=MMDataParallel(model),
+        optimizer=torch.optim.SGD(model.parameters(), lr=0.1, momentum=0.9),
+        work_dir=work_dir,
+        logger=logging.getLogger(),
+        max_epochs=2)
+    runner.register_training_hooks(
+        lr_config=None,
+        optimizer_config=dict(grad_clip=None),
+        checkpoint_config=dict(interval=1))
+    runner.register_hook(DistSamplerSeedHook())
+    runner.register_hook(MidEpochCheckpointHook(interval=3, max_keep_ckpts=2))
+    if resume_from is not None:
+        runner.resume(resume_from)
+    runner.run([data_loader], [('train', 1)])
+    return dataset.loaded, model
+
+
+def test_mid_epoch_checkpoint_hook():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        loaded, model = _train(tmpdir)
+        assert len(loaded) == 20
+        # 5 iterations per epoch, the older checkpoints are removed
+        assert not osp.exists(osp.join(tmpdir, 'iter_3.pth'))
+        ckpt = torch.load(osp.join(tmpdir, 'iter_6.pth'))
+        state = ckpt['meta']['resume_state']
+        assert state['epoch'] == 1 and state['iter'] == 6
+        assert state['sample_index'] == 2
+        assert set(state['rng']) >= {'python', 'numpy', 'torch'}
+
+        # the consumed samples are skipped without loading them, and the
+        # random states are restored
+        resumed, resumed_model = _train(
+            tmpdir, resume_from=osp.join(tmpdir, 'iter_6.pth'))
+        assert resumed == loaded[12:]
+        torch.testing.assert_close(resumed_model.fc.weight, model.fc.weight)
+        assert 'resume_state' not in torch.load(
+            osp.join(tmpdir, 'epoch_2.pth'))['meta']
@@ -0,0 +1,219 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import importlib.util
+import os.path as osp
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+import mmcv
+import numpy as np
+import pytest
+import torch
+
+from mmcls.models import build_classifier
+
+pytest.importorskip('onnxruntime')
+pytest.importorskip('onnx')
+
+MEAN = [123.675, 116.28, 103.53]
+STD = [58.395, 57.12, 57.375]
+
+
+def _load_tool(name):
+    path = osp.join(
+        osp.dirname(__file__), '../../tools/deployment', f'{name}.py')
+    spec = importlib.util.spec_from_file_location(f'deployment_{name}', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _model_cfg():
+    return dict(
+        type='ImageClassifier',
+        backbone=dict(
+            type='ResNet_CIFAR',
+            depth=18,
+            num_stages=4,
+            out_indices=(3, ),
+            style='pytorch'),
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(type='LinearClsHead', num_classes=4, in_channels=512))
+
+
+def _build_model():
+    torch.manual_seed(0)
+    model = build_classifier(_model_cfg())
+    model.init_weights()
+    return model.eval()
+
+
+def _export(tmpdir):
+    """Export a tiny classifier with a dynamic batch axis, the same as
+    ``--dynamic-batch`` of ``tools/deployment/pytorch2onnx.py``."""
+    model = _build_model()
+    onnx_file = osp.join(tmpdir, 'model.onnx')
+    origin_forward = model.forward
+    model.forward = lambda img: origin_forward(img, return_loss=False)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            torch.rand(1, 3, 32, 32),
+            onnx_file,
+            input_names=['input'],
+            output_names=['probs'],
+            keep_initializers_as_inputs=True,
+            dynamic_axes={
+                'input': {
+                    0: 'batch'
+                },
+                'probs': {
+                    0: 'batch'
+                }
+            },
+            opset_version=11)
+    model.forward = origin_forward
+    return model, onnx_file
+
+
+def _pytorch_scores(model, imgs):
+    with torch.no_grad():
+        return np.stack(
+            model(
+                torch.from_numpy(np.ascontiguousarray(imgs)),
+                return_loss=False))
+
+
+def test_pytorch2onnx_dynamic_batch():
+    # the ONNX symbolics of mmcv don't support all PyTorch versions
+    pytest.importorskip('mmcv.onnx')
+    import onnx
+
+    from mmcls.core.export import ONNXRuntimeEngine
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model = _build_model()
+        onnx_file = osp.join(tmpdir, 'model.onnx')
+        _load_tool('pytorch2onnx').pytorch2onnx(
+            model, (1, 3, 32, 32),
+            dynamic_batch=True,
+            output_file=onnx_file,
+            verify=True)
+        input_shape = onnx.load(onnx_file).graph.input[0].type.tensor_type
+        dims = [d.dim_param or d.dim_value for d in input_shape.shape.dim]
+        assert dims == ['batch', 3, 32, 32]
+
+        imgs = np.random.rand(5, 3, 32, 32).astype(np.float32)
+        np.testing.assert_allclose(
+            ONNXRuntimeEngine(onnx_file)(imgs),
+            _pytorch_scores(model, imgs),
+            atol=1e-5)
+
+
+def test_onnxruntime_engine():
+    from mmcls.core.export import ONNXRuntimeEngine
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        model, onnx_file = _export(tmpdir)
+        rng = np.random.RandomState(0)
+
+        # float32 images, split into chunks of max_batch_size
+        engine = ONNXRuntimeEngine(
+            onnx_file,
+            num_sessions=2,
+            intra_op_num_threads=1,
+            max_batch_size=3)
+        imgs = rng.randn(5, 3, 32, 32).astype(np.float32)
+        expected = _pytorch_scores(model, imgs)
+        scores = engine(imgs)
+        assert scores.shape == (5, 4)
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+        # the results are not overwritten by the reused buffers
+        np.testing.assert_allclose(engine(imgs[:2]), expected[:2], atol=1e-5)
+        np.testing.assert_allclose(scores, expected, atol=1e-5)
+        np.testing.assert_allclose(
+            engine(torch.from_numpy(imgs)), expected, atol=1e-5)
+
+        # concurrent calls share the pool of sessions
+        batches = [
+            rng.randn(4, 3, 32, 32).astype(np.float32) for _ in range(6)
+        ]
+        with ThreadPoolExecutor(4) as executor:
+            results = list(executor.map(engine, batches))
+        for batch, result in zip(batches, results):
+            np.testing.assert_allclose(
+                result, _pytorch_scores(model, batch), atol=1e-5)
+
+        # uint8 BGR images are normalized in the input buffer
+        imgs = rng.randint(0, 256, (5, 3, 32, 32)).astype(np.uint8)
+        normalized = (imgs[:, ::-1].astype(np.float32) -
+                      np.array(MEAN, dtype=np.float32)[:, None, None]) / \
+            np.array(STD, dtype=np.float32)[:, None, None]
+        expected = _pytorch_scores(model, normalized)
+        engine = ONNXRuntimeEngine(
+            onnx_file, max_batch_size=2, mean=MEAN, std=STD, to_rgb=True)
+        np.testing.assert_allclose(engine(imgs), expected, atol=1e-5)
+
+        with pytest.raises(AssertionError):
+            ONNXRuntimeEngine(onnx_file)(imgs)
+        with pytest.raises(AssertionError):
+            ONNXRuntimeEngine(onnx_file, graph_optimization_level='unknown')
+
+
+def test_deployment_test_tool():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        _, onnx_file = _export(tmpdir)
+        for i, folder in enumerate(['a', 'b', 'b', 'c', 'd']):
+            mmcv.mkdir_or_exist(f'{tmpdir}/imgs/{folder}')
+            shutil.copy('tests/data/color.jpg',
+                        f'{tmpdir}/imgs/{folder}/{i}.jpg')
+        cfg_file = osp.join(tmpdir, 'config.py')
+        cfg = mmcv.Config(
+            dict(
+                model=_model_cfg(),
+                data=dict(
+                    samples_per_gpu=2,
+                    workers_per_gpu=0,
+                    test=dict(
+                        type='ImageNet',
+                        data_prefix=f'{tmpdir}/imgs',
+                        classes=['a', 'b', 'c', 'd'],
+                        pipeline=[
+                            dict(type='LoadImageFromFile'),
+                            dict(type='Resize', size=(32, 32)),
+                            dict(
+                                type='Normalize',
+                                mean=MEAN,
+                                std=STD,
+                                to_rgb=True),
+                            dict(type='ImageToTensor', keys=['img']),
+                            dict(type='Collect', keys=['img'])
+                        ]))))
+        with open(cfg_file, 'w') as f:
+            f.write(cfg.pretty_text)
+
+        tool = _load_tool('test')
+        outputs = {}
+        for name, extra_args in [
+            ('plain', []),
+            ('engine', ['--engine-cfg', 'num_sessions=2']),
+            ('uint8', ['--engine-cfg', 'max_batch_size=1', '--uint8-input']),
+        ]:
+            out_file = osp.join(tmpdir, f'{name}.pkl')
+            argv = [
+                'test.py', cfg_file, onnx_file, '--backend', 'onnxruntime',
+                '--out', out_file
+            ] + extra_args
+            with patch('sys.argv', argv):
+                tool.main()
+            outputs[name] = mmcv.load(out_file)
+
+        assert len(outputs['plain']['pred_score']) == 5
+        for name in ['engine', 'uint8']:
+            np.testing.assert_allclose(
+                outputs[name]['pred_score'],
+                outputs['plain']['pred_score'],
+                atol=1e-5)
+            np.testing.assert_equal(outputs[name]['pred_label'],
+                                    outputs['plain']['pred_label'])
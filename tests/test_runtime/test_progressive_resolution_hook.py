@@ -0,0 +1,84 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import logging
+import tempfile
+
+import numpy as np
+import torch
+import torch.nn as nn
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import EpochBasedRunner
+from torch.utils.data import DataLoader, Dataset
+
+from mmcls.core import ProgressiveResolutionHook
+from mmcls.datasets.pipelines import (Compose, get_progressive_size,
+                                      set_progressive_size)
+
+
+class ExampleDataset(Dataset):
+
+    def __init__(self):
+        self.pipeline = Compose([
+            dict(type='ProgressiveRandomResizedCrop', size=32),
+            dict(type='ImageToTensor', keys=['img']),
+        ])
+
+    def __getitem__(self, idx):
+        img = np.random.randint(0, 256, (40, 48, 3), dtype=np.uint8)
+        return self.pipeline(dict(img=img))
+
+    def __len__(self):
+        return 12
+
+
+class ExampleModel(nn.Module):
+
+    def __init__(self):
+        super().__init__()
+        self.fc = nn.Linear(3, 2)
+        self.shapes = []
+
+    def train_step(self, data_batch, optimizer):
+        self.shapes.append(tuple(data_batch['img'].shape))
+        feat = data_batch['img'].float().mean(dim=(2, 3))
+        loss = self.fc(feat).mean()
+        return dict(
+            loss=loss, log_vars=dict(loss=loss.item()), num_samples=len(feat))
+
+
+def test_progressive_transforms():
+    dataset = ExampleDataset()
+    assert dataset[0]['img'].shape == (3, 32, 32)
+    set_progressive_size((16, 24))
+    assert dataset[0]['img'].shape == (3, 16, 24)
+    set_progressive_size(None)
+    assert get_progressive_size().tolist() == [0, 0]
+    assert dataset[0]['img'].shape == (3, 32, 32)
+
+
+def test_progressive_resolution_hook():
+    model = ExampleModel()
+    # the size is changed in the persistent workers
+    data_loader = DataLoader(
+        ExampleDataset(), batch_size=4, num_workers=1, persistent_workers=True)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        runner = EpochBasedRunner(
+            model=MMDataParallel(model),
+            optimizer=torch.optim.SGD(model.parameters(), lr=0.01),
+            work_dir=tmpdir,
+            logger=logging.getLogger(),
+            max_epochs=3)
+        runner.register_training_hooks(
+            lr_config=None, optimizer_config=dict(grad_clip=None))
+        runner.register_hook(
+            ProgressiveResolutionHook(schedule=[
+                dict(epoch=0, size=16, batch_size=6),
+                dict(epoch=1, size=24),
+                dict(epoch=2, size=32, batch_size=3),
+            ]))
+        runner.run([data_loader], [('train', 1)])
+
+    assert model.shapes == [(6, 3, 16, 16)] * 2 + [(6, 3, 24, 24)] * 2 + \
+        [(3, 3, 32, 32)] * 4
+    assert runner.max_iters == runner.iter == 8
+    # the size of the config is used after training
+    assert get_progressive_size().tolist() == [0, 0]
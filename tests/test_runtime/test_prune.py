@@ -0,0 +1,116 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+from copy import deepcopy
+
+import pytest
+import torch
+from torch.utils.data import DataLoader
+
+from mmcls.apis import (bn_gamma_importance, get_prunable_groups,
+                        prune_classifier, taylor_importance)
+from mmcls.models import build_classifier
+
+
+def _zero_half_channels(model):
+    """Zero the less important half of every group, so that pruning them
+    doesn't change the outputs."""
+    for group in get_prunable_groups(model):
+        channels = group['channels']
+        for norm in group['norms']:
+            norm.weight.data.uniform_(0.5, 1.)
+            norm.weight.data[channels // 2:] = 0
+            norm.bias.data[channels // 2:] = 0
+
+
+@pytest.mark.parametrize('backbone', [
+    dict(type='ResNet', depth=18),
+    dict(type='ResNetV1d', depth=50),
+    dict(type='MobileNetV2', widen_factor=0.5),
+])
+def test_prune_classifier(backbone):
+    in_channels = {
+        'ResNet': 512,
+        'ResNetV1d': 2048,
+        'MobileNetV2': 1280
+    }[backbone['type']]
+    model_cfg = dict(
+        type='ImageClassifier',
+        backbone=backbone,
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(
+            type='LinearClsHead', num_classes=2, in_channels=in_channels))
+    model = build_classifier(deepcopy(model_cfg))
+    model.init_weights()
+    _zero_half_channels(model)
+    model.eval()
+
+    imgs = torch.rand(2, 3, 64, 64)
+    with torch.no_grad():
+        expect = model.extract_feat(imgs)[-1]
+
+    groups = get_prunable_groups(model)
+    importance = bn_gamma_importance(model, groups)
+    assert len(importance) == len(groups)
+
+    pruned, pruned_cfg = prune_classifier(
+        model, model_cfg, 0.5, importance=importance)
+    assert pruned_cfg['backbone']['init_cfg'] is None
+    for group, pruned_group in zip(groups, get_prunable_groups(pruned)):
+        assert pruned_group['channels'] == group['channels'] // 2
+
+    # The config reproduces the pruned structure
+    rebuilt = build_classifier(pruned_cfg)
+    rebuilt.load_state_dict(pruned.state_dict())
+
+    pruned.eval()
+    with torch.no_grad():
+        output = pruned.extract_feat(imgs)[-1]
+    torch.testing.assert_allclose(output, expect, rtol=1e-4, atol=1e-5)
+
+    num_params = sum(p.numel() for p in model.parameters())
+    pruned_params = sum(p.numel() for p in pruned.parameters())
+    assert pruned_params < num_params
+
+
+def test_taylor_importance():
+    model_cfg = dict(
+        type='ImageClassifier',
+        backbone=dict(
+            type='ResNet',
+            depth=18,
+            num_stages=2,
+            out_indices=(1, ),
+            strides=(1, 2),
+            dilations=(1, 1)),
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(type='LinearClsHead', num_classes=2, in_channels=128))
+    model = build_classifier(model_cfg)
+    model.init_weights()
+
+    data = [
+        dict(img=torch.rand(3, 32, 32), gt_label=torch.tensor(i % 2))
+        for i in range(8)
+    ]
+    data_loader = DataLoader(data, batch_size=4)
+    importance = taylor_importance(model, data_loader, num_batches=2)
+    groups = get_prunable_groups(model)
+    assert len(importance) == len(groups)
+    for score, group in zip(importance, groups):
+        assert score.shape == (group['channels'], )
+        assert (score >= 0).all()
+    # The gradients are cleared after estimation
+    assert all(
+        p.grad is None or (p.grad == 0).all() for p in model.parameters())
+
+    pruned, _ = prune_classifier(model, model_cfg, 0.25, importance=importance)
+    assert pruned.backbone.layer1[0].mid_channels == 48
+
+
+def test_unsupported_backbone():
+    model = build_classifier(
+        dict(
+            type='ImageClassifier',
+            backbone=dict(type='SEResNet', depth=50),
+            neck=dict(type='GlobalAveragePooling'),
+            head=dict(type='LinearClsHead', num_classes=2, in_channels=2048)))
+    with pytest.raises(TypeError):
+        get_prunable_groups(model)
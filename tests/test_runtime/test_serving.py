@@ -0,0 +1,171 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import asyncio
+import json
+import os.path as osp
+
+import mmcv
+import numpy as np
+import pytest
+import torch
+
+from mmcls.apis import inference_model, init_model
+from mmcls.serving import (Histogram, InferenceServer, MicroBatcher,
+                           build_backend)
+
+IMG_PATH = osp.join(osp.dirname(__file__), '../data/color.jpg')
+
+
+def _build_model():
+    img_norm_cfg = dict(
+        mean=[123.675, 116.28, 103.53], std=[58.395, 57.12, 57.375])
+    cfg = mmcv.Config(
+        dict(
+            model=dict(
+                type='ImageClassifier',
+                backbone=dict(
+                    type='ResNet_CIFAR',
+                    depth=18,
+                    num_stages=4,
+                    out_indices=(3, ),
+                    style='pytorch'),
+                neck=dict(type='GlobalAveragePooling'),
+                head=dict(
+                    type='LinearClsHead',
+                    num_classes=3,
+                    in_channels=512,
+                    topk=(1, ))),
+            data=dict(
+                test=dict(pipeline=[
+                    dict(type='LoadImageFromFile'),
+                    dict(type='Resize', size=(32, 32)),
+                    dict(type='Normalize', **img_norm_cfg),
+                    dict(type='ImageToTensor', keys=['img']),
+                    dict(type='Collect', keys=['img'])
+                ]))))
+    model = init_model(cfg, device='cpu')
+    model.CLASSES = ['a', 'b', 'c']
+    return model
+
+
+async def _request(port, method, path, body=b'', content_length=None):
+    if content_length is None:
+        content_length = len(body)
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: localhost\r\n'
+                 f'Content-Length: {content_length}\r\n'
+                 'Connection: close\r\n\r\n'.encode() + body)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, payload = response.partition(b'\r\n\r\n')
+    status = int(head.split()[1])
+    return status, payload.decode()
+
+
+def test_histogram():
+    hist = Histogram('latency', 'The latency.', [0.1, 1, 10])
+    for value in [0.05, 0.1, 0.5, 20]:
+        hist.observe(value)
+    text = hist.to_text()
+    assert 'latency_bucket{le="0.1"} 2' in text
+    assert 'latency_bucket{le="1"} 3' in text
+    assert 'latency_bucket{le="10"} 3' in text
+    assert 'latency_bucket{le="+Inf"} 4' in text
+    assert 'latency_count 4' in text
+
+    with pytest.raises(AssertionError):
+        Histogram('latency', 'The latency.', [1, 0.1])
+
+
+def test_micro_batcher():
+    batch_sizes = []
+
+    def process_fn(items):
+        batch_sizes.append(len(items))
+        if 'error' in items:
+            raise ValueError('error')
+        return [item * 2 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process_fn, max_batch_size=4, max_wait_ms=50)
+        with pytest.raises(AssertionError):
+            await batcher.submit(1)
+        await batcher.start()
+        results = await asyncio.gather(*[batcher.submit(i) for i in range(10)])
+        assert results == [i * 2 for i in range(10)]
+        assert max(batch_sizes) == 4
+        assert len(batch_sizes) < 10
+
+        # The error should be raised in all requests of the batch.
+        results = await asyncio.gather(
+            batcher.submit('error'), batcher.submit(1), return_exceptions=True)
+        assert all(isinstance(r, ValueError) for r in results)
+        await batcher.stop()
+        assert not batcher.running
+
+    asyncio.run(run())
+
+
+def test_build_backend():
+    model = _build_model()
+    backend = build_backend('pytorch', model)
+    scores = backend(torch.rand(2, 3, 32, 32))
+    assert scores.shape == (2, 3)
+
+    with pytest.raises(ValueError):
+        build_backend('unknown', model)
+
+
+def test_inference_server():
+    model = _build_model()
+    server = InferenceServer(
+        build_backend('pytorch', model),
+        model.cfg.data.test.pipeline,
+        model.CLASSES,
+        max_batch_size=4,
+        max_wait_ms=20)
+    with open(IMG_PATH, 'rb') as f:
+        content = f.read()
+
+    async def run():
+        _, port = await server.start(port=0)
+        try:
+            responses = await asyncio.gather(*[
+                _request(port, 'POST', '/predict', content) for _ in range(8)
+            ])
+            bad_response = await _request(port, 'POST', '/predict', b'bad')
+            bad_lengths = []
+            for length in ['abc', '-1']:
+                bad_lengths.append(await _request(
+                    port, 'POST', '/predict', content_length=length))
+            not_found = await _request(port, 'GET', '/unknown')
+            metrics = await _request(port, 'GET', '/metrics')
+            health = await _request(port, 'GET', '/health')
+        finally:
+            await server.stop()
+        return responses, bad_response, bad_lengths, not_found, metrics, \
+            health
+
+    responses, bad_response, bad_lengths, not_found, metrics, health = \
+        asyncio.run(run())
+
+    expect = inference_model(model, IMG_PATH)
+    for status, payload in responses:
+        assert status == 200
+        result = json.loads(payload)
+        assert result['pred_label'] == expect['pred_label']
+        assert result['pred_class'] == expect['pred_class']
+        np.testing.assert_allclose(
+            result['pred_score'], expect['pred_score'], rtol=1e-4)
+
+    assert bad_response[0] == 400
+    # a malformed Content-Length is a bad request
+    assert [status for status, _ in bad_lengths] == [400, 400]
+    assert not_found[0] == 404
+    assert health[0] == 200
+    status, text = metrics
+    assert status == 200
+    assert 'mmcls_request_latency_seconds_count 8' in text
+    assert 'mmcls_batch_size_count' in text
+    assert 'mmcls_requests_total 9' in text
+    assert 'mmcls_request_errors_total 1' in text
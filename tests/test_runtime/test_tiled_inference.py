@@ -0,0 +1,103 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import mmcv
+import numpy as np
+import pytest
+import torch
+
+from mmcls.apis import inference_tiled_model, init_model
+
+
+def _build_model():
+    img_norm_cfg = dict(
+        mean=[123.675, 116.28, 103.53],
+        std=[58.395, 57.12, 57.375],
+        to_rgb=True)
+    cfg = mmcv.Config(
+        dict(
+            model=dict(
+                type='ImageClassifier',
+                backbone=dict(
+                    type='ResNet_CIFAR',
+                    depth=18,
+                    num_stages=4,
+                    out_indices=(3, ),
+                    style='pytorch'),
+                neck=dict(type='GlobalAveragePooling'),
+                head=dict(
+                    type='LinearClsHead',
+                    num_classes=3,
+                    in_channels=512,
+                    topk=(1, ))),
+            data=dict(
+                test=dict(pipeline=[
+                    dict(type='LoadImageFromFile'),
+                    dict(type='Normalize', **img_norm_cfg),
+                    dict(type='ImageToTensor', keys=['img']),
+                    dict(type='Collect', keys=['img'])
+                ]))))
+    model = init_model(cfg, device='cpu')
+    model.CLASSES = ['a', 'b', 'c']
+    return model
+
+
+def test_inference_tiled_model():
+    model = _build_model()
+    img = np.random.randint(0, 256, (100, 150, 3), dtype=np.uint8)
+
+    result = inference_tiled_model(
+        model, img, tile_size=32, stride=16, batch_size=20)
+    # 6 x 9 tiles to cover the padded image of 112 x 160
+    assert result['num_tiles'] == 54 and result['num_skipped'] == 0
+    assert len(result['tiles']) == 54
+    assert result['heatmap'].shape == (3, 7, 10)
+    assert result['heatmap_stride'] == 16
+    assert result['label_map'].shape == (7, 10)
+    np.testing.assert_array_equal(result['label_map'],
+                                  result['heatmap'].argmax(axis=0))
+    assert result['megapixels'] == pytest.approx(0.015)
+    assert result['mp_per_s'] > 0
+
+    # the top-left cell is only covered by the first tile
+    norm_cfg = model.cfg.data.test.pipeline[1]
+    tile = mmcv.imnormalize(img[:32, :32].astype(np.float32),
+                            np.array(norm_cfg.mean), np.array(norm_cfg.std))
+    tile = torch.from_numpy(tile.transpose(2, 0, 1))[None]
+    with torch.no_grad():
+        score = model(tile, return_loss=False, img_metas=None)[0]
+    np.testing.assert_allclose(
+        result['heatmap'][:, 0, 0], score, rtol=1e-4, atol=1e-5)
+    first_tile = result['tiles'][0]
+    np.testing.assert_array_equal(first_tile['bbox'], [0, 0, 32, 32])
+    assert first_tile['pred_label'] == np.argmax(score)
+    assert first_tile['pred_class'] == model.CLASSES[np.argmax(score)]
+    # the bboxes of the border tiles are clipped by the image
+    np.testing.assert_array_equal(result['tiles'][-1]['bbox'],
+                                  [128, 80, 150, 100])
+
+    # test the image pyramid
+    result = inference_tiled_model(
+        model, img, tile_size=32, stride=32, scales=(1., 0.5))
+    assert result['num_tiles'] == 4 * 5 + 2 * 3
+    assert result['heatmap'].shape == (3, 4, 5)
+    assert {tile['scale'] for tile in result['tiles']} == {1., 0.5}
+    assert max(tile['bbox'][2] for tile in result['tiles']) == 150
+
+    # test skipping the empty tiles
+    img[:, :64] = 128
+    result = inference_tiled_model(
+        model, img, tile_size=32, stride=32, empty_thr=1.)
+    assert result['num_tiles'] == 20 and result['num_skipped'] == 8
+    assert len(result['tiles']) == 12
+    assert (result['label_map'][:, :2] == -1).all()
+    assert (result['heatmap'][:, :, :2] == 0).all()
+    assert (result['label_map'][:, 2:] >= 0).all()
+
+    # test all tiles are skipped
+    result = inference_tiled_model(
+        model, img, tile_size=32, stride=32, empty_thr=1000.)
+    assert result['num_skipped'] == 20 and len(result['tiles']) == 0
+    assert result['heatmap'].shape == (3, 4, 5)
+    assert (result['label_map'] == -1).all()
+
+    with pytest.raises(AssertionError):
+        inference_tiled_model(model, img, tile_size=32, stride=64)
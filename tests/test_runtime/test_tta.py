@@ -0,0 +1,56 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import numpy as np
+import pytest
+import torch
+from torch.utils.data import DataLoader, Dataset
+
+from mmcls.apis import learn_tta_weights
+from mmcls.models import build_classifier
+
+
+class ToyMultiViewDataset(Dataset):
+    """The second view is the only informative one."""
+
+    def __init__(self, num_samples=16, num_views=3):
+        self.imgs = torch.randn(num_samples, num_views, 3, 8, 8)
+        self.labels = np.random.randint(0, 2, num_samples)
+        self.imgs[:, 1] = 0
+        self.imgs[self.labels == 1, 1] = 1
+
+    def __len__(self):
+        return len(self.labels)
+
+    def __getitem__(self, idx):
+        return dict(img=self.imgs[idx])
+
+    def get_gt_labels(self):
+        return self.labels
+
+
+def test_learn_tta_weights():
+    model_cfg = dict(
+        type='ImageClassifier',
+        backbone=dict(type='MobileNetV2', widen_factor=0.5),
+        neck=dict(type='GlobalAveragePooling'),
+        head=dict(type='LinearClsHead', num_classes=2, in_channels=1280),
+        test_cfg=dict(tta_merge='weighted', num_views=3))
+    model = build_classifier(model_cfg)
+    # make the prediction determined by the mean value of the input
+    model.extract_feat = lambda img: (img.mean(dim=(1, 2, 3)).view(-1, 1) *
+                                      torch.ones(1, 1280), )
+    torch.nn.init.constant_(model.head.fc.bias, 0)
+    model.head.fc.weight.data[0] = -1.
+    model.head.fc.weight.data[1] = 1.
+
+    data_loader = DataLoader(ToyMultiViewDataset(), batch_size=4)
+    weights = learn_tta_weights(model, data_loader, num_iters=100)
+    assert weights.shape == (3, )
+    assert torch.isclose(weights.sum(), torch.tensor(1.))
+    assert weights.argmax().item() == 1
+    torch.testing.assert_close(model.tta_logits.softmax(0), weights)
+
+    # test the model should use the weighted merge
+    model_cfg['test_cfg'] = None
+    model = build_classifier(model_cfg)
+    with pytest.raises(AssertionError):
+        learn_tta_weights(model, data_loader)
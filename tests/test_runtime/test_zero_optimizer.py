@@ -0,0 +1,163 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import copy
+import gc
+import os.path as osp
+import tempfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+import torch.nn as nn
+from mmcv.runner import CheckpointHook, EvalHook, build_optimizer
+from torch.utils.data import DataLoader
+
+from mmcls.core import (ConsolidateOptimizerStateHook, MidEpochCheckpointHook,
+                        ZeroRedundancyOptimizer)
+
+WORLD_SIZE = 2
+
+
+def _optimizer_cfg(optimizer_type):
+    cfg = dict(
+        type='ZeroRedundancyOptimizer',
+        optimizer_type=optimizer_type,
+        lr=0.01,
+        weight_decay=0.05,
+        paramwise_cfg=dict(norm_decay_mult=0.))
+    if optimizer_type is None:
+        cfg.pop('optimizer_type')
+        cfg['type'] = 'AdamW'
+    return cfg
+
+
+def _state_bytes(optimizer):
+    return sum(value.numel() * value.element_size()
+               for state in optimizer.state.values()
+               for value in state.values() if isinstance(value, torch.Tensor))
+
+
+def _train(model, ref_model, optimizer, ref_optimizer, rank, num_iters):
+    for _ in range(num_iters):
+        inputs = [torch.randn(4, 16) for _ in range(WORLD_SIZE)]
+        optimizer.zero_grad()
+        model(inputs[rank]).pow(2).mean().backward()
+        optimizer.step()
+        # the same mean loss of the batches of all ranks
+        ref_optimizer.zero_grad()
+        ref_model(torch.cat(inputs)).pow(2).mean().backward()
+        ref_optimizer.step()
+    for param, ref_param in zip(model.parameters(), ref_model.parameters()):
+        torch.testing.assert_close(param, ref_param)
+
+
+def _check_zero_optimizer(rank):
+    torch.manual_seed(0)
+    model = nn.Sequential(
+        nn.Linear(16, 32), nn.LayerNorm(32), nn.Linear(32, 32), nn.GELU(),
+        nn.Linear(32, 4))
+    ref_model = copy.deepcopy(model)
+    ddp = nn.parallel.DistributedDataParallel(model)
+    optimizer = build_optimizer(ddp, _optimizer_cfg('AdamW'))
+    assert isinstance(optimizer, ZeroRedundancyOptimizer)
+    ref_optimizer = build_optimizer(ref_model, _optimizer_cfg(None))
+
+    # the updated parameters are the same as the plain optimizer
+    _train(ddp, ref_model, optimizer, ref_optimizer, rank, 3)
+
+    # every rank keeps about a half of the states
+    state_bytes = torch.tensor(_state_bytes(optimizer.optim))
+    ref_bytes = _state_bytes(ref_optimizer)
+    assert state_bytes < ref_bytes * 0.75
+    dist.all_reduce(state_bytes)
+    assert state_bytes == ref_bytes
+
+    # the states are gathered to rank 0 by the hook
+    ConsolidateOptimizerStateHook().after_train_epoch(
+        SimpleNamespace(
+            optimizer=optimizer,
+            hooks=[CheckpointHook(interval=1)],
+            epoch=0,
+            _max_epochs=1))
+    state_dict = [None]
+    if rank == 0:
+        state_dict[0] = optimizer.state_dict()
+        ref_state_dict = ref_optimizer.state_dict()
+        assert state_dict[0]['state'].keys() == \
+            ref_state_dict['state'].keys()
+        for key, state in ref_state_dict['state'].items():
+            torch.testing.assert_close(
+                state_dict[0]['state'][key]['exp_avg_sq'], state['exp_avg_sq'])
+        assert len(state_dict[0]['param_groups']) == \
+            len(ref_state_dict['param_groups'])
+
+    # the full states are sharded when loaded by all ranks
+    dist.broadcast_object_list(state_dict, src=0)
+    model = copy.deepcopy(model)
+    ddp = nn.parallel.DistributedDataParallel(model)
+    optimizer = build_optimizer(ddp, _optimizer_cfg('AdamW'))
+    optimizer.load_state_dict(state_dict[0])
+    assert _state_bytes(optimizer.optim) < ref_bytes * 0.75
+    _train(ddp, ref_model, optimizer, ref_optimizer, rank, 2)
+
+
+def _worker(rank, init_file):
+    dist.init_process_group(
+        'gloo',
+        init_method=f'file://{init_file}',
+        rank=rank,
+        world_size=WORLD_SIZE)
+    try:
+        _check_zero_optimizer(rank)
+        # free the DDP models in reference cycles, which hold the process
+        # group and may hang the destroy of gloo
+        gc.collect()
+    finally:
+        dist.destroy_process_group()
+
+
+def test_zero_redundancy_optimizer_gloo():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        mp.spawn(
+            _worker,
+            args=(osp.join(tmpdir, 'init'), ),
+            nprocs=WORLD_SIZE,
+            join=True)
+
+
+def test_consolidate_optimizer_state_hook():
+    hook = ConsolidateOptimizerStateHook()
+    runner = SimpleNamespace(
+        optimizer=MagicMock(),
+        hooks=[
+            CheckpointHook(interval=2),
+            CheckpointHook(interval=4, by_epoch=False, save_last=True),
+            MidEpochCheckpointHook(interval=3),
+            EvalHook(DataLoader([0]), interval=3, save_best='accuracy'),
+            EvalHook(DataLoader([0]), interval=1)
+        ],
+        iter=0,
+        _max_iters=10,
+        epoch=0,
+        _max_epochs=7)
+    consolidated = []
+    for i in range(10):
+        runner.iter = i
+        runner.optimizer.reset_mock()
+        hook.after_train_iter(runner)
+        if runner.optimizer.consolidate_state_dict.called:
+            consolidated.append(i + 1)
+    assert consolidated == [3, 4, 6, 8, 9, 10]
+
+    # only at the epochs saving the checkpoints or evaluating for the best
+    consolidated = []
+    for i in range(7):
+        runner.epoch = i
+        runner.optimizer.reset_mock()
+        hook.after_train_epoch(runner)
+        if runner.optimizer.consolidate_state_dict.called:
+            runner.optimizer.consolidate_state_dict.assert_called_once_with(
+                to=0)
+            consolidated.append(i + 1)
+    assert consolidated == [2, 3, 4, 6, 7]
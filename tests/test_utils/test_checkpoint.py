@@ -0,0 +1,76 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import os.path as osp
+import tempfile
+
+import pytest
+import torch
+import torch.nn as nn
+from mmcv.utils import digit_version
+
+from mmcls.utils import (is_mmap_supported, load_checkpoint,
+                         load_state_dict_assign)
+
+
+class Model(nn.Module):
+
+    def __init__(self, out_channels=4):
+        super().__init__()
+        self.conv = nn.Conv2d(3, 4, 3)
+        self.bn = nn.BatchNorm2d(4)
+        self.fc = nn.Linear(4, out_channels)
+
+
+@pytest.mark.skipif(
+    digit_version(torch.__version__) < digit_version('2.1.0'),
+    reason='requires PyTorch>=2.1')
+def test_load_state_dict_assign():
+    model = Model()
+    model.conv.requires_grad_(False)
+    state_dict = Model().state_dict()
+    state_dict['fc.weight'] = state_dict['fc.weight'].half()
+    load_state_dict_assign(model, state_dict, strict=True)
+    # the tensors are used without copying
+    assert model.conv.weight.data_ptr() == state_dict['conv.weight'].data_ptr()
+    assert model.fc.weight.dtype == torch.float32
+    assert not model.conv.weight.requires_grad
+    assert model.fc.weight.requires_grad
+
+    # mismatched shapes and missing keys
+    model = Model(out_channels=2)
+    state_dict = Model().state_dict()
+    state_dict.pop('bn.weight')
+    with pytest.raises(RuntimeError, match='fc.weight'):
+        load_state_dict_assign(model, state_dict, strict=True)
+    load_state_dict_assign(model, state_dict)
+    assert model.fc.weight.shape == (2, 4)
+    torch.testing.assert_allclose(model.conv.weight, state_dict['conv.weight'])
+
+
+def test_load_checkpoint():
+    src_model = Model()
+    checkpoint = dict(
+        meta=dict(CLASSES=['a', 'b']),
+        state_dict={
+            f'module.{k}': v
+            for k, v in src_model.state_dict().items()
+        })
+    with tempfile.TemporaryDirectory() as tmpdir:
+        zip_file = osp.join(tmpdir, 'zip.pth')
+        legacy_file = osp.join(tmpdir, 'legacy.pth')
+        torch.save(checkpoint, zip_file)
+        torch.save(
+            checkpoint, legacy_file, _use_new_zipfile_serialization=False)
+
+        if digit_version(torch.__version__) >= digit_version('2.1.0'):
+            assert is_mmap_supported(zip_file)
+        assert not is_mmap_supported(zip_file, map_location='cuda:0')
+        assert not is_mmap_supported(legacy_file)
+        assert not is_mmap_supported(osp.join(tmpdir, 'none.pth'))
+
+        for filename in [zip_file, legacy_file]:
+            for mmap in [True, False]:
+                model = Model()
+                loaded = load_checkpoint(model, filename, mmap=mmap)
+                assert loaded['meta']['CLASSES'] == ['a', 'b']
+                for k, v in src_model.state_dict().items():
+                    torch.testing.assert_allclose(model.state_dict()[k], v)
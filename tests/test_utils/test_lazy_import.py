@@ -0,0 +1,73 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+from mmcls.utils import LazyRegistry, lazy_import
+
+
+@pytest.fixture
+def lazy_package(tmp_path, monkeypatch):
+    package = tmp_path / 'lazy_pkg'
+    package.mkdir()
+    (package / '__init__.py').write_text('')
+    (package / 'foo.py').write_text(
+        textwrap.dedent("""
+        from . import REGISTRY
+
+
+        @REGISTRY.register_module()
+        class Foo:
+            pass
+
+
+        @REGISTRY.register_module()
+        class Hidden:
+            pass
+        """))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield 'lazy_pkg'
+    for name in list(sys.modules):
+        if name.startswith('lazy_pkg'):
+            sys.modules.pop(name)
+
+
+def test_lazy_import(lazy_package):
+    package = __import__(lazy_package)
+    registry = LazyRegistry('lazy', scope='lazy_pkg')
+    package.REGISTRY = registry
+    getattr_, dir_ = lazy_import(lazy_package, {'.foo': ['Foo']}, registry)
+    package.__getattr__ = getattr_
+
+    assert f'{lazy_package}.foo' not in sys.modules
+    assert 'Foo' in dir_()
+    with pytest.raises(AttributeError):
+        package.Bar
+
+    # import by the registry
+    assert registry.get('Foo').__name__ == 'Foo'
+    assert f'{lazy_package}.foo' in sys.modules
+    assert package.Foo is registry.get('lazy_pkg.Foo')
+    # the registered names which are not exported are also found
+    assert registry.get('Hidden').__name__ == 'Hidden'
+    assert registry.get('Bar') is None
+    assert len(registry) == 2
+
+
+def test_lazy_import_mmcls():
+    # Use a new process since the modules may be imported by other tests.
+    code = textwrap.dedent("""
+        import sys
+        from mmcls.models import build_backbone
+        assert 'mmcls.models.backbones.resnet' not in sys.modules
+        assert 'mmcls.models.backbones.timm_backbone' not in sys.modules
+        assert 'mmcls.datasets.cifar' not in sys.modules
+        build_backbone(dict(type='ResNet', depth=18))
+        assert 'mmcls.models.backbones.resnet' in sys.modules
+        assert 'mmcls.models.backbones.timm_backbone' not in sys.modules
+        from mmcls.models import ResNet
+        from mmcls.datasets.pipelines import to_tensor
+        """)
+    subprocess.run([sys.executable, '-c', code], check=True)
@@ -32,6 +32,47 @@ def cal_train_time(log_dicts, args):
         print()
 
 
+def time_to_accuracy(log_dicts, args):
+    """Compute the training time to reach the target of a metric."""
+    for i, log_dict in enumerate(log_dicts):
+        print(f'{"-" * 5}Analyze time to accuracy of {args.json_logs[i]}'
+              f'{"-" * 5}')
+        elapsed = 0.
+        best = None
+        reached = None
+        for epoch in log_dict.keys():
+            epoch_log = log_dict[epoch]
+            if 'train_time' in epoch_log:
+                # logged by `LossAwareSamplingHook`
+                elapsed = epoch_log['train_time'][-1]
+            else:
+                # estimated by the average time of the logged iterations
+                iters = [
+                    it
+                    for it, mode in zip(epoch_log['iter'], epoch_log['mode'])
+                    if mode == 'train'
+                ]
+                intervals = np.diff([0] + iters)
+                elapsed += float(
+                    np.sum(intervals * np.array(epoch_log['time'])))
+            if args.metric not in epoch_log:
+                continue
+            value = epoch_log[args.metric][-1]
+            if best is None or value > best[1]:
+                best = (epoch, value, elapsed)
+            if reached is None and value >= args.target:
+                reached = (epoch, value, elapsed)
+        if best is None:
+            print(f'{args.metric} is not found in the log')
+        elif reached is None:
+            print(f'{args.target} is not reached, the best {args.metric} is '
+                  f'{best[1]:.4f} at epoch {best[0]} after {best[2]:.1f} s')
+        else:
+            print(f'{args.metric} reaches {reached[1]:.4f} at epoch '
+                  f'{reached[0]} after {reached[2]:.1f} s')
+        print()
+
+
 def plot_curve(log_dicts, args):
     """Plot train metric-iter graph."""
     if args.backend is not None:
@@ -138,12 +179,32 @@ def add_time_parser(subparsers):
         'the average time')
 
 
+def add_time_to_accuracy_parser(subparsers):
+    parser_acc = subparsers.add_parser(
+        'time_to_accuracy',
+        help='parser for computing the training time to reach a target '
+        'accuracy, e.g. to compare samplers')
+    parser_acc.add_argument(
+        'json_logs',
+        type=str,
+        nargs='+',
+        help='path of train log in json format')
+    parser_acc.add_argument(
+        '--metric',
+        type=str,
+        default='accuracy_top-1',
+        help='the metric of the target')
+    parser_acc.add_argument(
+        '--target', type=float, required=True, help='the target of the metric')
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description='Analyze Json Log')
     # currently only support plot curve and calculate average train time
     subparsers = parser.add_subparsers(dest='task', help='task parser')
     add_plot_parser(subparsers)
     add_time_parser(subparsers)
+    add_time_to_accuracy_parser(subparsers)
     args = parser.parse_args()
     return args
 
@@ -0,0 +1,336 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import itertools
+import os
+import os.path as osp
+import platform
+import tempfile
+import time
+import warnings
+
+import mmcv
+import numpy as np
+import torch
+from mmcv import Config, DictAction
+from torch import nn
+
+from mmcls.core import wrap_execution_mode
+from mmcls.models import build_classifier
+from mmcls.utils import load_checkpoint
+
+BACKENDS = ('eager', 'torchscript', 'onnxruntime')
+PRECISIONS = ('fp32', 'bf16', 'int8')
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the inference latency and throughput of '
+        'models with different batch sizes, threads, backends and precisions.')
+    parser.add_argument('configs', nargs='+', help='config files')
+    parser.add_argument(
+        '--checkpoints',
+        nargs='+',
+        help='checkpoint files of the configs, the models are randomly '
+        'initialized if not specified, which doesn\'t affect the speed')
+    parser.add_argument(
+        '--shape',
+        type=int,
+        nargs='+',
+        default=[224, 224],
+        help='input image size')
+    parser.add_argument(
+        '--batch-sizes',
+        type=int,
+        nargs='+',
+        default=[1, 8, 32],
+        help='batch sizes to benchmark')
+    parser.add_argument(
+        '--threads',
+        type=int,
+        nargs='+',
+        default=[torch.get_num_threads()],
+        help='numbers of intra-op threads to benchmark')
+    parser.add_argument(
+        '--backends',
+        nargs='+',
+        default=['eager'],
+        choices=BACKENDS,
+        help='backends to benchmark')
+    parser.add_argument(
+        '--precisions',
+        nargs='+',
+        default=['fp32'],
+        choices=PRECISIONS,
+        help='precisions to benchmark, "bf16" is the channels-last bf16 '
+        'autocast mode of PyTorch, and "int8" is the post-training static '
+        'quantization calibrated by random inputs')
+    parser.add_argument(
+        '--warmup', type=int, default=5, help='number of warm-up iterations')
+    parser.add_argument(
+        '--iters', type=int, default=50, help='number of timed iterations')
+    parser.add_argument(
+        '--device', default='cpu', help='device of the PyTorch backends')
+    parser.add_argument(
+        '--work-dir',
+        help='the directory to save the exported models, defaults to a '
+        'temporary directory')
+    parser.add_argument('--out', help='the file to save results in JSON')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file.')
+    args = parser.parse_args()
+    if args.checkpoints is not None:
+        assert len(args.checkpoints) == len(args.configs), \
+            'The number of checkpoints should be the same as the configs.'
+    return args
+
+
+class ScoreModel(nn.Module):
+    """Predict the score tensor, without the post processing of the head."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, img):
+        x = self.model.extract_feat(img)
+        return self.model.head.simple_test(x, post_process=False)
+
+
+def quantize_model(model, input_shape, num_calib=8):
+    """Post-training static quantization by FX graph mode, and fall back to
+    the dynamic quantization of linear layers if the model cannot be traced.
+
+    The calibration uses random inputs, so the accuracy of the quantized model
+    is meaningless, but the speed is the same as a calibrated one.
+    """
+    from torch.ao.quantization import get_default_qconfig_mapping
+    from torch.ao.quantization.quantize_fx import convert_fx, prepare_fx
+
+    example = torch.randn(1, *input_shape)
+    try:
+        prepared = prepare_fx(model, get_default_qconfig_mapping('x86'),
+                              (example, ))
+        with torch.no_grad():
+            for _ in range(num_calib):
+                prepared(torch.randn(1, *input_shape))
+        return convert_fx(prepared), 'static'
+    except Exception as e:
+        warnings.warn('Fall back to the dynamic quantization of linear '
+                      f'layers since the static quantization fails: {e}')
+        return torch.ao.quantization.quantize_dynamic(
+            model, {nn.Linear}, dtype=torch.qint8), 'dynamic'
+
+
+def export_onnx(model, input_shape, onnx_file, precision):
+    """Export the model to ONNX with a dynamic batch axis, and quantize it
+    statically by ONNX Runtime if the precision is int8."""
+    example = torch.randn(1, *input_shape)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            example,
+            onnx_file,
+            input_names=['input'],
+            output_names=['probs'],
+            dynamic_axes={
+                'input': {
+                    0: 'batch'
+                },
+                'probs': {
+                    0: 'batch'
+                }
+            },
+            opset_version=13)
+    if precision != 'int8':
+        return onnx_file, None
+
+    from onnxruntime.quantization import (CalibrationDataReader, QuantFormat,
+                                          quantize_static)
+
+    class RandomDataReader(CalibrationDataReader):
+
+        def __init__(self, num_calib=8):
+            self.data = iter([{
+                'input':
+                np.random.randn(1, *input_shape).astype(np.float32)
+            } for _ in range(num_calib)])
+
+        def get_next(self):
+            return next(self.data, None)
+
+    int8_file = onnx_file.replace('.onnx', '_int8.onnx')
+    quantize_static(
+        onnx_file, int8_file, RandomDataReader(), quant_format=QuantFormat.QDQ)
+    return int8_file, 'static'
+
+
+def build_runner(backend, model, precision, input_shape, batch_size,
+                 num_threads, device, onnx_file):
+    """Build a function to run a batch of the backend.
+
+    Returns:
+        tuple(callable, dict): The function and the extra information.
+    """
+    if backend == 'onnxruntime':
+        from mmcls.core.export import ONNXRuntimeEngine
+        engine = ONNXRuntimeEngine(
+            onnx_file,
+            intra_op_num_threads=num_threads,
+            max_batch_size=batch_size)
+        inputs = np.random.randn(batch_size, *input_shape).astype(np.float32)
+        return lambda: engine(inputs), {}
+
+    torch.set_num_threads(num_threads)
+    inputs = torch.randn(batch_size, *input_shape, device=device)
+    info = {}
+    if precision == 'bf16':
+        wrap_execution_mode(model.model, 'channels_last', 'bf16')
+    elif precision == 'int8':
+        model, info['quantization'] = quantize_model(model, input_shape)
+
+    if backend == 'torchscript':
+        with torch.no_grad():
+            model = torch.jit.trace(model, inputs, check_trace=False)
+            model = torch.jit.optimize_for_inference(torch.jit.freeze(model))
+
+    def run():
+        with torch.no_grad():
+            model(inputs)
+        if inputs.is_cuda:
+            torch.cuda.synchronize()
+
+    return run, info
+
+
+def measure(run, warmup, iters):
+    """Measure the latency of every iteration in seconds."""
+    for _ in range(warmup):
+        run()
+    latencies = []
+    for _ in range(iters):
+        start = time.perf_counter()
+        run()
+        latencies.append(time.perf_counter() - start)
+    return np.array(latencies)
+
+
+def build_model(config, checkpoint, cfg_options, device):
+    """Build the :class:`ScoreModel` of the config."""
+    cfg = Config.fromfile(config)
+    if cfg_options is not None:
+        cfg.merge_from_dict(cfg_options)
+    cfg.model.pretrained = None
+    model = build_classifier(cfg.model)
+    if checkpoint is not None:
+        load_checkpoint(model, checkpoint, map_location='cpu')
+    return cfg, ScoreModel(model).to(device).eval()
+
+
+def prepare_backend(backend, precision, model, input_shape, onnx_file):
+    """Check the combination and export the model if necessary.
+
+    Returns:
+        tuple(str, dict): The exported model file and the extra information.
+    """
+    if backend == 'onnxruntime':
+        assert precision != 'bf16', \
+            'bf16 is not supported by the onnxruntime backend.'
+        onnx_file, quantization = export_onnx(model, input_shape, onnx_file,
+                                              precision)
+        info = {} if quantization is None else dict(quantization=quantization)
+        return onnx_file, info
+    if precision == 'bf16' and backend == 'torchscript':
+        raise NotImplementedError(
+            'bf16 is only supported by the eager backend.')
+    return None, {}
+
+
+def main():
+    args = parse_args()
+    if len(args.shape) == 1:
+        input_shape = (3, args.shape[0], args.shape[0])
+    elif len(args.shape) == 2:
+        input_shape = (3, ) + tuple(args.shape)
+    else:
+        raise ValueError('invalid input shape')
+    work_dir = args.work_dir or tempfile.mkdtemp()
+    mmcv.mkdir_or_exist(work_dir)
+    checkpoints = args.checkpoints or [None] * len(args.configs)
+
+    results = []
+    for (config, checkpoint), precision, backend in itertools.product(
+            zip(args.configs, checkpoints), args.precisions, args.backends):
+        device = 'cpu' if backend == 'onnxruntime' else args.device
+        cfg, model = build_model(config, checkpoint, args.cfg_options, device)
+        base_result = dict(
+            config=config,
+            backbone=cfg.model.backbone.type,
+            backend=backend,
+            precision=precision)
+        onnx_file = osp.join(work_dir,
+                             osp.splitext(osp.basename(config))[0] + '.onnx')
+        try:
+            onnx_file, info = prepare_backend(backend, precision, model,
+                                              input_shape, onnx_file)
+        except Exception as e:
+            # Skip the unsupported combination.
+            results.append(dict(base_result, error=f'{type(e).__name__}: {e}'))
+            continue
+        base_result.update(info)
+
+        for num_threads, batch_size in itertools.product(
+                args.threads, args.batch_sizes):
+            result = dict(
+                base_result, batch_size=batch_size, threads=num_threads)
+            results.append(result)
+            try:
+                # Build a new model for every runner, since the runners may
+                # quantize or convert the model.
+                if backend != 'onnxruntime':
+                    _, model = build_model(config, checkpoint,
+                                           args.cfg_options, device)
+                run, info = build_runner(backend, model, precision,
+                                         input_shape, batch_size, num_threads,
+                                         device, onnx_file)
+                latencies = measure(run, args.warmup, args.iters)
+            except Exception as e:
+                result['error'] = f'{type(e).__name__}: {e}'
+                continue
+            result.update(info)
+            result['latency_ms'] = {
+                'mean': float(latencies.mean() * 1000),
+                'p50': float(np.percentile(latencies, 50) * 1000),
+                'p95': float(np.percentile(latencies, 95) * 1000),
+                'p99': float(np.percentile(latencies, 99) * 1000),
+            }
+            result['throughput'] = float(batch_size * len(latencies) /
+                                         latencies.sum())
+            print(f'{osp.basename(config)} {backend} {precision} '
+                  f'bs={batch_size} threads={num_threads}: '
+                  f'{result["throughput"]:.1f} img/s, '
+                  f'p50 {result["latency_ms"]["p50"]:.2f} ms, '
+                  f'p99 {result["latency_ms"]["p99"]:.2f} ms')
+
+    for result in results:
+        if 'error' in result:
+            print(f'{osp.basename(result["config"])} {result["backend"]} '
+                  f'{result["precision"]} failed: {result["error"]}')
+
+    if args.out:
+        env_info = dict(
+            platform=platform.platform(),
+            processor=platform.processor(),
+            cpu_count=os.cpu_count(),
+            torch=torch.__version__,
+            input_shape=input_shape,
+            warmup=args.warmup,
+            iters=args.iters)
+        mmcv.dump(dict(env_info=env_info, results=results), args.out)
+
+
+if __name__ == '__main__':
+    main()
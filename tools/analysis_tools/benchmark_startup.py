@@ -0,0 +1,115 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# The script run in a new process for every trial, so that the import time
+# isn't affected by the modules imported in the current process.
+TRIAL_SCRIPT = """
+import json
+import sys
+import time
+
+start = time.perf_counter()
+import torch  # noqa: E402
+import mmcv  # noqa: E402
+import mmcv.cnn  # noqa: E402
+import mmcv.runner  # noqa: E402
+base_imported = time.perf_counter()
+from mmcls.apis import inference_model  # noqa: E402
+from mmcls.models import build_classifier  # noqa: E402
+from mmcls.utils import load_checkpoint  # noqa: E402
+mmcls_imported = time.perf_counter()
+
+config, checkpoint, img, device, mmap = sys.argv[1:]
+cfg = mmcv.Config.fromfile(config)
+cfg.model.pretrained = None
+model = build_classifier(cfg.model)
+built = time.perf_counter()
+ckpt = load_checkpoint(model, checkpoint, map_location='cpu',
+                       mmap=mmap == '1')
+if 'CLASSES' in ckpt.get('meta', {}):
+    model.CLASSES = ckpt['meta']['CLASSES']
+else:
+    from mmcls.datasets import ImageNet
+    model.CLASSES = ImageNet.CLASSES
+model.cfg = cfg
+model.to(device)
+model.eval()
+loaded = time.perf_counter()
+inference_model(model, img)
+predicted = time.perf_counter()
+
+print(json.dumps(dict(
+    import_base=base_imported - start,
+    import_mmcls=mmcls_imported - base_imported,
+    build_model=built - mmcls_imported,
+    load_checkpoint=loaded - built,
+    first_prediction=predicted - loaded)))
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the startup time, including the import time '
+        'and the time to the first prediction.')
+    parser.add_argument('config', help='config file path')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument('img', help='image file')
+    parser.add_argument(
+        '--device', default='cpu', help='device used for inference')
+    parser.add_argument(
+        '--repeat', type=int, default=5, help='the number of trials')
+    parser.add_argument(
+        '--out', help='the file to save the results in JSON format')
+    args = parser.parse_args()
+    return args
+
+
+def run_trial(args, lazy_import, mmap):
+    env = dict(os.environ, MMCLS_LAZY_IMPORT='1' if lazy_import else '0')
+    start = time.perf_counter()
+    cmd = [
+        sys.executable, '-c', TRIAL_SCRIPT, args.config, args.checkpoint,
+        args.img, args.device, '1' if mmap else '0'
+    ]
+    output = subprocess.check_output(cmd, env=env)
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    # Including the startup of the interpreter.
+    result['total'] = time.perf_counter() - start
+    return result
+
+
+def main():
+    args = parse_args()
+    settings = {
+        'eager import + copy load': dict(lazy_import=False, mmap=False),
+        'lazy import + mmap load': dict(lazy_import=True, mmap=True),
+    }
+
+    results = {}
+    for name, setting in settings.items():
+        # warm up the file system cache
+        run_trial(args, **setting)
+        trials = [run_trial(args, **setting) for _ in range(args.repeat)]
+        results[name] = {
+            key: float(np.median([trial[key] for trial in trials]))
+            for key in trials[0]
+        }
+
+    keys = list(next(iter(results.values())))
+    print(' | '.join(['setting'] + [f'{key} (s)' for key in keys]))
+    for name, result in results.items():
+        print(' | '.join([name] + [f'{result[key]:.3f}' for key in keys]))
+    if args.out:
+        with open(args.out, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,173 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+from numbers import Number
+
+import mmcv
+import numpy as np
+import torch
+from mmcv import Config, DictAction
+from mmcv.parallel import MMDataParallel
+from mmcv.runner import load_checkpoint
+
+from mmcls.apis import single_gpu_test
+from mmcls.datasets import build_dataloader, build_dataset
+from mmcls.models import build_classifier
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Evaluate the accuracy and throughput of a vision '
+        'transformer under different token keep ratios.')
+    parser.add_argument('config', help='test config file path')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument(
+        '--keep-ratios',
+        type=float,
+        nargs='+',
+        default=[1.0, 0.9, 0.7, 0.5],
+        help='the token keep ratios to evaluate')
+    parser.add_argument(
+        '--prune-layers',
+        type=int,
+        nargs='+',
+        default=[3, 6, 9],
+        help='the layers after which to prune tokens, only used if the '
+        'backbone config has no `token_pruning_cfg`')
+    parser.add_argument(
+        '--scorer',
+        choices=['cls_attn', 'learned'],
+        default='cls_attn',
+        help='the token scorer, only used if the backbone config has no '
+        '`token_pruning_cfg`')
+    parser.add_argument(
+        '--metrics',
+        type=str,
+        nargs='+',
+        default=['accuracy'],
+        help='evaluation metrics, which depends on the dataset')
+    parser.add_argument(
+        '--batch-size',
+        type=int,
+        default=32,
+        help='the batch size to measure the model throughput')
+    parser.add_argument(
+        '--num-iters',
+        type=int,
+        default=20,
+        help='the number of iterations to measure the model throughput')
+    parser.add_argument('--out', help='the json file to save the results')
+    parser.add_argument(
+        '--device',
+        choices=['cpu', 'cuda'],
+        default='cuda',
+        help='device used for testing')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    args = parser.parse_args()
+    return args
+
+
+def measure_throughput(model,
+                       img_shape,
+                       batch_size,
+                       num_iters,
+                       device,
+                       num_warmup=5):
+    """Measure the images per second of the model without data loading."""
+    img = torch.rand(batch_size, *img_shape, device=device)
+    with torch.no_grad():
+        for i in range(num_warmup + num_iters):
+            if i == num_warmup:
+                if device == 'cuda':
+                    torch.cuda.synchronize()
+                start = time.perf_counter()
+            model(return_loss=False, img=img)
+        if device == 'cuda':
+            torch.cuda.synchronize()
+    return batch_size * num_iters / (time.perf_counter() - start)
+
+
+def main():
+    args = parse_args()
+
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    cfg.model.pretrained = None
+    cfg.data.test.test_mode = True
+    backbone_cfg = cfg.model.backbone
+    assert backbone_cfg.type in ('VisionTransformer', 'T2T_ViT'), \
+        'Token pruning only supports VisionTransformer and T2T_ViT, ' \
+        f'but got {backbone_cfg.type}.'
+    if backbone_cfg.get('token_pruning_cfg', None) is None:
+        backbone_cfg.token_pruning_cfg = dict(
+            prune_layers=args.prune_layers, scorer=args.scorer)
+
+    dataset = build_dataset(cfg.data.test)
+    data_loader = build_dataloader(
+        dataset,
+        samples_per_gpu=cfg.data.samples_per_gpu,
+        workers_per_gpu=cfg.data.workers_per_gpu,
+        dist=False,
+        shuffle=False,
+        round_up=False)
+
+    model = build_classifier(cfg.model)
+    load_checkpoint(model, args.checkpoint, map_location='cpu')
+    pruner = model.backbone.token_pruner
+    img_shape = tuple(dataset[0]['img'].shape)
+    if args.device == 'cpu':
+        model = model.cpu()
+        device = 'cpu'
+    else:
+        model = MMDataParallel(model, device_ids=[0])
+        device = 'cuda'
+    model.eval()
+
+    results = []
+    for keep_ratio in args.keep_ratios:
+        pruner.keep_ratio = [keep_ratio] * len(pruner.prune_layers)
+        start = time.perf_counter()
+        outputs = single_gpu_test(model, data_loader)
+        test_time = time.perf_counter() - start
+        eval_results = dataset.evaluate(outputs, args.metrics)
+        throughput = measure_throughput(model, img_shape, args.batch_size,
+                                        args.num_iters, device)
+        result = dict(
+            keep_ratio=keep_ratio,
+            throughput=throughput,
+            test_time=test_time,
+            **{
+                k: v.tolist() if isinstance(v, np.ndarray) else v
+                for k, v in eval_results.items()
+            })
+        results.append(result)
+
+    base = results[0]['throughput']
+    print('\nkeep ratio | ' + ' | '.join(args.metrics) +
+          ' | images/s | speedup')
+    for result in results:
+        metrics = []
+        for k, v in result.items():
+            if k.split('_')[0] in args.metrics and isinstance(v, Number):
+                metrics.append(f'{k}: {v:.2f}')
+        print(f'{result["keep_ratio"]:.2f} | ' + ', '.join(metrics) +
+              f' | {result["throughput"]:.1f} | '
+              f'{result["throughput"] / base:.2f}x')
+
+    if args.out:
+        mmcv.dump(results, args.out)
+        print(f'\nThe results are saved in {args.out}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import copy
+import os.path as osp
+import time
+
+import mmcv
+import numpy as np
+import torch
+from mmcv import Config, DictAction
+from mmcv.cnn.utils import get_model_complexity_info
+from mmcv.runner import save_checkpoint
+
+from mmcls import __version__
+from mmcls.apis import (bn_gamma_importance, init_model, prune_classifier,
+                        taylor_importance, train_model)
+from mmcls.datasets import build_dataloader, build_dataset
+from mmcls.utils import get_root_logger
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Prune the channels of a ResNet/MobileNetV2 classifier, '
+        'and optionally fine-tune it after every pruning step.')
+    parser.add_argument('config', help='config file path')
+    parser.add_argument('checkpoint', help='checkpoint file')
+    parser.add_argument(
+        '--work-dir',
+        help='the dir to save the pruned configs, checkpoints and logs')
+    parser.add_argument(
+        '--ratio',
+        type=float,
+        default=0.3,
+        help='the ratio of channels to remove in every pruning step')
+    parser.add_argument(
+        '--iterations',
+        type=int,
+        default=1,
+        help='the number of prune-finetune cycles')
+    parser.add_argument(
+        '--importance',
+        choices=['bn_gamma', 'taylor'],
+        default='bn_gamma',
+        help='the criterion to rank channels')
+    parser.add_argument(
+        '--taylor-batches',
+        type=int,
+        default=10,
+        help='the number of training batches to estimate taylor importance')
+    parser.add_argument(
+        '--finetune-epochs',
+        type=int,
+        default=0,
+        help='the epochs to fine-tune after every pruning step')
+    parser.add_argument(
+        '--divisor',
+        type=int,
+        default=8,
+        help='round the remaining channels to a multiple of it')
+    parser.add_argument(
+        '--shape',
+        type=int,
+        nargs='+',
+        default=[224, 224],
+        help='input image size to count FLOPs and latency')
+    parser.add_argument(
+        '--latency-iters',
+        type=int,
+        default=50,
+        help='the number of iterations to measure CPU latency')
+    parser.add_argument(
+        '--device', choices=['cpu', 'cuda'], default='cpu', help='device')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    args = parser.parse_args()
+    return args
+
+
+def get_complexity(model, input_shape):
+    """Count the FLOPs and params in the same way as `get_flops.py`."""
+    model = copy.deepcopy(model).cpu()
+    model.eval()
+    model.forward = model.extract_feat
+    flops, params = get_model_complexity_info(
+        model, input_shape, print_per_layer_stat=False, as_strings=False)
+    return flops, params
+
+
+def get_cpu_latency(model, input_shape, num_iters=50, num_warmup=10):
+    """Measure the median latency of one image on CPU in milliseconds."""
+    model = copy.deepcopy(model).cpu()
+    model.eval()
+    img = torch.rand(1, *input_shape)
+    times = []
+    with torch.no_grad():
+        for i in range(num_warmup + num_iters):
+            start = time.perf_counter()
+            model.extract_feat(img)
+            if i >= num_warmup:
+                times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000
+
+
+def report(logger, name, model, input_shape, latency_iters):
+    flops, params = get_complexity(model, input_shape)
+    latency = get_cpu_latency(model, input_shape, latency_iters)
+    logger.info(f'{name}: FLOPs {flops / 1e9:.3f} G, '
+                f'Params {params / 1e6:.3f} M, '
+                f'CPU latency {latency:.2f} ms')
+    return dict(flops=flops, params=params, latency=latency)
+
+
+def main():
+    args = parse_args()
+
+    if len(args.shape) == 1:
+        input_shape = (3, args.shape[0], args.shape[0])
+    elif len(args.shape) == 2:
+        input_shape = (3, ) + tuple(args.shape)
+    else:
+        raise ValueError('invalid input shape')
+
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    if args.work_dir is not None:
+        cfg.work_dir = args.work_dir
+    elif cfg.get('work_dir', None) is None:
+        cfg.work_dir = osp.join(
+            './work_dirs',
+            osp.splitext(osp.basename(args.config))[0] + '_pruned')
+    mmcv.mkdir_or_exist(osp.abspath(cfg.work_dir))
+    timestamp = time.strftime('%Y%m%d_%H%M%S', time.localtime())
+    logger = get_root_logger(
+        log_file=osp.join(cfg.work_dir, f'{timestamp}.log'))
+
+    device = 'cuda:0' if args.device == 'cuda' else 'cpu'
+    model = init_model(cfg, args.checkpoint, device=device)
+    model_cfg = copy.deepcopy(cfg.model)
+    summary = [
+        report(logger, 'Original', model, input_shape, args.latency_iters)
+    ]
+
+    for i in range(args.iterations):
+        if args.importance == 'taylor':
+            dataset = build_dataset(cfg.data.train)
+            data_loader = build_dataloader(
+                dataset,
+                cfg.data.samples_per_gpu,
+                cfg.data.workers_per_gpu,
+                dist=False,
+                shuffle=True,
+                round_up=False,
+                persistent_workers=False)
+            importance = taylor_importance(model, data_loader,
+                                           args.taylor_batches)
+        else:
+            importance = bn_gamma_importance(model)
+        model, model_cfg = prune_classifier(
+            model,
+            model_cfg,
+            args.ratio,
+            importance=importance,
+            divisor=args.divisor)
+        cfg.model = model_cfg
+        # Avoid loading the unpruned weights in the following training.
+        cfg.load_from = None
+        cfg.resume_from = None
+
+        step_dir = osp.join(cfg.work_dir, f'prune_{i + 1}')
+        mmcv.mkdir_or_exist(step_dir)
+        if args.finetune_epochs > 0:
+            ft_cfg = copy.deepcopy(cfg)
+            ft_cfg.work_dir = step_dir
+            ft_cfg.runner = dict(
+                type='EpochBasedRunner', max_epochs=args.finetune_epochs)
+            ft_cfg.gpu_ids = range(1)
+            ft_cfg.seed = None
+            datasets = [build_dataset(ft_cfg.data.train)]
+            ft_cfg.checkpoint_config.meta = dict(
+                mmcls_version=__version__,
+                config=ft_cfg.pretty_text,
+                CLASSES=datasets[0].CLASSES)
+            train_model(
+                model,
+                datasets,
+                ft_cfg,
+                validate=True,
+                timestamp=timestamp,
+                device=args.device,
+                meta=dict())
+
+        cfg.dump(osp.join(step_dir, 'pruned_config.py'))
+        save_checkpoint(
+            model,
+            osp.join(step_dir, 'pruned.pth'),
+            meta=dict(
+                mmcls_version=__version__,
+                config=cfg.pretty_text,
+                CLASSES=getattr(model, 'CLASSES', None)))
+        summary.append(
+            report(logger, f'Pruning step {i + 1}', model, input_shape,
+                   args.latency_iters))
+
+    origin, final = summary[0], summary[-1]
+    logger.info(
+        f'FLOPs: {origin["flops"] / final["flops"]:.2f}x fewer, '
+        f'Params: {origin["params"] / final["params"]:.2f}x fewer, '
+        f'CPU latency: {origin["latency"] / final["latency"]:.2f}x faster. '
+        f'The pruned config and checkpoint are saved in {cfg.work_dir}.')
+
+
+if __name__ == '__main__':
+    main()
@@ -13,18 +13,25 @@ def parse_args():
         description='Process a checkpoint to be published')
     parser.add_argument('in_file', help='input checkpoint filename')
     parser.add_argument('out_file', help='output checkpoint filename')
+    parser.add_argument(
+        '--mmap',
+        action='store_true',
+        help='save in the zipfile format, which can be memory-mapped by '
+        '`mmcls.utils.load_checkpoint` but requires PyTorch>=1.6 to load')
     args = parser.parse_args()
     return args
 
 
-def process_checkpoint(in_file, out_file):
+def process_checkpoint(in_file, out_file, mmap=False):
     checkpoint = torch.load(in_file, map_location='cpu')
     # remove optimizer for smaller file size
     if 'optimizer' in checkpoint:
         del checkpoint['optimizer']
     # if it is necessary to remove some sensitive data in checkpoint['meta'],
     # add the code here.
-    if digit_version(torch.__version__) >= digit_version('1.6'):
+    if mmap:
+        torch.save(checkpoint, out_file)
+    elif digit_version(torch.__version__) >= digit_version('1.6'):
         torch.save(checkpoint, out_file, _use_new_zipfile_serialization=False)
     else:
         torch.save(checkpoint, out_file)
@@ -48,7 +55,7 @@ def main():
     if not out_dir.exists():
         raise ValueError(f'Directory {out_dir} does not exist, '
                          'please generate it manually.')
-    process_checkpoint(args.in_file, args.out_file)
+    process_checkpoint(args.in_file, args.out_file, args.mmap)
 
 
 if __name__ == '__main__':
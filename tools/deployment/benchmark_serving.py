@@ -0,0 +1,75 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Load test the inference server of '
+        '`tools/deployment/serve.py`.')
+    parser.add_argument('img', help='the image file to send')
+    parser.add_argument(
+        '--inference-addr',
+        default='127.0.0.1:8080',
+        help='address and port of the inference server')
+    parser.add_argument(
+        '--concurrency',
+        type=int,
+        nargs='+',
+        default=[1, 4, 16],
+        help='the numbers of concurrent clients to test')
+    parser.add_argument(
+        '--num-requests',
+        type=int,
+        default=200,
+        help='the number of requests for every concurrency')
+    args = parser.parse_args()
+    return args
+
+
+def run_client(url, content, num_requests):
+    latencies = []
+    with requests.Session() as session:
+        for _ in range(num_requests):
+            start = time.perf_counter()
+            response = session.post(url, data=content)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    args = parse_args()
+    url = f'http://{args.inference_addr}/predict'
+    with open(args.img, 'rb') as f:
+        content = f.read()
+    # warm up
+    run_client(url, content, 5)
+
+    print('concurrency | requests/s | p50 (ms) | p95 (ms) | p99 (ms)')
+    for concurrency in args.concurrency:
+        num_per_client = max(1, args.num_requests // concurrency)
+        with ThreadPoolExecutor(concurrency) as pool:
+            start = time.perf_counter()
+            futures = [
+                pool.submit(run_client, url, content, num_per_client)
+                for _ in range(concurrency)
+            ]
+            latencies = sum((f.result() for f in futures), [])
+            elapsed = time.perf_counter() - start
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        print(f'{concurrency} | {len(latencies) / elapsed:.1f} | '
+              f'{p50:.1f} | {p95:.1f} | {p99:.1f}')
+
+    response = requests.get(f'http://{args.inference_addr}/metrics')
+    for line in response.text.splitlines():
+        if line.startswith('mmcls_batch_size_') and 'bucket' not in line:
+            print(line)
+
+
+if __name__ == '__main__':
+    main()
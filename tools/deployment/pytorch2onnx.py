@@ -39,6 +39,7 @@ def pytorch2onnx(model,
                  input_shape,
                  opset_version=11,
                  dynamic_export=False,
+                 dynamic_batch=False,
                  show=False,
                  output_file='tmp.onnx',
                  do_simplify=False,
@@ -51,6 +52,11 @@ def pytorch2onnx(model,
         input_shape (tuple): Use this input shape to construct
             the corresponding dummy input and execute the model.
         opset_version (int): The onnx op version. Default: 11.
+        dynamic_export (bool): Whether to export with dynamic batch size
+            and image shape. Default: False.
+        dynamic_batch (bool): Whether to export with a dynamic batch size
+            only, which keeps the static image shape for the graph
+            optimization of the backends. Default: False.
         show (bool): Whether print the computation graph. Default: False.
         output_file (string): The path to where we store the output ONNX model.
             Default: `tmp.onnx`.
@@ -90,6 +96,8 @@ def pytorch2onnx(model,
                 0: 'batch'
             }
         }
+    elif dynamic_batch:
+        dynamic_axes = {'input': {0: 'batch'}, 'probs': {0: 'batch'}}
     else:
         dynamic_axes = {}
 
@@ -117,9 +125,11 @@ def pytorch2onnx(model,
             min_required_version
         ), f'Requires to install onnx-simplify>={min_required_version}'
 
-        if dynamic_axes:
+        if dynamic_export:
             input_shape = (input_shape[0], input_shape[1], input_shape[2] * 2,
                            input_shape[3] * 2)
+        elif dynamic_batch:
+            input_shape = (input_shape[0] * 2, ) + tuple(input_shape[1:])
         else:
             input_shape = (input_shape[0], input_shape[1], input_shape[2],
                            input_shape[3])
@@ -131,7 +141,7 @@ def pytorch2onnx(model,
             output_file,
             input_shapes=input_shape_dic,
             input_data=input_dic,
-            dynamic_input_shape=dynamic_export)
+            dynamic_input_shape=bool(dynamic_axes))
         if check_ok:
             onnx.save(model_opt, output_file)
             print(f'Successfully simplified ONNX model: {output_file}')
@@ -150,10 +160,16 @@ def pytorch2onnx(model,
                  input_shape[3] * 2), model.head.num_classes)
             imgs = dynamic_test_inputs.pop('imgs')
             img_list = [img[None, :] for img in imgs]
+        elif dynamic_batch:
+            imgs = _demo_mm_inputs((input_shape[0] * 2, ) + input_shape[1:],
+                                   model.head.num_classes).pop('imgs')
+            img_list = [imgs]
 
         # check the numerical value
         # get pytorch output
-        pytorch_result = model(img_list, img_metas={}, return_loss=False)[0]
+        pytorch_result = model(img_list, img_metas={}, return_loss=False)
+        pytorch_result = np.stack(pytorch_result) \
+            if dynamic_batch else pytorch_result[0]
 
         # get onnx output
         input_all = [node.name for node in onnx_model.graph.input]
@@ -195,6 +211,11 @@ def parse_args():
         action='store_true',
         help='Whether to export ONNX with dynamic input shape. \
             Defaults to False.')
+    parser.add_argument(
+        '--dynamic-batch',
+        action='store_true',
+        help='Whether to export ONNX with dynamic batch size only, which is '
+        'recommended for the batched inference of `ONNXRuntimeEngine`.')
     args = parser.parse_args()
     return args
 
@@ -228,6 +249,7 @@ if __name__ == '__main__':
         opset_version=args.opset_version,
         show=args.show,
         dynamic_export=args.dynamic_export,
+        dynamic_batch=args.dynamic_batch,
         output_file=args.output_file,
         do_simplify=args.simplify,
         verify=args.verify)
@@ -0,0 +1,84 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+
+import mmcv
+from mmcv import DictAction
+
+from mmcls.apis import init_model
+from mmcls.serving import InferenceServer, build_backend
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Serve a classifier over HTTP with dynamic batching.')
+    parser.add_argument('config', help='model config file')
+    parser.add_argument(
+        'model',
+        help='checkpoint file for the pytorch backend, or the exported model '
+        'file for the torchscript and onnxruntime backends')
+    parser.add_argument(
+        '--backend',
+        choices=['pytorch', 'torchscript', 'onnxruntime'],
+        default='pytorch',
+        help='backend of the model')
+    parser.add_argument(
+        '--host', default='127.0.0.1', help='the address to listen on')
+    parser.add_argument(
+        '--port', type=int, default=8080, help='the port to listen on')
+    parser.add_argument(
+        '--max-batch-size',
+        type=int,
+        default=8,
+        help='the maximum number of images in a batch')
+    parser.add_argument(
+        '--max-wait-ms',
+        type=float,
+        default=5.,
+        help='the maximum time to wait for a batch to be filled')
+    parser.add_argument(
+        '--num-workers',
+        type=int,
+        default=4,
+        help='the number of threads to decode and preprocess images')
+    parser.add_argument(
+        '--device', default='cpu', help='device used for inference')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file.')
+    args = parser.parse_args()
+    return args
+
+
+def main():
+    args = parse_args()
+    cfg = mmcv.Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+
+    if args.backend == 'pytorch':
+        model = init_model(cfg, args.model, device=args.device)
+        class_names = model.CLASSES
+    else:
+        from mmcls.datasets import DATASETS
+        model = args.model
+        dataset_type = DATASETS.get(cfg.data.test.type)
+        class_names = dataset_type.get_classes(
+            cfg.data.test.get('classes', None))
+    backend = build_backend(
+        args.backend, model, class_names=class_names, device=args.device)
+
+    server = InferenceServer(
+        backend,
+        cfg.data.test.pipeline,
+        class_names,
+        max_batch_size=args.max_batch_size,
+        max_wait_ms=args.max_wait_ms,
+        num_workers=args.num_workers)
+    server.run(args.host, args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,15 @@
 # Copyright (c) OpenMMLab. All rights reserved.
 import argparse
+import time
 import warnings
 
 import mmcv
 import numpy as np
+import torch
 from mmcv import DictAction
 from mmcv.parallel import MMDataParallel
 
-from mmcls.apis import single_gpu_test
+from mmcls.apis import init_model, single_gpu_test
 from mmcls.core.export import ONNXRuntimeClassifier, TensorRTClassifier
 from mmcls.datasets import build_dataloader, build_dataset
 
@@ -48,6 +50,22 @@ def parse_args():
     parser.add_argument('--show', action='store_true', help='show results')
     parser.add_argument(
         '--show-dir', help='directory where painted images will be saved')
+    parser.add_argument(
+        '--engine-cfg',
+        nargs='+',
+        action=DictAction,
+        help='arguments of `ONNXRuntimeEngine` to run the onnxruntime backend '
+        'on CPU with a pool of tuned sessions, e.g. "num_sessions=2 '
+        'intra_op_num_threads=4 max_batch_size=32".')
+    parser.add_argument(
+        '--uint8-input',
+        action='store_true',
+        help='remove the `Normalize` from the pipeline and feed uint8 images '
+        'to `ONNXRuntimeEngine`, which normalizes them in its input buffer.')
+    parser.add_argument(
+        '--pytorch-checkpoint',
+        help='if specified, also run the PyTorch model with this checkpoint '
+        'and compare the throughput with the backend.')
     args = parser.parse_args()
     return args
 
@@ -62,6 +80,20 @@ def main():
     if args.cfg_options is not None:
         cfg.merge_from_dict(args.cfg_options)
 
+    engine_cfg = args.engine_cfg
+    test_pipeline = cfg.data.test.pipeline
+    if args.uint8_input:
+        assert args.backend == 'onnxruntime', \
+            '`--uint8-input` is only supported by the onnxruntime backend.'
+        norm_cfg = [t for t in test_pipeline if t['type'] == 'Normalize']
+        assert len(norm_cfg) == 1, \
+            'Cannot find the `Normalize` in the test pipeline.'
+        engine_cfg = dict(engine_cfg or {}, **norm_cfg[0])
+        engine_cfg.pop('type')
+        cfg.data.test.pipeline = [
+            t for t in test_pipeline if t['type'] != 'Normalize'
+        ]
+
     # build dataset and dataloader
     dataset = build_dataset(cfg.data.test)
     data_loader = build_dataloader(
@@ -74,7 +106,10 @@ def main():
     # build onnxruntime model and run inference.
     if args.backend == 'onnxruntime':
         model = ONNXRuntimeClassifier(
-            args.model, class_names=dataset.CLASSES, device_id=0)
+            args.model,
+            class_names=dataset.CLASSES,
+            device_id=0,
+            engine_cfg=engine_cfg)
     elif args.backend == 'tensorrt':
         model = TensorRTClassifier(
             args.model, class_names=dataset.CLASSES, device_id=0)
@@ -84,7 +119,30 @@ def main():
 
     model = MMDataParallel(model, device_ids=[0])
     model.CLASSES = dataset.CLASSES
+    start = time.perf_counter()
     outputs = single_gpu_test(model, data_loader, args.show, args.show_dir)
+    elapsed = time.perf_counter() - start
+    print(f'\nThroughput of {args.backend}: '
+          f'{len(dataset) / elapsed:.2f} images/s')
+
+    if args.pytorch_checkpoint:
+        cfg.data.test.pipeline = test_pipeline
+        dataset = build_dataset(cfg.data.test)
+        data_loader = build_dataloader(
+            dataset,
+            samples_per_gpu=cfg.data.samples_per_gpu,
+            workers_per_gpu=cfg.data.workers_per_gpu,
+            shuffle=False,
+            round_up=False)
+        device = 'cuda' if torch.cuda.is_available() else 'cpu'
+        pytorch_model = init_model(cfg, args.pytorch_checkpoint, device=device)
+        pytorch_model = MMDataParallel(pytorch_model, device_ids=[0])
+        start = time.perf_counter()
+        single_gpu_test(pytorch_model, data_loader)
+        pytorch_elapsed = time.perf_counter() - start
+        print(f'\nThroughput of pytorch: '
+              f'{len(dataset) / pytorch_elapsed:.2f} images/s, '
+              f'{args.backend} speedup: {pytorch_elapsed / elapsed:.2f}x')
 
     if args.metrics:
         results = dataset.evaluate(outputs, args.metrics, args.metric_options)
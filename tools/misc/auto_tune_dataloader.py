@@ -0,0 +1,116 @@
+# Copyright (c) OpenMMLab. All rights reserved.
+import argparse
+
+from mmcv import Config, DictAction
+
+from mmcls.datasets import auto_tune_dataloader, build_dataset
+from mmcls.datasets.auto_tune import TUNED_KEYS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description='Tune the number of workers, the prefetch factor, the '
+        'batch size and the memory pinning of the training data loader by '
+        'short timed trials')
+    parser.add_argument('config', help='config file path')
+    parser.add_argument(
+        '--workers',
+        type=int,
+        nargs='+',
+        help='numbers of workers to try, defaults to 0 and the powers of 2 '
+        'up to the number of CPUs')
+    parser.add_argument(
+        '--prefetch-factors',
+        type=int,
+        nargs='+',
+        default=[2, 4],
+        help='prefetch factors to try')
+    parser.add_argument(
+        '--batch-sizes',
+        type=int,
+        nargs='+',
+        help='batch sizes to try, defaults to the one in the config')
+    parser.add_argument(
+        '--pin-memory',
+        choices=['true', 'false', 'both'],
+        help='the memory pinning to try, defaults to both if CUDA is '
+        'available')
+    parser.add_argument(
+        '--num-batches',
+        type=int,
+        default=20,
+        help='number of timed batches of every trial')
+    parser.add_argument(
+        '--warmup', type=int, default=3, help='number of warm-up batches')
+    parser.add_argument(
+        '--tolerance',
+        type=float,
+        default=0.05,
+        help='the relative speed tolerance to prefer the setting with less '
+        'memory')
+    parser.add_argument('--max-rss', type=float, help='the memory limit in MB')
+    parser.add_argument(
+        '--cache-file',
+        default='~/.cache/mmcls/dataloader_profiles.json',
+        help='the file of cached profiles')
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='run the trials even if the profile is cached')
+    parser.add_argument(
+        '--out-config', help='the file to save the config with the settings')
+    parser.add_argument(
+        '--cfg-options',
+        nargs='+',
+        action=DictAction,
+        help='override some settings in the used config, the key-value pair '
+        'in xxx=yyy format will be merged into config file. If the value to '
+        'be overwritten is a list, it should be like key="[a,b]" or key=a,b '
+        'It also allows nested list/tuple values, e.g. key="[(a,b),(c,d)]" '
+        'Note that the quotation marks are necessary and that no white space '
+        'is allowed.')
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    cfg = Config.fromfile(args.config)
+    if args.cfg_options is not None:
+        cfg.merge_from_dict(args.cfg_options)
+    pin_memory = {
+        None: None,
+        'true': [True],
+        'false': [False],
+        'both': [True, False]
+    }[args.pin_memory]
+
+    dataset = build_dataset(cfg.data.train)
+    profile = auto_tune_dataloader(
+        dataset,
+        cfg.data,
+        workers=args.workers,
+        prefetch_factors=args.prefetch_factors,
+        batch_sizes=args.batch_sizes,
+        pin_memory=pin_memory,
+        num_batches=args.num_batches,
+        warmup=args.warmup,
+        tolerance=args.tolerance,
+        max_rss_mb=args.max_rss,
+        cache_file=args.cache_file,
+        use_cache=not args.no_cache)
+
+    if args.out_config is not None:
+        cfg.data.update(profile['settings'])
+        cfg.data.pop('auto_tune', None)
+        cfg.dump(args.out_config)
+        print(f'The config is saved at {args.out_config}')
+    else:
+        settings = ', '.join(f'{key}={profile["settings"][key]}'
+                             for key in TUNED_KEYS)
+        print('Add the settings to the `data` field of the config: '
+              f'{settings}')
+
+
+if __name__ == '__main__':
+    main()
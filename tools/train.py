@@ -12,7 +12,7 @@ from mmcv import Config, DictAction
 from mmcv.runner import get_dist_info, init_dist
 
 from mmcls import __version__
-from mmcls.apis import set_random_seed, train_model
+from mmcls.apis import build_feature_cache, set_random_seed, train_model
 from mmcls.datasets import build_dataset
 from mmcls.models import build_classifier
 from mmcls.utils import collect_env, get_root_logger
@@ -153,6 +153,16 @@ def main():
     model = build_classifier(cfg.model)
     model.init_weights()
 
+    if cfg.get('feature_cache', None) is not None:
+        # extract the features of the frozen backbone once, and train the
+        # head only on the cached features.
+        if distributed:
+            extract_device = f'cuda:{torch.cuda.current_device()}'
+        else:
+            extract_device = 'cpu' if args.device == 'cpu' else 'cuda'
+        model = build_feature_cache(model, cfg, device=extract_device)
+        logger.info(f'Train the head on cached features:\n{cfg.pretty_text}')
+
     datasets = [build_dataset(cfg.data.train)]
     if len(cfg.workflow) == 2:
         val_dataset = copy.deepcopy(cfg.data.val)